@@ -0,0 +1,107 @@
+"""Tests of the cache of stage outputs."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from topostats.cache import CACHED_STAGES, StageCache, hash_config, hash_input, run_stage
+
+# pylint: disable=protected-access
+
+RNG = np.random.default_rng(seed=1000)
+IMAGE = RNG.random((16, 16))
+CONFIGS = {stage: {"run": True, "parameter": 1.0} for stage in CACHED_STAGES}
+
+
+@pytest.mark.parametrize(
+    ("image", "pixel_to_nm_scaling", "filename", "img_path", "expected_equal"),
+    [
+        pytest.param(IMAGE.copy(), 1.0, "image", "dir/image", True, id="identical"),
+        pytest.param(IMAGE + 1e-9, 1.0, "image", "dir/image", False, id="image differs"),
+        pytest.param(IMAGE.copy(), 2.0, "image", "dir/image", False, id="scaling differs"),
+        pytest.param(IMAGE.copy(), 1.0, "other", "dir/image", False, id="filename differs"),
+        pytest.param(IMAGE.T.copy().T, 1.0, "image", "dir/image", True, id="non-contiguous"),
+    ],
+)
+def test_hash_input(
+    image: np.ndarray, pixel_to_nm_scaling: float, filename: str, img_path: str, expected_equal: bool
+) -> None:
+    """Test hashing of input scans."""
+    reference = hash_input(IMAGE, 1.0, "image", "dir/image")
+    assert (hash_input(image, pixel_to_nm_scaling, filename, img_path) == reference) == expected_equal
+
+
+def test_hash_config() -> None:
+    """Test hashing of configuration is independent of key order."""
+    assert hash_config({"a": 1, "b": {"c": 2}}) == hash_config({"b": {"c": 2}, "a": 1})
+    assert hash_config({"a": 1}) != hash_config({"a": 2})
+
+
+@pytest.mark.parametrize(
+    ("changed_stage", "expected_unchanged"),
+    [
+        pytest.param("filter", [], id="filter changes all"),
+        pytest.param("grainstats", ["filter", "grains"], id="grainstats changes later stages"),
+        pytest.param("splining", list(CACHED_STAGES[:-1]), id="splining changes only splining"),
+    ],
+)
+def test_stage_keys(changed_stage: str, expected_unchanged: list) -> None:
+    """Test changing the configuration of a stage changes the key of that and all later stages only."""
+    keys = StageCache.stage_keys("input", CONFIGS)
+    changed_configs = {**CONFIGS, changed_stage: {"run": True, "parameter": 2.0}}
+    changed_keys = StageCache.stage_keys("input", changed_configs)
+    unchanged = [stage for stage in CACHED_STAGES if keys[stage] == changed_keys[stage]]
+    assert unchanged == expected_unchanged
+
+
+def test_stage_keys_version(monkeypatch) -> None:
+    """Test the key of every stage changes with the version of TopoStats."""
+    keys = StageCache.stage_keys("input", CONFIGS)
+    monkeypatch.setattr("topostats.cache.__version__", "0.0.0")
+    changed_keys = StageCache.stage_keys("input", CONFIGS)
+    assert all(keys[stage] != changed_keys[stage] for stage in CACHED_STAGES)
+
+
+def test_stage_cache_get_put(tmp_path) -> None:
+    """Test values are cached and retrieved."""
+    cache = StageCache(cache_dir=tmp_path / "cache", max_size_gb=1.0)
+    assert cache.get("missing") == (False, None)
+    value = (IMAGE, pd.DataFrame({"a": [1, 2]}), {"above": {"grain_0": IMAGE}})
+    cache.put("key", value)
+    found, cached = cache.get("key")
+    assert found
+    np.testing.assert_array_equal(cached[0], IMAGE)
+    pd.testing.assert_frame_equal(cached[1], value[1])
+    np.testing.assert_array_equal(cached[2]["above"]["grain_0"], IMAGE)
+    assert list((tmp_path / "cache").glob("*.tmp")) == []
+
+
+def test_stage_cache_evict(tmp_path) -> None:
+    """Test the least recently used entries are evicted when the cache exceeds its maximum size."""
+    cache = StageCache(cache_dir=tmp_path, max_size_gb=1.0)
+    cache.put("first", np.zeros(1000))
+    cache.put("second", np.zeros(1000))
+    entry_size = cache._path("first").stat().st_size
+    # Make "first" the most recently used
+    cache.get("second")
+    cache.get("first")
+    cache.max_size_bytes = int(entry_size * 1.5)
+    cache.evict()
+    assert cache._path("first").exists()
+    assert not cache._path("second").exists()
+
+
+def test_run_stage(tmp_path) -> None:
+    """Test functions are only run on a cache miss."""
+    calls = []
+
+    def stage(x: int) -> int:
+        calls.append(x)
+        return x * 2
+
+    cache = StageCache(cache_dir=tmp_path, max_size_gb=1.0)
+    assert run_stage(cache, "key", stage, x=2) == 4
+    assert run_stage(cache, "key", stage, x=2) == 4
+    assert calls == [2]
+    assert run_stage(None, None, stage, x=3) == 6
+    assert calls == [2, 3]
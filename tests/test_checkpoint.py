@@ -0,0 +1,71 @@
+"""Tests of the checkpoint module."""
+
+from pathlib import Path
+
+import pytest
+
+from topostats.checkpoint import Checkpoints
+
+# pylint: disable=protected-access
+
+CONFIG = {"cores": 2, "log_level": "info", "resume": True, "filter": {"threshold_std_dev": 1.0}}
+
+
+def _results(img_path: str, value: int) -> tuple:
+    """Results in the shape returned by ``process_scan()``."""
+    return (Path(img_path), {"value": value}, None, None, None, None)
+
+
+def test_commit(tmp_path: Path) -> None:
+    """Test committing results marks the image as committed and leaves no temporary directories."""
+    checkpoints = Checkpoints(output_dir=tmp_path, config=CONFIG)
+    assert not checkpoints.is_committed(Path("dir/image_1"))
+    checkpoints.commit(_results("dir/image_1", 1))
+    assert checkpoints.is_committed(Path("dir/image_1"))
+    assert not checkpoints.is_committed(Path("dir/image_2"))
+    assert [path.name for path in checkpoints.checkpoint_dir.iterdir()] == [
+        checkpoints._image_dir(Path("dir/image_1")).name
+    ]
+
+
+@pytest.mark.parametrize(
+    ("config", "committed"),
+    [
+        pytest.param({**CONFIG, "cores": 8, "log_level": "debug", "resume": False}, True, id="excluded keys changed"),
+        pytest.param({**CONFIG, "filter": {"threshold_std_dev": 2.0}}, False, id="filter config changed"),
+    ],
+)
+def test_fingerprint(tmp_path: Path, config: dict, committed: bool) -> None:
+    """Test only changes to options which affect the results invalidate committed images."""
+    Checkpoints(output_dir=tmp_path, config=CONFIG).commit(_results("image_1", 1))
+    assert Checkpoints(output_dir=tmp_path, config=config).is_committed(Path("image_1")) == committed
+
+
+def test_commit_replaces_stale(tmp_path: Path) -> None:
+    """Test committing with a new configuration replaces results committed with an old configuration."""
+    Checkpoints(output_dir=tmp_path, config=CONFIG).commit(_results("image_1", 1))
+    checkpoints = Checkpoints(output_dir=tmp_path, config={**CONFIG, "filter": {"threshold_std_dev": 2.0}})
+    checkpoints.commit(_results("image_1", 2))
+    assert [results[1] for results in checkpoints.load_committed()] == [{"value": 2}]
+    assert len(list(checkpoints.checkpoint_dir.iterdir())) == 1
+
+
+def test_load_committed(tmp_path: Path) -> None:
+    """Test only results committed with the current configuration are loaded."""
+    Checkpoints(output_dir=tmp_path, config={**CONFIG, "filter": {}}).commit(_results("image_0", 0))
+    checkpoints = Checkpoints(output_dir=tmp_path, config=CONFIG)
+    committed = list(checkpoints.commit_each(_results(f"image_{i}", i) for i in range(1, 4)))
+    assert len(committed) == 3
+    loaded = sorted(checkpoints.load_committed(), key=lambda results: results[1]["value"])
+    assert [results[0] for results in loaded] == [Path("image_1"), Path("image_2"), Path("image_3")]
+    assert [results[1] for results in loaded] == [{"value": 1}, {"value": 2}, {"value": 3}]
+
+
+def test_incomplete_commits_removed(tmp_path: Path) -> None:
+    """Test directories left by an interrupted commit are removed and never loaded."""
+    staging_dir = tmp_path / "checkpoints" / ".staging_abc"
+    staging_dir.mkdir(parents=True)
+    (staging_dir / "results.pkl").write_bytes(b"partial")
+    checkpoints = Checkpoints(output_dir=tmp_path, config=CONFIG)
+    assert not staging_dir.exists()
+    assert list(checkpoints.load_committed()) == []
@@ -1,5 +1,8 @@
 """Test the entry point of TopoStats and its ability to correctly direct to programs."""
 
+import re
+import subprocess
+import sys
 from collections.abc import Callable
 from pathlib import Path
 
@@ -14,6 +17,10 @@ from topostats.plotting import run_toposum
 
 # noqa: S108
 
+# Time in seconds importing the entry point may take, every invocation of topostats (and every worker process it spawns)
+# pays this before doing any work
+IMPORT_TIME_BUDGET = 4.0
+
 
 # Test "help" arguments
 @pytest.mark.parametrize("option", [("-h"), ("--help")])
@@ -710,3 +717,24 @@ def test_entry_point_create_simple_config_file(tmp_path: Path) -> None:
         ]
     )
     assert Path(f"{tmp_path}/test_create_simple_config.yaml").is_file()
+
+
+def test_entry_point_import_time() -> None:
+    """Test importing the entry point, timed in a fresh interpreter, is within budget and skips heavy dependencies."""
+    heavy_modules = ["keras", "tensorflow", "topoly", "snoop", "seaborn", "skan", "pySPM"]
+    result = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys, topostats.entry_point; print([m for m in {heavy_modules} if m in sys.modules])",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+    # Lines of -X importtime are "import time: self [us] | cumulative [us] | module"
+    import_time = re.search(r"\|\s*(\d+) \| topostats\.entry_point$", result.stderr, re.MULTILINE)
+    assert int(import_time.group(1)) / 1e6 < IMPORT_TIME_BUDGET
@@ -6,7 +6,7 @@ import numpy as np
 import pytest
 from skimage.filters import gaussian  # pylint: disable=no-name-in-module
 
-from topostats.filters import Filters
+from topostats.filters import Filters, _nanquantile_rows
 
 # pylint: disable=protected-access
 
@@ -38,6 +38,59 @@ def test_median_flatten_no_mask(
     np.testing.assert_allclose(median_flattened, expected, **TOLERANCE)
 
 
+def test_median_flatten_fully_masked_rows() -> None:
+    """Test rows that are entirely masked are left unaligned and reported as a warning."""
+    image = np.arange(30, dtype=float).reshape(5, 6)
+    mask = np.zeros(image.shape, dtype=bool)
+    mask[[1, 3], :] = True
+    mask[0, :3] = True
+    filters = Filters(image=image, filename="dummy_input", pixel_to_nm_scaling=1.0)
+    median_flattened = filters.median_flatten(image, mask=mask, row_alignment_quantile=0.5)
+
+    np.testing.assert_array_equal(median_flattened[[1, 3]], image[[1, 3]])
+    np.testing.assert_array_equal(median_flattened[0], image[0] - 4.0)
+    np.testing.assert_array_equal(median_flattened[[2, 4]], image[[2, 4]] - image[[2, 4]].mean(axis=1)[:, None])
+    assert filters.warnings == [
+        {
+            "step": "median_flatten",
+            "masked": True,
+            "rows": [1, 3],
+            "message": "Rows fully masked, large grain detected, rows not aligned.",
+        }
+    ]
+
+
+def test_filter_image_logs_warnings(caplog) -> None:
+    """Test warnings recorded whilst filtering are logged once for the image."""
+    image = RNG.random((32, 32))
+    initial_mask = np.zeros(image.shape, dtype=bool)
+    initial_mask[[4, 5], :] = True
+    filters = Filters(
+        image=image,
+        filename="dummy_input",
+        pixel_to_nm_scaling=1.0,
+        threshold_method="std_dev",
+        threshold_std_dev={"above": 1.0, "below": 10.0},
+        gaussian_size=1.0,
+        remove_scars={"run": False},
+        initial_mask=initial_mask,
+    )
+    filters.filter_image()
+    assert filters.warnings == [
+        {
+            "step": "median_flatten",
+            "masked": True,
+            "rows": [4, 5],
+            "message": "Rows fully masked, large grain detected, rows not aligned.",
+        }
+    ]
+    warnings = [record.getMessage() for record in caplog.records if record.levelname == "WARNING"]
+    assert warnings == [
+        "[dummy_input] [median_flatten] : Rows fully masked, large grain detected, rows not aligned. 2 row(s) with "
+        "mask : [4, 5], please refer to https://github.com/AFM-SPM/TopoStats/discussions for more information."
+    ]
+
+
 def test_remove_tilt_no_mask(test_filters_random: Filters, image_random_remove_x_y_tilt: np.array) -> None:
     """Test removal of x/y tilt."""
     tilt_removed = test_filters_random.remove_tilt(test_filters_random.images["pixels"], mask=None)
@@ -129,3 +182,21 @@ def test_gaussian_filter(small_array_filters: Filters, filter_config: dict) -> N
     )
     assert isinstance(small_array_filters.images["gaussian_filtered"], np.ndarray)
     np.testing.assert_array_equal(small_array_filters.images["gaussian_filtered"], target)
+
+
+@pytest.mark.parametrize(
+    ("dtype", "tolerance"),
+    [
+        pytest.param(np.float64, {"rtol": 1e-12}, id="float64"),
+        pytest.param(np.float32, {"rtol": 1e-6}, id="float32"),
+    ],
+)
+def test_nanquantile_rows(dtype: type, tolerance: dict) -> None:
+    """Test the quantile of each row ignoring NaN matches numpy.nanquantile."""
+    array = RNG.random((6, 4, 9)).astype(dtype)
+    array[RNG.random(array.shape) > 0.6] = np.nan
+    array[0, 0] = np.nan
+    for quantile in (0.0, 0.2, 0.5, 1.0):
+        with pytest.warns(RuntimeWarning):
+            expected = np.nanquantile(array, quantile, axis=-1)
+        np.testing.assert_allclose(_nanquantile_rows(array, quantile), expected, **tolerance)
@@ -85,3 +85,114 @@ def test_gaussian_filter(minicircle_grain_gaussian_filter: Filters) -> None:
     assert isinstance(minicircle_grain_gaussian_filter.images["gaussian_filtered"], np.ndarray)
     assert minicircle_grain_gaussian_filter.images["gaussian_filtered"].shape == (64, 64)
     assert minicircle_grain_gaussian_filter.images["gaussian_filtered"].sum() == pytest.approx(1325.8136941472153)
+
+
+@pytest.mark.parametrize(
+    ("remove_scars"),
+    [
+        pytest.param(False, id="without scar removal"),
+        pytest.param(True, id="with scar removal"),
+    ],
+)
+def test_filter_image_lean_memory(load_scan, filter_config: dict, remove_scars: bool) -> None:
+    """Test lean memory mode gives the same filtered image and mask while keeping only the images needed later."""
+    load_scan.get_data()
+    filtered = {}
+    for lean_memory in (False, True):
+        config = {
+            **filter_config,
+            "lean_memory": lean_memory,
+            "remove_scars": {**filter_config["remove_scars"], "run": remove_scars},
+        }
+        filters = Filters(
+            image=load_scan.image,
+            filename=load_scan.filename,
+            pixel_to_nm_scaling=load_scan.pixel_to_nm_scaling,
+            **config,
+        )
+        pixels = filters.images["pixels"].copy()
+        filters.filter_image()
+        np.testing.assert_array_equal(filters.images["pixels"], pixels)
+        filtered[lean_memory] = filters.images
+
+    assert set(filtered[True]) == {"pixels", "scar_mask", "mask", "gaussian_filtered"}
+    for key, image in filtered[True].items():
+        np.testing.assert_array_equal(image, filtered[False][key])
+
+
+def test_filter_image_float32(load_scan, filter_config: dict) -> None:
+    """Test filtering in single precision keeps the precision and stays close to double precision."""
+    load_scan.get_data()
+    filtered = {}
+    for precision in ("float64", "float32"):
+        filters = Filters(
+            image=load_scan.image.astype(precision),
+            filename=load_scan.filename,
+            pixel_to_nm_scaling=load_scan.pixel_to_nm_scaling,
+            **{**filter_config, "remove_scars": {**filter_config["remove_scars"], "run": True}},
+        )
+        filters.filter_image()
+        for key, image in filters.images.items():
+            if image is not None and image.dtype.kind == "f":
+                assert image.dtype == np.dtype(precision), key
+        filtered[precision] = filters.images
+
+    np.testing.assert_array_equal(filtered["float32"]["mask"], filtered["float64"]["mask"])
+    np.testing.assert_allclose(
+        filtered["float32"]["gaussian_filtered"], filtered["float64"]["gaussian_filtered"], atol=1e-5
+    )
+
+
+@pytest.mark.parametrize(
+    ("remove_scars"),
+    [
+        pytest.param(False, id="without scar removal"),
+        pytest.param(True, id="with scar removal"),
+    ],
+)
+def test_filter_image_stack(load_scan, filter_config: dict, remove_scars: bool) -> None:
+    """Test filtering a stack of frames gives the same images as filtering each frame on its own."""
+    load_scan.get_data()
+    frames = [load_scan.image, np.rot90(load_scan.image), load_scan.image[::-1] * 2.0]
+    stack = Filters(
+        image=np.stack(frames),
+        filename=load_scan.filename,
+        pixel_to_nm_scaling=load_scan.pixel_to_nm_scaling,
+        **{**filter_config, "remove_scars": {**filter_config["remove_scars"], "run": remove_scars}},
+    )
+    stack.filter_image()
+    for index, frame in enumerate(frames):
+        filters = Filters(
+            image=frame,
+            filename=load_scan.filename,
+            pixel_to_nm_scaling=load_scan.pixel_to_nm_scaling,
+            **{**filter_config, "remove_scars": {**filter_config["remove_scars"], "run": remove_scars}},
+        )
+        filters.filter_image()
+        assert stack.thresholds[index] == pytest.approx(filters.thresholds)
+        for key, image in filters.images.items():
+            if image is not None:
+                np.testing.assert_allclose(stack.images[key][index], image, atol=1e-10, err_msg=key)
+
+
+def test_filter_image_tiled(load_scan, filter_config: dict) -> None:
+    """Test filtering in tiles gives the same images as filtering the whole image."""
+    load_scan.get_data()
+    filtered = {}
+    for run in (False, True):
+        filters = Filters(
+            image=load_scan.image,
+            filename=load_scan.filename,
+            pixel_to_nm_scaling=load_scan.pixel_to_nm_scaling,
+            **{
+                **filter_config,
+                "remove_scars": dict(filter_config["remove_scars"]),
+                "tiling": {"run": run, "tile_size": 16, "cores": 2},
+            },
+        )
+        filters.filter_image()
+        filtered[run] = filters.images
+
+    for key, image in filtered[False].items():
+        if image is not None:
+            np.testing.assert_allclose(filtered[True][key], image, atol=1e-10, err_msg=key)
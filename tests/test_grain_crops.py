@@ -0,0 +1,112 @@
+"""Tests of the grain_crops module."""
+
+import numpy as np
+import pytest
+
+from topostats import grain_crops
+from topostats.grains import Grains
+
+# Two grains, the first touching the top edge of the image and the second touching the right edge
+LABELLED_REGIONS = np.array(
+    [
+        [0, 1, 1, 0, 0, 0, 0],
+        [0, 1, 1, 0, 0, 0, 0],
+        [0, 0, 0, 0, 2, 2, 0],
+        [0, 0, 0, 0, 2, 2, 2],
+        [0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+    ]
+)
+
+
+@pytest.mark.parametrize(
+    ("padding", "expected_bounding_boxes"),
+    [
+        pytest.param(0, [(0, 1, 2, 3), (2, 4, 4, 7)], id="no padding"),
+        pytest.param(2, [(0, 0, 4, 5), (0, 2, 6, 7)], id="padding stops at the edges"),
+    ],
+)
+def test_crop_labelled_grains(padding: int, expected_bounding_boxes: list) -> None:
+    """Test each labelled region is cropped, other regions in the crop are removed."""
+    crops = grain_crops.crop_labelled_grains(LABELLED_REGIONS, padding=padding)
+    assert [crop.bounding_box for crop in crops] == expected_bounding_boxes
+    for label, crop in enumerate(crops, start=1):
+        min_row, min_col, max_row, max_col = crop.bounding_box
+        np.testing.assert_array_equal(crop.mask, LABELLED_REGIONS[min_row:max_row, min_col:max_col] == label)
+        assert crop.padding == padding
+
+
+def test_crop_labelled_grains_missing_label() -> None:
+    """Test labels missing from the image are skipped."""
+    crops = grain_crops.crop_labelled_grains(np.where(LABELLED_REGIONS == 1, 0, LABELLED_REGIONS))
+    assert [crop.bounding_box for crop in crops] == [(2, 4, 4, 7)]
+
+
+def test_crop_grains() -> None:
+    """Test grains of a multi-class tensor are cropped, matching cropping the whole tensor for each grain."""
+    grain_mask_tensor = np.zeros((*LABELLED_REGIONS.shape, 3), dtype=bool)
+    grain_mask_tensor[:, :, 1] = LABELLED_REGIONS > 0
+    # The second grain has a region of a second class touching it, they are one grain
+    grain_mask_tensor[4, 5, 2] = True
+    grain_mask_tensor[:, :, 0] = ~np.any(grain_mask_tensor[:, :, 1:], axis=-1)
+    crops = grain_crops.crop_grains(grain_mask_tensor, padding=2)
+    assert [crop.bounding_box for crop in crops] == [(0, 0, 4, 5), (0, 2, 6, 7)]
+    assert crops[1].mask.shape == (6, 5, 3)
+    # The first grain is removed from the crop of the second, the background updated
+    assert not crops[1].mask[0, 0, 1]
+    assert crops[1].mask[0, 0, 0]
+    assert crops[1].mask[4, 3, 2]
+    for crop in crops:
+        assert crop.mask.dtype == bool
+        np.testing.assert_array_equal(crop.mask[:, :, 0], ~np.any(crop.mask[:, :, 1:], axis=-1))
+    # Grains are found as when labelling the whole tensor
+    assert [crop.bounding_box for crop in grain_crops.crop_grains(grain_mask_tensor, padding=1)] == list(
+        Grains.get_multi_class_grain_bounding_boxes(grain_mask_tensor).values()
+    )
+
+
+@pytest.mark.parametrize(
+    ("classes", "padding", "expected_bounding_box"),
+    [
+        pytest.param(False, 1, (1, 3, 5, 7), id="2-D mask"),
+        pytest.param(True, 3, (0, 1, 6, 7), id="tensor padded to the edges"),
+    ],
+)
+def test_pad_grain_crop(classes: bool, padding: int, expected_bounding_box: tuple) -> None:
+    """Test padding a crop matches cropping the grain with the larger padding."""
+    crop = grain_crops.crop_labelled_grains(LABELLED_REGIONS)[1]
+    if classes:
+        crop = crop._replace(mask=np.stack([~crop.mask, crop.mask], axis=-1))
+    padded = grain_crops.pad_grain_crop(crop, padding, LABELLED_REGIONS.shape)
+    assert padded.bounding_box == expected_bounding_box
+    assert padded.padding == padding
+    min_row, min_col, max_row, max_col = expected_bounding_box
+    expected_mask = LABELLED_REGIONS[min_row:max_row, min_col:max_col] == 2
+    if classes:
+        expected_mask = np.stack([~expected_mask, expected_mask], axis=-1)
+    np.testing.assert_array_equal(padded.mask, expected_mask)
+
+
+def test_assemble_grain_crops() -> None:
+    """Test assembling the crops of grains away from the edges gives back the grain mask tensor."""
+    grain_mask_tensor = np.zeros((10, 12, 2), dtype=bool)
+    grain_mask_tensor[2:4, 2:5, 1] = True
+    grain_mask_tensor[5:8, 6:10, 1] = True
+    grain_mask_tensor[:, :, 0] = ~grain_mask_tensor[:, :, 1]
+    crops = grain_crops.crop_grains(grain_mask_tensor, padding=1)
+    np.testing.assert_array_equal(grain_crops.assemble_grain_crops(crops, grain_mask_tensor.shape), grain_mask_tensor)
+    # Dropping a grain leaves background
+    assembled = grain_crops.assemble_grain_crops(crops[1:], grain_mask_tensor.shape)
+    assert not assembled[2:4, 2:5, 1].any()
+    assert assembled[2:4, 2:5, 0].all()
+
+
+def test_crop_grain_masks() -> None:
+    """Test the grains of each direction's mask are cropped from the labelled class."""
+    grain_masks = {
+        "above": np.stack([LABELLED_REGIONS == 0, LABELLED_REGIONS], axis=-1),
+        "below": np.zeros((5, 5, 2), dtype=np.int32),
+    }
+    crops = grain_crops.crop_grain_masks(grain_masks)
+    assert len(crops["above"]) == 2
+    assert crops["below"] == []
@@ -699,6 +699,50 @@ def test_find_grains_unet(
         np.testing.assert_array_equal(result_labelled_regions, expected_labelled_regions_tensor)
 
 
+@pytest.mark.parametrize(
+    ("remove_edge_intersecting_grains", "expected_grains"),
+    [
+        pytest.param(True, 2, id="edge grain removed"),
+        pytest.param(False, 3, id="edge grain kept"),
+    ],
+)
+def test_find_grains_unet_tiled(remove_edge_intersecting_grains: bool, expected_grains: int) -> None:
+    """Test grains are found by segmenting the whole image with the U-Net in tiles, without thresholding."""
+    model = MagicMock()
+    model.input_shape = (None, 8, 8, 1)
+    model.predict.side_effect = lambda input_array: input_array
+    image = np.zeros((20, 20))
+    image[3:7, 3:7] = 1.0
+    image[12:16, 10:15] = 1.0
+    image[15:20, 0:3] = 1.0
+    with patch("keras.models.load_model", return_value=model):
+        grains_object = Grains(
+            image=image,
+            filename="test_image",
+            pixel_to_nm_scaling=1.0,
+            unet_config={
+                "model_path": "dummy_model_path",
+                "upper_norm_bound": 1.0,
+                "lower_norm_bound": 0.0,
+                "grain_crop_padding": 1,
+                "batch_size": 4,
+                "mode": "tiled",
+                "tile_overlap": 2,
+            },
+            threshold_method="absolute",
+            threshold_absolute={"above": 0.5, "below": 0.0},
+            direction="above",
+            remove_edge_intersecting_grains=remove_edge_intersecting_grains,
+        )
+        grains_object.find_grains()
+    assert grains_object.thresholds is None
+    labelled_regions = grains_object.directions["above"]["labelled_regions_02"]
+    assert labelled_regions.shape == (20, 20, 2)
+    assert labelled_regions[:, :, 1].max() == expected_grains
+    assert len(grains_object.region_properties["above"]) == expected_grains
+    np.testing.assert_array_equal(labelled_regions[:, :, 0], labelled_regions[:, :, 1] == 0)
+
+
 @pytest.mark.parametrize(
     (
         "image",
@@ -88,3 +88,22 @@ def test_colour_regions(minicircle_grain_coloured: Grains) -> None:
     assert isinstance(minicircle_grain_coloured.directions["above"]["coloured_regions"], np.ndarray)
     assert minicircle_grain_coloured.directions["above"]["coloured_regions"].shape == (64, 64, 3)
     assert minicircle_grain_coloured.directions["above"]["coloured_regions"].sum() == 691
+
+
+def test_find_grains_tiled(minicircle_grain_gaussian_filter, grains_config: dict) -> None:
+    """Test labelling grains in tiles gives the same grains as labelling the whole image."""
+    found = {}
+    for run in (False, True):
+        grains = Grains(
+            image=minicircle_grain_gaussian_filter.images["gaussian_filtered"],
+            filename=minicircle_grain_gaussian_filter.filename,
+            pixel_to_nm_scaling=minicircle_grain_gaussian_filter.pixel_to_nm_scaling,
+            **{**grains_config, "direction": "both", "tiling": {"run": run, "tile_size": 16, "cores": 2}},
+        )
+        grains.find_grains()
+        found[run] = grains
+
+    for direction, images in found[False].directions.items():
+        for key, image in images.items():
+            np.testing.assert_array_equal(found[True].directions[direction][key], image, err_msg=key)
+    assert found[True].directions["above"]["labelled_regions_02"][:, :, 1].max() > 0
@@ -3,16 +3,30 @@
 import argparse
 import json
 import logging
+import pickle
+import struct
 from datetime import datetime
 from pathlib import Path
 
 import h5py
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 import pytest
+from AFMReader import asd
 
 from topostats.io import (
+    TOPOSTATS_EXTRACT_GROUPS,
+    ASDFrames,
+    BatchContainerWriter,
+    FolderCSVWriter,
+    IncrementalCSVWriter,
+    LazyASDFrameDict,
+    LazyHDF5Dict,
     LoadScans,
+    ParquetDatasetWriter,
+    StatisticsWriter,
+    _add_to_batch_container,
     convert_basename_to_relative_paths,
     dict_almost_equal,
     dict_to_hdf5,
@@ -21,15 +35,18 @@ from topostats.io import (
     get_date_time,
     get_out_path,
     get_relative_paths,
+    hdf5_dataset_options,
     hdf5_to_dict,
     load_array,
     load_pkl,
     merge_mappings,
     path_to_str,
     read_64d,
+    read_batch_index,
     read_char,
     read_gwy_component_dtype,
     read_null_terminated_string,
+    read_statistics,
     read_u32i,
     read_yaml,
     save_array,
@@ -497,6 +514,103 @@ def test_save_folder_grainstats(tmp_path: Path) -> None:
     assert Path(out_path / "processed" / "folder_grainstats.csv").exists()
 
 
+def test_incremental_csv_writer(tmp_path: Path) -> None:
+    """Test appending data frames with differing columns matches writing them all at once."""
+    dfs = [
+        pd.DataFrame({"image": ["a", "a"], "grain_number": [0, 1], "area": [1.5, 2.5]}).set_index("image"),
+        pd.DataFrame(),
+        pd.DataFrame({"image": ["b"], "grain_number": [0], "volume": [3.0]}).set_index("image"),
+        pd.DataFrame({"image": ["c"], "grain_number": [0], "area": [4.0], "volume": [5.0]}).set_index("image"),
+    ]
+    writer = IncrementalCSVWriter(tmp_path / "stats.csv", chunksize=1)
+    for df in dfs:
+        writer.write(df)
+    assert writer.rows == 4
+    assert writer.columns == ["image", "grain_number", "area", "volume"]
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "stats.csv"), pd.concat(dfs).reset_index())
+
+
+def test_incremental_csv_writer_empty(tmp_path: Path) -> None:
+    """Test no file is written when all data frames are empty."""
+    writer = IncrementalCSVWriter(tmp_path / "stats.csv")
+    writer.write(pd.DataFrame())
+    assert writer.rows == 0
+    assert not (tmp_path / "stats.csv").exists()
+
+
+def test_folder_csv_writer(tmp_path: Path) -> None:
+    """Test statistics are appended to a file for each folder."""
+    base_dir = tmp_path / "data"
+    writer = FolderCSVWriter(output_dir=tmp_path / "output", base_dir=base_dir, stats_filename="grain_stats")
+    writer.write(pd.DataFrame({"image": ["a", "b"], "area": [1.0, 2.0], "basename": [base_dir / "x", base_dir / "y"]}))
+    writer.write(pd.DataFrame({"image": ["c"], "area": [3.0], "basename": [base_dir / "x"]}))
+    folder_x = pd.read_csv(tmp_path / "output" / "x" / "processed" / "folder_grain_stats.csv")
+    folder_y = pd.read_csv(tmp_path / "output" / "y" / "processed" / "folder_grain_stats.csv")
+    assert list(folder_x["image"]) == ["a", "c"]
+    assert list(folder_y["image"]) == ["b"]
+
+
+@pytest.mark.parametrize(
+    ("partition_by", "expected_partitions"),
+    [
+        pytest.param("folder", ["folder=.", "folder=level1%2Fa"], id="partition by folder"),
+        pytest.param("image", ["image=001", "image=b"], id="partition by image"),
+    ],
+)
+def test_parquet_dataset_writer(tmp_path: Path, partition_by: str, expected_partitions: list) -> None:
+    """Test statistics are written to a partitioned Parquet dataset and read back with their types."""
+    pytest.importorskip("pyarrow")
+    writer = ParquetDatasetWriter(tmp_path / "all_statistics.parquet", partition_by=partition_by)
+    writer.write(
+        pd.DataFrame({"image": ["001", "001"], "grain_number": [0, 1], "area": [1.5, 2.5], "basename": tmp_path}),
+        folder=".",
+    )
+    writer.write(pd.DataFrame(), folder=".")
+    writer.write(
+        pd.DataFrame({"image": ["b"], "grain_number": [0], "area": [np.nan], "volume": [3.0], "basename": tmp_path}),
+        folder="level1/a",
+    )
+    assert writer.rows == 3
+    assert sorted(path.name for path in writer.path.iterdir()) == expected_partitions
+    statistics = read_statistics(writer.path).sort_values(["image", "grain_number"], ignore_index=True)
+    assert list(statistics["image"]) == ["001", "001", "b"]
+    assert list(statistics["grain_number"]) == [0, 1, 0]
+    assert statistics["grain_number"].dtype == np.int64
+    np.testing.assert_array_equal(statistics["volume"], [np.nan, np.nan, 3.0])
+    assert list(statistics["basename"]) == [str(tmp_path)] * 3
+    columns = read_statistics(writer.path, columns=["image", "area", "missing"]).columns
+    assert sorted(columns) == ["area", "image"]
+
+
+@pytest.mark.parametrize(
+    ("output_format", "expected_files"),
+    [
+        pytest.param("csv", ["all_statistics.csv", "level1"], id="csv"),
+        pytest.param("parquet", ["all_statistics.parquet"], id="parquet"),
+    ],
+)
+def test_statistics_writer(tmp_path: Path, output_format: str, expected_files: list) -> None:
+    """Test statistics are written in the requested format and can be read back."""
+    if output_format == "parquet":
+        pytest.importorskip("pyarrow")
+    base_dir = tmp_path / "data"
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    writer = StatisticsWriter(
+        output_dir=output_dir,
+        base_dir=base_dir,
+        name="all_statistics",
+        folder_stats_filename="grain_stats",
+        output_format=output_format,
+    )
+    df = pd.DataFrame({"image": ["a"], "grain_number": [0], "area": [1.0], "basename": [base_dir / "level1"]})
+    writer.write(df.set_index(["image", "grain_number"]), img_path=base_dir / "level1" / "a")
+    assert writer.rows == 1
+    assert sorted(path.name for path in output_dir.iterdir()) == expected_files
+    statistics = read_statistics(writer.path, columns=["image", "grain_number", "area"])
+    pd.testing.assert_frame_equal(statistics[["image", "grain_number", "area"]], df[["image", "grain_number", "area"]])
+
+
 def test_load_scan_spm(load_scan_spm: LoadScans) -> None:
     """Test loading of Bruker .spm file."""
     load_scan_spm.img_path = load_scan_spm.img_paths[0]
@@ -683,6 +797,16 @@ def test_load_scan_get_data(
     assert scan.img_dict[filename]["pixel_to_nm_scaling"] == pixel_to_nm_scaling
 
 
+def test_load_scan_iter_data(load_scan: LoadScans) -> None:
+    """Test the LoadScans.iter_data() method yields each image without accumulating them in img_dict."""
+    images = list(load_scan.iter_data())
+    assert len(images) == 1
+    assert images[0]["filename"] == "minicircle_small"
+    assert isinstance(images[0]["image_original"], np.ndarray)
+    assert images[0]["image_original"].shape == (64, 64)
+    assert load_scan.img_dict == {}
+
+
 @pytest.mark.parametrize(
     ("x", "y", "log_msg"),
     [
@@ -959,6 +1083,213 @@ def test_dict_to_hdf5_list(tmp_path: Path) -> None:
         np.testing.assert_array_equal(f["list"][()], expected["list"])
 
 
+@pytest.mark.parametrize(
+    ("item", "compression", "compression_level", "expected"),
+    [
+        pytest.param(np.zeros((64, 64)), None, None, {}, id="no compression"),
+        pytest.param(np.zeros((8, 8)), "gzip", 4, {}, id="small array"),
+        pytest.param(np.array(1.0), "gzip", 4, {}, id="scalar array"),
+        pytest.param(
+            np.zeros((64, 64), dtype=bool),
+            "gzip",
+            4,
+            {"chunks": True, "compression": "gzip", "shuffle": False, "compression_opts": 4},
+            id="boolean mask",
+        ),
+        pytest.param(
+            np.zeros((64, 64, 2), dtype=np.int32),
+            "gzip",
+            9,
+            {"chunks": True, "compression": "gzip", "shuffle": True, "compression_opts": 9},
+            id="label tensor",
+        ),
+        pytest.param(
+            np.zeros((64, 64)),
+            "lzf",
+            4,
+            {"chunks": True, "compression": "lzf", "shuffle": True},
+            id="float heightmap lzf",
+        ),
+    ],
+)
+def test_hdf5_dataset_options(item: np.ndarray, compression: str, compression_level: int, expected: dict) -> None:
+    """Test chunking and compression options for saving arrays to HDF5."""
+    assert hdf5_dataset_options(item, compression, compression_level) == expected
+
+
+@pytest.mark.parametrize("compression", [pytest.param("gzip", id="gzip"), pytest.param("lzf", id="lzf")])
+def test_dict_to_hdf5_compression(tmp_path: Path, compression: str) -> None:
+    """Test arrays are chunked and compressed when saving to HDF5 and are unchanged when loaded."""
+    rng = np.random.default_rng(seed=1000)
+    to_save = {
+        "image": rng.random((64, 64)),
+        "grain_masks": {"above": np.zeros((64, 64, 2), dtype=np.int32)},
+        "small": np.arange(9).reshape(3, 3),
+    }
+    with h5py.File(tmp_path / "compressed.hdf5", "w") as f:
+        dict_to_hdf5(open_hdf5_file=f, group_path="/", dictionary=to_save, compression=compression)
+
+    with h5py.File(tmp_path / "compressed.hdf5", "r") as f:
+        assert f["image"].compression == compression
+        assert f["image"].chunks is not None
+        assert f["grain_masks/above"].compression == compression
+        assert f["small"].compression is None
+        loaded = hdf5_to_dict(open_hdf5_file=f, group_path="/")
+    np.testing.assert_array_equal(loaded["image"], to_save["image"])
+    np.testing.assert_array_equal(loaded["grain_masks"]["above"], to_save["grain_masks"]["above"])
+    np.testing.assert_array_equal(loaded["small"], to_save["small"])
+
+
+def test_lazy_hdf5_dict(tmp_path: Path) -> None:
+    """Test the LazyHDF5Dict reads items on access, restricts keys and can be modified without changing the file."""
+    to_save = {
+        "a": 1,
+        "b": np.arange(9).reshape(3, 3),
+        "c": "test",
+        "d": {"e": np.ones(3), "f": "nested"},
+    }
+    with h5py.File(tmp_path / "lazy.hdf5", "w") as f:
+        dict_to_hdf5(open_hdf5_file=f, group_path="/", dictionary=to_save)
+
+    lazy = LazyHDF5Dict(tmp_path / "lazy.hdf5", keys=["a", "b", "d"])
+    assert list(lazy.keys()) == ["a", "b", "d"]
+    assert "c" not in lazy
+    assert lazy._data == {}  # pylint: disable=protected-access
+    np.testing.assert_array_equal(lazy["b"], to_save["b"])
+    assert isinstance(lazy["d"], LazyHDF5Dict)
+    assert lazy["d"]["f"] == "nested"
+    with pytest.raises(KeyError):
+        lazy["c"]  # pylint: disable=pointless-statement
+    # Modifications are not written to disk
+    lazy["g"] = np.zeros(2)
+    del lazy["a"]
+    assert list(lazy.keys()) == ["b", "d", "g"]
+    with h5py.File(tmp_path / "lazy.hdf5", "r") as f:
+        assert set(f.keys()) == {"a", "b", "c", "d"}
+    # Pickling closes the file and it is re-opened on access
+    unpickled = pickle.loads(pickle.dumps(lazy))  # noqa: S301
+    lazy.close()
+    assert list(unpickled.keys()) == ["b", "d", "g"]
+    np.testing.assert_array_equal(unpickled["d"]["e"], to_save["d"]["e"])
+    assert dict_almost_equal(
+        lazy.to_dict(), {"b": to_save["b"], "d": {"e": to_save["d"]["e"], "f": "nested"}, "g": np.zeros(2)}
+    )
+    # Files re-opened on access are closed, along with those of sub-groups, on leaving the context
+    with unpickled:
+        np.testing.assert_array_equal(unpickled["b"], to_save["b"])
+    assert unpickled._open_file is None  # pylint: disable=protected-access
+    assert unpickled["d"]._open_file is None  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize("extract", ["grains", "grainstats", "nodestats", "splining"])
+def test_load_scan_topostats_lazy_extract(loading_config: dict, extract: str) -> None:
+    """Test only the groups required for a given stage are included when loading a .topostats file."""
+    loading_config["extract"] = extract
+    scan = LoadScans([RESOURCES / "test_image" / "minicircle_small.topostats"], **loading_config)
+    scan.get_data()
+    data = scan.img_dict["minicircle_small"]
+    assert isinstance(data, LazyHDF5Dict)
+    assert set(data.keys()) <= set(TOPOSTATS_EXTRACT_GROUPS[extract])
+    assert "image" in data
+    assert data["image"].shape == (64, 64)
+    assert data["img_path"] == RESOURCES / "test_image" / "minicircle_small"
+
+
+def _write_asd(file_path: Path, channels: dict[str, npt.NDArray]) -> None:
+    """Write frames of two channels to a version 1 .asd file with the header fields read by AFMReader."""
+    (channel1, frames1), (channel2, frames2) = channels.items()
+    num_frames, y_pixels, x_pixels = frames1.shape
+    header = struct.pack("<6i", 1, 0, 32, 0, 0, 0)
+    header += channel1.encode("utf-16-le") + channel2.encode("utf-16-le")
+    header += struct.pack("<8i", num_frames, num_frames, 0, 0, x_pixels, y_pixels, 2 * x_pixels, 2 * y_pixels)
+    header += struct.pack("<?9i3fi12xiIi6f", False, *[0] * 9, 0.1, 0.1, 2.0, 0, 0, 0x00020000, 12, *[1.0] * 6)
+    with file_path.open("wb") as f:
+        f.write(header)
+        for frame in [*frames1, *frames2]:
+            f.write(bytes(32))
+            f.write(frame.astype("<i2").tobytes())
+
+
+@pytest.fixture()
+def asd_file(tmp_path: Path) -> Path:
+    """Write a synthetic .asd file with three 16 x 12 frames of the TP and ER channels."""
+    rng = np.random.default_rng(seed=1)
+    file_path = tmp_path / "video.asd"
+    _write_asd(
+        file_path,
+        {
+            "TP": rng.integers(-2048, 2048, size=(3, 12, 16)),
+            "ER": rng.integers(-2048, 2048, size=(3, 12, 16)),
+        },
+    )
+    return file_path
+
+
+@pytest.mark.parametrize("channel", [pytest.param("TP", id="first channel"), pytest.param("ER", id="second channel")])
+def test_asd_frames(asd_file: Path, channel: str) -> None:
+    """Test frames read on demand by ASDFrames match those read by AFMReader."""
+    expected_frames, expected_scaling, _ = asd.load_asd(file_path=asd_file, channel=channel)
+    frames = ASDFrames(asd_file, channel=channel)
+    assert len(frames) == 3
+    assert frames.shape == (12, 16)
+    assert frames.pixel_to_nm_scaling == expected_scaling
+    np.testing.assert_array_equal(np.stack(list(frames)), expected_frames)
+    np.testing.assert_array_equal(frames[-1], expected_frames[2])
+    with pytest.raises(IndexError):
+        frames[3]  # pylint: disable=pointless-statement
+
+
+@pytest.mark.parametrize(("precision"), [pytest.param("float32", id="float32"), pytest.param("float64", id="float64")])
+def test_load_scan_precision(asd_file: Path, precision: str) -> None:
+    """Test images are returned in the requested precision, including frames of .asd files decoded on demand."""
+    scan = LoadScans(
+        [RESOURCES / "test_image" / "minicircle_small.topostats", asd_file],
+        channel="TP",
+        extract="raw",
+        precision=precision,
+    )
+    scan.get_data()
+    assert len(scan.img_dict) == 4
+    for image_data in scan.img_dict.values():
+        assert image_data["image_original"].dtype == np.dtype(precision)
+    np.testing.assert_allclose(
+        scan.img_dict["video_0"]["image_original"], ASDFrames(asd_file, channel="TP")[0], rtol=1e-6
+    )
+
+
+def test_asd_frames_channel_not_found(asd_file: Path) -> None:
+    """Test a ValueError is raised if the channel is not in the .asd file."""
+    with pytest.raises(ValueError, match="'PH' not found .asd channel list: TP, ER"):
+        ASDFrames(asd_file, channel="PH")
+
+
+def test_load_scan_asd_lazy_frames(asd_file: Path) -> None:
+    """Test frames of .asd files are only decoded when the image is accessed, including after pickling."""
+    scan = LoadScans([asd_file], channel="TP")
+    scan.get_data()
+    assert list(scan.img_dict) == ["video_0", "video_1", "video_2"]
+    data = scan.img_dict["video_1"]
+    assert isinstance(data, LazyASDFrameDict)
+    assert "image_original" in data
+    assert "image_original" not in data._data  # pylint: disable=protected-access
+    assert data["img_path"] == asd_file.with_name("video_1")
+    assert data["pixel_to_nm_scaling"] == 2.0
+    unpickled = pickle.loads(pickle.dumps(data))  # noqa: S301
+    np.testing.assert_array_equal(unpickled["image_original"], ASDFrames(asd_file, channel="TP")[1])
+    assert "image_original" not in data._data  # pylint: disable=protected-access
+    # Processing replaces the original image and adds new items
+    unpickled["image"] = unpickled["image_original"] * 2
+    del unpickled["grain_masks"]
+    assert list(unpickled) == [
+        "filename",
+        "img_path",
+        "pixel_to_nm_scaling",
+        "image",
+        "grain_trace_data",
+        "image_original",
+    ]
+
+
 def test_hdf5_to_dict_all_together_group_path_default(tmp_path: Path) -> None:
     """Test loading a nested dictionary with arrays from HDF5 format with group path as default."""
     to_save = {
@@ -1348,6 +1679,108 @@ def test_save_and_load_topostats_file(
         np.testing.assert_equal(grain_trace_data, loadscans.img_dict["topostats_file_test"]["grain_trace_data"])
 
 
+def _batch_image(tmp_path: Path, index: int, value: float) -> dict:
+    """Create a topostats dictionary object for testing batch containers."""
+    image = np.full((16, 16), value)
+    return {
+        "filename": f"image_{index}",
+        "img_path": tmp_path / "scans" / f"image_{index}",
+        "pixel_to_nm_scaling": 0.5,
+        "image_original": image,
+        "image": image + 1,
+        "grain_masks": {"above": np.ones((1, 16, 16), dtype=bool)},
+        "grain_trace_data": {},
+    }
+
+
+def test_batch_container_writer(tmp_path: Path) -> None:
+    """Test images are written to a single container with an index, replacing images with the same path."""
+    path = tmp_path / "all_images.topostats_batch"
+    with BatchContainerWriter(path) as writer:
+        for index, value in enumerate([1.0, 2.0, 3.0]):
+            save_topostats_file(
+                output_dir=tmp_path,
+                filename=f"image_{index}",
+                topostats_object=_batch_image(tmp_path, index, value),
+                batch_writer=writer,
+            )
+        writer.save(_batch_image(tmp_path, 1, 5.0))
+    assert list(tmp_path.glob("*.topostats")) == []
+    with h5py.File(path, "r") as f:
+        assert read_batch_index(f) == [
+            ("0", "image_0", tmp_path / "scans" / "image_0"),
+            ("1", "image_1", tmp_path / "scans" / "image_1"),
+            ("2", "image_2", tmp_path / "scans" / "image_2"),
+        ]
+        assert f["images/1/image_original"][0, 0] == 5.0
+        assert f["images/0/topostats_file_version"][()] == 0.2
+    # Appending adds to the existing container
+    with BatchContainerWriter(path, append=True) as writer:
+        writer.save(_batch_image(tmp_path, 3, 4.0))
+    with h5py.File(path, "r") as f:
+        assert [row[1] for row in read_batch_index(f)] == ["image_0", "image_1", "image_2", "image_3"]
+
+
+def test_batch_container_writer_failure(tmp_path: Path) -> None:
+    """Test images that can not be written raise an error in the caller and leave the container unchanged."""
+    path = tmp_path / "all_images.topostats_batch"
+    with BatchContainerWriter(path) as writer:
+        writer.save(_batch_image(tmp_path, 0, 1.0))
+        with pytest.raises(RuntimeError, match="image_0"):
+            writer.save({**_batch_image(tmp_path, 0, 2.0), "unsaveable": np.array([1, "a", None], dtype=object)})
+        with pytest.raises(RuntimeError, match="image_1"):
+            writer.save({**_batch_image(tmp_path, 1, 2.0), "unsaveable": np.array([1, "a", None], dtype=object)})
+        writer.save(_batch_image(tmp_path, 2, 3.0))
+    with h5py.File(path, "r") as f:
+        assert [row[1] for row in read_batch_index(f)] == ["image_0", "image_2"]
+        assert set(f["images"].keys()) == {"0", "1"}
+        assert f["images/0/image_original"][0, 0] == 1.0
+        assert f["images/1/image_original"][0, 0] == 3.0
+
+
+def test_add_to_batch_container_move_failure(tmp_path: Path, monkeypatch) -> None:
+    """Test an image whose group can not be moved into place is not added to the index."""
+    path = tmp_path / "all_images.topostats_batch"
+    with BatchContainerWriter(path) as writer:
+        writer.save(_batch_image(tmp_path, 0, 1.0))
+
+    def _move(self, source: str, dest: str) -> None:  # pylint: disable=unused-argument
+        raise OSError("Unable to move")
+
+    monkeypatch.setattr(h5py.Group, "move", _move)
+    with h5py.File(path, "a") as f:
+        keys = {str(img_path): key for key, _, img_path in read_batch_index(f)}
+        with pytest.raises(OSError, match="Unable to move"):
+            _add_to_batch_container(f, keys, _batch_image(tmp_path, 1, 2.0), compression=None, compression_level=None)
+        assert [row[1] for row in read_batch_index(f)] == ["image_0"]
+        assert list(keys.values()) == ["0"]
+
+
+@pytest.mark.parametrize(
+    ("extract", "data_type"),
+    [
+        pytest.param("raw", dict, id="raw"),
+        pytest.param("grains", LazyHDF5Dict, id="grains"),
+        pytest.param("grainstats", LazyHDF5Dict, id="grainstats"),
+    ],
+)
+def test_load_scan_batch_container(tmp_path: Path, extract: str, data_type: type) -> None:
+    """Test LoadScans iterates over each image in a batch container."""
+    path = tmp_path / "all_images.topostats_batch"
+    with BatchContainerWriter(path) as writer:
+        for index, value in enumerate([1.0, 2.0]):
+            writer.save(_batch_image(tmp_path, index, value))
+    images = list(LoadScans([path], channel="dummy_channel", extract=extract).iter_data())
+    assert [image["filename"] for image in images] == ["image_0", "image_1"]
+    for image, value in zip(images, [1.0, 2.0]):
+        assert isinstance(image, data_type)
+        assert image["img_path"] == tmp_path / "scans" / image["filename"]
+        assert image["pixel_to_nm_scaling"] == 0.5
+        np.testing.assert_array_equal(image["image_original"], np.full((16, 16), value))
+    if extract == "grainstats":
+        assert images[0]["grain_masks"]["above"].shape == (1, 16, 16)
+
+
 @pytest.mark.parametrize(
     ("dictionary", "target"),
     [
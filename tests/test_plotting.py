@@ -14,6 +14,7 @@ from matplotlib.figure import Figure
 
 import topostats
 from topostats.entry_point import entry_point
+from topostats.io import ParquetDatasetWriter
 from topostats.plotting import TopoSum, _pad_array, plot_height_profiles, toposum
 
 # pylint: disable=protected-access
@@ -137,6 +138,21 @@ def test_toposum(summary_config: dict) -> None:
     assert isinstance(figures["area"]["violin"]["figure"], Figure)
 
 
+def test_toposum_parquet(summary_config: dict, tmp_path: Path) -> None:
+    """Test the toposum function reads statistics from a Parquet dataset."""
+    pytest.importorskip("pyarrow")
+    writer = ParquetDatasetWriter(tmp_path / "all_statistics.parquet", partition_by="image")
+    writer.write(pd.read_csv(RESOURCES / "minicircle_default_all_statistics.csv"))
+    summary_config["csv_file"] = writer.path
+    summary_config["violin"] = False
+    summary_config["stats_to_sum"] = ["area"]
+    summary_config.pop("stat_to_sum")
+    figures = toposum(summary_config)
+    assert "area" in figures.keys()
+    assert isinstance(figures["area"]["dist"]["figure"], Figure)
+    assert sorted(summary_config["df"].columns) == ["area", "basename", "grain_number", "image"]
+
+
 @pytest.mark.mpl_image_compare(baseline_dir="resources/img/distributions/")
 def test_plot_kde(toposum_object_single_directory: TopoSum) -> None:
     """Regression test for sns_plot() with a single KDE."""
@@ -0,0 +1,129 @@
+"""Tests for the polynomial_background module."""
+
+import numpy as np
+import pytest
+
+from topostats import polynomial_background
+
+
+@pytest.mark.parametrize(
+    ("order", "ndim", "expected"),
+    [
+        pytest.param(0, 2, ((0, 0),), id="constant"),
+        pytest.param(1, 1, ((0,), (1,)), id="line"),
+        pytest.param(2, 1, ((0,), (1,), (2,)), id="quadratic 1D"),
+        pytest.param(1, 2, ((0, 0), (1, 0), (0, 1)), id="plane"),
+        pytest.param(2, 2, ((0, 0), (1, 0), (0, 1), (2, 0), (1, 1), (0, 2)), id="quadratic 2D"),
+    ],
+)
+def test_polynomial_terms(order: int, ndim: int, expected: tuple) -> None:
+    """Test the exponents of polynomial terms."""
+    assert polynomial_background.polynomial_terms(order, ndim) == expected
+
+
+def test_polynomial_terms_negative_order() -> None:
+    """Test a negative order raises a ValueError."""
+    with pytest.raises(ValueError, match="non-negative"):
+        polynomial_background.polynomial_terms(-1)
+
+
+def test_gram_matrix_cached() -> None:
+    """Test the Gram matrix is built once per shape and terms, is read-only and matches that of the design matrix."""
+    terms = polynomial_background.polynomial_terms(2)
+    gram = polynomial_background.gram_matrix((3, 4), terms)
+    assert polynomial_background.gram_matrix((3, 4), terms) is gram
+    assert polynomial_background.gram_matrix((4, 3), terms) is not gram
+    assert not gram.flags.writeable
+    rows, cols = np.indices((3, 4))
+    design_matrix = np.stack([(rows**row_exp * cols**col_exp).ravel() for row_exp, col_exp in terms], axis=-1)
+    np.testing.assert_array_equal(gram, design_matrix.T @ design_matrix)
+
+
+@pytest.mark.parametrize(
+    ("order", "masked"),
+    [
+        pytest.param(1, False, id="plane"),
+        pytest.param(2, False, id="quadratic"),
+        pytest.param(3, False, id="cubic"),
+        pytest.param(2, True, id="quadratic masked"),
+    ],
+)
+def test_remove_polynomial(order: int, masked: bool) -> None:
+    """Test fitting and removing a polynomial surface recovers its coefficients."""
+    rng = np.random.default_rng(seed=0)
+    terms = polynomial_background.polynomial_terms(order)
+    coefficients = rng.uniform(-1, 1, len(terms)) / 10 ** np.array([sum(exponents) for exponents in terms])
+    image = polynomial_background.evaluate_polynomial((32, 48), terms, coefficients)
+    mask = None
+    if masked:
+        # Masked points (and NaN) are ignored when fitting but the fit is still subtracted from them.
+        mask = np.zeros(image.shape, dtype=bool)
+        mask[10:20, 10:20] = True
+        image[mask] += 100.0
+        image[0, 0] = np.nan
+    removed, fitted = polynomial_background.remove_polynomial(image, terms, mask)
+    np.testing.assert_allclose(fitted, coefficients, rtol=1e-6, atol=1e-10)
+    if masked:
+        np.testing.assert_allclose(removed[mask], 100.0)
+        removed = np.where(mask, 0.0, removed)
+    np.testing.assert_allclose(np.nan_to_num(removed), 0.0, atol=1e-8)
+
+
+def test_fit_polynomial_matches_polyfit() -> None:
+    """Test a one dimensional fit matches numpy.polyfit."""
+    rng = np.random.default_rng(seed=1)
+    data = rng.normal(size=100)
+    fitted = polynomial_background.fit_polynomial(data, polynomial_background.polynomial_terms(2, ndim=1))
+    np.testing.assert_allclose(fitted[::-1], np.polyfit(np.arange(100), data, 2))
+
+
+def test_fit_polynomial_all_masked() -> None:
+    """Test fitting when every point is masked returns NaN coefficients."""
+    fitted = polynomial_background.fit_polynomial(
+        np.ones((4, 4)), polynomial_background.SADDLE_TERMS, mask=np.ones((4, 4), dtype=bool)
+    )
+    assert np.isnan(fitted).all()
+
+
+@pytest.mark.parametrize(
+    ("masked"),
+    [
+        pytest.param(False, id="unmasked"),
+        pytest.param(True, id="masked"),
+    ],
+)
+def test_fit_polynomial_batch(masked: bool) -> None:
+    """Test fitting a batch of arrays gives the same coefficients as fitting each array on its own."""
+    rng = np.random.default_rng(seed=2)
+    terms = polynomial_background.polynomial_terms(2)
+    data = rng.normal(size=(3, 16, 20))
+    mask = None
+    if masked:
+        mask = rng.random(data.shape) > 0.7
+        mask[2] = True
+        data[0, 0, 0] = np.nan
+    fitted = polynomial_background.fit_polynomial(data, terms, mask)
+    assert fitted.shape == (3, len(terms))
+    for index, frame in enumerate(data):
+        expected = polynomial_background.fit_polynomial(frame, terms, None if mask is None else mask[index])
+        np.testing.assert_allclose(fitted[index], expected, rtol=1e-8, atol=1e-12)
+    removed, _ = polynomial_background.remove_polynomial(data, terms, mask)
+    np.testing.assert_allclose(
+        removed[:2], data[:2] - polynomial_background.evaluate_polynomial((16, 20), terms, fitted[:2])
+    )
+
+
+def test_fit_polynomial_batch_chunks(monkeypatch) -> None:
+    """Test fitting and removing polynomials from a batch in chunks gives the same result as all at once."""
+    rng = np.random.default_rng(seed=3)
+    terms = polynomial_background.polynomial_terms(1)
+    data = rng.normal(size=(5, 8, 10)).astype(np.float32)
+    mask = rng.random(data.shape) > 0.7
+    expected_removed, expected = polynomial_background.remove_polynomial(data, terms, mask)
+    # Two frames per chunk
+    monkeypatch.setattr(polynomial_background, "BATCH_CHUNK_SIZE", 2 * 8 * 10)
+    removed, fitted = polynomial_background.remove_polynomial(data, terms, mask, copy=False)
+    assert removed is data
+    assert removed.dtype == np.float32
+    np.testing.assert_allclose(fitted, expected, rtol=1e-10)
+    np.testing.assert_allclose(removed, expected_removed, rtol=1e-6)
@@ -0,0 +1,98 @@
+"""Tests of the preview module."""
+
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from topostats.io import LoadScans
+from topostats.preview import build_pyramid, preview_scan, save_thumbnail, scale_filter_config
+
+# pylint: disable=too-many-positional-arguments
+
+
+@pytest.mark.parametrize(
+    ("shape", "max_size", "expected_shapes"),
+    [
+        pytest.param((64, 64), 64, [(64, 64)], id="no downsampling needed"),
+        pytest.param((64, 64), 20, [(64, 64), (32, 32), (16, 16)], id="square"),
+        pytest.param((65, 33), 40, [(65, 33), (32, 16)], id="odd rows and columns dropped"),
+        pytest.param((4, 1), 2, [(4, 1)], id="too narrow to halve"),
+    ],
+)
+def test_build_pyramid(shape: tuple, max_size: int, expected_shapes: list) -> None:
+    """Test the levels of a pyramid are halved until no larger than the maximum size."""
+    image = np.arange(np.prod(shape), dtype=float).reshape(shape)
+    pyramid = build_pyramid(image, max_size)
+    assert [level.shape for level in pyramid] == expected_shapes
+    assert pyramid[0] is image
+
+
+def test_build_pyramid_block_means() -> None:
+    """Test each pixel of a level is the mean of a 2x2 block of the level below."""
+    image = np.array([[1.0, 3.0, 0.0, 0.0], [5.0, 7.0, 2.0, 2.0]])
+    pyramid = build_pyramid(image, max_size=2)
+    np.testing.assert_array_equal(pyramid[1], [[4.0, 1.0]])
+
+
+def test_scale_filter_config(filter_config: dict) -> None:
+    """Test sizes in pixels are scaled to larger pixels without changing the original configuration."""
+    filter_config["gaussian_size"] = 2.0
+    filter_config["remove_scars"]["max_scar_width"] = 4
+    filter_config["remove_scars"]["min_scar_length"] = 16
+    scaled = scale_filter_config(filter_config, factor=8)
+    assert scaled["gaussian_size"] == 0.25
+    assert scaled["remove_scars"]["max_scar_width"] == 1
+    assert scaled["remove_scars"]["min_scar_length"] == 2
+    assert filter_config["remove_scars"]["min_scar_length"] == 16
+
+
+@pytest.mark.parametrize(
+    ("grains", "zrange"),
+    [
+        pytest.param(None, None, id="image only"),
+        pytest.param(np.pad(np.ones((4, 4), dtype=int), 3), [0, 1], id="grain outlined"),
+    ],
+)
+def test_save_thumbnail(tmp_path: Path, grains: npt.NDArray | None, zrange: list | None) -> None:
+    """Test a thumbnail of the size of the image is saved."""
+    outpath = tmp_path / "preview" / "image.png"
+    save_thumbnail(np.random.default_rng(0).random((10, 10)), outpath, grains=grains, cmap="nanoscope", zrange=zrange)
+    assert outpath.is_file()
+
+
+@pytest.mark.parametrize(
+    ("run_grains", "preview_size", "expected_level", "expected_grains"),
+    [
+        pytest.param(True, 32, 1, 3, id="grains downsampled 2x"),
+        pytest.param(True, 1024, 0, 3, id="grains full size"),
+        pytest.param(False, 16, 2, None, id="filtering only"),
+    ],
+)
+def test_preview_scan(
+    tmp_path: Path,
+    process_scan_config: dict,
+    load_scan_data: LoadScans,
+    run_grains: bool,
+    preview_size: int,
+    expected_level: int,
+    expected_grains: int | None,
+) -> None:
+    """Test previewing a scan downsamples the image, counts grains and saves a thumbnail."""
+    topostats_object = load_scan_data.img_dict["minicircle_small"]
+    filename, result = preview_scan(
+        topostats_object,
+        base_dir=tmp_path,
+        filter_config=process_scan_config["filter"],
+        grains_config=process_scan_config["grains"] if run_grains else None,
+        plotting_config=process_scan_config["plotting"],
+        preview_size=preview_size,
+        output_dir=tmp_path,
+    )
+    assert filename == "minicircle_small"
+    assert result["pyramid_level"] == expected_level
+    assert result["pixel_to_nm_scaling"] == pytest.approx(topostats_object["pixel_to_nm_scaling"] * 2**expected_level)
+    assert result.get("grains_above") == expected_grains
+    assert "run" in process_scan_config["filter"]
+    assert len(list(tmp_path.rglob("preview/minicircle_small.png"))) == 1
@@ -2,6 +2,9 @@
 
 import logging
 import pickle
+from collections.abc import Iterator
+from copy import deepcopy
+from functools import partial
 from pathlib import Path
 
 import filetype
@@ -11,10 +14,16 @@ import pandas as pd
 import pytest
 from test_io import dict_almost_equal
 
+from topostats.cache import StageCache, hash_input
+from topostats.filters import Filters
 from topostats.io import LoadScans, hdf5_to_dict
 from topostats.processing import (
     LOGGER_NAME,
+    _filter_cache_key,
     check_run_steps,
+    filter_frames,
+    filter_frames_coherent,
+    load_and_process,
     process_scan,
     run_filters,
     run_grains,
@@ -859,3 +868,229 @@ def test_run_grainstats(process_scan_config: dict, tmp_path: Path) -> None:
 #     assert isinstance(dnatracing_df, pd.DataFrame)
 #     assert dnatracing_df.shape[0] == 13
 #     assert len(dnatracing_df.columns) == 26
+
+
+def test_load_and_process(loading_config: dict) -> None:
+    """Test scans are loaded and each image passed to the processing function."""
+
+    def processing_function(topostats_object: dict, config: dict) -> tuple:
+        # Each image should receive an unmodified copy of the configuration
+        run = config.pop("run")
+        return (topostats_object["filename"], topostats_object["image_original"].shape, run)
+
+    results = load_and_process(
+        img_path=RESOURCES / "test_image" / "minicircle_small.topostats",
+        processing_function=partial(processing_function, config={"run": True}),
+        loading_config=loading_config,
+    )
+    assert results == [("minicircle_small", (64, 64), True)]
+
+
+def test_load_and_process_skip_frames(monkeypatch) -> None:
+    """Test frames are filtered together in runs of consecutive frames that are not skipped."""
+
+    class FakeScans:  # pylint: disable=too-few-public-methods
+        """Scan of five frames."""
+
+        def __init__(self, img_paths: list, **kwargs) -> None:  # pylint: disable=unused-argument
+            """Initialise the class."""
+
+        def iter_data(self) -> Iterator[dict]:
+            """Yield each frame."""
+            yield from ({"img_path": Path(f"video_{index}")} for index in range(5))
+
+    monkeypatch.setattr("topostats.processing.LoadScans", FakeScans)
+    runs = []
+    results = load_and_process(
+        img_path=Path("video.asd"),
+        processing_function=lambda topostats_object: topostats_object["img_path"].name,
+        loading_config={},
+        skip=lambda img_path: img_path.name in {"video_0", "video_2"},
+        stack_filter=lambda topostats_objects, filename: runs.append(
+            [topostats_object["img_path"].name for topostats_object in topostats_objects]
+        ),
+    )
+    assert results == ["video_1", "video_3", "video_4"]
+    assert runs == [["video_1"], ["video_3", "video_4"]]
+
+
+@pytest.mark.parametrize(
+    "frame_chunk_size",
+    [
+        pytest.param(2**23, id="single stack"),
+        pytest.param(64 * 64 * 2, id="stacks of two frames"),
+    ],
+)
+def test_filter_frames(
+    load_scan_data: LoadScans, process_scan_config: dict, frame_chunk_size: int, monkeypatch
+) -> None:
+    """Test the frames of a video are filtered together and the filtered images used by run_filters()."""
+    monkeypatch.setattr("topostats.processing.FRAME_CHUNK_SIZE", frame_chunk_size)
+    image = load_scan_data.img_dict["minicircle_small"]
+    topostats_objects = [
+        {**image, "image_original": frame}
+        for frame in (image["image_original"], image["image_original"][::-1], image["image_original"][:, ::-1])
+    ]
+    filter_frames(topostats_objects, filename="video", filter_config=process_scan_config["filter"])
+    for topostats_object in topostats_objects:
+        filters = Filters(
+            image=topostats_object["image_original"],
+            filename="video",
+            pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
+            **{key: deepcopy(value) for key, value in process_scan_config["filter"].items() if key != "run"},
+        )
+        filters.filter_image()
+        np.testing.assert_allclose(
+            topostats_object["filtered_images"]["gaussian_filtered"], filters.images["gaussian_filtered"], atol=1e-10
+        )
+        np.testing.assert_array_equal(topostats_object["filtered_images"]["mask"], filters.images["mask"])
+        # Only the images needed after filtering are kept for each frame
+        assert set(topostats_object["filtered_images"]) <= {"pixels", "scar_mask", "mask", "gaussian_filtered"}
+        assert topostats_object["filtered_images"]["pixels"] is topostats_object["image_original"]
+    assert "run" in process_scan_config["filter"]
+
+
+def test_filter_frames_cached(load_scan_data: LoadScans, process_scan_config: dict, tmp_path: Path) -> None:
+    """Test a video is only filtered as a stack if the filtered image of a frame is not cached."""
+    image = load_scan_data.img_dict["minicircle_small"]
+    topostats_objects = [
+        {**image, "filename": f"video_{index}", "image_original": frame}
+        for index, frame in enumerate((image["image_original"], image["image_original"][::-1]))
+    ]
+    cache_config = {"run": True, "cache_dir": tmp_path / "cache", "max_size_gb": 1.0}
+    cache = StageCache(cache_dir=cache_config["cache_dir"], max_size_gb=cache_config["max_size_gb"])
+    keys = [
+        cache.stage_keys(
+            input_hash=hash_input(
+                image=topostats_object["image_original"],
+                pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
+                filename=topostats_object["filename"],
+                img_path=topostats_object["img_path"],
+            ),
+            configs={"filter": process_scan_config["filter"]},
+        )["filter"]
+        for topostats_object in topostats_objects
+    ]
+    cache.put(keys[0], None)
+    filter_frames(
+        topostats_objects, filename="video", filter_config=process_scan_config["filter"], cache_config=cache_config
+    )
+    assert all("filtered_images" in topostats_object for topostats_object in topostats_objects)
+    for topostats_object in topostats_objects:
+        del topostats_object["filtered_images"]
+    cache.put(keys[1], None)
+    filter_frames(
+        topostats_objects, filename="video", filter_config=process_scan_config["filter"], cache_config=cache_config
+    )
+    assert not any("filtered_images" in topostats_object for topostats_object in topostats_objects)
+
+
+def test_filter_frames_single_image(load_scan_data: LoadScans, process_scan_config: dict) -> None:
+    """Test a scan with a single image is left to be filtered on its own."""
+    topostats_objects = [dict(load_scan_data.img_dict["minicircle_small"])]
+    filter_frames(topostats_objects, filename="minicircle_small", filter_config=process_scan_config["filter"])
+    assert "filtered_images" not in topostats_objects[0]
+
+
+@pytest.mark.parametrize(
+    ("drift_limit", "expected_full_fits"),
+    [
+        pytest.param(0.05, 2, id="flipped frame filtered from scratch"),
+        pytest.param(1.0, 1, id="every frame warm started"),
+    ],
+)
+def test_filter_frames_coherent(
+    load_scan_data: LoadScans, process_scan_config: dict, drift_limit: float, expected_full_fits: int, caplog
+) -> None:
+    """Test frames are warm started from the frame before unless their mask drifts too far."""
+    caplog.set_level(logging.INFO, LOGGER_NAME)
+    image = load_scan_data.img_dict["minicircle_small"]
+    frames = (image["image_original"], image["image_original"].copy(), image["image_original"][::-1])
+    topostats_objects = [{**image, "image_original": frame} for frame in frames]
+    filter_frames_coherent(
+        topostats_objects, filename="video", filter_config=process_scan_config["filter"], drift_limit=drift_limit
+    )
+    filtered = []
+    for frame in frames:
+        filters = Filters(
+            image=frame,
+            filename="video",
+            pixel_to_nm_scaling=image["pixel_to_nm_scaling"],
+            **{key: deepcopy(value) for key, value in process_scan_config["filter"].items() if key != "run"},
+        )
+        filters.filter_image()
+        filtered.append(filters.images["gaussian_filtered"])
+    # A frame warm started from the mask of an identical frame is filtered exactly as it would be from scratch
+    for index in (0, 1) if expected_full_fits == 1 else (0, 1, 2):
+        np.testing.assert_allclose(
+            topostats_objects[index]["filtered_images"]["gaussian_filtered"], filtered[index], atol=1e-10
+        )
+    # The second frame keeps the mask it was warm started from, the mask derived from the first frame's filtered image
+    assert topostats_objects[1]["filtered_images"]["mask"] is topostats_objects[0]["filtered_images"]["mask"]
+    for topostats_object in topostats_objects:
+        assert set(topostats_object["filtered_images"]) <= {"pixels", "scar_mask", "mask", "gaussian_filtered"}
+    assert f"{expected_full_fits} of 3 frames filtered from scratch" in caplog.text
+    assert "run" in process_scan_config["filter"]
+
+
+def test_filter_frames_coherent_cached(load_scan_data: LoadScans, process_scan_config: dict, tmp_path: Path) -> None:
+    """Test frames warm started from the frame before are cached apart from frames filtered on their own."""
+    image = load_scan_data.img_dict["minicircle_small"]
+    frames = (image["image_original"], image["image_original"].copy())
+    topostats_objects = [
+        {**image, "filename": f"video_{index}", "image_original": frame} for index, frame in enumerate(frames)
+    ]
+    cache_config = {"run": True, "cache_dir": tmp_path / "cache", "max_size_gb": 1.0}
+    cache = StageCache(cache_dir=cache_config["cache_dir"], max_size_gb=cache_config["max_size_gb"])
+    filter_config = process_scan_config["filter"]
+    for topostats_object in topostats_objects:
+        cache.put(_filter_cache_key(topostats_object, filter_config, warm_start=None), None)
+    filter_frames_coherent(topostats_objects, filename="video", filter_config=filter_config, cache_config=cache_config)
+    assert all("filtered_images" in topostats_object for topostats_object in topostats_objects)
+    # Each frame is keyed by the drift limit and the key of the frame before
+    warm_starts = [topostats_object["warm_start"] for topostats_object in topostats_objects]
+    assert warm_starts[0] == {"drift_limit": 0.05, "previous_key": None}
+    assert warm_starts[1] == {
+        "drift_limit": 0.05,
+        "previous_key": _filter_cache_key(topostats_objects[0], filter_config, warm_starts[0]),
+    }
+    assert _filter_cache_key(topostats_objects[1], filter_config, {**warm_starts[1], "drift_limit": 0.1}) != (
+        _filter_cache_key(topostats_objects[1], filter_config, warm_starts[1])
+    )
+    for topostats_object in topostats_objects:
+        cache.put(_filter_cache_key(topostats_object, filter_config, topostats_object.pop("warm_start")), None)
+        del topostats_object["filtered_images"]
+    filter_frames_coherent(topostats_objects, filename="video", filter_config=filter_config, cache_config=cache_config)
+    assert not any("filtered_images" in topostats_object for topostats_object in topostats_objects)
+    assert [topostats_object["warm_start"] for topostats_object in topostats_objects] == warm_starts
+
+
+def test_process_scan_cache(process_scan_config: dict, load_scan_data: LoadScans, tmp_path: Path, caplog) -> None:
+    """Test outputs of each stage are retrieved from the cache when processing the same scan again."""
+    caplog.set_level(logging.INFO, LOGGER_NAME)
+    process_scan_config["plotting"]["run"] = False
+    cache_config = {"run": True, "cache_dir": tmp_path / "cache", "max_size_gb": 1.0}
+    results = []
+    for _ in range(2):
+        config = deepcopy(process_scan_config)
+        results.append(
+            process_scan(
+                topostats_object=deepcopy(load_scan_data.img_dict["minicircle_small"]),
+                base_dir=BASE_DIR,
+                filter_config=config["filter"],
+                grains_config=config["grains"],
+                grainstats_config=config["grainstats"],
+                disordered_tracing_config=config["disordered_tracing"],
+                nodestats_config=config["nodestats"],
+                ordered_tracing_config=config["ordered_tracing"],
+                splining_config=config["splining"],
+                curvature_config=config["curvature"],
+                plotting_config=config["plotting"],
+                output_dir=tmp_path,
+                cache_config=cache_config,
+            )
+        )
+    assert "Using cached output of run_filters()" in caplog.text
+    assert "Using cached output of run_splining()" in caplog.text
+    pd.testing.assert_frame_equal(results[0][1], results[1][1])
+    pd.testing.assert_frame_equal(results[0][5], results[1][5])
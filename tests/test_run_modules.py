@@ -4,11 +4,14 @@ import argparse
 import logging
 from pathlib import Path
 
+import h5py
+import numpy as np
 import pandas as pd
 import pytest
 from AFMReader import topostats
 
 from topostats.entry_point import entry_point
+from topostats.io import LoadScans
 from topostats.logs.logs import LOGGER_NAME
 from topostats.run_modules import _set_logging, reconcile_config_args
 from topostats.validation import DEFAULT_CONFIG_SCHEMA, validate_config
@@ -186,6 +189,91 @@ def test_filters(caplog) -> None:
     ]
 
 
+def test_filters_shared_memory(caplog) -> None:
+    """Test running the filters module passing images to workers through shared memory."""
+    caplog.set_level(logging.INFO)
+    entry_point(
+        manually_provided_args=[
+            "--config",
+            f"{BASE_DIR / 'topostats' / 'default_config.yaml'}",
+            "--base-dir",
+            "./tests/resources/test_image/",
+            "--file-ext",
+            ".topostats",
+            "--cores",
+            "1",
+            "--shared-memory",
+            "True",
+            "filter",
+        ]
+    )
+    assert "Images will be passed to workers through shared memory." in caplog.text
+    assert "[minicircle_small] Filtering completed." in caplog.text
+    data = topostats.load_topostats("output/processed/minicircle_small.topostats")
+    assert data["image"].shape == (64, 64)
+
+
+def test_filters_grains_batch_container(tmp_path: Path, caplog) -> None:
+    """Test filtering to a batch container and detecting grains in the images it contains."""
+    caplog.set_level(logging.INFO)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("topostats_file:\n  batch_container: true\n", encoding="utf-8")
+    for base_dir, file_ext, output_dir, module in (
+        ("./tests/resources/test_image/", ".topostats", tmp_path / "filtered", "filter"),
+        (tmp_path / "filtered", ".topostats_batch", tmp_path / "grains", "grains"),
+    ):
+        entry_point(
+            manually_provided_args=[
+                "--config",
+                f"{config_file}",
+                "--base-dir",
+                f"{base_dir}",
+                "--output-dir",
+                f"{output_dir}",
+                "--file-ext",
+                file_ext,
+                "--cores",
+                "1",
+                module,
+            ]
+        )
+    assert "[minicircle_small] Grain detection completed" in caplog.text
+    assert list(tmp_path.glob("**/*.topostats")) == []
+    data = LoadScans([tmp_path / "grains" / "all_images.topostats_batch"], channel="", extract="grainstats")
+    images = list(data.iter_data())
+    assert [image["filename"] for image in images] == ["minicircle_small"]
+    assert images[0]["image"].shape == (64, 64)
+    assert images[0]["grain_masks"]["above"].shape[:2] == (64, 64)
+
+
+def test_filters_float32(tmp_path: Path) -> None:
+    """Test filtering in single precision saves single precision images close to those filtered in double precision."""
+    images = {}
+    for precision in ("float64", "float32"):
+        entry_point(
+            manually_provided_args=[
+                "--config",
+                f"{BASE_DIR / 'topostats' / 'default_config.yaml'}",
+                "--base-dir",
+                "./tests/resources/test_image/",
+                "--output-dir",
+                f"{tmp_path / precision}",
+                "--file-ext",
+                ".topostats",
+                "--cores",
+                "1",
+                "--precision",
+                precision,
+                "filter",
+            ]
+        )
+        with h5py.File(tmp_path / precision / "processed" / "minicircle_small.topostats", "r") as f:
+            images[precision] = {key: f[key][()] for key in ("image_original", "image")}
+    for key, image in images["float32"].items():
+        assert image.dtype == np.float32
+        np.testing.assert_allclose(image, images["float64"][key], atol=1e-5)
+
+
 def test_grains(caplog) -> None:
     """Test running the grains module.
 
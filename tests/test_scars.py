@@ -526,6 +526,38 @@ def test_mark_if_negative_scar(potential_negative_scar, target, threshold_low, m
     np.testing.assert_array_equal(marked, target)
 
 
+@pytest.mark.parametrize("max_scar_width", [pytest.param(1, id="width 1"), pytest.param(4, id="width 4")])
+@pytest.mark.parametrize(
+    ("direction", "mark_if_scar"),
+    [
+        pytest.param(1, scars._mark_if_positive_scar, id="positive"),
+        pytest.param(-1, scars._mark_if_negative_scar, id="negative"),
+    ],
+)
+def test_mark_positive_scars(direction: int, mark_if_scar, max_scar_width: int) -> None:
+    """Test marking scars across the whole image matches marking each pixel in turn."""
+    rng = np.random.default_rng(seed=2)
+    img = rng.normal(size=(40, 30))
+    img[10:12, 5:25] += 3 * direction
+    img[20, :] += 2 * direction
+    stddev = np.std(img)
+    target = np.zeros(img.shape)
+    for row, col in np.ndindex(img.shape[0] - 1, img.shape[1]):
+        mark_if_scar(
+            row_col=(row, col),
+            stddev=stddev,
+            img=img,
+            marked=target,
+            threshold_low=0.25,
+            max_scar_width=max_scar_width,
+        )
+    marked = scars._mark_positive_scars(
+        img=direction * img, stddev=stddev, threshold_low=0.25, max_scar_width=max_scar_width
+    )
+    assert target.any()
+    np.testing.assert_array_equal(marked, target)
+
+
 def test_spread_scars():
     """Test the spread scars method of the Scars class."""
     marked_mask = np.array(
@@ -606,6 +638,14 @@ def test_remove_short_scars():
     np.testing.assert_array_equal(mask, target)
 
 
+def test_remove_short_scars_row_end():
+    """Test short scars at the end of a row keep their last pixel and rows which are entirely scar are removed."""
+    mask = np.array([[0, 0, 0, 2, 2], [2, 2, 2, 2, 2], [2, 2, 2, 0, 0]])
+    target = np.array([[0, 0, 0, 0, 1], [0, 0, 0, 0, 0], [0, 0, 0, 0, 0]])
+    scars._remove_short_scars(mask, threshold_high=2, min_scar_length=6)
+    np.testing.assert_array_equal(mask, target)
+
+
 def test_mark_scars(synthetic_scars_image, synthetic_marked_scars):
     """Test the mark_scars method of the Scars class."""
     marked = scars._mark_scars(
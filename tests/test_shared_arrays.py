@@ -0,0 +1,92 @@
+"""Tests of the shared_arrays module."""
+
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from topostats.shared_arrays import SharedArray, attach_arrays, imap_unordered_shared, release, share_arrays
+
+RNG = np.random.default_rng(seed=1000)
+
+
+def _summarise(topostats_object: dict) -> tuple:
+    """Summarise the arrays of an image dictionary, as a processing function would."""
+    return (
+        topostats_object["filename"],
+        float(topostats_object["image"].sum()),
+        int(topostats_object["grain_masks"]["above"].sum()),
+    )
+
+
+def _image_dict(filename: str) -> dict:
+    """Image dictionary with nested arrays."""
+    return {
+        "filename": filename,
+        "pixel_to_nm_scaling": 0.5,
+        "image": RNG.random((32, 32)),
+        "grain_masks": {"above": RNG.integers(0, 2, (32, 32), dtype=np.uint8)},
+        "empty": np.array([]),
+    }
+
+
+def test_share_attach_arrays() -> None:
+    """Test arrays are replaced with descriptors and attached without copying."""
+    image_dict = _image_dict("image_1")
+    blocks = []
+    shared = share_arrays(image_dict, blocks)
+    assert len(blocks) == 2
+    assert isinstance(shared["image"], SharedArray)
+    assert isinstance(shared["grain_masks"]["above"], SharedArray)
+    assert shared["filename"] == "image_1"
+    # Empty arrays can not be placed in shared memory and are passed as they are
+    assert isinstance(shared["empty"], np.ndarray)
+
+    attached_blocks = []
+    attached = attach_arrays(shared, attached_blocks)
+    np.testing.assert_array_equal(attached["image"], image_dict["image"])
+    np.testing.assert_array_equal(attached["grain_masks"]["above"], image_dict["grain_masks"]["above"])
+    assert attached["grain_masks"]["above"].dtype == np.uint8
+    # Writes through the attached array are visible in the block
+    attached["image"][0, 0] = -1.0
+    assert np.ndarray((32, 32), dtype=np.float64, buffer=blocks[0].buf)[0, 0] == -1.0
+    del attached
+    release(attached_blocks, unlink=False)
+    release(blocks)
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=blocks[0].name)
+
+
+def test_imap_unordered_shared() -> None:
+    """Test images are processed by a pool through shared memory and the blocks are freed."""
+    image_dicts = [_image_dict(f"image_{i}") for i in range(4)]
+    expected = {
+        image_dict["filename"]: (float(image_dict["image"].sum()), int(image_dict["grain_masks"]["above"].sum()))
+        for image_dict in image_dicts
+    }
+    with Pool(processes=2) as pool:
+        results = {
+            filename: (image_sum, mask_sum)
+            for filename, image_sum, mask_sum in imap_unordered_shared(pool, _summarise, iter(image_dicts))
+        }
+    assert results == expected
+
+
+def test_imap_unordered_shared_window() -> None:
+    """Test images are only shared once there is room for them in the window."""
+    in_flight = []
+    drawn = 0
+
+    def _images():
+        nonlocal drawn
+        for i in range(8):
+            drawn += 1
+            yield _image_dict(f"image_{i}")
+
+    with Pool(processes=2) as pool:
+        for count, _ in enumerate(imap_unordered_shared(pool, _summarise, _images(), max_in_flight=2), start=1):
+            in_flight.append(drawn - count)
+    # Besides the images in the window, one more may be drawn and waiting for a slot
+    assert max(in_flight) <= 3
+    assert drawn == 8
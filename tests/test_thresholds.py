@@ -5,7 +5,7 @@ import numpy as np
 import pytest
 from skimage.filters import threshold_mean, threshold_minimum, threshold_otsu, threshold_triangle, threshold_yen
 
-from topostats.thresholds import threshold
+from topostats.thresholds import ThresholdStatistics, threshold
 
 OPTIONS = {
     "nbins": 10,
@@ -149,3 +149,37 @@ def test_threshold_triangle_keywords(image_random: np.array) -> None:
 
     assert isinstance(_threshold, float)
     assert _threshold == threshold_triangle(image_random, **OPTIONS)
+
+
+def test_threshold_statistics_shared(image_random: np.array) -> None:
+    """Test every method served from one set of statistics matches skimage and the histogram is computed once.
+
+    Parameters
+    ----------
+    image_random : np.array
+        Numpy array representing an image.
+    """
+    statistics = ThresholdStatistics(image_random)
+    assert threshold(image_random, method="otsu", otsu_threshold_multiplier=1.0, statistics=statistics) == (
+        threshold_otsu(image_random)
+    )
+    assert threshold(image_random, method="yen", statistics=statistics) == threshold_yen(image_random)
+    assert threshold(image_random, method="triangle", statistics=statistics) == threshold_triangle(image_random)
+    assert threshold(image_random, method="minimum", statistics=statistics) == threshold_minimum(image_random)
+    assert threshold(image_random, method="mean", statistics=statistics) == threshold_mean(image_random)
+    assert statistics.histogram() is statistics.histogram(256)
+    assert statistics.std == np.nanstd(image_random)
+
+
+@pytest.mark.parametrize(
+    ("method", "expected"),
+    [
+        pytest.param("otsu", 3.0 * OTSU_THRESHOLD_MULTIPLIER, id="otsu"),
+        pytest.param("triangle", 3.0, id="triangle"),
+        pytest.param("mean", 3.0, id="mean"),
+    ],
+)
+def test_threshold_constant_image(method: str, expected: float) -> None:
+    """Test the threshold of an image of a single value is that value."""
+    image = np.full((10, 10), 3.0)
+    assert threshold(image, method=method, otsu_threshold_multiplier=OTSU_THRESHOLD_MULTIPLIER) == expected
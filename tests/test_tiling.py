@@ -0,0 +1,96 @@
+"""Tests of the tiling module."""
+
+import numpy as np
+import pytest
+from skimage.filters import gaussian
+from skimage.measure import label
+
+from topostats import tiling
+
+RNG = np.random.default_rng(seed=1000)
+
+
+@pytest.mark.parametrize(
+    ("shape", "tile_size", "overlap"),
+    [
+        pytest.param((10, 10), 5, 0, id="even tiles"),
+        pytest.param((11, 7), 4, 2, id="uneven tiles with overlap"),
+        pytest.param((9, 6), (4, None), 1, id="bands of rows"),
+        pytest.param((3, 3), 10, 2, id="single tile"),
+    ],
+)
+def test_tile_image(shape: tuple, tile_size: int | tuple, overlap: int) -> None:
+    """Test tiles cover the image once and their outer regions extend by the overlap."""
+    tiles = tiling.tile_image(shape, tile_size, overlap)
+    coverage = np.zeros(shape, dtype=int)
+    for tile in tiles:
+        coverage[tile.inner] += 1
+        index = np.indices(shape)
+        np.testing.assert_array_equal(
+            index[(slice(None), *tile.outer)][(slice(None), *tile.core)], index[(slice(None), *tile.inner)]
+        )
+        for outer, inner, length in zip(tile.outer, tile.inner, shape):
+            assert outer.start == max(inner.start - overlap, 0)
+            assert outer.stop == min(inner.stop + overlap, length)
+    np.testing.assert_array_equal(coverage, 1)
+
+
+def test_get_tile_size() -> None:
+    """Test only large 2-D images are tiled when tiling is enabled."""
+    config = {"run": True, "tile_size": 32, "cores": 1}
+    assert tiling.get_tile_size(np.zeros((64, 16)), config) == 32
+    assert tiling.get_tile_size(np.zeros((32, 32)), config) is None
+    assert tiling.get_tile_size(np.zeros((2, 64, 64)), config) is None
+    assert tiling.get_tile_size(np.zeros((64, 64)), {**config, "run": False}) is None
+    assert tiling.get_tile_size(np.zeros((64, 64)), None) is None
+
+
+@pytest.mark.parametrize(
+    ("sigma", "mode", "cores"),
+    [
+        pytest.param(1.0, "nearest", 1, id="sigma 1"),
+        pytest.param(2.5, "reflect", 3, id="sigma 2.5 threaded"),
+    ],
+)
+def test_map_tiles_gaussian(sigma: float, mode: str, cores: int) -> None:
+    """Test filtering in overlapping tiles is the same as filtering the whole image."""
+    image = RNG.random((70, 53))
+    tiled = tiling.map_tiles(
+        lambda tile: gaussian(tile, sigma=sigma, mode=mode), image, 16, overlap=int(4.0 * sigma + 0.5) + 1, cores=cores
+    )
+    np.testing.assert_array_equal(tiled, gaussian(image, sigma=sigma, mode=mode))
+
+
+@pytest.mark.parametrize(
+    ("shape", "tile_size", "connectivity", "cores"),
+    [
+        pytest.param((64, 64), 8, None, 1, id="full connectivity"),
+        pytest.param((64, 64), 8, 1, 1, id="orthogonal connectivity"),
+        pytest.param((97, 130), 17, None, 3, id="uneven tiles threaded"),
+        pytest.param((20, 20), 50, None, 1, id="single tile"),
+    ],
+)
+def test_label_tiled(shape: tuple, tile_size: int, connectivity: int | None, cores: int) -> None:
+    """Test labelling in tiles gives the same labels as labelling the whole image."""
+    image = RNG.random(shape) < 0.55
+    np.testing.assert_array_equal(
+        tiling.label_tiled(image, tile_size, cores=cores, connectivity=connectivity),
+        label(image, connectivity=connectivity),
+    )
+
+
+def test_label_tiled_spanning_regions() -> None:
+    """Test regions spanning many tiles, including diagonally across a corner, are stitched into one."""
+    image = np.zeros((12, 12), dtype=bool)
+    image[1, :] = True
+    image[:, 10] = True
+    np.fill_diagonal(image[3:, :], True)
+    labelled = tiling.label_tiled(image, 3)
+    assert labelled.max() == 2
+    np.testing.assert_array_equal(labelled, label(image))
+
+
+def test_label_tiled_values() -> None:
+    """Test regions are connected pixels of the same value, as skimage.measure.label()."""
+    image = RNG.integers(0, 3, (40, 40))
+    np.testing.assert_array_equal(tiling.label_tiled(image, 7), label(image, background=0))
@@ -2,13 +2,26 @@
 
 from __future__ import annotations
 
-from unittest.mock import MagicMock
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import numpy as np
 import numpy.typing as npt
 import pytest
 
-from topostats.unet_masking import dice_loss, iou_loss, make_bounding_box_square, pad_bounding_box, predict_unet
+from topostats.unet_masking import (
+    UNET_MODEL_CACHE_SIZE,
+    _cached_unet_model,
+    dice_loss,
+    iou_loss,
+    load_unet_model,
+    make_bounding_box_square,
+    pad_bounding_box,
+    predict_unet,
+    predict_unet_batch,
+    predict_unet_tiled,
+)
 
 # pylint: disable=too-many-positional-arguments
 
@@ -93,6 +106,33 @@ def test_iou_loss(
     np.testing.assert_allclose(result, expected_loss, atol=1e-5)
 
 
+def test_load_unet_model(tmp_path: Path) -> None:
+    """Test models are loaded once per path and modification time, evicting the least recently used."""
+    _cached_unet_model.cache_clear()
+    model_paths = [tmp_path / f"model_{index}.keras" for index in range(UNET_MODEL_CACHE_SIZE + 1)]
+    for model_path in model_paths:
+        model_path.write_bytes(b"model")
+    with patch("keras.models.load_model", side_effect=lambda *args, **kwargs: MagicMock()) as mock_load_model:
+        model = load_unet_model(model_paths[0])
+        assert load_unet_model(str(model_paths[0])) is model
+        assert mock_load_model.call_count == 1
+        # Replacing the model file loads it again
+        os.utime(model_paths[0], ns=(0, 0))
+        assert load_unet_model(model_paths[0]) is not model
+        assert mock_load_model.call_count == 2
+        # Loading more models than the cache holds evicts the least recently used
+        for model_path in model_paths:
+            load_unet_model(model_path)
+        assert mock_load_model.call_count == 2 + UNET_MODEL_CACHE_SIZE
+        load_unet_model(model_paths[0])
+        assert mock_load_model.call_count == 3 + UNET_MODEL_CACHE_SIZE
+        # Paths that do not exist are not cached
+        load_unet_model("missing_model_path")
+        load_unet_model("missing_model_path")
+        assert mock_load_model.call_count == 5 + UNET_MODEL_CACHE_SIZE
+    _cached_unet_model.cache_clear()
+
+
 def test_predict_unet(mock_model_5_by_5_single_class: MagicMock) -> None:
     """Test the predict_unet method."""
     image = np.array(
@@ -147,6 +187,102 @@ def test_predict_unet(mock_model_5_by_5_single_class: MagicMock) -> None:
     )
 
 
+@pytest.mark.parametrize(
+    ("batch_size", "expected_batches"),
+    [
+        pytest.param(1, [1, 1, 1, 1, 1], id="batch size 1"),
+        pytest.param(2, [2, 2, 1], id="batch size 2"),
+        pytest.param(32, [5], id="all crops in one batch"),
+    ],
+)
+def test_predict_unet_batch(batch_size: int, expected_batches: list[int]) -> None:
+    """Test crops are predicted in batches with the same result as predicting each crop on its own."""
+    batches = []
+    model = MagicMock()
+    model.input_shape = (None, 8, 8, 1)
+
+    def side_effect_predict(input_array: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        batches.append(input_array.shape[0])
+        return input_array
+
+    model.predict.side_effect = side_effect_predict
+    rng = np.random.default_rng(0)
+    images = [rng.random((size, size)).astype(np.float32) for size in (4, 8, 12, 5, 16)]
+    predicted_masks = predict_unet_batch(
+        images=images,
+        model=model,
+        confidence=0.5,
+        model_input_shape=model.input_shape,
+        upper_norm_bound=1.0,
+        lower_norm_bound=0.0,
+        batch_size=batch_size,
+    )
+    assert batches == expected_batches
+    for image, predicted_mask in zip(images, predicted_masks):
+        expected_mask = predict_unet(
+            image=image,
+            model=model,
+            confidence=0.5,
+            model_input_shape=model.input_shape,
+            upper_norm_bound=1.0,
+            lower_norm_bound=0.0,
+        )
+        assert predicted_mask.shape == (*image.shape, 2)
+        np.testing.assert_array_equal(predicted_mask, expected_mask)
+
+
+@pytest.mark.parametrize(
+    ("shape", "overlap", "batch_size", "expected_batches"),
+    [
+        pytest.param((8, 8), 2, 4, [1], id="image the size of a tile"),
+        pytest.param((5, 6), 2, 4, [1], id="image smaller than a tile"),
+        pytest.param((20, 14), 2, 4, [4, 2], id="overlapping tiles"),
+        pytest.param((20, 14), 0, 32, [6], id="tiles without overlap"),
+    ],
+)
+def test_predict_unet_tiled(shape: tuple, overlap: int, batch_size: int, expected_batches: list[int]) -> None:
+    """Test the whole image is predicted in overlapping tiles blended into one mask."""
+    batches = []
+    model = MagicMock()
+    model.input_shape = (None, 8, 8, 1)
+
+    def side_effect_predict(input_array: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        assert input_array.shape[1:] == (8, 8, 1)
+        batches.append(input_array.shape[0])
+        return input_array
+
+    model.predict.side_effect = side_effect_predict
+    image = np.random.default_rng(0).random(shape) * 2.0
+    predicted_mask = predict_unet_tiled(
+        image=image,
+        model=model,
+        confidence=0.25,
+        model_input_shape=model.input_shape,
+        upper_norm_bound=2.0,
+        lower_norm_bound=0.0,
+        overlap=overlap,
+        batch_size=batch_size,
+    )
+    assert batches == expected_batches
+    # The model returns its input so blending the overlapping tiles gives back the normalised image
+    assert predicted_mask.shape == (*shape, 2)
+    np.testing.assert_array_equal(predicted_mask[:, :, 1], image / 2.0 > 0.25)
+    np.testing.assert_array_equal(predicted_mask[:, :, 0], ~predicted_mask[:, :, 1])
+
+
+def test_predict_unet_tiled_overlap_too_large() -> None:
+    """Test tiles must overlap by less than their size."""
+    with pytest.raises(ValueError, match="Tile overlap"):
+        predict_unet_tiled(np.zeros((10, 10)), MagicMock(), 0.5, (None, 8, 8, 1), 1.0, 0.0, overlap=8)
+
+
+def test_predict_unet_batch_no_images() -> None:
+    """Test the model is not run when there are no crops to predict."""
+    model = MagicMock()
+    assert predict_unet_batch([], model, 0.5, (None, 8, 8, 1), 1.0, 0.0) == []
+    model.predict.assert_not_called()
+
+
 @pytest.mark.parametrize(
     ("crop_min_row", "crop_min_col", "crop_max_row", "crop_max_col", "image_shape", "expected_indices"),
     [
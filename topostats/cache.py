@@ -0,0 +1,284 @@
+"""On-disk cache of the outputs of each stage of processing."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle as pkl
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from topostats import __version__
+from topostats.logs.logs import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+# Stages in the order they are run, the key for each stage depends on its configuration and that of all earlier stages.
+CACHED_STAGES = (
+    "filter",
+    "grains",
+    "grainstats",
+    "disordered_tracing",
+    "nodestats",
+    "ordered_tracing",
+    "splining",
+)
+CACHE_SUFFIX = ".pkl"
+
+
+def hash_input(image: npt.NDArray, pixel_to_nm_scaling: float, filename: str, img_path: str | Path) -> str:
+    """
+    Hash the content of an input scan.
+
+    The filename and path are included as they are recorded in the outputs of each stage.
+
+    Parameters
+    ----------
+    image : npt.NDArray
+        The original (unprocessed) image.
+    pixel_to_nm_scaling : float
+        Scaling factor for converting pixel length scales to nanometres.
+    filename : str
+        Name of the image.
+    img_path : str | Path
+        Path of the image.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest of the input.
+    """
+    digest = hashlib.sha256()
+    image = np.ascontiguousarray(image)
+    digest.update(f"{image.shape}{image.dtype}{float(pixel_to_nm_scaling)!r}{filename}{img_path}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def hash_config(config: dict) -> str:
+    """
+    Hash a configuration dictionary.
+
+    Parameters
+    ----------
+    config : dict
+        Configuration dictionary, values that are not JSON serialisable (e.g. ``Path``) are converted to strings.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest of the configuration.
+    """
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class StageCache:
+    """
+    Size-bounded on-disk cache of the outputs of each stage of processing.
+
+    Entries are keyed by a hash of the input scan and the configuration of the stage and every earlier stage, so
+    changing a parameter of one stage only invalidates that stage and those which follow it. When the total size of the
+    cache exceeds ``max_size_gb`` the least recently used entries are removed.
+
+    Parameters
+    ----------
+    cache_dir : str | Path
+        Directory to store cached outputs in, it is created if it does not exist.
+    max_size_gb : float
+        Maximum size of the cache in gigabytes.
+    """
+
+    def __init__(self, cache_dir: str | Path, max_size_gb: float) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        cache_dir : str | Path
+            Directory to store cached outputs in, it is created if it does not exist.
+        max_size_gb : float
+            Maximum size of the cache in gigabytes.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_gb * 1024**3)
+
+    @staticmethod
+    def stage_keys(input_hash: str, configs: dict[str, dict]) -> dict[str, str]:
+        """
+        Derive the cache key for each stage.
+
+        The version of TopoStats is included in the key of every stage so that outputs cached by other versions are not
+        used.
+
+        Parameters
+        ----------
+        input_hash : str
+            Hash of the input scan, see ``hash_input()``.
+        configs : dict[str, dict]
+            Configuration for each stage keyed by the stage names in ``CACHED_STAGES``. Keys are derived for the stages
+            in order up to the first whose configuration is not given.
+
+        Returns
+        -------
+        dict[str, str]
+            Dictionary of cache keys for each stage.
+        """
+        keys = {}
+        key = f"{__version__}{input_hash}"
+        for stage in CACHED_STAGES:
+            if stage not in configs:
+                break
+            key = hashlib.sha256(f"{key}{stage}{hash_config(configs[stage])}".encode()).hexdigest()
+            keys[stage] = key
+        return keys
+
+    def _path(self, key: str) -> Path:
+        """
+        Path of the cache entry for a key.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        Path
+            Path to the cache entry.
+        """
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Check whether there is an entry for a key without reading it.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        bool
+            Whether the key is in the cache, the entry may still be evicted before it is read.
+        """
+        return self._path(key).exists()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """
+        Get an entry from the cache, updating its last used time.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+
+        Returns
+        -------
+        tuple[bool, Any]
+            Whether the key was found and the cached value (``None`` if not found).
+        """
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                value = pkl.load(f)  # noqa: S301
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pkl.UnpicklingError):
+            # Entries may be evicted by another process between listing and reading
+            return False, None
+        return True, value
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Add an entry to the cache, evicting the least recently used entries if the cache is too large.
+
+        The entry is written to a temporary file and then moved into place so that concurrent readers never see a
+        partially written entry.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        value : Any
+            Value to cache, must be picklable.
+        """
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+            pkl.dump(value, f, protocol=pkl.HIGHEST_PROTOCOL)
+        Path(f.name).replace(self._path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache is no larger than the maximum size."""
+        entries = []
+        for path in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= self.max_size_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+            LOGGER.debug(f"Evicted cache entry : {path.name}")
+
+    def run(self, key: str, function: Callable, **kwargs) -> Any:
+        """
+        Return the cached output of a function if present, otherwise run the function and cache its output.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        function : Callable
+            Function to run on a cache miss.
+        **kwargs
+            Keyword arguments passed to ``function``.
+
+        Returns
+        -------
+        Any
+            The (cached) output of the function.
+        """
+        found, value = self.get(key)
+        if found:
+            LOGGER.info(f"Using cached output of {function.__name__}(), plots of this stage are not regenerated.")
+            return value
+        value = function(**kwargs)
+        self.put(key, value)
+        return value
+
+
+def run_stage(cache: StageCache | None, key: str | None, function: Callable, **kwargs) -> Any:
+    """
+    Run a stage of processing, using the cache if one is provided.
+
+    Parameters
+    ----------
+    cache : StageCache | None
+        Cache of stage outputs, if ``None`` the function is always run.
+    key : str | None
+        Cache key for the stage.
+    function : Callable
+        Function to run the stage.
+    **kwargs
+        Keyword arguments passed to ``function``.
+
+    Returns
+    -------
+    Any
+        The (cached) output of the function.
+    """
+    if cache is None:
+        return function(**kwargs)
+    return cache.run(key, function, **kwargs)
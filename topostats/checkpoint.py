@@ -0,0 +1,163 @@
+"""Checkpointing of per-image results so that interrupted batch runs can be resumed."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import shutil
+import tempfile
+from collections.abc import Generator, Iterable
+from pathlib import Path
+
+from topostats.cache import hash_config
+from topostats.io import load_pkl, save_pkl
+from topostats.logs.logs import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+# Configuration options that do not change the results of processing and so are excluded from the fingerprint.
+FINGERPRINT_EXCLUDED_KEYS = ("cores", "log_level", "resume", "shared_memory")
+FINGERPRINT_FILE = "fingerprint"
+RESULTS_FILE = "results.pkl"
+
+
+class Checkpoints:
+    """
+    Commit the results of each image as it is processed and retrieve them when a run is resumed.
+
+    Each image's results are written to their own sub-directory of ``<output_dir>/checkpoints`` along with a fingerprint
+    of the configuration used. Results are written to a temporary directory which is renamed once complete so that a
+    crash part way through writing never leaves a partial checkpoint. Images with a checkpoint matching the current
+    fingerprint are skipped when a run is resumed.
+
+    Parameters
+    ----------
+    output_dir : str | Path
+        Output directory of the run.
+    config : dict
+        Configuration of the run, used to derive the fingerprint.
+    """
+
+    def __init__(self, output_dir: str | Path, config: dict) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        output_dir : str | Path
+            Output directory of the run.
+        config : dict
+            Configuration of the run, used to derive the fingerprint.
+        """
+        self.checkpoint_dir = Path(output_dir) / "checkpoints"
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        # Remove anything left part way through being committed or replaced when a previous run was interrupted
+        for incomplete_dir in [*self.checkpoint_dir.glob(".staging_*"), *self.checkpoint_dir.glob(".stale_*")]:
+            shutil.rmtree(incomplete_dir, ignore_errors=True)
+        self.fingerprint = hash_config(
+            {key: value for key, value in config.items() if key not in FINGERPRINT_EXCLUDED_KEYS}
+        )
+
+    def _image_dir(self, img_path: str | Path) -> Path:
+        """
+        Directory holding the checkpoint for an image.
+
+        Parameters
+        ----------
+        img_path : str | Path
+            Path of the image as recorded by ``LoadScans`` (i.e. without a suffix).
+
+        Returns
+        -------
+        Path
+            Checkpoint directory for the image.
+        """
+        return self.checkpoint_dir / hashlib.sha256(str(img_path).encode()).hexdigest()
+
+    def _is_current(self, image_dir: Path) -> bool:
+        """
+        Check whether a checkpoint directory was committed with the current fingerprint.
+
+        Parameters
+        ----------
+        image_dir : Path
+            Checkpoint directory for an image.
+
+        Returns
+        -------
+        bool
+            Whether the checkpoint exists and matches the current fingerprint.
+        """
+        try:
+            return (image_dir / FINGERPRINT_FILE).read_text(encoding="utf-8") == self.fingerprint
+        except FileNotFoundError:
+            return False
+
+    def is_committed(self, img_path: str | Path) -> bool:
+        """
+        Check whether the results of an image have been committed with the current configuration.
+
+        Parameters
+        ----------
+        img_path : str | Path
+            Path of the image as recorded by ``LoadScans`` (i.e. without a suffix).
+
+        Returns
+        -------
+        bool
+            Whether the image has been committed.
+        """
+        return self._is_current(self._image_dir(img_path))
+
+    def commit(self, results: tuple) -> None:
+        """
+        Atomically commit the results of processing an image.
+
+        Parameters
+        ----------
+        results : tuple
+            Results returned by ``process_scan()``, the first item is the path of the image.
+        """
+        image_dir = self._image_dir(results[0])
+        staging_dir = Path(tempfile.mkdtemp(dir=self.checkpoint_dir, prefix=".staging_"))
+        save_pkl(outfile=staging_dir / RESULTS_FILE, to_pkl=results)
+        (staging_dir / FINGERPRINT_FILE).write_text(self.fingerprint, encoding="utf-8")
+        # Results from a previous configuration are moved aside before being replaced
+        if image_dir.exists():
+            stale_dir = Path(tempfile.mkdtemp(dir=self.checkpoint_dir, prefix=".stale_"))
+            image_dir.replace(stale_dir / image_dir.name)
+            shutil.rmtree(stale_dir, ignore_errors=True)
+        staging_dir.replace(image_dir)
+        LOGGER.debug(f"[{results[0]}] Results committed to : {image_dir}")
+
+    def commit_each(self, image_results: Iterable[tuple]) -> Generator[tuple, None, None]:
+        """
+        Commit the results of each image as they are completed.
+
+        Parameters
+        ----------
+        image_results : Iterable[tuple]
+            Iterable of results returned by ``process_scan()``.
+
+        Yields
+        ------
+        tuple
+            The results of each image after they have been committed.
+        """
+        for results in image_results:
+            self.commit(results)
+            yield results
+
+    def load_committed(self) -> Generator[tuple, None, None]:
+        """
+        Load the results of all images committed with the current fingerprint.
+
+        Yields
+        ------
+        tuple
+            Results of each image as returned by ``process_scan()``.
+        """
+        for image_dir in sorted(self.checkpoint_dir.iterdir()):
+            if image_dir.name.startswith(".") or not self._is_current(image_dir):
+                continue
+            yield load_pkl(image_dir / RESULTS_FILE)
@@ -91,6 +91,55 @@ def create_parser() -> arg.ArgumentParser:
         required=False,
         help="Number of CPU cores to use when processing.",
     )
+    parser.add_argument(
+        "--shared-memory",
+        dest="shared_memory",
+        type=bool,
+        required=False,
+        help="Whether to pass images to the processes on each core through shared memory.",
+    )
+    parser.add_argument(
+        "--precision",
+        dest="precision",
+        type=str,
+        required=False,
+        help="Floating point precision images are processed in, options are 'float32' or 'float64'.",
+    )
+    parser.add_argument(
+        "--stack-frames",
+        dest="stack_frames",
+        type=bool,
+        required=False,
+        help="Whether to filter the frames of each video (.asd) file together as a single stack.",
+    )
+    parser.add_argument(
+        "--temporal-coherence",
+        dest="temporal_coherence",
+        type=bool,
+        required=False,
+        help="Whether to warm start filtering each frame of a video (.asd) file from the mask of the frame before.",
+    )
+    parser.add_argument(
+        "--coherence-drift-limit",
+        dest="coherence_drift_limit",
+        type=float,
+        required=False,
+        help="Fraction of pixels whose mask may change between frames before a frame is filtered from scratch.",
+    )
+    parser.add_argument(
+        "--preview",
+        dest="preview",
+        type=bool,
+        required=False,
+        help="Whether to quickly filter and find grains on downsampled images rather than processing them fully.",
+    )
+    parser.add_argument(
+        "--preview-size",
+        dest="preview_size",
+        type=int,
+        required=False,
+        help="Largest size in pixels of the downsampled images previewed.",
+    )
     parser.add_argument(
         "-f",
         "--file-ext",
@@ -335,6 +384,13 @@ def create_parser() -> arg.ArgumentParser:
         help="Lower bound for normalisation of input data. This should be slightly lower than the minimum desired"
         "/expected height of the background",
     )
+    process_parser.add_argument(
+        "--unet-batch-size",
+        dest="unet_batch_size",
+        type=int,
+        required=False,
+        help="Number of grain crops passed to the U-Net model at once",
+    )
 
     # Grainstats
     process_parser.add_argument(
@@ -582,6 +638,13 @@ def create_parser() -> arg.ArgumentParser:
         required=False,
         help="Whether to ignore warnings.",
     )
+    process_parser.add_argument(
+        "--resume",
+        dest="resume",
+        type=bool,
+        required=False,
+        help="Whether to skip images already processed with the same configuration by an interrupted run.",
+    )
     # Run the relevant function with the arguments
     process_parser.set_defaults(func=run_modules.process)
 
@@ -810,6 +873,13 @@ def create_parser() -> arg.ArgumentParser:
         help="Lower bound for normalisation of input data. This should be slightly lower than the minimum desired"
         "/expected height of the background",
     )
+    grains_parser.add_argument(
+        "--unet-batch-size",
+        dest="unet_batch_size",
+        type=int,
+        required=False,
+        help="Number of grain crops passed to the U-Net model at once",
+    )
     # Run the relevant function with the arguments
     grains_parser.set_defaults(func=run_modules.grains)
 
@@ -6,14 +6,14 @@ import logging
 
 import numpy as np
 import numpy.typing as npt
-from scipy.optimize import curve_fit
 
 # ruff: noqa: disable=no-name-in-module
 # pylint: disable=no-name-in-module
 from skimage.filters import gaussian
 
-from topostats import scars
+from topostats import polynomial_background, scars
 from topostats.logs.logs import LOGGER_NAME
+from topostats.tiling import get_tile_size, map_tiles, run_tiles, tile_image
 from topostats.utils import get_mask, get_thresholds
 
 LOGGER = logging.getLogger(LOGGER_NAME)
@@ -29,6 +29,44 @@ LOGGER = logging.getLogger(LOGGER_NAME)
 # pylint: disable=dangerous-default-value
 
 
+def _nanquantile_rows(array: npt.NDArray, quantile: float) -> npt.NDArray:
+    """
+    Quantile of each row (last axis) of an array, ignoring NaN.
+
+    Equivalent to ''np.nanquantile(array, quantile, axis=-1)'' with the default linear interpolation, but vectorised
+    when there are NaNs (e.g. masked points) rather than looping over each row in Python.
+
+    Parameters
+    ----------
+    array : npt.NDArray
+        Array to find the quantile of each row of.
+    quantile : float
+        Quantile (in the range 0.0 to 1.0) to find.
+
+    Returns
+    -------
+    npt.NDArray
+        Quantile of each row, NaN for rows that are entirely NaN.
+    """
+    nans = np.isnan(array)
+    if not nans.any():
+        return np.quantile(array, quantile, axis=-1)
+    counts = array.shape[-1] - nans.sum(axis=-1)
+    # NaN are sorted to the end of each row
+    sorted_rows = np.sort(array, axis=-1)
+    index = (counts - 1) * quantile
+    lower = np.floor(index)
+    gamma = index - lower
+    lower = np.clip(lower, 0, None).astype(np.intp)
+    upper = np.clip(np.minimum(lower + 1, counts - 1), 0, None)
+    below = np.take_along_axis(sorted_rows, lower[..., np.newaxis], axis=-1)[..., 0]
+    above = np.take_along_axis(sorted_rows, upper[..., np.newaxis], axis=-1)[..., 0]
+    # Interpolate as numpy does, from whichever of the neighbours is closer
+    difference = above - below
+    quantiles = np.where(gamma >= 0.5, above - difference * (1 - gamma), below + difference * gamma)
+    return np.where(counts == 0, np.nan, quantiles.astype(array.dtype, copy=False))
+
+
 class Filters:
     """
     Class for filtering scans.
@@ -36,7 +74,8 @@ class Filters:
     Parameters
     ----------
     image : npt.NDArray
-        The raw image from the Atomic Force Microscopy machine.
+        The raw image from the Atomic Force Microscopy machine. A 3-D stack of frames (e.g. of a video), with frames
+        along the first axis, can be filtered in one pass, each frame being filtered as though it were a separate image.
     filename : str
         The filename (used in logging only).
     pixel_to_nm_scaling : float
@@ -61,6 +100,15 @@ class Filters:
         Method passed to 'skimage.filters.gaussian(mode = gaussian_mode)'.
     remove_scars : dict
         Dictionary containing configuration parameters for the scar removal function.
+    lean_memory : bool
+        Whether to keep only the images needed after filtering (the raw pixels, mask, scar mask and Gaussian filtered
+        image), working in place rather than retaining a copy of the image at each step.
+    tiling : dict
+        Dictionary of 'run', 'tile_size' and 'cores' for processing images larger than 'tile_size' in tiles (bands of
+        rows for row alignment and polynomial fits) on several cores.
+    initial_mask : npt.NDArray, optional
+        Mask of the features of a similar image (e.g. the previous frame of a video) used in place of the mask derived
+        from an unmasked first pass, see ``filter_image()``.
     """  # numpydoc: ignore=PR01
 
     def __init__(
@@ -76,6 +124,9 @@ class Filters:
         gaussian_size: float = None,
         gaussian_mode: str = "nearest",
         remove_scars: dict = None,
+        lean_memory: bool = False,
+        tiling: dict = None,
+        initial_mask: npt.NDArray | None = None,
     ):
         """
         Initialise the class.
@@ -83,7 +134,7 @@ class Filters:
         Parameters
         ----------
         image : npt.NDArray
-            The raw image from the Atomic Force Microscopy machine.
+            The raw image from the Atomic Force Microscopy machine, or a 3-D stack of frames.
         filename : str
             The filename (used in logging only).
         pixel_to_nm_scaling : float
@@ -108,6 +159,15 @@ class Filters:
             Method passed to 'skimage.filters.gaussian(mode = gaussian_mode)'.
         remove_scars : dict
             Dictionary containing configuration parameters for the scar removal function.
+        lean_memory : bool
+            Whether to keep only the images needed after filtering (the raw pixels, mask, scar mask and Gaussian
+            filtered image), working in place rather than retaining a copy of the image at each step.
+        tiling : dict
+            Dictionary of 'run', 'tile_size' and 'cores' for processing images larger than 'tile_size' in tiles (bands
+            of rows for row alignment and polynomial fits) on several cores.
+        initial_mask : npt.NDArray, optional
+            Mask of the features of a similar image (e.g. the previous frame of a video) used in place of the mask
+            derived from an unmasked first pass, see ``filter_image()``.
         """
         self.filename = filename
         self.pixel_to_nm_scaling = pixel_to_nm_scaling
@@ -119,6 +179,9 @@ class Filters:
         self.threshold_std_dev = threshold_std_dev
         self.threshold_absolute = threshold_absolute
         self.remove_scars_config = remove_scars
+        self.lean_memory = lean_memory
+        self.tiling = tiling if tiling is not None else {"run": False, "tile_size": None, "cores": 1}
+        self.initial_mask = initial_mask
         self.images = {
             "pixels": image,
             "initial_median_flatten": None,
@@ -135,6 +198,8 @@ class Filters:
             "final_zero_average_background": None,
             "gaussian_filtered": None,
         }
+        if lean_memory:
+            self.images = {key: self.images[key] for key in ("pixels", "scar_mask", "mask", "gaussian_filtered")}
         self.thresholds = None
         self.medians = {"rows": None, "cols": None}
         self.results = {
@@ -143,10 +208,14 @@ class Filters:
             "x_gradient": None,
             "y_gradient": None,
             "threshold": None,
+            "mask_drift": None,
         }
+        self.warnings = []
+        # Mask derived from the filtered image when warm started from an initial mask, e.g. to warm start the next frame
+        self.derived_mask = None
 
     def median_flatten(
-        self, image: npt.NDArray, mask: npt.NDArray = None, row_alignment_quantile: float = 0.5
+        self, image: npt.NDArray, mask: npt.NDArray = None, row_alignment_quantile: float = 0.5, copy: bool = True
     ) -> npt.NDArray:
         """
         Flatten images using median differences.
@@ -154,44 +223,73 @@ class Filters:
         Flatten the rows of an image, aligning the rows and centering the median around zero. When used with a mask,
         this has the effect of centering the background data on zero.
 
-        Note this function does not handle scars.
+        Note this function does not handle scars. Rows that are entirely masked can not be aligned and are left
+        unchanged, they are recorded in ``self.warnings``.
 
         Parameters
         ----------
         image : npt.NDArray
-            2-D image of the data to align the rows of.
+            2-D image of the data to align the rows of, or a 3-D stack of frames.
         mask : npt.NDArray
             Boolean array of points to mask (ignore).
         row_alignment_quantile : float
             Quantile (in the range 0.0 to 1.0) used for defining the average background.
+        copy : bool
+            Whether to work on a copy of the image, if ``False`` the image is modified in place.
 
         Returns
         -------
         npt.NDArray
             Copy of the input image with rows aligned.
         """
-        image = image.copy()
-        if mask is not None:
-            read_matrix = np.ma.masked_array(image, mask=mask, fill_value=np.nan).filled()
-            LOGGER.debug(f"[{self.filename}] : Median flattening with mask")
+        image = image.copy() if copy else image
+        LOGGER.debug(f"[{self.filename}] : Median flattening {'with' if mask is not None else 'without'} mask")
+
+        def _row_quantiles(rows: tuple[slice, ...]) -> npt.NDArray:
+            if mask is None:
+                return _nanquantile_rows(image[rows], row_alignment_quantile)
+            return _nanquantile_rows(np.where(mask[rows], np.nan, image[rows]), row_alignment_quantile)
+
+        # Quantile of every row at once (or of every row of each band of rows of a large image), rows that are entirely
+        # masked have no quantile and are left unaligned
+        tile_size = get_tile_size(image, self.tiling)
+        if tile_size is None:
+            row_quantiles = _row_quantiles((Ellipsis,))
         else:
-            read_matrix = image
-            LOGGER.debug(f"[{self.filename}] : Median flattening without mask")
-
-        for row in range(image.shape[0]):
-            # Get the median of the row
-            m = np.nanquantile(read_matrix[row, :], row_alignment_quantile)
-            if not np.isnan(m):
-                image[row, :] -= m
-            else:
-                LOGGER.warning(
-                    """f[{self.filename}] Large grain detected image can not be
-processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for more information."""
+            row_quantiles = np.concatenate(
+                run_tiles(
+                    lambda band: _row_quantiles(band.inner),
+                    tile_image(image.shape, (tile_size, None)),
+                    self.tiling["cores"],
                 )
+            )
+        unaligned_rows = np.argwhere(np.isnan(row_quantiles))
+        image -= np.where(np.isnan(row_quantiles), 0.0, row_quantiles)[..., np.newaxis]
+        if unaligned_rows.size:
+            self.warnings.append(
+                {
+                    "step": "median_flatten",
+                    "masked": mask is not None,
+                    # Rows of a stack of frames are identified by their frame and row
+                    "rows": (
+                        unaligned_rows[:, 0].tolist() if image.ndim == 2 else [tuple(row) for row in unaligned_rows]
+                    ),
+                    "message": "Rows fully masked, large grain detected, rows not aligned.",
+                }
+            )
 
         return image
 
-    def remove_tilt(self, image: npt.NDArray, mask: npt.NDArray = None) -> npt.NDArray:
+    def log_warnings(self) -> None:
+        """Log each warning recorded whilst filtering the image, e.g. rows that could not be aligned."""
+        for warning in self.warnings:
+            LOGGER.warning(
+                f"[{self.filename}] [{warning['step']}] : {warning['message']} {len(warning['rows'])} row(s) "
+                f"{'with' if warning['masked'] else 'without'} mask : {warning['rows']}, please refer to "
+                "https://github.com/AFM-SPM/TopoStats/discussions for more information."
+            )
+
+    def remove_tilt(self, image: npt.NDArray, mask: npt.NDArray = None, copy: bool = True) -> npt.NDArray:
         """
         Remove the planar tilt from an image (linear in 2D spaces).
 
@@ -201,16 +299,18 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
         Parameters
         ----------
         image : npt.NDArray
-            2-D image of the data to remove the planar tilt from.
+            2-D image of the data to remove the planar tilt from, or a 3-D stack of frames.
         mask : npt.NDArray
             Boolean array of points to mask (ignore).
+        copy : bool
+            Whether to work on a copy of the image, if ``False`` the image is modified in place.
 
         Returns
         -------
         npt.NDArray
             Numpy array of image with tilt removed.
         """
-        image = image.copy()
+        image = image.copy() if copy else image
         if mask is not None:
             read_matrix = np.ma.masked_array(image, mask=mask, fill_value=np.nan).filled()
             LOGGER.debug(f"[{self.filename}] : Plane tilt removal with mask")
@@ -220,42 +320,53 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
 
         # Line of best fit
         # Calculate medians
-        medians_x = [np.nanmedian(read_matrix[:, i]) for i in range(read_matrix.shape[1])]
-        medians_y = [np.nanmedian(read_matrix[j, :]) for j in range(read_matrix.shape[0])]
+        medians_x = np.nanmedian(read_matrix, axis=-2)
+        medians_y = np.nanmedian(read_matrix, axis=-1)
         LOGGER.debug(f"[{self.filename}] [remove_tilt] medians_x   : {medians_x}")
         LOGGER.debug(f"[{self.filename}] [remove_tilt] medians_y   : {medians_y}")
 
-        # Fit linear x
-        px = np.polyfit(range(0, len(medians_x)), medians_x, 1)
+        # Fit linear x, coefficients are in increasing order so reverse them to match numpy.polyfit
+        terms = polynomial_background.polynomial_terms(1, ndim=1)
+        px = polynomial_background.fit_polynomial(medians_x, terms)[..., ::-1]
         LOGGER.debug(f"[{self.filename}] : x-polyfit 1st order: {px}")
-        py = np.polyfit(range(0, len(medians_y)), medians_y, 1)
+        py = polynomial_background.fit_polynomial(medians_y, terms)[..., ::-1]
         LOGGER.debug(f"[{self.filename}] : y-polyfit 1st order: {py}")
 
-        if px[0] != 0:
-            if not np.isnan(px[0]):
-                LOGGER.debug(f"[{self.filename}] : Removing x plane tilt")
-                for row in range(0, image.shape[0]):
-                    for col in range(0, image.shape[1]):
-                        image[row, col] -= px[0] * (col)
-            else:
-                LOGGER.debug(f"[{self.filename}] : x gradient is nan, skipping plane tilt x removal")
-        else:
-            LOGGER.debug("[{self.filename}] : x gradient is zero, skipping plane tilt x removal")
-
-        if py[0] != 0:
-            if not np.isnan(py[0]):
-                LOGGER.debug(f"[{self.filename}] : removing y plane tilt")
-                for row in range(0, image.shape[0]):
-                    for col in range(0, image.shape[1]):
-                        image[row, col] -= py[0] * (row)
-            else:
-                LOGGER.debug("[{self.filename}] : y gradient is nan, skipping plane tilt y removal")
-        else:
-            LOGGER.debug("[{self.filename}] : y gradient is zero, skipping plane tilt y removal")
+        x_gradient = self._gradient_to_remove(px[..., 0], "x")
+        image -= x_gradient[..., np.newaxis, np.newaxis] * np.arange(image.shape[-1])[np.newaxis, :]
+        y_gradient = self._gradient_to_remove(py[..., 0], "y")
+        image -= y_gradient[..., np.newaxis, np.newaxis] * np.arange(image.shape[-2])[:, np.newaxis]
 
         return image
 
-    def remove_nonlinear_polynomial(self, image: npt.NDArray, mask: npt.NDArray | None = None) -> npt.NDArray:
+    def _gradient_to_remove(self, gradient: npt.NDArray, direction: str) -> npt.NDArray:
+        """
+        Replace gradients that can not be removed (zero or NaN) with zero, logging those that are skipped.
+
+        Parameters
+        ----------
+        gradient : npt.NDArray
+            Gradient of the image, or of each frame of a stack.
+        direction : str
+            Direction of the gradient, ''x'' or ''y''.
+
+        Returns
+        -------
+        npt.NDArray
+            Gradient to remove.
+        """
+        if np.isnan(gradient).any():
+            LOGGER.debug(f"[{self.filename}] : {direction} gradient is nan, skipping plane tilt {direction} removal")
+        if (gradient == 0).any():
+            LOGGER.debug(f"[{self.filename}] : {direction} gradient is zero, skipping plane tilt {direction} removal")
+        removable = (gradient != 0) & ~np.isnan(gradient)
+        if removable.any():
+            LOGGER.debug(f"[{self.filename}] : Removing {direction} plane tilt")
+        return np.where(removable, gradient, 0.0)
+
+    def remove_nonlinear_polynomial(
+        self, image: npt.NDArray, mask: npt.NDArray | None = None, copy: bool = True
+    ) -> npt.NDArray:
         """
         Fit and remove a "saddle" shaped nonlinear polynomial from the image.
 
@@ -269,94 +380,35 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
         Parameters
         ----------
         image : npt.NDArray
-            2-D numpy height-map array of floats with a polynomial trend to remove.
+            2-D numpy height-map array of floats with a polynomial trend to remove, or a 3-D stack of frames.
         mask : npt.NDArray, optional
             2-D Numpy boolean array used to mask any points in the image that are deemed not to be part of the
             height-map's background data.
+        copy : bool
+            Whether to work on a copy of the image, if ``False`` the image is modified in place.
 
         Returns
         -------
         npt.NDArray
             Image with the polynomial trend subtracted.
         """
-        # Script has a lot of locals but I feel this is necessary for readability?
-        # pylint: disable=too-many-locals
-
-        # Define the polynomial function to fit to the image
-        def model_func(x: float, y: float, a: float, b: float, c: float, d: float) -> float:
-            """
-            Polynomial function to fit to the image.
-
-            Parameters
-            ----------
-            x : float
-                X.
-            y : float
-                Y.
-            a : float
-                A.
-            b : float
-                B.
-            c : float
-                C.
-            d : float
-                D.
-
-            Returns
-            -------
-            float
-                Result of applying the polynomial a + (b * x * y) - (c * x) - (d * y).
-            """
-            return a + b * x * y - c * x - d * y
-
-        image = image.copy()
-        if mask is not None:
-            read_matrix = np.ma.masked_array(image, mask=mask, fill_value=np.nan).filled()
-        else:
-            read_matrix = image
-
-        # Construct a meshgrid of x and y points for fitting to the z heights
-        xdata, ydata = np.meshgrid(np.arange(read_matrix.shape[1]), np.arange(read_matrix.shape[0]))
-        zdata = read_matrix
-
-        # Only use data that is not nan. Nans may be in the image from the
-        # masked array. Curve fitting cannot handle nans.
-        nan_mask = ~np.isnan(zdata)
-        xdata_nans_removed = xdata[nan_mask]
-        ydata_nans_removed = ydata[nan_mask]
-        zdata_nans_removed = zdata[nan_mask]
-
-        # Convert the z data to a 1D array
-        zdata = zdata.ravel()
-        zdata_nans_removed = zdata_nans_removed.ravel()
-
-        # Stack the x, y meshgrid data after converting them to 1D
-        xy_data_stacked = np.vstack((xdata_nans_removed.ravel(), ydata_nans_removed.ravel()))
-
-        # Fit the model to the data
-        # Note: pylint is flagging the tuple unpacking regarding an internal line of scipy.optimize._minpack_py : 910.
-        # This isn't actually an issue though as the extended tuple output is only provided if the 'full_output' flag is
-        # provided as a kwarg in curve_fit.
-        popt, _pcov = curve_fit(  # pylint: disable=unbalanced-tuple-unpacking
-            lambda x, a, b, c, d: model_func(x[0], x[1], a, b, c, d),
-            xy_data_stacked,
-            zdata_nans_removed,
+        # The saddle is linear in its parameters so is fitted directly by least squares, masked points are excluded.
+        image, coefficients = polynomial_background.remove_polynomial(
+            image,
+            polynomial_background.SADDLE_TERMS,
+            mask=mask,
+            copy=copy,
+            tile_size=get_tile_size(image, self.tiling),
+            cores=self.tiling["cores"],
         )
-
-        # Unpack the optimised parameters
-        a, b, c, d = popt
+        a, b, c, d = coefficients[..., 0], coefficients[..., 1], -coefficients[..., 2], -coefficients[..., 3]
         LOGGER.debug(
             f"[{self.filename}] : Nonlinear polynomial removal optimal params: const: {a} xy: {b} x: {c} y: {d}"
         )
 
-        # Use the optimised parameters to construct a prediction of the underlying surface
-        z_pred = model_func(xdata, ydata, a, b, c, d)
-        # Subtract the fitted nonlinear polynomial from the image
-        image -= z_pred
-
         return image
 
-    def remove_quadratic(self, image: npt.NDArray, mask: npt.NDArray = None) -> npt.NDArray:
+    def remove_quadratic(self, image: npt.NDArray, mask: npt.NDArray = None, copy: bool = True) -> npt.NDArray:
         """
         Remove the quadratic bowing that can be seen in some large-scale AFM images.
 
@@ -366,16 +418,18 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
         Parameters
         ----------
         image : npt.NDArray
-            2-D image of the data to remove the quadratic from.
+            2-D image of the data to remove the quadratic from, or a 3-D stack of frames.
         mask : npt.NDArray
             Boolean array of points to mask (ignore).
+        copy : bool
+            Whether to work on a copy of the image, if ``False`` the image is modified in place.
 
         Returns
         -------
         npt.NDArray
             Image with the quadratic bowing removed.
         """
-        image = image.copy()
+        image = image.copy() if copy else image
         if mask is not None:
             read_matrix = np.ma.masked_array(image, mask=mask, fill_value=np.nan).filled()
             LOGGER.debug(f"[{self.filename}] : Remove quadratic bow with mask")
@@ -384,24 +438,25 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
             LOGGER.debug(f"[{self.filename}] : Remove quadratic bow without mask")
 
         # Calculate medians
-        medians_x = [np.nanmedian(read_matrix[:, i]) for i in range(read_matrix.shape[1])]
+        medians_x = np.nanmedian(read_matrix, axis=-2)
 
-        # Fit quadratic x
-        px = np.polyfit(range(0, len(medians_x)), medians_x, 2)
+        # Fit quadratic x, coefficients are in increasing order so reverse them to match numpy.polyfit
+        px = polynomial_background.fit_polynomial(medians_x, polynomial_background.polynomial_terms(2, ndim=1))[
+            ..., ::-1
+        ]
         LOGGER.debug(f"[{self.filename}] : x polyfit 2nd order: {px}")
 
         # Handle divide by zero
-        if px[0] != 0:
-            if not np.isnan(px[0]):
-                # Remove quadratic in x
-                cx = -px[1] / (2 * px[0])
-                for row in range(0, image.shape[0]):
-                    for col in range(0, image.shape[1]):
-                        image[row, col] -= px[0] * (col - cx) ** 2
-            else:
-                LOGGER.debug(f"[{self.filename}] : Quadratic polyfit returns nan, skipping quadratic removal")
-        else:
+        quadratic = px[..., 0]
+        if np.isnan(quadratic).any():
+            LOGGER.debug(f"[{self.filename}] : Quadratic polyfit returns nan, skipping quadratic removal")
+        if (quadratic == 0).any():
             LOGGER.debug(f"[{self.filename}] : Quadratic polyfit returns zero, skipping quadratic removal")
+        removable = (quadratic != 0) & ~np.isnan(quadratic)
+        # Remove quadratic in x
+        cx = np.divide(-px[..., 1], 2 * quadratic, out=np.zeros_like(quadratic), where=removable)
+        quadratic = np.where(removable, quadratic, 0.0)[..., np.newaxis, np.newaxis]
+        image -= quadratic * (np.arange(image.shape[-1])[np.newaxis, :] - cx[..., np.newaxis, np.newaxis]) ** 2
 
         return image
 
@@ -440,27 +495,34 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
         """
         return self.calc_diff(array) / shape
 
-    def average_background(self, image: npt.NDArray, mask: npt.NDArray = None) -> npt.NDArray:
+    def average_background(self, image: npt.NDArray, mask: npt.NDArray = None, copy: bool = True) -> npt.NDArray:
         """
         Zero the background by subtracting the non-masked mean from all pixels.
 
         Parameters
         ----------
         image : npt.NDArray
-            Numpy array representing the image.
+            Numpy array representing the image, or a 3-D stack of frames each of which is zeroed.
         mask : npt.NDArray
             Mask of the array, should have the same dimensions as image.
+        copy : bool
+            Whether to work on a copy of the image, if ``False`` the image is modified in place.
 
         Returns
         -------
         npt.NDArray
             Numpy array of image zero averaged.
         """
-        if mask is None:
-            mask = np.zeros_like(image)
-        mean = np.mean(image[mask == 0])
+        if image.ndim > 2:
+            # Mean of each frame of a stack
+            mean = np.mean(image, axis=(-2, -1), where=True if mask is None else mask == 0, keepdims=True)
+        else:
+            mean = np.mean(image) if mask is None else np.mean(image[mask == 0])
         LOGGER.debug(f"[{self.filename}] : Zero averaging background : {mean} nm")
-        return image - mean
+        if copy:
+            return image - mean
+        image -= mean
+        return image
 
     def gaussian_filter(self, image: npt.NDArray, **kwargs) -> npt.NDArray:
         """
@@ -469,7 +531,7 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
         Parameters
         ----------
         image : npt.NDArray
-            Numpy array representing the image.
+            Numpy array representing the image, or a 3-D stack of frames.
         **kwargs
             Keyword arguments passed on to the skimage.filters.gaussian() function.
 
@@ -482,17 +544,121 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
             f"[{self.filename}] : Applying Gaussian filter (mode : {self.gaussian_mode};"
             f" Gaussian blur (px) : {self.gaussian_size})."
         )
-        return gaussian(
+        # Frames of a stack are each filtered without blurring between frames
+        if image.ndim > 2:
+            kwargs.setdefault("channel_axis", 0)
+        tile_size = get_tile_size(image, self.tiling)
+        if tile_size is None:
+            return gaussian(image, sigma=(self.gaussian_size), mode=self.gaussian_mode, **kwargs)
+        # Tiles overlap by the radius of the kernel, as truncated by scipy.ndimage, so are filtered exactly as the
+        # whole image would be
+        overlap = int(kwargs.get("truncate", 4.0) * self.gaussian_size + 0.5) + 1
+        return map_tiles(
+            lambda tile: gaussian(tile, sigma=(self.gaussian_size), mode=self.gaussian_mode, **kwargs),
             image,
-            sigma=(self.gaussian_size),
-            mode=self.gaussian_mode,
-            **kwargs,
+            tile_size,
+            overlap=overlap,
+            cores=self.tiling["cores"],
         )
 
+    def get_thresholds(self, image: npt.NDArray) -> dict:
+        """
+        Get the thresholds for masking an image using the configured threshold method.
+
+        Parameters
+        ----------
+        image : npt.NDArray
+            2-D image to derive the thresholds of.
+
+        Returns
+        -------
+        dict
+            Dictionary of thresholds, contains keys 'below' and optionally 'above'.
+        """
+        try:
+            return get_thresholds(
+                image=image,
+                threshold_method=self.threshold_method,
+                otsu_threshold_multiplier=self.otsu_threshold_multiplier,
+                threshold_std_dev=self.threshold_std_dev,
+                absolute=self.threshold_absolute,
+            )
+        except TypeError as type_error:
+            raise type_error
+
+    def threshold_image(self, image: npt.NDArray) -> None:
+        """
+        Derive the thresholds of an image and the mask of its features, each frame of a stack separately.
+
+        Parameters
+        ----------
+        image : npt.NDArray
+            2-D image, or 3-D stack of frames, with a zero average background.
+        """
+        if image.ndim > 2:
+            self.thresholds = [self.get_thresholds(frame) for frame in image]
+            self.images["mask"] = np.stack(
+                [
+                    get_mask(image=frame, thresholds=thresholds, img_name=self.filename)
+                    for frame, thresholds in zip(image, self.thresholds)
+                ]
+            )
+        else:
+            self.thresholds = self.get_thresholds(image)
+            self.images["mask"] = get_mask(
+                image=image,
+                thresholds=self.thresholds,
+                img_name=self.filename,
+            )
+
+    def remove_scars(self, image: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray]:
+        """
+        Remove scars from an image, or from each frame of a stack, using the configured parameters.
+
+        Parameters
+        ----------
+        image : npt.NDArray
+            2-D image, or 3-D stack of frames, to remove scars from. The image is modified in place.
+
+        Returns
+        -------
+        tuple[npt.NDArray, npt.NDArray]
+            The image with scars removed and the mask of the scars removed.
+        """
+        if image.ndim > 2:
+            scar_mask = np.zeros(image.shape, dtype=bool)
+            for index, frame in enumerate(image):
+                image[index], frame_scar_mask = scars.remove_scars(
+                    frame, filename=self.filename, **self.remove_scars_config
+                )
+                if frame_scar_mask is not None:
+                    scar_mask[index] = frame_scar_mask
+            return image, scar_mask
+        return scars.remove_scars(image, filename=self.filename, **self.remove_scars_config)
+
+    def _store(self, name: str, image: npt.NDArray) -> None:
+        """
+        Store an intermediate image unless running in lean memory mode.
+
+        Parameters
+        ----------
+        name : str
+            Key of the image in ``self.images``.
+        image : npt.NDArray
+            The image.
+        """
+        if not self.lean_memory:
+            self.images[name] = image
+
     def filter_image(self) -> None:  # numpydoc: ignore=GL07
         """
         Process a single image, filtering, finding grains and calculating their statistics.
 
+        If an ``initial_mask`` was given it is used to mask features in place of the mask derived from an unmasked first
+        pass, which is skipped, and is kept as ``images["mask"]``. The image's own mask is then derived from the
+        filtered image as ``derived_mask`` and ``results["mask_drift"]`` is the fraction of pixels where it differs from
+        the initial mask.
+
         Returns
         -------
         None
@@ -509,74 +675,80 @@ processed, please refer to https://github.com/AFM-SPM/TopoStats/discussions for
         ...             threshold_method='otsu')
         filter.filter_image()
         """
-        self.images["initial_median_flatten"] = self.median_flatten(
+        # In lean memory mode each step works in place on a single buffer (the raw pixels are never modified) and only
+        # the images needed after filtering are kept.
+        copy = not self.lean_memory
+        image = self.median_flatten(
             self.images["pixels"], mask=None, row_alignment_quantile=self.row_alignment_quantile
         )
-        self.images["initial_tilt_removal"] = self.remove_tilt(self.images["initial_median_flatten"], mask=None)
-        self.images["initial_quadratic_removal"] = self.remove_quadratic(self.images["initial_tilt_removal"], mask=None)
-        self.images["initial_nonlinear_polynomial_removal"] = self.remove_nonlinear_polynomial(
-            self.images["initial_quadratic_removal"], mask=None
-        )
-
-        # Remove scars
+        self._store("initial_median_flatten", image)
+        image = self.remove_tilt(image, mask=None, copy=copy)
+        self._store("initial_tilt_removal", image)
+        # The masked pass starts again from the tilt removed image
+        tilt_removed = image.copy() if self.lean_memory and self.initial_mask is None else image
         run_scar_removal = self.remove_scars_config.pop("run")
-        if run_scar_removal:
-            LOGGER.debug(f"[{self.filename}] : Initial scar removal")
-            self.images["initial_scar_removal"], _ = scars.remove_scars(
-                self.images["initial_nonlinear_polynomial_removal"],
-                filename=self.filename,
-                **self.remove_scars_config,
-            )
-        else:
-            LOGGER.debug(f"[{self.filename}] : Skipping scar removal as requested from config")
-            self.images["initial_scar_removal"] = self.images["initial_nonlinear_polynomial_removal"]
+        if self.initial_mask is None:
+            image = self.remove_quadratic(image, mask=None, copy=copy)
+            self._store("initial_quadratic_removal", image)
+            image = self.remove_nonlinear_polynomial(image, mask=None, copy=copy)
+            self._store("initial_nonlinear_polynomial_removal", image)
+
+            # Remove scars
+            if run_scar_removal:
+                LOGGER.debug(f"[{self.filename}] : Initial scar removal")
+                image, _ = self.remove_scars(image)
+            else:
+                LOGGER.debug(f"[{self.filename}] : Skipping scar removal as requested from config")
+            self._store("initial_scar_removal", image)
 
-        # Zero the data before thresholding, helps with absolute thresholding
-        self.images["initial_zero_average_background"] = self.average_background(
-            self.images["initial_scar_removal"], mask=None
-        )
+            # Zero the data before thresholding, helps with absolute thresholding
+            image = self.average_background(image, mask=None, copy=copy)
+            self._store("initial_zero_average_background", image)
 
-        # Get the thresholds
-        try:
-            self.thresholds = get_thresholds(
-                image=self.images["initial_zero_average_background"],
-                threshold_method=self.threshold_method,
-                otsu_threshold_multiplier=self.otsu_threshold_multiplier,
-                threshold_std_dev=self.threshold_std_dev,
-                absolute=self.threshold_absolute,
-            )
-        except TypeError as type_error:
-            raise type_error
-        self.images["mask"] = get_mask(
-            image=self.images["initial_zero_average_background"],
-            thresholds=self.thresholds,
-            img_name=self.filename,
-        )
-        self.images["masked_median_flatten"] = self.median_flatten(
-            self.images["initial_tilt_removal"],
+            # Get the thresholds, for a stack of frames each frame is thresholded and masked separately
+            self.threshold_image(image)
+        else:
+            # Warm started from the mask of a similar image the unmasked first pass is skipped, its images are not made
+            LOGGER.debug(f"[{self.filename}] : Using the initial mask in place of an unmasked first pass")
+            for name in (
+                "initial_quadratic_removal",
+                "initial_nonlinear_polynomial_removal",
+                "initial_scar_removal",
+                "initial_zero_average_background",
+            ):
+                self.images.pop(name, None)
+            self.images["mask"] = self.initial_mask
+        del image
+        image = self.median_flatten(
+            tilt_removed,
             self.images["mask"],
             row_alignment_quantile=self.row_alignment_quantile,
+            copy=copy,
         )
-        self.images["masked_tilt_removal"] = self.remove_tilt(self.images["masked_median_flatten"], self.images["mask"])
-        self.images["masked_quadratic_removal"] = self.remove_quadratic(
-            self.images["masked_tilt_removal"], self.images["mask"]
-        )
-        self.images["masked_nonlinear_polynomial_removal"] = self.remove_nonlinear_polynomial(
-            self.images["masked_quadratic_removal"], self.images["mask"]
-        )
+        del tilt_removed
+        self._store("masked_median_flatten", image)
+        image = self.remove_tilt(image, self.images["mask"], copy=copy)
+        self._store("masked_tilt_removal", image)
+        image = self.remove_quadratic(image, self.images["mask"], copy=copy)
+        self._store("masked_quadratic_removal", image)
+        image = self.remove_nonlinear_polynomial(image, self.images["mask"], copy=copy)
+        self._store("masked_nonlinear_polynomial_removal", image)
         # Remove scars
         if run_scar_removal:
             LOGGER.debug(f"[{self.filename}] : Secondary scar removal")
-            self.images["secondary_scar_removal"], scar_mask = scars.remove_scars(
-                self.images["masked_nonlinear_polynomial_removal"],
-                filename=self.filename,
-                **self.remove_scars_config,
-            )
+            image, scar_mask = self.remove_scars(image)
             self.images["scar_mask"] = scar_mask
         else:
             LOGGER.debug(f"[{self.filename}] : Skipping scar removal as requested from config")
-            self.images["secondary_scar_removal"] = self.images["masked_nonlinear_polynomial_removal"]
-        self.images["final_zero_average_background"] = self.average_background(
-            self.images["secondary_scar_removal"], self.images["mask"]
-        )
-        self.images["gaussian_filtered"] = self.gaussian_filter(self.images["final_zero_average_background"])
+        self._store("secondary_scar_removal", image)
+        image = self.average_background(image, self.images["mask"], copy=copy)
+        self._store("final_zero_average_background", image)
+        if self.initial_mask is not None:
+            # The image's own mask, e.g. to warm start the next frame, and the fraction of pixels it differs from the
+            # initial mask by. The initial mask the image was filtered with remains its mask.
+            self.threshold_image(image)
+            self.derived_mask, self.images["mask"] = self.images["mask"], self.initial_mask
+            self.results["mask_drift"] = float(np.mean(self.derived_mask != self.initial_mask))
+            LOGGER.debug(f"[{self.filename}] : Mask drift from the initial mask : {self.results['mask_drift']:.4f}")
+        self.images["gaussian_filtered"] = self.gaussian_filter(image)
+        self.log_warnings()
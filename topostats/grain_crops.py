@@ -0,0 +1,202 @@
+"""Crops of individual grains, so grains are processed in memory proportional to their size rather than the image's."""
+
+from __future__ import annotations
+
+import logging
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+from scipy import ndimage
+from skimage.measure import label
+
+from topostats.logs.logs import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+
+class GrainCrop(NamedTuple):
+    """
+    A single grain cropped from a mask of the whole image.
+
+    Parameters
+    ----------
+    bounding_box : tuple[int, int, int, int]
+        Region of the image the crop covers ('min_row', 'min_col', 'max_row', 'max_col'), the bounding box of the grain
+        padded by ``padding`` pixels on each side that is not an edge of the image.
+    mask : npt.NDArray
+        Boolean mask of the region, either 2-D or a 3-D tensor with a channel for each class where the first is the
+        background. Only the grain itself is masked, any other grains within the region are removed.
+    padding : int
+        Number of pixels the bounding box of the grain was padded by.
+    """
+
+    bounding_box: tuple[int, int, int, int]
+    mask: npt.NDArray
+    padding: int
+
+
+def _grain_bounding_box(region: tuple[slice, slice], image_shape: tuple[int, ...], padding: int) -> tuple[int, ...]:
+    """
+    Pad the bounding box of a grain, stopping at the edges of the image.
+
+    Parameters
+    ----------
+    region : tuple[slice, slice]
+        Slices of the grain's bounding box, as returned by ``scipy.ndimage.find_objects()``.
+    image_shape : tuple[int, ...]
+        Shape of the image.
+    padding : int
+        Number of pixels to pad the bounding box by.
+
+    Returns
+    -------
+    tuple[int, ...]
+        The padded bounding box ('min_row', 'min_col', 'max_row', 'max_col').
+    """
+    return (
+        max(region[0].start - padding, 0),
+        max(region[1].start - padding, 0),
+        min(region[0].stop + padding, image_shape[0]),
+        min(region[1].stop + padding, image_shape[1]),
+    )
+
+
+def crop_labelled_grains(labelled_regions: npt.NDArray, padding: int = 0) -> list[GrainCrop]:
+    """
+    Crop each labelled region of a 2-D image.
+
+    The bounding boxes of all regions are found in a single pass over the image and each mask is made from the region
+    of the image the grain covers, so no copies of the whole image are made.
+
+    Parameters
+    ----------
+    labelled_regions : npt.NDArray
+        2-D array of labelled regions, the background being 0.
+    padding : int
+        Number of pixels to pad the bounding box of each grain by.
+
+    Returns
+    -------
+    list[GrainCrop]
+        Crop of each region in the order of their labels, masks are 2-D.
+    """
+    grain_crops = []
+    for index, region in enumerate(ndimage.find_objects(labelled_regions)):
+        if region is None:
+            continue
+        bounding_box = _grain_bounding_box(region, labelled_regions.shape, padding)
+        mask = labelled_regions[bounding_box[0] : bounding_box[2], bounding_box[1] : bounding_box[3]] == index + 1
+        grain_crops.append(GrainCrop(bounding_box=bounding_box, mask=mask, padding=padding))
+    return grain_crops
+
+
+def crop_grains(grain_mask_tensor: npt.NDArray, padding: int = 1) -> list[GrainCrop]:
+    """
+    Crop each grain of a multi-class grain mask tensor.
+
+    Grains are the connected regions of all classes bar the background. Within each crop the classes of any other
+    grains are removed and the background class is updated to match.
+
+    Parameters
+    ----------
+    grain_mask_tensor : npt.NDArray
+        3-D array of the grain mask tensor, with a channel for each class where the first is the background.
+    padding : int
+        Number of pixels to pad the bounding box of each grain by.
+
+    Returns
+    -------
+    list[GrainCrop]
+        Crop of each grain in the order they are met scanning the image row by row, masks are 3-D tensors.
+    """
+    assert len(grain_mask_tensor.shape) == 3, f"Tensor not 3D: {grain_mask_tensor.shape}"
+    labelled_regions = label(np.any(grain_mask_tensor[:, :, 1:], axis=-1))
+    grain_crops = []
+    for grain_crop in crop_labelled_grains(labelled_regions, padding):
+        min_row, min_col, max_row, max_col = grain_crop.bounding_box
+        mask = grain_mask_tensor[min_row:max_row, min_col:max_col].astype(bool)
+        mask[:, :, 1:] &= grain_crop.mask[:, :, np.newaxis]
+        mask[:, :, 0] = ~np.any(mask[:, :, 1:], axis=-1)
+        grain_crops.append(grain_crop._replace(mask=mask))
+    return grain_crops
+
+
+def pad_grain_crop(grain_crop: GrainCrop, padding: int, image_shape: tuple[int, ...]) -> GrainCrop:
+    """
+    Pad a grain crop by a further number of pixels, stopping at the edges of the image.
+
+    Parameters
+    ----------
+    grain_crop : GrainCrop
+        The crop to pad.
+    padding : int
+        Number of pixels to pad the crop by, in addition to its current padding.
+    image_shape : tuple[int, ...]
+        Shape of the image the grain was cropped from.
+
+    Returns
+    -------
+    GrainCrop
+        The padded crop, the grain's mask surrounded by background.
+    """
+    min_row, min_col, max_row, max_col = grain_crop.bounding_box
+    bounding_box = _grain_bounding_box((slice(min_row, max_row), slice(min_col, max_col)), image_shape, padding)
+    pad_width = [
+        (min_row - bounding_box[0], bounding_box[2] - max_row),
+        (min_col - bounding_box[1], bounding_box[3] - max_col),
+    ]
+    if grain_crop.mask.ndim == 3:
+        mask = np.pad(grain_crop.mask, pad_width + [(0, 0)])
+        mask[:, :, 0] = ~np.any(mask[:, :, 1:], axis=-1)
+    else:
+        mask = np.pad(grain_crop.mask, pad_width)
+    return GrainCrop(bounding_box=bounding_box, mask=mask, padding=grain_crop.padding + padding)
+
+
+def assemble_grain_crops(grain_crops: list[GrainCrop], grain_mask_tensor_shape: tuple[int, int, int]) -> npt.NDArray:
+    """
+    Combine crops of grains into a single grain mask tensor of the whole image.
+
+    The padding is trimmed from each crop before it is combined, so neighbouring grains' padding does not overlap.
+
+    Parameters
+    ----------
+    grain_crops : list[GrainCrop]
+        Crops of the grains, masks are 3-D tensors.
+    grain_mask_tensor_shape : tuple[int, int, int]
+        Shape of the grain mask tensor.
+
+    Returns
+    -------
+    npt.NDArray
+        3-D boolean array of the grain mask tensor, with the background class updated to match the grains.
+    """
+    grain_mask_tensor = np.zeros(grain_mask_tensor_shape, dtype=bool)
+    for grain_crop in grain_crops:
+        min_row, min_col, max_row, max_col = grain_crop.bounding_box
+        padding = grain_crop.padding
+        rows, cols = grain_crop.mask.shape[:2]
+        region = grain_mask_tensor[min_row + padding : max_row - padding, min_col + padding : max_col - padding]
+        region |= grain_crop.mask[padding : rows - padding, padding : cols - padding]
+    grain_mask_tensor[:, :, 0] = ~np.any(grain_mask_tensor[:, :, 1:], axis=-1)
+    return grain_mask_tensor
+
+
+def crop_grain_masks(grain_masks: dict[str, npt.NDArray], class_index: int = 1) -> dict[str, list[GrainCrop]]:
+    """
+    Crop the grains of one class of each direction's grain mask tensor.
+
+    Parameters
+    ----------
+    grain_masks : dict[str, npt.NDArray]
+        Dictionary of labelled grain mask tensors, keys "above" or "below".
+    class_index : int
+        Class of the tensors whose labelled regions are cropped.
+
+    Returns
+    -------
+    dict[str, list[GrainCrop]]
+        Dictionary of the unpadded crops of the grains of each direction, in the order of their labels.
+    """
+    return {direction: crop_labelled_grains(mask[:, :, class_index]) for direction, mask in grain_masks.items()}
@@ -4,10 +4,8 @@
 from __future__ import annotations
 
 import logging
-import sys
 from collections import defaultdict
 
-import keras
 import numpy as np
 import numpy.typing as npt
 from skimage import morphology
@@ -16,14 +14,16 @@ from skimage.measure import label, regionprops
 from skimage.morphology import binary_dilation
 from skimage.segmentation import clear_border
 
+from topostats.grain_crops import GrainCrop, assemble_grain_crops, crop_grains, crop_labelled_grains
 from topostats.logs.logs import LOGGER_NAME
-from topostats.thresholds import threshold
+from topostats.thresholds import ThresholdStatistics, threshold
+from topostats.tiling import get_tile_size, label_tiled
 from topostats.unet_masking import (
-    iou_loss,
+    load_unet_model,
     make_bounding_box_square,
-    mean_iou,
     pad_bounding_box,
-    predict_unet,
+    predict_unet_batch,
+    predict_unet_tiled,
 )
 from topostats.utils import _get_mask, get_thresholds
 
@@ -62,6 +62,12 @@ class Grains:
             Upper bound for normalising the image.
         lower_norm_bound: float
             Lower bound for normalising the image.
+        batch_size: int
+            Number of grain crops passed to the model at once.
+        mode: str
+            Whether to refine the crops of thresholded grains ('crops') or segment the whole image in tiles ('tiled').
+        tile_overlap: int
+            Number of pixels tiles overlap by when segmenting the whole image.
     threshold_method : str
         Method for determining thershold to mask values, default is 'otsu'.
     otsu_threshold_multiplier : float
@@ -83,6 +89,8 @@ class Grains:
         List of tuples of classes to merge.
     vetting : dict | None
         Dictionary of vetting parameters.
+    tiling : dict | None
+        Dictionary of 'run', 'tile_size' and 'cores' for labelling regions of images larger than 'tile_size' in tiles.
     """
 
     def __init__(
@@ -101,6 +109,7 @@ class Grains:
         remove_edge_intersecting_grains: bool = True,
         classes_to_merge: list[tuple[int, int]] | None = None,
         vetting: dict | None = None,
+        tiling: dict | None = None,
     ):
         """
         Initialise the class.
@@ -123,6 +132,13 @@ class Grains:
                 Upper bound for normalising the image.
             lower_norm_bound : float
                 Lower bound for normalising the image.
+            batch_size : int
+                Number of grain crops passed to the model at once.
+            mode : str
+                Whether to refine the crops of thresholded grains ('crops') or segment the whole image in tiles
+                ('tiled').
+            tile_overlap : int
+                Number of pixels tiles overlap by when segmenting the whole image.
         threshold_method : str
             Method for determining thershold to mask values, default is 'otsu'.
         otsu_threshold_multiplier : float
@@ -144,6 +160,9 @@ class Grains:
             List of tuples of classes to merge.
         vetting : dict | None
             Dictionary of vetting parameters.
+        tiling : dict | None
+            Dictionary of 'run', 'tile_size' and 'cores' for labelling regions of images larger than 'tile_size' in
+            tiles, the labels of regions that span tiles are stitched back together.
         """
         if unet_config is None:
             unet_config = {
@@ -151,6 +170,9 @@ class Grains:
                 "grain_crop_padding": 0,
                 "upper_norm_bound": 1.0,
                 "lower_norm_bound": 0.0,
+                "batch_size": 1,
+                "mode": "crops",
+                "tile_overlap": 32,
             }
         if absolute_area_threshold is None:
             absolute_area_threshold = {"above": [None, None], "below": [None, None]}
@@ -166,6 +188,9 @@ class Grains:
         self.direction = [direction] if direction != "both" else ["above", "below"]
         self.smallest_grain_size_nm2 = smallest_grain_size_nm2
         self.remove_edge_intersecting_grains = remove_edge_intersecting_grains
+        # Histogram and moments of the image, shared by the thresholds of each direction
+        self.threshold_statistics = ThresholdStatistics(image)
+        self.tiling = tiling
         self.thresholds = None
         self.images = {
             "mask_grains": None,
@@ -206,6 +231,14 @@ class Grains:
             2-D Numpy array of image without objects touching the border.
         """
         LOGGER.debug(f"[{self.filename}] : Tidying borders")
+        if get_tile_size(image, self.tiling) is not None and not kwargs:
+            # Regions are already labelled so those touching the border are removed directly, rather than relabelling
+            # the whole image as clear_border() does.
+            border_labels = np.concatenate([image[0], image[-1], image[:, 0], image[:, -1]])
+            touches_border = np.zeros(image.max() + 1, dtype=bool)
+            touches_border[border_labels] = True
+            touches_border[0] = False
+            return np.where(touches_border[image], 0, image)
         return clear_border(image, **kwargs)
 
     @staticmethod
@@ -230,6 +263,25 @@ class Grains:
         """
         return morphology.label(image, background)
 
+    def _label(self, image: npt.NDArray) -> npt.NDArray:
+        """
+        Label regions, in tiles if tiling is enabled and the image is large enough.
+
+        Parameters
+        ----------
+        image : npt.NDArray
+            2-D Numpy array of image.
+
+        Returns
+        -------
+        npt.NDArray
+            2-D Numpy array of image with regions numbered, as ``label_regions()``.
+        """
+        tile_size = get_tile_size(image, self.tiling)
+        if tile_size is None:
+            return self.label_regions(image)
+        return label_tiled(image, tile_size, cores=self.tiling["cores"])
+
     def calc_minimum_grain_size(self, image: npt.NDArray) -> float:
         """
         Calculate the minimum grain size in pixels squared.
@@ -339,19 +391,21 @@ class Grains:
         npt.NDArray
             2-D Numpy array of image with objects removed that are too small to process.
         """
-        labelled_image = label(image)
+        labelled_image = self._label(image)
         region_properties = self.get_region_properties(labelled_image)
+        keep = np.ones(labelled_image.max() + 1, dtype=bool)
+        keep[0] = False
         for region in region_properties:
             # If the number of true pixels in the region is less than the minimum number of pixels, remove the region
             if region.area < minimum_size_px:
-                labelled_image[labelled_image == region.label] = 0
+                keep[region.label] = False
             bbox_width = region.bbox[2] - region.bbox[0]
             bbox_height = region.bbox[3] - region.bbox[1]
             # If the minimum dimension of the bounding box is less than the minimum dimension, remove the region
             if min(bbox_width, bbox_height) < minimum_bbox_size_px:
-                labelled_image[labelled_image == region.label] = 0
+                keep[region.label] = False
 
-        return labelled_image.astype(bool)
+        return keep[labelled_image]
 
     def area_thresholding(self, image: npt.NDArray, area_thresholds: tuple) -> npt.NDArray:
         """
@@ -370,7 +424,6 @@ class Grains:
         npt.NDArray
             Array with small and large objects removed.
         """
-        image_cp = image.copy()
         lower_size_limit, upper_size_limit = area_thresholds
         # if one value is None adjust for comparison
         if upper_size_limit is None:
@@ -380,19 +433,22 @@ class Grains:
         # Get array of grain numbers (discounting zero)
         uniq = np.delete(np.unique(image), 0)
         grain_count = 0
+        # Grains are renumbered through a lookup table of new numbers, rather than one pass over the image per grain
+        areas = np.bincount(image.ravel()) * self.pixel_to_nm_scaling**2
+        new_numbers = np.arange(image.max(initial=0) + 1, dtype=image.dtype)
         LOGGER.debug(
             f"[{self.filename}] : Area thresholding grains | Thresholds: L: {(lower_size_limit / self.pixel_to_nm_scaling**2):.2f},"
             f"U: {(upper_size_limit / self.pixel_to_nm_scaling**2):.2f} px^2, L: {lower_size_limit:.2f}, U: {upper_size_limit:.2f} nm^2."
         )
         for grain_no in uniq:  # Calculate grian area in nm^2
-            grain_area = np.sum(image_cp == grain_no) * (self.pixel_to_nm_scaling**2)
+            grain_area = areas[grain_no]
             # Compare area in nm^2 to area thresholds
             if grain_area > upper_size_limit or grain_area < lower_size_limit:
-                image_cp[image_cp == grain_no] = 0
+                new_numbers[grain_no] = 0
             else:
                 grain_count += 1
-                image_cp[image_cp == grain_no] = grain_count
-        return image_cp
+                new_numbers[grain_no] = grain_count
+        return new_numbers[image]
 
     def colour_regions(self, image: npt.NDArray, **kwargs) -> npt.NDArray:
         """
@@ -451,6 +507,9 @@ class Grains:
 
     def find_grains(self):
         """Find grains."""
+        if self.unet_config["model_path"] is not None and self.unet_config.get("mode", "crops") == "tiled":
+            self.find_grains_unet_tiled()
+            return
         LOGGER.debug(f"[{self.filename}] : Thresholding method (grains) : {self.threshold_method}")
         self.thresholds = get_thresholds(
             image=self.image,
@@ -458,6 +517,7 @@ class Grains:
             otsu_threshold_multiplier=self.otsu_threshold_multiplier,
             threshold_std_dev=self.threshold_std_dev,
             absolute=self.threshold_absolute,
+            statistics=self.threshold_statistics,
         )
 
         for direction in self.direction:
@@ -469,9 +529,7 @@ class Grains:
                 threshold_direction=direction,
                 img_name=self.filename,
             )
-            self.directions[direction]["labelled_regions_01"] = self.label_regions(
-                self.directions[direction]["mask_grains"]
-            )
+            self.directions[direction]["labelled_regions_01"] = self._label(self.directions[direction]["mask_grains"])
 
             if self.remove_edge_intersecting_grains:
                 self.directions[direction]["tidied_border"] = self.tidy_border(
@@ -505,7 +563,7 @@ class Grains:
                     minimum_bbox_size_px=self.minimum_bbox_size_px,
                 )
             )
-            self.directions[direction]["labelled_regions_02"] = self.label_regions(
+            self.directions[direction]["labelled_regions_02"] = self._label(
                 self.directions[direction]["removed_objects_too_small_to_process"]
             )
 
@@ -526,7 +584,7 @@ class Grains:
             # Get a binary mask where 1s are background and 0s are grains
             labelled_regions_background_mask = np.where(self.directions[direction]["labelled_regions_02"] == 0, 1, 0)
             # keep only the largest region
-            labelled_regions_background_mask = label(labelled_regions_background_mask)
+            labelled_regions_background_mask = self._label(labelled_regions_background_mask)
             areas = [region.area for region in regionprops(labelled_regions_background_mask)]
             labelled_regions_background_mask = np.where(
                 labelled_regions_background_mask == np.argmax(areas) + 1, labelled_regions_background_mask, 0
@@ -577,35 +635,119 @@ class Grains:
                     f"[{self.filename}] : Overridden {thresholding_grain_count} grains with {class_counts} UNet predictions ({direction})"
                 )
 
-            # Vet the grains
-            if self.vetting is not None:
-                vetted_grains = Grains.vet_grains(
-                    grain_mask_tensor=self.directions[direction]["labelled_regions_02"].astype(bool),
-                    pixel_to_nm_scaling=self.pixel_to_nm_scaling,
-                    **self.vetting,
-                )
-            else:
-                vetted_grains = self.directions[direction]["labelled_regions_02"].astype(bool)
+            self.vet_and_label_grains(direction)
+
+    def vet_and_label_grains(self, direction: str) -> None:
+        """
+        Vet the grains found in a direction, merge classes as configured and label the regions of each class.
 
-            # Merge classes if necessary
-            merged_classes = Grains.merge_classes(
-                vetted_grains,
-                self.classes_to_merge,
+        Parameters
+        ----------
+        direction : str
+            Direction of the grains, the 'labelled_regions_02' and 'removed_small_objects' of the direction are updated.
+        """
+        # Vet the grains, each grain's crop is converted to a binary mask as it is vetted
+        if self.vetting is not None:
+            vetted_grains = Grains.vet_grains(
+                grain_mask_tensor=self.directions[direction]["labelled_regions_02"],
+                pixel_to_nm_scaling=self.pixel_to_nm_scaling,
+                **self.vetting,
             )
+        else:
+            vetted_grains = self.directions[direction]["labelled_regions_02"].astype(bool)
 
-            # Update the background class
-            final_grains = Grains.update_background_class(grain_mask_tensor=merged_classes)
+        # Merge classes if necessary
+        merged_classes = Grains.merge_classes(
+            vetted_grains,
+            self.classes_to_merge,
+        )
 
-            # Label each class in the tensor
-            labelled_final_grains = np.zeros_like(final_grains).astype(int)
-            # The background class will be the same as the binary mask
-            labelled_final_grains[:, :, 0] = final_grains[:, :, 0]
-            # Iterate over each class and label the regions
-            for class_index in range(final_grains.shape[2]):
-                labelled_final_grains[:, :, class_index] = Grains.label_regions(final_grains[:, :, class_index])
+        # Update the background class
+        final_grains = Grains.update_background_class(grain_mask_tensor=merged_classes)
+
+        # Label each class in the tensor
+        labelled_final_grains = np.zeros(final_grains.shape, dtype=np.int32)
+        # Iterate over each class and label the regions
+        for class_index in range(final_grains.shape[2]):
+            labelled_final_grains[:, :, class_index] = Grains.label_regions(final_grains[:, :, class_index])
+
+        self.directions[direction]["removed_small_objects"] = final_grains
+        self.directions[direction]["labelled_regions_02"] = labelled_final_grains
+
+    def find_grains_unet_tiled(self) -> None:
+        """
+        Find grains by segmenting the whole image with the U-Net model in tiles, without thresholding first.
+
+        The same segmentation is used for each direction grains are found in. Grains touching the border of the image
+        are removed if configured, then grains are vetted and labelled as when refining thresholded grains.
+        """
+        unet_mask, unet_labelled_regions = Grains.segment_unet_tiled(
+            filename=self.filename,
+            unet_config=self.unet_config,
+            image=self.image,
+        )
+        if self.remove_edge_intersecting_grains:
+            for class_index in range(1, unet_labelled_regions.shape[2]):
+                unet_labelled_regions[:, :, class_index] = self.tidy_border(unet_labelled_regions[:, :, class_index])
+                unet_mask[:, :, class_index] = unet_labelled_regions[:, :, class_index] > 0
+        for direction in self.direction:
+            self.directions[direction] = {
+                "removed_small_objects": unet_mask.copy(),
+                "labelled_regions_02": unet_labelled_regions.copy(),
+                "coloured_regions": self.colour_regions(unet_labelled_regions[:, :, 1]),
+            }
+            self.region_properties[direction] = self.get_region_properties(unet_labelled_regions[:, :, 1])
+            self.bounding_boxes[direction] = self.get_bounding_boxes(direction=direction)
+            class_counts = [
+                unet_labelled_regions[:, :, class_index].max() for class_index in range(unet_labelled_regions.shape[2])
+            ]
+            LOGGER.info(f"[{self.filename}] : Found {class_counts} grains with tiled UNet predictions ({direction})")
+            self.vet_and_label_grains(direction)
+
+    @staticmethod
+    def segment_unet_tiled(
+        filename: str,
+        unet_config: dict[str, str | int | float | tuple[int | None, int, int, int] | None],
+        image: npt.NDArray,
+    ) -> tuple[npt.NDArray, npt.NDArray]:
+        """
+        Use a UNet model to segment a whole image in overlapping tiles, see ``predict_unet_tiled()``.
+
+        Parameters
+        ----------
+        filename : str
+            File being processed (used in logging).
+        unet_config : dict[str, str | int | float | tuple[int | None, int, int, int] | None]
+            Configuration for the UNet model, 'model_path', 'upper_norm_bound', 'lower_norm_bound', 'tile_overlap' and
+            'batch_size' are used.
+        image : npt.NDArray
+            2-D Numpy array of image.
 
-            self.directions[direction]["removed_small_objects"] = labelled_final_grains.astype(bool)
-            self.directions[direction]["labelled_regions_02"] = labelled_final_grains.astype(np.int32)
+        Returns
+        -------
+        npt.NDArray
+            NxNxC Numpy array of the UNet mask.
+        npt.NDArray
+            NxNxC Numpy array of the labelled regions from the UNet mask.
+        """
+        LOGGER.debug(f"[{filename}] : Running UNet model over the whole image in tiles")
+        unet_model = load_unet_model(unet_config["model_path"])
+        unet_mask = predict_unet_tiled(
+            image=image,
+            model=unet_model,
+            confidence=0.1,
+            model_input_shape=unet_model.input_shape,
+            upper_norm_bound=unet_config["upper_norm_bound"],
+            lower_norm_bound=unet_config["lower_norm_bound"],
+            overlap=unet_config.get("tile_overlap", 32),
+            batch_size=unet_config.get("batch_size", 1),
+        )
+        # The labelled background class will be identical to the binary one from the unet mask.
+        unet_labelled_regions = np.zeros(unet_mask.shape, dtype=np.int32)
+        unet_labelled_regions[:, :, 0] = unet_mask[:, :, 0]
+        for class_index in range(1, unet_mask.shape[2]):
+            unet_labelled_regions[:, :, class_index] = Grains.label_regions(unet_mask[:, :, class_index])
+        return unet_mask, unet_labelled_regions
 
     # pylint: disable=too-many-locals
     @staticmethod
@@ -635,6 +777,8 @@ class Grains:
                 Upper bound for normalising the image.
             lower_norm_bound: float
                 Lower bound for normalising the image.
+            batch_size: int
+                Number of grain crops passed to the model at once, if missing crops are predicted one at a time.
         image : npt.NDArray
             2-D Numpy array of image.
         labelled_grain_regions : npt.NDArray
@@ -649,27 +793,8 @@ class Grains:
         """
         LOGGER.debug(f"[{filename}] : Running UNet model on {direction} grains")
 
-        # When debugging, you might find that the custom_objects are incorrect. This is entirely based on what the model used
-        # for its loss during training and so this will need to be changed a lot.
-        # Once the group has gotten used to training models, this can be made configurable, but currently it's too changeable.
-        # unet_model = keras.models.load_model(
-        #     self.unet_config["model_path"], custom_objects={"dice_loss": dice_loss, "iou_loss": iou_loss}
-        # )
-        # You may also get an error referencing a "group_1" parameter, this is discussed in this issue:
-        # https://github.com/keras-team/keras/issues/19441 which also has an experimental fix that we can try but
-        # I haven't tested it yet.
-
-        try:
-            unet_model = keras.models.load_model(
-                unet_config["model_path"], custom_objects={"mean_iou": mean_iou, "iou_loss": iou_loss}, compile=False
-            )
-        except Exception as e:
-            LOGGER.debug(f"Python executable: {sys.executable}")
-            LOGGER.debug(f"Keras version: {keras.__version__}")
-            LOGGER.debug(f"Model path: {unet_config['model_path']}")
-            raise e
-
-        # unet_model = keras.models.load_model(unet_config["model_path"], custom_objects={"mean_iou": mean_iou})
+        # The model is loaded once by each process and re-used for every image and direction
+        unet_model = load_unet_model(unet_config["model_path"])
         LOGGER.debug(f"Output shape of UNet model: {unet_model.output_shape}")
 
         # Initialise an empty mask to iteratively add to for each grain, with the correct number of class channels based on
@@ -684,24 +809,11 @@ class Grains:
         unet_mask[:, :, 0] = 1
         # Labelled regions will be the same by default, but will be overwritten if there are any grains present.
         unet_labelled_regions = np.zeros_like(unet_mask).astype(np.int32)
-        # For each detected molecule, create an image of just that molecule and run the UNet
-        # on that image to segment it
-        grain_region_properties = regionprops(labelled_grain_regions)
-        for grain_number, region in enumerate(grain_region_properties):
-            LOGGER.debug(f"Unet predicting mask for grain {grain_number} of {len(grain_region_properties)}")
-
-            # Get the bounding box for the region
-            bounding_box: tuple[int, int, int, int] = tuple(region.bbox)  # min_row, min_col, max_row, max_col
-
-            # Pad the bounding box
-            bounding_box = pad_bounding_box(
-                crop_min_row=bounding_box[0],
-                crop_min_col=bounding_box[1],
-                crop_max_row=bounding_box[2],
-                crop_max_col=bounding_box[3],
-                image_shape=(image.shape[0], image.shape[1]),
-                padding=unet_config["grain_crop_padding"],
-            )
+        # For each detected molecule, create an image of just that molecule to run the UNet on to segment it. The padded
+        # bounding boxes of all the grains are found in one pass over the image.
+        bounding_boxes = []
+        for grain_crop in crop_labelled_grains(labelled_grain_regions, padding=unet_config["grain_crop_padding"]):
+            bounding_box = grain_crop.bounding_box  # min_row, min_col, max_row, max_col
 
             # Make the bounding box square within the confines of the image
             if (bounding_box[2] - bounding_box[0]) != (bounding_box[3] - bounding_box[1]):
@@ -712,27 +824,27 @@ class Grains:
                     crop_max_col=bounding_box[3],
                     image_shape=(image.shape[0], image.shape[1]),
                 )
+            bounding_boxes.append(bounding_box)
 
-            # Grab the cropped image. Using slice since the bounding box from skimage is
-            # half-open, so the max_row and max_col are not included in the region.
-            region_image = image[
-                bounding_box[0] : bounding_box[2],
-                bounding_box[1] : bounding_box[3],
-            ]
-
-            # Run the UNet on the region. This is allowed to be a single channel
-            # as we can add a background channel afterwards if needed.
-            # Remember that this region is cropped from the original image, so it's not
-            # the same size as the original image.
-            predicted_mask = predict_unet(
-                image=region_image,
-                model=unet_model,
-                confidence=0.1,
-                model_input_shape=unet_model.input_shape,
-                upper_norm_bound=unet_config["upper_norm_bound"],
-                lower_norm_bound=unet_config["lower_norm_bound"],
-            )
+        # Run the UNet on the regions, batches of crops are predicted together. Each prediction is allowed to be a
+        # single channel as we can add a background channel afterwards if needed. Remember that each region is cropped
+        # from the original image (using slices since the bounding box from skimage is half-open, so the max_row and
+        # max_col are not included in the region), so it's not the same size as the original image.
+        LOGGER.debug(f"Unet predicting masks for {len(bounding_boxes)} grains")
+        predicted_masks = predict_unet_batch(
+            images=[
+                image[bounding_box[0] : bounding_box[2], bounding_box[1] : bounding_box[3]]
+                for bounding_box in bounding_boxes
+            ],
+            model=unet_model,
+            confidence=0.1,
+            model_input_shape=unet_model.input_shape,
+            upper_norm_bound=unet_config["upper_norm_bound"],
+            lower_norm_bound=unet_config["lower_norm_bound"],
+            batch_size=unet_config.get("batch_size", 1),
+        )
 
+        for bounding_box, predicted_mask in zip(bounding_boxes, predicted_masks):
             assert len(predicted_mask.shape) == 3
             LOGGER.debug(f"Predicted mask shape: {predicted_mask.shape}")
 
@@ -763,12 +875,12 @@ class Grains:
                         unet_predicted_mask_labelled,
                     )
 
-            assert len(unet_mask.shape) == 3, f"Unet mask shape: {unet_mask.shape}"
-            assert unet_mask.shape[-1] >= 2, f"Unet mask shape: {unet_mask.shape}"
+        assert len(unet_mask.shape) == 3, f"Unet mask shape: {unet_mask.shape}"
+        assert unet_mask.shape[-1] >= 2, f"Unet mask shape: {unet_mask.shape}"
 
-            # For each class in the unet mask tensor, label the mask and add to unet_labelled_regions
-            # The labelled background class will be identical to the binary one from the unet mask.
-            unet_labelled_regions[:, :, 0] = unet_mask[:, :, 0]
+        # For each class in the unet mask tensor, label the mask and add to unet_labelled_regions, once all the grains'
+        # predictions have been added. Without any grains the labelled regions are left empty.
+        if bounding_boxes:
             # Iterate over each class and label the regions
             for class_index in range(unet_mask.shape[2]):
                 unet_labelled_regions[:, :, class_index] = Grains.label_regions(unet_mask[:, :, class_index])
@@ -968,57 +1080,12 @@ class Grains:
         int
             Padding used for the bounding boxes.
         """
-        grain_crops = []
-        bounding_boxes = []
-
-        # Label the regions
-        flattened_multi_class_mask = Grains.flatten_multi_class_tensor(grain_mask_tensor)
-        labelled_regions = Grains.label_regions(flattened_multi_class_mask)
-
-        # Iterate over the regions and return the crop, but zero any non-connected grains
-        for region in Grains.get_region_properties(labelled_regions):
-            binary_labelled_regions = labelled_regions == region.label
-
-            # Zero any non-connected grains
-            # For each class, set all pixels to zero that are not in the current region
-            this_region_only_grain_tensor = np.copy(grain_mask_tensor)
-            # Iterate over the non-background classes
-            for class_index in range(1, grain_mask_tensor.shape[2]):
-                # Set all pixels to zero that are not in the current region
-                this_region_only_grain_tensor[:, :, class_index] = (
-                    binary_labelled_regions * grain_mask_tensor[:, :, class_index]
-                )
-
-            # Update background class to reflect the removal of any non-connected grains
-            this_region_only_grain_tensor = Grains.update_background_class(
-                grain_mask_tensor=this_region_only_grain_tensor
-            )
-
-            # Get the bounding box
-            bounding_box = region.bbox
-
-            # Pad the bounding box
-            bounding_box = pad_bounding_box(
-                crop_min_row=bounding_box[0],
-                crop_min_col=bounding_box[1],
-                crop_max_row=bounding_box[2],
-                crop_max_col=bounding_box[3],
-                image_shape=(grain_mask_tensor.shape[0], grain_mask_tensor.shape[1]),
-                padding=padding,
-            )
-
-            # Crop the grain
-            grain_crop = this_region_only_grain_tensor[
-                bounding_box[0] : bounding_box[2],
-                bounding_box[1] : bounding_box[3],
-                :,
-            ]
-
-            # Add the crop to the list
-            grain_crops.append(grain_crop.astype(bool))
-            bounding_boxes.append(bounding_box)
-
-        return grain_crops, bounding_boxes, padding
+        grain_crops = crop_grains(grain_mask_tensor, padding=padding)
+        return (
+            [grain_crop.mask for grain_crop in grain_crops],
+            [grain_crop.bounding_box for grain_crop in grain_crops],
+            padding,
+        )
 
     @staticmethod
     def vet_numbers_of_regions_single_grain(
@@ -1308,38 +1375,17 @@ class Grains:
         npt.NDArray
             3-D Numpy array of the grain mask tensor.
         """
-        # Initialise the grain mask tensor
-        grain_mask_tensor = np.zeros(grain_mask_tensor_shape).astype(np.int32)
-
-        # Iterate over the grain crops
-        for grain_crop_and_bounding_box in grain_crops_and_bounding_boxes:
-            # Get the grain crop and bounding box
-            grain_crop = grain_crop_and_bounding_box["grain_tensor"]
-            bounding_box = grain_crop_and_bounding_box["bounding_box"]
-            padding = grain_crop_and_bounding_box["padding"]
-
-            # Get the bounding box coordinates
-            min_row, min_col, max_row, max_col = bounding_box
-
-            # Crop the grain
-            cropped_grain = grain_crop[
-                padding:-padding,
-                padding:-padding,
-                :,
-            ]
-
-            # Update the grain mask tensor
-            grain_mask_tensor[min_row + padding : max_row - padding, min_col + padding : max_col - padding, :] = (
-                np.maximum(
-                    grain_mask_tensor[min_row + padding : max_row - padding, min_col + padding : max_col - padding, :],
-                    cropped_grain,
+        return assemble_grain_crops(
+            [
+                GrainCrop(
+                    bounding_box=grain_crop_and_bounding_box["bounding_box"],
+                    mask=grain_crop_and_bounding_box["grain_tensor"],
+                    padding=grain_crop_and_bounding_box["padding"],
                 )
-            )
-
-        # Update the background class
-        grain_mask_tensor = Grains.update_background_class(grain_mask_tensor)
-
-        return grain_mask_tensor.astype(bool)
+                for grain_crop_and_bounding_box in grain_crops_and_bounding_boxes
+            ],
+            grain_mask_tensor_shape,
+        )
 
     # Ignore too complex, to break the function down into smaller functions would make it more complex.
     # ruff: noqa: C901
@@ -1473,13 +1519,12 @@ class Grains:
         npt.NDArray
             3-D Numpy array of the vetted grain mask tensor.
         """
-        # Get individual grain crops
-        grain_tensor_crops, bounding_boxes, padding = Grains.get_individual_grain_crops(grain_mask_tensor)
-
-        passed_grain_crops_and_bounding_boxes = []
+        # Crop each grain, vetting works on the crops so needs memory in proportion to the grains rather than the image
+        passed_grain_crops = []
 
         # Iterate over the grain crops
-        for _, (single_grain_mask_tensor, bounding_box) in enumerate(zip(grain_tensor_crops, bounding_boxes)):
+        for grain_crop in crop_grains(grain_mask_tensor):
+            single_grain_mask_tensor = grain_crop.mask
             # Convert small / big areas to other classes
             single_grain_mask_tensor = Grains.convert_classes_when_too_big_or_small(
                 grain_mask_tensor=single_grain_mask_tensor,
@@ -1526,23 +1571,10 @@ class Grains:
                 continue
 
             # If passed all vetting steps, add to the list of passed grain crops
-            passed_grain_crops_and_bounding_boxes.append(
-                {
-                    "grain_tensor": largest_only_single_grain_mask_tensor,
-                    "bounding_box": bounding_box,
-                    "padding": padding,
-                }
-            )
+            passed_grain_crops.append(grain_crop._replace(mask=largest_only_single_grain_mask_tensor))
 
         # Construct a new grain mask tensor from the passed grains
-        return Grains.assemble_grain_mask_tensor_from_crops(
-            grain_mask_tensor_shape=(
-                grain_mask_tensor.shape[0],
-                grain_mask_tensor.shape[1],
-                grain_mask_tensor.shape[2],
-            ),
-            grain_crops_and_bounding_boxes=passed_grain_crops_and_bounding_boxes,
-        )
+        return assemble_grain_crops(passed_grain_crops, grain_mask_tensor.shape)
 
     @staticmethod
     def merge_classes(
@@ -12,9 +12,9 @@ import numpy.typing as npt
 import pandas as pd
 import scipy.ndimage
 import skimage.feature as skimage_feature
-import skimage.measure as skimage_measure
 import skimage.morphology as skimage_morphology
 
+from topostats.grain_crops import GrainCrop, crop_labelled_grains
 from topostats.logs.logs import LOGGER_NAME
 from topostats.measure import feret, height_profiles
 from topostats.utils import create_empty_dataframe
@@ -103,6 +103,7 @@ class GrainStats:
         cropped_size: float = -1,
         plot_opts: dict = None,
         metre_scaling_factor: float = 1e-9,
+        grain_crops: list[GrainCrop] | None = None,
     ):
         """
         Initialise the class.
@@ -133,9 +134,13 @@ class GrainStats:
         metre_scaling_factor : float
             Multiplier to convert the current length scale to metres. Default: 1e-9 for the
             usual AFM length scale of nanometres.
+        grain_crops : list[GrainCrop] | None
+            Unpadded crops of each grain of the labelled data, in the order of their labels. If ``None`` the grains are
+            cropped from the labelled data.
         """
         self.data = data
         self.labelled_data = labelled_data
+        self.grain_crops = grain_crops
         self.pixel_to_nanometre_scaling = pixel_to_nanometre_scaling
         self.direction = direction
         self.base_output_dir = Path(base_output_dir)
@@ -209,29 +214,29 @@ class GrainStats:
             )
             return pd.DataFrame(columns=GRAIN_STATS_COLUMNS), grains_plot_data, all_height_profiles
 
-        # Calculate region properties
-        region_properties = skimage_measure.regionprops(self.labelled_data)
+        # Crop each grain, the statistics of a grain are calculated from its crop
+        grain_crops = crop_labelled_grains(self.labelled_data) if self.grain_crops is None else self.grain_crops
 
         # Iterate over all the grains in the image
         stats_array = []
         # List to hold all the plot data for all the grains. Each entry is a dictionary of plotting data.
         # There are multiple entries for each grain.
-        for index, region in enumerate(region_properties):
+        for index, grain_crop in enumerate(grain_crops):
             LOGGER.debug(f"[{self.image_name}] : Processing grain: {index}")
 
             # Skip grain if too small to calculate stats for
-            LOGGER.debug(f"[{self.image_name}] : Grain size: {region.image.size}")
-            if min(region.image.shape) < 5:
+            LOGGER.debug(f"[{self.image_name}] : Grain size: {grain_crop.mask.size}")
+            if min(grain_crop.mask.shape) < 5:
                 LOGGER.debug(
-                    f"[{self.image_name}] : Skipping grain due to being too small (size: {region.image.shape}) to calculate stats for."
+                    f"[{self.image_name}] : Skipping grain due to being too small (size: {grain_crop.mask.shape}) to calculate stats for."
                 )
                 continue
 
             # Create directory for each grain's plots
             output_grain = self.base_output_dir / self.direction
             # Obtain cropped grain mask and image
-            minr, minc, maxr, maxc = region.bbox
-            grain_mask = np.array(region.image)
+            minr, minc, maxr, maxc = grain_crop.bounding_box
+            grain_mask = grain_crop.mask
             grain_image = self.data[minr:maxr, minc:maxc]
             grain_mask_image = np.ma.masked_array(grain_image, mask=np.invert(grain_mask), fill_value=np.nan).filled()
 
@@ -254,11 +259,10 @@ class GrainStats:
                 # Get cropped image and mask
                 grain_centre = int((minr + maxr) / 2), int((minc + maxc) / 2)
                 length = int(self.cropped_size / (2 * self.pixel_to_nanometre_scaling))
-                solo_mask = self.labelled_data.copy()
-                solo_mask[solo_mask != index + 1] = 0
-                solo_mask[solo_mask == index + 1] = 1
                 cropped_grain_image = self.get_cropped_region(self.data, length, np.asarray(grain_centre))
-                cropped_grain_mask = self.get_cropped_region(solo_mask, length, np.asarray(grain_centre)).astype(bool)
+                cropped_grain_mask = (
+                    self.get_cropped_region(self.labelled_data, length, np.asarray(grain_centre)) == index + 1
+                )
                 cropped_grain_mask_image = np.ma.masked_array(
                     grain_image, mask=np.invert(grain_mask), fill_value=np.nan
                 ).filled()
@@ -329,8 +333,8 @@ class GrainStats:
                 "volume": np.nansum(grain_mask_image)
                 * self.pixel_to_nanometre_scaling**2
                 * (self.metre_scaling_factor**3),
-                "area": region.area * area_scaling_factor,
-                "area_cartesian_bbox": region.area_bbox * area_scaling_factor,
+                "area": np.count_nonzero(grain_mask) * area_scaling_factor,
+                "area_cartesian_bbox": grain_mask.size * area_scaling_factor,
                 "smallest_bounding_width": smallest_bounding_width * length_scaling_factor,
                 "smallest_bounding_length": smallest_bounding_length * length_scaling_factor,
                 "smallest_bounding_area": smallest_bounding_length * smallest_bounding_width * area_scaling_factor,
@@ -989,7 +993,7 @@ class GrainStats:
         xy = np.stack((xy1, xy2))
         shiftx = self.get_shift(xy[:, 0], shape[0])
         shifty = self.get_shift(xy[:, 1], shape[1])
-        return image.copy()[
+        return image[
             centre[0] - length - shiftx : centre[0] + length + 1 - shiftx,  # noqa: E203
             centre[1] - length - shifty : centre[1] + length + 1 - shifty,  # noqa: E203
-        ]
+        ].copy()
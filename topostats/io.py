@@ -5,12 +5,15 @@ from __future__ import annotations
 import io
 import json
 import logging
+import multiprocessing
 import os
 import pickle as pkl
+import shutil
 import struct
-from collections.abc import MutableMapping
+from collections.abc import Generator, MutableMapping
 from datetime import datetime
 from importlib import resources
+from multiprocessing.connection import Client, Connection, Listener
 from pathlib import Path
 from typing import Any, TypeVar
 
@@ -18,7 +21,7 @@ import h5py
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
-from AFMReader import asd, gwy, ibw, jpk, spm, topostats
+from AFMReader import gwy, ibw, jpk, topostats
 from numpyencoder import NumpyEncoder
 from ruamel.yaml import YAML, YAMLError
 
@@ -35,6 +38,46 @@ CONFIG_DOCUMENTATION_REFERENCE = """# For more information on configuration and
 
 MutableMappingType = TypeVar("MutableMappingType", bound="MutableMapping")
 
+# Top-level groups/datasets of ''.topostats'' files required by each stage when re-processing (see LoadScans(extract=)).
+# Each stage requires everything the previous stage did along with that stage's input. ''None'' loads everything.
+_TOPOSTATS_BASE_GROUPS = [
+    "filename",
+    "img_path",
+    "pixel_to_nm_scaling",
+    "image_original",
+    "image",
+    "grain_trace_data",
+    "topostats_file_version",
+]
+TOPOSTATS_EXTRACT_GROUPS: dict[str | None, list[str] | None] = {
+    None: None,
+    "all": None,
+    "raw": ["image_original", "pixel_to_nm_scaling"],
+    "filter": ["image_original", "pixel_to_nm_scaling"],
+    "grains": _TOPOSTATS_BASE_GROUPS,
+    "grainstats": _TOPOSTATS_BASE_GROUPS + ["grain_masks"],
+    "disordered_tracing": _TOPOSTATS_BASE_GROUPS + ["grain_masks", "height_profiles"],
+    "nodestats": _TOPOSTATS_BASE_GROUPS + ["grain_masks", "height_profiles", "disordered_traces"],
+    "ordered_tracing": _TOPOSTATS_BASE_GROUPS + ["grain_masks", "height_profiles", "disordered_traces", "nodestats"],
+    "splining": _TOPOSTATS_BASE_GROUPS
+    + ["grain_masks", "height_profiles", "disordered_traces", "nodestats", "ordered_traces"],
+}
+
+# Batch containers hold every processed image of a run in one HDF5 file, each image is a sub-group of BATCH_IMAGES_GROUP
+# and the BATCH_INDEX_DATASET at the root maps the name of each sub-group to the image filename and path.
+BATCH_CONTAINER_SUFFIX = ".topostats_batch"
+BATCH_CONTAINER_FILENAME = f"all_images{BATCH_CONTAINER_SUFFIX}"
+BATCH_IMAGES_GROUP = "images"
+BATCH_INDEX_DATASET = "index"
+# Images are written to this sub-group of the images group and only moved into place once complete
+BATCH_PENDING_GROUP = "pending"
+BATCH_INDEX_DTYPE = np.dtype(
+    [("key", h5py.string_dtype()), ("filename", h5py.string_dtype()), ("img_path", h5py.string_dtype())]
+)
+
+# Arrays with fewer elements than this are stored contiguously as the overhead of chunking outweighs any saving.
+HDF5_MIN_COMPRESSION_SIZE = 1024
+
 
 def merge_mappings(map1: MutableMappingType, map2: MutableMappingType) -> MutableMappingType:
     """
@@ -379,22 +422,366 @@ def save_folder_grainstats(
     None
         This only saves the dataframes and does not retain them.
     """
-    dirs = set(all_stats_df["basename"].values)
     LOGGER.debug(f"Statistics :\n{all_stats_df}")
-    for _dir in dirs:
-        LOGGER.debug(f"Statistics ({_dir}) :\n{all_stats_df}")
-        try:
-            out_path = get_out_path(Path(_dir), base_dir, output_dir)
-            # Ensure "processed" directory exists at the stem of out_path, creating if needed
-            if out_path.stem != "processed":
-                out_path_processed = out_path / "processed"
-                out_path_processed.mkdir(parents=True, exist_ok=True)
-            all_stats_df[all_stats_df["basename"] == _dir].to_csv(
-                out_path / "processed" / f"folder_{stats_filename}.csv", index=True
+    FolderCSVWriter(output_dir=output_dir, base_dir=base_dir, stats_filename=stats_filename).write(all_stats_df)
+
+
+class IncrementalCSVWriter:
+    """
+    Append data frames to a CSV file as they are produced rather than concatenating them in memory.
+
+    The index of each data frame is written as columns. Columns are ordered as they are first seen, as with
+    ``pd.concat()``. If a data frame has columns that have not been seen before the rows already written are re-written
+    (in chunks) with the new columns empty. The file is not created until a non-empty data frame is written and is
+    overwritten if it already exists.
+
+    Parameters
+    ----------
+    outfile : str | Path
+        CSV file to write to.
+    chunksize : int
+        Number of rows to read at a time when re-writing rows already written.
+    """
+
+    def __init__(self, outfile: str | Path, chunksize: int = 100_000) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        outfile : str | Path
+            CSV file to write to.
+        chunksize : int
+            Number of rows to read at a time when re-writing rows already written.
+        """
+        self.outfile = Path(outfile)
+        self.chunksize = chunksize
+        self.columns: list | None = None
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Append the rows of a data frame to the CSV file.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Data frame to append, empty data frames are ignored.
+        """
+        if df.empty:
+            return
+        df = df.reset_index()
+        if self.columns is None:
+            self.columns = list(df.columns)
+            df.to_csv(self.outfile, index=False)
+        else:
+            new_columns = [column for column in df.columns if column not in self.columns]
+            if new_columns:
+                self._add_columns(new_columns)
+            df.reindex(columns=self.columns).to_csv(self.outfile, mode="a", header=False, index=False)
+        self.rows += len(df)
+
+    def _add_columns(self, new_columns: list) -> None:
+        """
+        Re-write the rows already written with additional empty columns.
+
+        Parameters
+        ----------
+        new_columns : list
+            Columns to add after the existing columns.
+        """
+        LOGGER.debug(f"Adding columns {new_columns} to : {self.outfile}")
+        columns = self.columns + new_columns
+        tmp_file = self.outfile.with_name(f".{self.outfile.name}.tmp")
+        header = True
+        # Values are read as strings so they are written back unchanged
+        for chunk in pd.read_csv(self.outfile, dtype=str, keep_default_na=False, chunksize=self.chunksize):
+            chunk.reindex(columns=columns, fill_value="").to_csv(
+                tmp_file, mode="w" if header else "a", header=header, index=False
             )
-            LOGGER.info(f"Folder-wise statistics saved to: {str(out_path)}/folder_{stats_filename}.csv")
-        except TypeError:
-            LOGGER.info(f"No folder-wise statistics for directory {_dir}, no grains detected in any images.")
+            header = False
+        tmp_file.replace(self.outfile)
+        self.columns = columns
+
+
+class FolderCSVWriter:
+    """
+    Append data frames of statistics to a CSV file for each folder images were found in.
+
+    Rows are split by their ``basename`` column and appended to ``processed/folder_<stats_filename>.csv`` under the
+    output directory for that folder.
+
+    Parameters
+    ----------
+    output_dir : str | Path
+        Path of the output directory head.
+    base_dir : str | Path
+        Path of the base directory where files were found.
+    stats_filename : str
+        The name of the type of statistics being saved.
+    """
+
+    def __init__(self, output_dir: str | Path, base_dir: str | Path, stats_filename: str) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        output_dir : str | Path
+            Path of the output directory head.
+        base_dir : str | Path
+            Path of the base directory where files were found.
+        stats_filename : str
+            The name of the type of statistics being saved.
+        """
+        self.output_dir = output_dir
+        self.base_dir = base_dir
+        self.stats_filename = stats_filename
+        self.writers: dict[str, IncrementalCSVWriter] = {}
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Append the rows of a data frame to the CSV file of each folder.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Data frame of statistics with a ``basename`` column.
+        """
+        if "basename" not in df.columns:
+            return
+        for _dir, folder_df in df.groupby("basename", sort=False):
+            if str(_dir) not in self.writers:
+                try:
+                    out_path = get_out_path(Path(_dir), self.base_dir, self.output_dir)
+                except TypeError:
+                    LOGGER.info(f"No folder-wise statistics for directory {_dir}, no grains detected in any images.")
+                    continue
+                # Ensure "processed" directory exists at the stem of out_path, creating if needed
+                if out_path.stem != "processed":
+                    out_path_processed = out_path / "processed"
+                    out_path_processed.mkdir(parents=True, exist_ok=True)
+                outfile = out_path / "processed" / f"folder_{self.stats_filename}.csv"
+                self.writers[str(_dir)] = IncrementalCSVWriter(outfile)
+                LOGGER.info(f"Folder-wise statistics saved to: {outfile}")
+            self.writers[str(_dir)].write(folder_df)
+
+
+def _import_pyarrow_dataset():
+    """
+    Import ``pyarrow`` which is required for reading and writing Parquet datasets.
+
+    Returns
+    -------
+    tuple
+        The ``pyarrow`` and ``pyarrow.dataset`` modules.
+    """
+    try:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.dataset as ds  # pylint: disable=import-outside-toplevel
+    except ImportError as error:
+        raise ImportError(
+            "Parquet statistics require the optional dependency 'pyarrow', install with "
+            "'pip install topostats[parquet]'."
+        ) from error
+    return pa, ds
+
+
+class ParquetDatasetWriter:
+    """
+    Append data frames to a Parquet dataset partitioned by folder or image.
+
+    Each data frame is written to its own file within a Hive style partition (e.g. ``folder=level1%2Fa/``) so that
+    nothing is held in memory and subsets of the data can be read without reading the whole dataset. The index of each
+    data frame is written as columns. The dataset is not created until a non-empty data frame is written and replaces
+    any existing dataset.
+
+    Parameters
+    ----------
+    path : str | Path
+        Directory of the dataset.
+    partition_by : str
+        Column to partition by, either ``folder`` (the folder of the image relative to the base directory, added as a
+        column) or ``image``.
+    """
+
+    def __init__(self, path: str | Path, partition_by: str = "folder") -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        path : str | Path
+            Directory of the dataset.
+        partition_by : str
+            Column to partition by, either ``folder`` (the folder of the image relative to the base directory, added as
+            a column) or ``image``.
+        """
+        _import_pyarrow_dataset()
+        self.path = Path(path)
+        self.partition_by = partition_by
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame, folder: str = ".") -> None:
+        """
+        Append the rows of a data frame to the dataset.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Data frame to append, empty data frames are ignored.
+        folder : str
+            Folder of the image the statistics are from, used when partitioning by ``folder``.
+        """
+        if df.empty:
+            return
+        df = df.reset_index()
+        if self.partition_by == "folder":
+            df["folder"] = folder
+        # Arrow has no type for Path objects
+        for column in df.select_dtypes(include="object").columns:
+            df[column] = df[column].map(lambda value: str(value) if isinstance(value, Path) else value)
+        if self.rows == 0 and self.path.exists():
+            shutil.rmtree(self.path)
+        df.to_parquet(self.path, partition_cols=[self.partition_by], index=False)
+        self.rows += len(df)
+
+
+class StatisticsWriter:
+    """
+    Append the statistics of each image to the output as they are produced.
+
+    Statistics are written either as CSV, to ``<name>.csv`` and optionally to a ``processed/folder_<name>.csv`` file
+    for each folder, or as a Parquet dataset in the directory ``<name>.parquet`` partitioned by folder or image.
+
+    Parameters
+    ----------
+    output_dir : str | Path
+        Path of the output directory head.
+    base_dir : str | Path
+        Path of the base directory where files were found.
+    name : str
+        Name of the statistics file (without suffix).
+    folder_stats_filename : str | None
+        Name of the type of statistics for the folder-wise CSV files, if ``None`` no folder-wise files are written.
+        Not used for Parquet datasets which are partitioned instead.
+    output_format : str
+        Format to write statistics in, either ``csv`` or ``parquet``.
+    partition_by : str
+        Column to partition Parquet datasets by, either ``folder`` or ``image``.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        base_dir: str | Path,
+        name: str,
+        folder_stats_filename: str | None = None,
+        output_format: str = "csv",
+        partition_by: str = "folder",
+    ) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        output_dir : str | Path
+            Path of the output directory head.
+        base_dir : str | Path
+            Path of the base directory where files were found.
+        name : str
+            Name of the statistics file (without suffix).
+        folder_stats_filename : str | None
+            Name of the type of statistics for the folder-wise CSV files, if ``None`` no folder-wise files are written.
+            Not used for Parquet datasets which are partitioned instead.
+        output_format : str
+            Format to write statistics in, either ``csv`` or ``parquet``.
+        partition_by : str
+            Column to partition Parquet datasets by, either ``folder`` or ``image``.
+        """
+        self.base_dir = Path(base_dir)
+        self.path = Path(output_dir) / f"{name}.{output_format}"
+        self.folder_writer = None
+        if output_format == "parquet":
+            self.writer = ParquetDatasetWriter(self.path, partition_by=partition_by)
+        else:
+            self.writer = IncrementalCSVWriter(self.path)
+            if folder_stats_filename is not None:
+                self.folder_writer = FolderCSVWriter(output_dir, base_dir, folder_stats_filename)
+
+    @property
+    def rows(self) -> int:
+        """
+        Number of rows written.
+
+        Returns
+        -------
+        int
+            Number of rows written.
+        """
+        return self.writer.rows
+
+    def write(self, df: pd.DataFrame, img_path: str | Path) -> None:
+        """
+        Append the statistics of an image.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Statistics of the image.
+        img_path : str | Path
+            Path of the image the statistics are from.
+        """
+        if isinstance(self.writer, ParquetDatasetWriter):
+            folder = Path(img_path).parent
+            try:
+                folder = folder.relative_to(self.base_dir)
+            except ValueError:
+                pass
+            self.writer.write(df, folder=str(folder))
+        else:
+            self.writer.write(df)
+            if self.folder_writer is not None:
+                self.folder_writer.write(df)
+
+
+def read_statistics(path: str | Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Read statistics written as CSV or as a Parquet dataset.
+
+    Parameters
+    ----------
+    path : str | Path
+        Path to a CSV file, a Parquet file or the directory of a Parquet dataset.
+    columns : list[str] | None
+        Columns to read, those not present are ignored. If ``None`` all columns are read.
+
+    Returns
+    -------
+    pd.DataFrame
+        The statistics.
+    """
+    path = Path(path)
+    if not (path.is_dir() or path.suffix == ".parquet"):
+        return pd.read_csv(path, usecols=None if columns is None else lambda column: column in columns)
+    pa, ds = _import_pyarrow_dataset()
+    # Partition values are always read as strings rather than inferred (e.g. an image named '001' is not an integer)
+    partition_fields = (
+        sorted({part.name.split("=", 1)[0] for part in path.iterdir() if part.is_dir() and "=" in part.name})
+        if path.is_dir()
+        else []
+    )
+    partitioning = ds.partitioning(pa.schema([(field, pa.string()) for field in partition_fields]), flavor="hive")
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning)
+    # Columns that are entirely null in some files are promoted to the type found in others
+    schema = pa.unify_schemas(
+        [dataset.schema, *(fragment.physical_schema for fragment in dataset.get_fragments())],
+        promote_options="permissive",
+    )
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning, schema=schema)
+    if columns is not None:
+        columns = [column for column in dict.fromkeys(columns) if column in schema.names]
+    return dataset.to_table(columns=columns).to_pandas()
 
 
 def read_null_terminated_string(open_file: io.TextIOWrapper, encoding: str = "utf-8") -> str:
@@ -600,6 +987,11 @@ class LoadScans:
         What to extract from ''.topostats'' files, default is ''all'' which loads everything but if using in
        ''run_topostats'' functions then specific subsets of data are required and this allows just those to be
        loaded. Options include ''raw'' and ''filter'' at present.
+    lazy : bool
+        Whether scans should be loaded lazily. When ''True'' callers should use ''iter_data()'' so that only one file is
+        held in memory at a time, when used with ''run_topostats'' functions scans are loaded by each worker process.
+    precision : str
+        Floating point precision (''float32'' or ''float64'') images are returned in.
     """
 
     def __init__(
@@ -607,6 +999,8 @@ class LoadScans:
         img_paths: list[str | Path],
         channel: str,
         extract: str = "all",
+        lazy: bool = False,
+        precision: str = "float64",
     ):
         """
         Initialise the class.
@@ -621,12 +1015,21 @@ class LoadScans:
             What to extract from ''.topostats'' files, default is ''all'' which loads everything but if using in
            ''run_topostats'' functions then specific subsets of data are required and this allows just those to be
            loaded. Options include ''raw'' and ''filter'' at present.
+        lazy : bool
+            Whether scans should be loaded lazily. When ''True'' callers should use ''iter_data()'' so that only one
+            file is held in memory at a time, when used with ''run_topostats'' functions scans are loaded by each worker
+            process.
+        precision : str
+            Floating point precision (''float32'' or ''float64'') images are returned in. Images already processed and
+            extracted from ''.topostats'' files beyond the ''raw'' stage keep the precision they were saved with.
         """
         self.img_paths = img_paths
         self.img_path = None
         self.channel = channel
         self.channel_data = None
         self.extract = extract
+        self.lazy = lazy
+        self.precision = np.dtype(precision)
         self.filename = None
         self.suffix = None
         self.image = None
@@ -645,6 +1048,9 @@ class LoadScans:
         tuple[npt.NDArray, float]
             A tuple containing the image and its pixel to nanometre scaling value.
         """
+        # pySPM, which reads .spm files, is slow to import so is only imported when needed
+        from AFMReader import spm  # pylint: disable=import-outside-toplevel
+
         try:
             LOGGER.debug(f"Loading image from : {self.img_path}")
             return spm.load_spm(file_path=self.img_path, channel=self.channel)
@@ -661,6 +1067,10 @@ class LoadScans:
         Note that grain masks are stored via self.grain_masks rather than returned due to how we extract information for
         all other file loading functions.
 
+        When extracting data for a specific stage of processing (e.g. `grains` or `grainstats`) a ``LazyHDF5Dict`` view
+        of the file is returned which includes only the groups listed for that stage in ``TOPOSTATS_EXTRACT_GROUPS``,
+        data is read from disk when it is first accessed.
+
         Parameters
         ----------
         extract : str
@@ -676,15 +1086,19 @@ class LoadScans:
         """
         try:
             LOGGER.debug(f"Loading image from : {self.img_path}")
-            data = topostats.load_topostats(self.img_path)
+            if TOPOSTATS_EXTRACT_GROUPS.get(extract) is None:
+                return topostats.load_topostats(self.img_path)
+            data = LazyHDF5Dict(self.img_path, keys=TOPOSTATS_EXTRACT_GROUPS[extract])
         except FileNotFoundError:
             LOGGER.error(f"File Not Found : {self.img_path}")
             raise
-        # We want everything if performing any step beyond filtering (or explicitly ask for None/"all")
-        if extract in [None, "all", "grains", "grainstats"]:
+        # We want everything if performing any step beyond filtering
+        if extract not in ("raw", "filter"):
             return data
         # Otherwise we are re-running filtering we want the raw/image_original and scaling
-        return (data["image_original"], data["pixel_to_nm_scaling"])
+        image_original, pixel_to_nm_scaling = data["image_original"], data["pixel_to_nm_scaling"]
+        data.close()
+        return (image_original, pixel_to_nm_scaling)
 
     def load_asd(self) -> tuple[npt.NDArray, float]:
         """
@@ -695,6 +1109,8 @@ class LoadScans:
         tuple[npt.NDArray, float]
             A tuple containing the image and its pixel to nanometre scaling value.
         """
+        from AFMReader import asd  # pylint: disable=import-outside-toplevel
+
         try:
             frames: np.ndarray
             pixel_to_nm_scaling: float
@@ -707,6 +1123,23 @@ class LoadScans:
 
         return (frames, pixel_to_nm_scaling)
 
+    def load_asd_frames(self) -> tuple[ASDFrames, float]:
+        """
+        Index the frames of a .asd file without reading them, frames are decoded when they are accessed.
+
+        Returns
+        -------
+        tuple[ASDFrames, float]
+            A tuple containing the frame reader and the pixel to nanometre scaling value.
+        """
+        try:
+            frames = ASDFrames(file_path=self.img_path, channel=self.channel, dtype=self.precision)
+            LOGGER.debug(f"[{self.filename}] : Indexed {len(frames)} frames from : {self.img_path}")
+        except FileNotFoundError:
+            LOGGER.error(f"File not found. Path: {self.img_path}")
+            raise
+        return (frames, frames.pixel_to_nm_scaling)
+
     def load_ibw(self) -> tuple[npt.NDArray, float]:
         """
         Load image from Asylum Research (Igor) .ibw files.
@@ -754,62 +1187,135 @@ class LoadScans:
             LOGGER.error(f"File not found : {self.img_path}")
             raise
 
-    def get_data(self) -> None:  # noqa: C901  # pylint: disable=too-many-branches
+    def get_data(self) -> None:
         """Extract image, filepath and pixel to nm scaling value, and append these to the img_dic object."""
+        for img_path in self.img_paths:
+            self._load_img_path(img_path)
+
+    def iter_data(self) -> Generator[dict[str, Any], None, None]:
+        """
+        Lazily extract images one file at a time, yielding the image dictionary for each image.
+
+        Unlike ``get_data()`` images are not accumulated in ``img_dict``, which only ever holds the images from the file
+        currently being loaded (a single image for most formats, all frames for ``.asd`` files).
+
+        Yields
+        ------
+        dict[str, Any]
+            Image dictionary for each image (or frame) found in ``img_paths``.
+        """
+        for img_path in self.img_paths:
+            self.img_dict = {}
+            self._load_img_path(img_path)
+            yield from self.img_dict.values()
+        self.img_dict = {}
+
+    def _load_img_path(self, img_path: Path) -> None:  # noqa: C901  # pylint: disable=too-many-branches
+        """
+        Extract image, filepath and pixel to nm scaling value from a single file, adding these to the img_dict object.
+
+        Parameters
+        ----------
+        img_path : Path
+            Path to a valid AFM scan to load.
+        """
         suffix_to_loader = {
             ".spm": self.load_spm,
             ".jpk": self.load_jpk,
             ".ibw": self.load_ibw,
             ".gwy": self.load_gwy,
             ".topostats": self.load_topostats,
-            ".asd": self.load_asd,
+            ".asd": self.load_asd_frames,
         }
-        for img_path in self.img_paths:
-            self.img_path = img_path
-            self.filename = img_path.stem
-            suffix = img_path.suffix
-            LOGGER.info(f"Extracting image from {self.img_path}")
-            LOGGER.debug(f"File extension : {suffix}")
-
-            # Check that the file extension is supported
-            if suffix in suffix_to_loader:
-                data = None
-                try:
-                    if suffix == ".topostats" and self.extract in (None, "all", "grains", "grainstats"):
-                        data = self.load_topostats(extract=self.extract)
-                        self.image = data["image"]
-                        self.pixel_to_nm_scaling = data["pixel_to_nm_scaling"]
-                        # If we need the grain masks for processing we extract them
-                        if self.extract in ("grainstats"):
-                            self.grain_masks = data["grain_masks"]
-                    elif suffix == ".topostats" and self.extract in ("filter", "raw"):
-                        self.image, self.pixel_to_nm_scaling = self.load_topostats(extract=self.extract)
-                    else:
-                        self.image, self.pixel_to_nm_scaling = suffix_to_loader[suffix]()
-                except Exception as e:
-                    if "Channel" in str(e) and "not found" in str(e):
-                        LOGGER.warning(e)  # log the specific error message
-                        LOGGER.warning(f"[{self.filename}] Channel {self.channel} not found, skipping image.")
-                    else:
-                        raise
+        self.img_path = img_path
+        self.filename = img_path.stem
+        suffix = img_path.suffix
+        LOGGER.info(f"Extracting image from {self.img_path}")
+        LOGGER.debug(f"File extension : {suffix}")
+
+        # Check that the file extension is supported
+        if suffix == BATCH_CONTAINER_SUFFIX:
+            self.load_batch_container()
+        elif suffix in suffix_to_loader:
+            data = None
+            try:
+                if suffix == ".topostats" and self.extract not in ("filter", "raw"):
+                    data = self.load_topostats(extract=self.extract)
+                    self.image = data["image"]
+                    self.pixel_to_nm_scaling = data["pixel_to_nm_scaling"]
+                    # If we need the grain masks for processing we extract them
+                    if self.extract == "grainstats":
+                        self.grain_masks = data["grain_masks"]
+                elif suffix == ".topostats" and self.extract in ("filter", "raw"):
+                    self.image, self.pixel_to_nm_scaling = self.load_topostats(extract=self.extract)
+                else:
+                    self.image, self.pixel_to_nm_scaling = suffix_to_loader[suffix]()
+            except Exception as e:
+                if "Channel" in str(e) and "not found" in str(e):
+                    LOGGER.warning(e)  # log the specific error message
+                    LOGGER.warning(f"[{self.filename}] Channel {self.channel} not found, skipping image.")
                 else:
-                    if suffix == ".asd":
-                        for index, frame in enumerate(self.image):
-                            self._check_image_size_and_add_to_dict(image=frame, filename=f"{self.filename}_{index}")
-                    # If we have extracted the image dictionary (only possible with .topostats files) we add that to the
-                    # dictionary
-                    elif data is not None:
-                        data["img_path"] = img_path.with_suffix("")
-                        self.img_dict[self.filename] = self.clean_dict(img_dict=data)
-                    # Otherwise check the size and add image to dictionary
-                    else:
-                        self._check_image_size_and_add_to_dict(image=self.image, filename=self.filename)
+                    raise
             else:
-                raise ValueError(
-                    f"File type {suffix} not yet supported. Please make an issue at \
-                https://github.com/AFM-SPM/TopoStats/issues, or email topostats@sheffield.ac.uk to request support for \
-                this file type."
+                # Frames of .asd files are only decoded when the image is accessed by the process that handles it
+                if suffix == ".asd":
+                    for index in range(len(self.image)):
+                        filename = f"{self.filename}_{index}"
+                        if self._check_image_size(shape=self.image.shape, filename=filename):
+                            self.img_dict[filename] = LazyASDFrameDict(
+                                frames=self.image, index=index, data=self._image_data(image=None, filename=filename)
+                            )
+                            LOGGER.debug(f"[{filename}] Image added to processing.")
+                # If we have extracted the image dictionary (only possible with .topostats files) we add that to the
+                # dictionary
+                elif data is not None:
+                    data["img_path"] = img_path.with_suffix("")
+                    self.img_dict[self.filename] = self.clean_dict(img_dict=data)
+                    # Lazily loaded files are re-opened when next accessed (e.g. by the worker processing them) so we
+                    # avoid holding a handle open for every file that has been found
+                    if isinstance(data, LazyHDF5Dict):
+                        data.close()
+                # Otherwise check the size and add image to dictionary
+                else:
+                    self._check_image_size_and_add_to_dict(image=self.image, filename=self.filename)
+        else:
+            raise ValueError(
+                f"File type {suffix} not yet supported. Please make an issue at \
+            https://github.com/AFM-SPM/TopoStats/issues, or email topostats@sheffield.ac.uk to request support for \
+            this file type."
+            )
+
+    def load_batch_container(self) -> None:
+        """
+        Add each image in a batch container to the img_dict object.
+
+        Images are viewed with ``LazyHDF5Dict`` and restricted to the groups required for the ``extract`` stage, data
+        is read from the container when it is first accessed (e.g. by the worker processing the image).
+        """
+        container_path = self.img_path
+        try:
+            open_file = h5py.File(container_path, "r")
+        except FileNotFoundError:
+            LOGGER.error(f"File Not Found : {container_path}")
+            raise
+        with open_file:
+            for key, filename, img_path in read_batch_index(open_file):
+                data = LazyHDF5Dict(
+                    container_path,
+                    group_path=f"/{BATCH_IMAGES_GROUP}/{key}/",
+                    keys=TOPOSTATS_EXTRACT_GROUPS.get(self.extract),
+                    open_file=open_file,
                 )
+                self.filename = filename
+                # Re-running filtering requires only the original image and scaling
+                if self.extract in ("raw", "filter"):
+                    self.pixel_to_nm_scaling = data["pixel_to_nm_scaling"]
+                    self.img_path = img_path
+                    self._check_image_size_and_add_to_dict(image=data["image_original"], filename=filename)
+                else:
+                    data["img_path"] = img_path
+                    self.img_dict[filename] = self.clean_dict(img_dict=data)
+        LOGGER.debug(f"Loaded images from batch container : {container_path}")
 
     def _check_image_size_and_add_to_dict(self, image: npt.NDArray, filename: str) -> None:
         """
@@ -824,12 +1330,31 @@ class LoadScans:
         filename : str
             The name of the file.
         """
-        if image.shape[0] < self.MINIMUM_IMAGE_SIZE or image.shape[1] < self.MINIMUM_IMAGE_SIZE:
-            LOGGER.warning(f"[{filename}] Skipping, image too small: {image.shape}")
-        else:
+        if self._check_image_size(shape=image.shape, filename=filename):
             self.add_to_dict(image=image, filename=filename)
             LOGGER.debug(f"[{filename}] Image added to processing.")
 
+    def _check_image_size(self, shape: tuple[int, ...], filename: str) -> bool:
+        """
+        Check an image shape is above the minimum size in both dimensions, logging a warning if it is not.
+
+        Parameters
+        ----------
+        shape : tuple[int, ...]
+            Shape of the image.
+        filename : str
+            The name of the file.
+
+        Returns
+        -------
+        bool
+            Whether the image is large enough to be processed.
+        """
+        if shape[0] < self.MINIMUM_IMAGE_SIZE or shape[1] < self.MINIMUM_IMAGE_SIZE:
+            LOGGER.warning(f"[{filename}] Skipping, image too small: {shape}")
+            return False
+        return True
+
     def add_to_dict(self, image: npt.NDArray, filename: str) -> None:
         """
         Add an image and metadata to the img_dict dictionary under the key filename.
@@ -845,11 +1370,29 @@ class LoadScans:
         filename : str
             The name of the file.
         """
-        self.img_dict[filename] = {
+        self.img_dict[filename] = self._image_data(image=image, filename=filename)
+
+    def _image_data(self, image: npt.NDArray | None, filename: str) -> dict[str, Any]:
+        """
+        Create the dictionary of an image and its metadata.
+
+        Parameters
+        ----------
+        image : npt.NDArray | None
+            An array of the extracted AFM image.
+        filename : str
+            The name of the file.
+
+        Returns
+        -------
+        dict[str, Any]
+            Dictionary of the image and its metadata.
+        """
+        return {
             "filename": filename,
             "img_path": self.img_path.with_name(filename),
             "pixel_to_nm_scaling": self.pixel_to_nm_scaling,
-            "image_original": image,
+            "image_original": None if image is None else image.astype(self.precision, copy=False),
             "image": None,
             "grain_masks": self.grain_masks,
             "grain_trace_data": self.grain_trace_data,
@@ -860,7 +1403,7 @@ class LoadScans:
         If we are loading .topostats files for reprocessing we already have the dictionary structure.
 
         We therefore need to extract just the information that is required for the stage requested and remove everything
-        else.
+        else. The groups retained for each stage are defined in ``TOPOSTATS_EXTRACT_GROUPS``.
 
         Parameters
         ----------
@@ -872,97 +1415,644 @@ class LoadScans:
         dict[str, Any]
             Returns the image dictionary with keys/values removed appropriate to the extraction stage.
         """
-        # Reverse order so we remove things in reverse order, splining removes what it doesn't need then ordered
-        # tracing removes what it doesn't need, then nodestats, then disordered, then grainstats then grains, should be
-        # more succinct code with less popping
-        if self.extract in ["grains"]:
-            img_dict.pop("disordered_traces")
-            img_dict.pop("grain_curvature_stats")
-            img_dict.pop("grain_masks")
-            img_dict.pop("height_profiles")
-            img_dict.pop("nodestats")
-            img_dict.pop("ordered_traces")
-            img_dict.pop("splining")
-            return img_dict
-        if self.extract in ["grainstats"]:
-            img_dict.pop("disordered_traces")
-            img_dict.pop("grain_curvature_stats")
-            img_dict.pop("height_profiles")
-            img_dict.pop("nodestats")
-            img_dict.pop("ordered_traces")
-            img_dict.pop("splining")
-            return img_dict
-        if self.extract in ["disordered_tracing", "nodestats", "ordered_tracing"]:
-            img_dict.pop("disordered_traces")
-            img_dict.pop("grain_curvature_stats")
-            img_dict.pop("nodestats")
-            img_dict.pop("ordered_tracing")
-            img_dict.pop("splining")
-            return img_dict
-        if self.extract in ["splining"]:
-            img_dict.pop("splining")
-            img_dict.pop("grain_curvature_stats")
+        groups = TOPOSTATS_EXTRACT_GROUPS.get(self.extract)
+        if groups is None:
             return img_dict
+        for key in [key for key in img_dict.keys() if key not in groups]:
+            img_dict.pop(key)
         return img_dict
 
 
-def dict_to_hdf5(open_hdf5_file: h5py.File, group_path: str, dictionary: dict) -> None:
+class LazyHDF5Dict(MutableMapping):
     """
-    Recursively save a dictionary to an open hdf5 file.
+    Lazy dictionary-like view of a group within an HDF5 (e.g. ''.topostats'') file.
+
+    Datasets are read from the open file the first time they are accessed and cached thereafter, sub-groups are returned
+    as nested ``LazyHDF5Dict`` views. Items can be added, replaced or removed without modifying the file on disk. When
+    pickled (e.g. to be passed to a worker process) only the path and any items already loaded or modified are
+    serialised, the file is re-opened when next accessed.
 
     Parameters
     ----------
-    open_hdf5_file : h5py.File
-        An open hdf5 file object.
+    file_path : str | Path
+        Path to the HDF5 file.
     group_path : str
-        The path to the group in the hdf5 file to start saving data from.
-    dictionary : dict
-        A dictionary of the data to save.
+        The path to the group in the hdf5 file the view represents, default is the root ''/''.
+    keys : list[str] | None
+        Restrict the view to these keys of the group, if ''None'' all keys are included.
+    open_file : h5py.File | None
+        An already open hdf5 file object to read from, used when creating views of sub-groups.
     """
-    for key, item in dictionary.items():
-        # LOGGER.info(f"Saving key: {key}")
 
-        if item is None:
-            LOGGER.debug(f"Item '{key}' is None. Skipping.")
-        # Make sure the key is a string
-        key = str(key)
+    def __init__(
+        self,
+        file_path: str | Path,
+        group_path: str = "/",
+        keys: list[str] | None = None,
+        open_file: h5py.File | None = None,
+    ) -> None:
+        """
+        Initialise the class.
 
-        # Check if the item is a known datatype
-        # Ruff wants us to use the pipe operator here but it isn't supported by python 3.9
-        if isinstance(item, (list, str, int, float, np.ndarray, Path, dict)):  # noqa: UP038
-            # Lists need to be converted to numpy arrays
-            if isinstance(item, list):
-                item = np.array(item)
-                open_hdf5_file[group_path + key] = item
-            # Strings need to be encoded to bytes
-            elif isinstance(item, str):
-                open_hdf5_file[group_path + key] = item.encode("utf8")
-            # Integers, floats and numpy arrays can be added directly to the hdf5 file
-            # Ruff wants us to use the pipe operator here but it isn't supported by python 3.9
-            elif isinstance(item, (int, float, np.ndarray)):  # noqa: UP038
-                open_hdf5_file[group_path + key] = item
-            # Path objects need to be encoded to bytes
-            elif isinstance(item, Path):
-                open_hdf5_file[group_path + key] = str(item).encode("utf8")
-            # Dictionaries need to be recursively saved
-            elif isinstance(item, dict):  # a sub-dictionary, so we need to recurse
-                dict_to_hdf5(open_hdf5_file, group_path + key + "/", item)
-        else:  # attempt to save an item that is not a numpy array or a dictionary
-            try:
-                open_hdf5_file[group_path + key] = item
-            except Exception as e:
-                LOGGER.debug(f"Cannot save key '{key}' to HDF5. Item type: {type(item)}. Skipping. {e}")
+        Parameters
+        ----------
+        file_path : str | Path
+            Path to the HDF5 file.
+        group_path : str
+            The path to the group in the hdf5 file the view represents, default is the root ''/''.
+        keys : list[str] | None
+            Restrict the view to these keys of the group, if ''None'' all keys are included.
+        open_file : h5py.File | None
+            An already open hdf5 file object to read from, used when creating views of sub-groups.
+        """
+        self.file_path = Path(file_path)
+        self.group_path = group_path
+        self._open_file = open_file if open_file is not None else h5py.File(self.file_path, "r")
+        self._file_keys = [key for key in self._open_file[group_path].keys() if keys is None or key in keys]
+        self._data: dict[str, Any] = {}
+        self._deleted: set[str] = set()
+
+    def _read(self, key: str) -> Any:
+        """
+        Read an item from the file.
 
+        Parameters
+        ----------
+        key : str
+            Key of the item within the group.
 
-def hdf5_to_dict(open_hdf5_file: h5py.File, group_path: str) -> dict:
-    """
-    Read a dictionary from an open hdf5 file.
+        Returns
+        -------
+        Any
+            A nested ``LazyHDF5Dict`` if the item is a group, otherwise the (decoded) dataset.
+        """
+        if self._open_file is None or not self._open_file.id.valid:
+            self._open_file = h5py.File(self.file_path, "r")
+        item = self._open_file[self.group_path][key]
+        if isinstance(item, h5py.Group):
+            return LazyHDF5Dict(self.file_path, group_path=f"{self.group_path}{key}/", open_file=self._open_file)
+        # Decode byte strings to utf-8. The data type "O" is a byte string.
+        if item.dtype == "O":
+            return item[()].decode("utf-8")
+        return item[()]
 
-    Parameters
-    ----------
-    open_hdf5_file : h5py.File
-        An open hdf5 file object.
-    group_path : str
+    def __getitem__(self, key: str) -> Any:
+        """
+        Get an item, reading it from the file if it has not already been loaded.
+
+        Parameters
+        ----------
+        key : str
+            Key of the item.
+
+        Returns
+        -------
+        Any
+            The item.
+        """
+        if key not in self._data:
+            if key in self._deleted or key not in self._file_keys:
+                raise KeyError(key)
+            LOGGER.debug(f"Loading hdf5 key: {self.group_path}{key}")
+            self._data[key] = self._read(key)
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """
+        Set an item, this does not modify the file on disk.
+
+        Parameters
+        ----------
+        key : str
+            Key of the item.
+        value : Any
+            Value of the item.
+        """
+        self._data[key] = value
+        self._deleted.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Remove an item from the view, this does not modify the file on disk.
+
+        Parameters
+        ----------
+        key : str
+            Key of the item.
+        """
+        if key not in self:
+            raise KeyError(key)
+        self._data.pop(key, None)
+        if key in self._file_keys:
+            self._deleted.add(key)
+
+    def __iter__(self) -> Generator[str, None, None]:
+        """
+        Iterate over the keys of the view.
+
+        Yields
+        ------
+        str
+            Keys of items in the file followed by any keys that have been added.
+        """
+        yield from (key for key in self._file_keys if key not in self._deleted)
+        yield from (key for key in self._data if key not in self._file_keys)
+
+    def __len__(self) -> int:
+        """
+        Get the number of items in the view.
+
+        Returns
+        -------
+        int
+            Number of items.
+        """
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        """
+        Check whether a key is in the view without reading the item.
+
+        Parameters
+        ----------
+        key : object
+            Key to check.
+
+        Returns
+        -------
+        bool
+            Whether the key is present.
+        """
+        return key in self._data or (key in self._file_keys and key not in self._deleted)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Get the state for pickling, excluding the open file which can not be pickled.
+
+        Returns
+        -------
+        dict[str, Any]
+            State of the object.
+        """
+        state = self.__dict__.copy()
+        state["_open_file"] = None
+        return state
+
+    def __repr__(self) -> str:
+        """
+        Representation of the view.
+
+        Returns
+        -------
+        str
+            Representation including the file, group and keys.
+        """
+        return f"LazyHDF5Dict(file_path={self.file_path}, group_path={self.group_path}, keys={list(self)})"
+
+    def __enter__(self) -> LazyHDF5Dict:
+        """
+        Enter the context, the file is closed on exit.
+
+        Returns
+        -------
+        LazyHDF5Dict
+            The view.
+        """
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Close the underlying file.
+
+        Parameters
+        ----------
+        *exc_info
+            Details of any exception raised within the context.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying file and that of any loaded sub-groups, they are re-opened if further items are read."""
+        for value in self._data.values():
+            if isinstance(value, LazyHDF5Dict):
+                value.close()
+        if self._open_file is not None and self._open_file.id.valid:
+            self._open_file.close()
+        self._open_file = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Read all items in the view (recursively) into a dictionary.
+
+        Returns
+        -------
+        dict[str, Any]
+            Dictionary of all items.
+        """
+        return {key: value.to_dict() if isinstance(value, LazyHDF5Dict) else value for key, value in self.items()}
+
+
+class ASDFrames:
+    """
+    Indexed reader of the frames of a single channel of a ''.asd'' high-speed AFM video.
+
+    Only the file header is read when the reader is created, each frame is memory-mapped and decoded when it is indexed
+    so the memory used does not depend on the number of frames. No file handles are held open between reads, so the
+    reader is cheap to pickle and frames can be decoded by the worker processing them.
+
+    Parameters
+    ----------
+    file_path : str | Path
+        Path to the ''.asd'' file.
+    channel : str
+        Channel to read, one of the two channels recorded in the file (e.g. ''TP'', ''ER'' or ''PH'').
+    dtype : npt.DTypeLike
+        Data type frames are returned as.
+    """
+
+    def __init__(self, file_path: str | Path, channel: str, dtype: npt.DTypeLike = np.float64) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        file_path : str | Path
+            Path to the ''.asd'' file.
+        channel : str
+            Channel to read, one of the two channels recorded in the file (e.g. ''TP'', ''ER'' or ''PH'').
+        dtype : npt.DTypeLike
+            Data type frames are returned as.
+        """
+        from AFMReader import asd  # pylint: disable=import-outside-toplevel
+
+        self.file_path = Path(file_path)
+        self.channel = channel
+        self.dtype = np.dtype(dtype)
+        if not self.file_path.is_file():
+            raise FileNotFoundError(f"File not found : {self.file_path}")
+        header_readers = {
+            0: asd.read_header_file_version_0,
+            1: asd.read_header_file_version_1,
+            2: asd.read_header_file_version_2,
+        }
+        with self.file_path.open("rb") as f:
+            file_version = asd.read_file_version(f)
+            if file_version not in header_readers:
+                raise ValueError(
+                    f"File version {file_version} unknown. Please add support if you know how to decode this file "
+                    "version."
+                )
+            header = header_readers[file_version](f)
+            data_offset = f.tell()
+        self.num_frames = header["num_frames"]
+        self.shape = (header["y_pixels"], header["x_pixels"])
+        self.frame_header_length = header["frame_header_length"]
+        # Each value is a signed 2 byte integer
+        self.frame_length = self.frame_header_length + 2 * header["x_pixels"] * header["y_pixels"]
+        if channel == header["channel1"]:
+            self.offset = data_offset
+        elif channel == header["channel2"]:
+            self.offset = data_offset + self.num_frames * self.frame_length
+        else:
+            raise ValueError(
+                f"'{channel}' not found {self.file_path.suffix} channel list: "
+                f"{header['channel1']}, {header['channel2']}"
+            )
+        self.pixel_to_nm_scaling = header["x_nm"] / header["x_pixels"]
+        if self.pixel_to_nm_scaling != header["y_nm"] / header["y_pixels"]:
+            LOGGER.warning(
+                f"Resolution of image is different in x and y directions: x: {self.pixel_to_nm_scaling} "
+                f"y: {header['y_nm'] / header['y_pixels']}"
+            )
+        self.converter = asd.create_analogue_digital_converter(
+            analogue_digital_range=header["analogue_digital_range"],
+            scaling_factor=asd.calculate_scaling_factor(
+                channel=channel,
+                z_piezo_gain=header["z_piezo_gain"],
+                z_piezo_extension=header["z_piezo_extension"],
+                scanner_sensitivity=header["scanner_sensitivity"],
+                phase_sensitivity=header["phase_sensitivity"],
+            ),
+        )
+
+    def __len__(self) -> int:
+        """
+        Get the number of frames.
+
+        Returns
+        -------
+        int
+            Number of frames in the file.
+        """
+        return self.num_frames
+
+    def __getitem__(self, index: int) -> npt.NDArray:
+        """
+        Read and decode a single frame.
+
+        Parameters
+        ----------
+        index : int
+            Index of the frame, negative indices count from the last frame.
+
+        Returns
+        -------
+        npt.NDArray
+            The frame heights in nanometres.
+        """
+        if not -self.num_frames <= index < self.num_frames:
+            raise IndexError(f"Frame {index} out of range for {self.num_frames} frames.")
+        index %= self.num_frames
+        levels = np.memmap(
+            self.file_path,
+            dtype="<i2",
+            mode="r",
+            offset=self.offset + index * self.frame_length + self.frame_header_length,
+            shape=self.shape,
+        )
+        # Copy the frame out of the memory map so the file is not held open
+        return self.converter.level_to_voltage(np.array(levels)).astype(self.dtype, copy=False)
+
+    def __repr__(self) -> str:
+        """
+        Representation of the reader.
+
+        Returns
+        -------
+        str
+            Representation including the file, channel and number of frames.
+        """
+        return f"ASDFrames(file_path={self.file_path}, channel={self.channel}, num_frames={self.num_frames})"
+
+
+class LazyASDFrameDict(MutableMapping):
+    """
+    Image dictionary for a single frame of a ''.asd'' file which decodes the frame when ''image_original'' is accessed.
+
+    The decoded frame is cached thereafter. When pickled (e.g. to be passed to a worker process) only the reader and the
+    frame index are serialised unless the frame has already been decoded.
+
+    Parameters
+    ----------
+    frames : ASDFrames
+        Reader of the frames of the file.
+    index : int
+        Index of the frame.
+    data : dict[str, Any]
+        The other items of the image dictionary (e.g. ''filename'' and ''pixel_to_nm_scaling''), any
+        ''image_original'' is ignored.
+    """
+
+    IMAGE_KEY = "image_original"
+
+    def __init__(self, frames: ASDFrames, index: int, data: dict[str, Any]) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        frames : ASDFrames
+            Reader of the frames of the file.
+        index : int
+            Index of the frame.
+        data : dict[str, Any]
+            The other items of the image dictionary (e.g. ''filename'' and ''pixel_to_nm_scaling''), any
+            ''image_original'' is ignored.
+        """
+        self.frames = frames
+        self.index = index
+        self._data = {key: value for key, value in data.items() if key != self.IMAGE_KEY}
+        self._pending = True
+
+    def __getitem__(self, key: str) -> Any:
+        """
+        Get an item, decoding the frame if ''image_original'' has not already been accessed.
+
+        Parameters
+        ----------
+        key : str
+            Key of the item.
+
+        Returns
+        -------
+        Any
+            The item.
+        """
+        if key == self.IMAGE_KEY and self._pending:
+            LOGGER.debug(f"Decoding frame {self.index} of : {self.frames.file_path}")
+            self._data[key] = self.frames[self.index]
+            self._pending = False
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """
+        Set an item, this does not modify the file on disk.
+
+        Parameters
+        ----------
+        key : str
+            Key of the item.
+        value : Any
+            Value of the item.
+        """
+        self._data[key] = value
+        if key == self.IMAGE_KEY:
+            self._pending = False
+
+    def __delitem__(self, key: str) -> None:
+        """
+        Remove an item, this does not modify the file on disk.
+
+        Parameters
+        ----------
+        key : str
+            Key of the item.
+        """
+        if key == self.IMAGE_KEY and self._pending:
+            self._pending = False
+        else:
+            del self._data[key]
+
+    def __iter__(self) -> Generator[str, None, None]:
+        """
+        Iterate over the keys of the dictionary.
+
+        Yields
+        ------
+        str
+            Keys of the dictionary.
+        """
+        if self._pending:
+            yield self.IMAGE_KEY
+        yield from self._data
+
+    def __len__(self) -> int:
+        """
+        Get the number of items.
+
+        Returns
+        -------
+        int
+            Number of items.
+        """
+        return len(self._data) + self._pending
+
+    def __contains__(self, key: object) -> bool:
+        """
+        Check whether a key is present without decoding the frame.
+
+        Parameters
+        ----------
+        key : object
+            Key to check.
+
+        Returns
+        -------
+        bool
+            Whether the key is present.
+        """
+        return key in self._data or (self._pending and key == self.IMAGE_KEY)
+
+    def __repr__(self) -> str:
+        """
+        Representation of the dictionary.
+
+        Returns
+        -------
+        str
+            Representation including the frame and keys.
+        """
+        return f"LazyASDFrameDict(file_path={self.frames.file_path}, index={self.index}, keys={list(self)})"
+
+
+def hdf5_dataset_options(
+    item: npt.NDArray, compression: str | None = None, compression_level: int | None = None
+) -> dict:
+    """
+    Get the chunking and compression options for saving an array to HDF5.
+
+    Only numeric and boolean arrays with at least ``HDF5_MIN_COMPRESSION_SIZE`` elements are compressed, the chunk shape
+    is left for ``h5py`` to determine. The byte-shuffle filter is applied to multi-byte types (e.g. float heightmaps
+    and integer label images) where it improves the compression ratio, it is not applied to single byte types such as
+    boolean masks.
+
+    Parameters
+    ----------
+    item : npt.NDArray
+        Array that is to be saved.
+    compression : str | None
+        Lossless compression filter to use, either ``gzip`` or ``lzf``. If ``None`` the array is stored uncompressed.
+    compression_level : int | None
+        Level of ``gzip`` compression (``0-9``), ignored for other filters.
+
+    Returns
+    -------
+    dict
+        Dictionary of keyword arguments for ``h5py.Group.create_dataset()``.
+    """
+    if compression is None or item.ndim == 0 or item.size < HDF5_MIN_COMPRESSION_SIZE or item.dtype.kind not in "biuf":
+        return {}
+    options = {"chunks": True, "compression": compression, "shuffle": item.dtype.itemsize > 1}
+    if compression == "gzip" and compression_level is not None:
+        options["compression_opts"] = compression_level
+    return options
+
+
+def _array_to_hdf5(
+    open_hdf5_file: h5py.File,
+    dataset_path: str,
+    item: list | npt.NDArray,
+    compression: str | None = None,
+    compression_level: int | None = None,
+) -> None:
+    """
+    Save a list or array to an open hdf5 file as a dataset.
+
+    Parameters
+    ----------
+    open_hdf5_file : h5py.File
+        An open hdf5 file object.
+    dataset_path : str
+        The path of the dataset in the hdf5 file.
+    item : list | npt.NDArray
+        List or array to save, lists are converted to numpy arrays.
+    compression : str | None
+        Lossless compression filter to apply, either ``gzip`` or ``lzf``. Default is ``None`` which stores the array
+        uncompressed.
+    compression_level : int | None
+        Level of ``gzip`` compression (``0-9``).
+    """
+    item = np.asarray(item)
+    open_hdf5_file.create_dataset(dataset_path, data=item, **hdf5_dataset_options(item, compression, compression_level))
+
+
+def dict_to_hdf5(
+    open_hdf5_file: h5py.File,
+    group_path: str,
+    dictionary: dict,
+    compression: str | None = None,
+    compression_level: int | None = None,
+) -> None:
+    """
+    Recursively save a dictionary to an open hdf5 file.
+
+    Parameters
+    ----------
+    open_hdf5_file : h5py.File
+        An open hdf5 file object.
+    group_path : str
+        The path to the group in the hdf5 file to start saving data from.
+    dictionary : dict
+        A dictionary of the data to save.
+    compression : str | None
+        Lossless compression filter to apply to arrays, either ``gzip`` or ``lzf``. Default is ``None`` which stores
+        arrays uncompressed. See ``hdf5_dataset_options()`` for details of which arrays are compressed.
+    compression_level : int | None
+        Level of ``gzip`` compression (``0-9``).
+    """
+    for key, item in dictionary.items():
+        # LOGGER.info(f"Saving key: {key}")
+
+        if item is None:
+            LOGGER.debug(f"Item '{key}' is None. Skipping.")
+        # Make sure the key is a string
+        key = str(key)
+
+        # Check if the item is a known datatype
+        # Ruff wants us to use the pipe operator here but it isn't supported by python 3.9
+        if isinstance(item, (list, str, int, float, np.ndarray, Path, MutableMapping)):  # noqa: UP038
+            # Lists and numpy arrays are saved as datasets, chunked and compressed if requested
+            if isinstance(item, (list, np.ndarray)):
+                _array_to_hdf5(open_hdf5_file, group_path + key, item, compression, compression_level)
+            # Strings need to be encoded to bytes
+            elif isinstance(item, str):
+                open_hdf5_file[group_path + key] = item.encode("utf8")
+            # Integers and floats can be added directly to the hdf5 file
+            # Ruff wants us to use the pipe operator here but it isn't supported by python 3.9
+            elif isinstance(item, (int, float)):  # noqa: UP038
+                open_hdf5_file[group_path + key] = item
+            # Path objects need to be encoded to bytes
+            elif isinstance(item, Path):
+                open_hdf5_file[group_path + key] = str(item).encode("utf8")
+            # Dictionaries need to be recursively saved
+            elif isinstance(item, MutableMapping):  # a sub-dictionary, so we need to recurse
+                dict_to_hdf5(open_hdf5_file, group_path + key + "/", item, compression, compression_level)
+        else:  # attempt to save an item that is not a numpy array or a dictionary
+            try:
+                open_hdf5_file[group_path + key] = item
+            except Exception as e:
+                LOGGER.debug(f"Cannot save key '{key}' to HDF5. Item type: {type(item)}. Skipping. {e}")
+
+
+def hdf5_to_dict(open_hdf5_file: h5py.File, group_path: str) -> dict:
+    """
+    Read a dictionary from an open hdf5 file.
+
+    Parameters
+    ----------
+    open_hdf5_file : h5py.File
+        An open hdf5 file object.
+    group_path : str
         The path to the group in the hdf5 file to start reading data from.
 
     Returns
@@ -988,10 +2078,20 @@ def hdf5_to_dict(open_hdf5_file: h5py.File, group_path: str) -> dict:
     return data_dict
 
 
-def save_topostats_file(output_dir: Path, filename: str, topostats_object: dict) -> None:
+def save_topostats_file(
+    output_dir: Path,
+    filename: str,
+    topostats_object: dict,
+    compression: str | None = "gzip",
+    compression_level: int | None = 4,
+    batch_writer: BatchContainerWriter | None = None,
+) -> None:
     """
     Save a topostats dictionary object to a .topostats (hdf5 format) file.
 
+    If a ``batch_writer`` is given the object is instead sent to it to be added to the batch container of the run, in
+    which case ``output_dir``, ``compression`` and ``compression_level`` are ignored.
+
     Parameters
     ----------
     output_dir : Path
@@ -1001,7 +2101,25 @@ def save_topostats_file(output_dir: Path, filename: str, topostats_object: dict)
     topostats_object : dict
         Dictionary of the topostats data to save. Must include a flattened image and pixel to nanometre scaling
         factor. May also include grain masks.
+    compression : str | None
+        Lossless compression filter to apply to arrays, either ``gzip`` (default) or ``lzf``. If ``None`` arrays are
+        stored uncompressed.
+    compression_level : int | None
+        Level of ``gzip`` compression (``0-9``), default is ``4``.
+    batch_writer : BatchContainerWriter | None
+        Writer of the batch container to add the object to rather than saving a ``.topostats`` file.
     """
+    if batch_writer is not None:
+        if topostats_object["image"] is None:
+            raise ValueError(
+                "TopoStats object dictionary does not contain an 'image'. \
+                 TopoStats objects must be saved with a flattened image."
+            )
+        LOGGER.info(f"[{filename}] : Adding image to batch container")
+        topostats_object["topostats_file_version"] = 0.2
+        batch_writer.save(topostats_object)
+        return
+
     LOGGER.info(f"[{filename}] : Saving image to .topostats file")
 
     if ".topostats" not in filename:
@@ -1009,13 +2127,25 @@ def save_topostats_file(output_dir: Path, filename: str, topostats_object: dict)
     else:
         save_file_path = output_dir / filename
 
+    # If over-writing the file an object was lazily loaded from we need to read everything and close it first
+    if isinstance(topostats_object, LazyHDF5Dict) and topostats_object.file_path.resolve() == save_file_path.resolve():
+        loaded_object = topostats_object.to_dict()
+        topostats_object.close()
+        topostats_object = loaded_object
+
     with h5py.File(save_file_path, "w") as f:
         # It may be possible for topostats_object["image"] to be None.
         # Make sure that this is not the case.
         if topostats_object["image"] is not None:
             topostats_object["topostats_file_version"] = 0.2
             # Recursively save the topostats object dictionary to the .topostats file
-            dict_to_hdf5(open_hdf5_file=f, group_path="/", dictionary=topostats_object)
+            dict_to_hdf5(
+                open_hdf5_file=f,
+                group_path="/",
+                dictionary=topostats_object,
+                compression=compression,
+                compression_level=compression_level,
+            )
 
         else:
             raise ValueError(
@@ -1024,6 +2154,278 @@ def save_topostats_file(output_dir: Path, filename: str, topostats_object: dict)
             )
 
 
+class BatchContainerWriter:
+    """
+    Write processed images to a single HDF5 batch container through a dedicated writer process.
+
+    Writing one ''.topostats'' file per image creates a large number of small files which is slow on some (e.g.
+    parallel) filesystems. Instead each image is added as a sub-group of ``images`` within one container and a row is
+    appended to the ``index`` table at the root recording the sub-group, filename and path of the image. Only the writer
+    process opens the container, workers send their objects to it over a connection, so no locking is required.
+
+    Use as a context manager, the writer process is started on entry and stops once all images sent to it have been
+    written on exit. Instances only hold the address of the writer process and can be pickled to workers.
+
+    Parameters
+    ----------
+    path : str | Path
+        Path of the container.
+    compression : str | None
+        Lossless compression filter to apply to arrays, either ``gzip`` (default) or ``lzf``. If ``None`` arrays are
+        stored uncompressed.
+    compression_level : int | None
+        Level of ``gzip`` compression (``0-9``), default is ``4``.
+    append : bool
+        Whether to add images to an existing container (e.g. when resuming a run) rather than overwriting it.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        compression: str | None = "gzip",
+        compression_level: int | None = 4,
+        append: bool = False,
+    ) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        path : str | Path
+            Path of the container.
+        compression : str | None
+            Lossless compression filter to apply to arrays, either ``gzip`` (default) or ``lzf``. If ``None`` arrays
+            are stored uncompressed.
+        compression_level : int | None
+            Level of ``gzip`` compression (``0-9``), default is ``4``.
+        append : bool
+            Whether to add images to an existing container (e.g. when resuming a run) rather than overwriting it.
+        """
+        self.path = Path(path)
+        self.compression = compression
+        self.compression_level = compression_level
+        self.append = append
+        self.address = None
+        self._authkey = os.urandom(32)
+        self._process = None
+
+    def __enter__(self) -> BatchContainerWriter:
+        """
+        Start the writer process.
+
+        Returns
+        -------
+        BatchContainerWriter
+            The writer.
+        """
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_run_batch_container_writer,
+            kwargs={
+                "path": self.path,
+                "authkey": self._authkey,
+                "address_connection": sender,
+                "compression": self.compression,
+                "compression_level": self.compression_level,
+                "append": self.append,
+            },
+            daemon=True,
+        )
+        self._process.start()
+        sender.close()
+        try:
+            self.address = receiver.recv()
+        except EOFError as error:
+            self._process.join()
+            raise RuntimeError(f"Batch container writer failed to start, see log for details : {self.path}") from error
+        LOGGER.info(f"Writing processed images to batch container : {self.path}")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """
+        Wait for all images to be written and stop the writer process.
+
+        Parameters
+        ----------
+        *exc_info
+            Details of any exception raised within the context.
+        """
+        try:
+            self.save(None)
+        except (OSError, EOFError):
+            LOGGER.error(f"Batch container writer stopped unexpectedly, images may be missing from : {self.path}")
+        self._process.join()
+        self._process = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        Get the state for pickling, excluding the writer process.
+
+        Returns
+        -------
+        dict[str, Any]
+            State of the object.
+        """
+        state = self.__dict__.copy()
+        state["_process"] = None
+        return state
+
+    def save(self, topostats_object: dict | None) -> None:
+        """
+        Send a topostats dictionary object to the writer process and wait for it to be added to the container.
+
+        Parameters
+        ----------
+        topostats_object : dict | None
+            Dictionary of the topostats data to save, ``None`` stops the writer once all earlier objects are written.
+
+        Raises
+        ------
+        RuntimeError
+            If the writer process failed to add the object to the container.
+        """
+        with Client(self.address, authkey=self._authkey) as connection:
+            connection.send(topostats_object)
+            error = connection.recv()
+        if error is not None:
+            raise RuntimeError(
+                f"[{topostats_object['filename']}] : Failed to add image to batch container {self.path} : {error}"
+            )
+
+
+def _run_batch_container_writer(
+    path: Path,
+    authkey: bytes,
+    address_connection: Connection,
+    compression: str | None,
+    compression_level: int | None,
+    append: bool,
+) -> None:
+    """
+    Write topostats dictionary objects received from workers to a batch container until ``None`` is received.
+
+    Objects are written in the order connections are made. An image with the same ``img_path`` as one already in the
+    container replaces it. Once each object is written ``None`` is sent back over its connection, or a description of
+    the error if it could not be written.
+
+    Parameters
+    ----------
+    path : Path
+        Path of the container.
+    authkey : bytes
+        Authentication key connections must use.
+    address_connection : Connection
+        Connection to send the address of the listener on once the container is ready.
+    compression : str | None
+        Lossless compression filter to apply to arrays.
+    compression_level : int | None
+        Level of ``gzip`` compression (``0-9``).
+    append : bool
+        Whether to add images to an existing container rather than overwriting it.
+    """
+    with h5py.File(path, "a" if append else "w") as open_file, Listener(authkey=authkey) as listener:
+        if BATCH_INDEX_DATASET not in open_file:
+            open_file.create_group(BATCH_IMAGES_GROUP)
+            open_file.create_dataset(BATCH_INDEX_DATASET, shape=(0,), maxshape=(None,), dtype=BATCH_INDEX_DTYPE)
+        keys = {str(img_path): key for key, _, img_path in read_batch_index(open_file)}
+        address_connection.send(listener.address)
+        address_connection.close()
+        while True:
+            with listener.accept() as connection:
+                topostats_object = connection.recv()
+                if topostats_object is None:
+                    connection.send(None)
+                    break
+                # Failures are sent back to the worker saving the image rather than raised here, which would stop the
+                # writer and lose all following images
+                try:
+                    _add_to_batch_container(open_file, keys, topostats_object, compression, compression_level)
+                    connection.send(None)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    connection.send(repr(error))
+    LOGGER.info(f"Batch container written : {path}")
+
+
+def _add_to_batch_container(
+    open_file: h5py.File,
+    keys: dict[str, str],
+    topostats_object: dict,
+    compression: str | None,
+    compression_level: int | None,
+) -> None:
+    """
+    Add a topostats dictionary object to an open batch container.
+
+    The object is written to the ``BATCH_PENDING_GROUP`` sub-group and only moved into place and added to the index once
+    complete, so a failure leaves neither a partially written image nor removes an existing image with the same
+    ``img_path``.
+
+    Parameters
+    ----------
+    open_file : h5py.File
+        The open batch container.
+    keys : dict[str, str]
+        Dictionary of the sub-group of ``images`` of each image in the container keyed by its path, updated with the
+        added image.
+    topostats_object : dict
+        Dictionary of the topostats data to add.
+    compression : str | None
+        Lossless compression filter to apply to arrays.
+    compression_level : int | None
+        Level of ``gzip`` compression (``0-9``).
+    """
+    images = open_file[BATCH_IMAGES_GROUP]
+    if BATCH_PENDING_GROUP in images:
+        del images[BATCH_PENDING_GROUP]
+    try:
+        dict_to_hdf5(
+            open_hdf5_file=open_file,
+            group_path=f"/{BATCH_IMAGES_GROUP}/{BATCH_PENDING_GROUP}/",
+            dictionary=topostats_object,
+            compression=compression,
+            compression_level=compression_level,
+        )
+    except Exception:
+        if BATCH_PENDING_GROUP in images:
+            del images[BATCH_PENDING_GROUP]
+        raise
+    img_path = str(topostats_object["img_path"])
+    if img_path in keys:
+        key = keys[img_path]
+        del images[key]
+        images.move(BATCH_PENDING_GROUP, key)
+    else:
+        key = str(len(keys))
+        images.move(BATCH_PENDING_GROUP, key)
+        # The image is only added to the index once its group is in place
+        index = open_file[BATCH_INDEX_DATASET]
+        index.resize((len(keys) + 1,))
+        index[len(keys)] = (key, str(topostats_object["filename"]), img_path)
+        keys[img_path] = key
+    open_file.flush()
+    LOGGER.debug(f"[{topostats_object['filename']}] : Added to batch container as : {key}")
+
+
+def read_batch_index(open_file: h5py.File) -> list[tuple[str, str, Path]]:
+    """
+    Read the index of a batch container.
+
+    Parameters
+    ----------
+    open_file : h5py.File
+        An open batch container.
+
+    Returns
+    -------
+    list[tuple[str, str, Path]]
+        The name of the sub-group of ``images``, the filename and the path of each image in the container.
+    """
+    return [
+        (key.decode("utf-8"), filename.decode("utf-8"), Path(img_path.decode("utf-8")))
+        for key, filename, img_path in open_file[BATCH_INDEX_DATASET][()]
+    ]
+
+
 def save_pkl(outfile: Path, to_pkl: dict) -> None:
     """
     Pickle objects for working with later.
@@ -14,9 +14,8 @@ import matplotlib.colors
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
-import seaborn as sns
 
-from topostats.io import read_yaml, write_yaml, convert_basename_to_relative_paths
+from topostats.io import convert_basename_to_relative_paths, read_statistics, read_yaml, write_yaml
 from topostats.logs.logs import LOGGER_NAME
 from topostats.utils import update_config
 from topostats.theme import Colormap
@@ -41,7 +40,7 @@ class TopoSum:
     base_dir :  str | Path
         Base directory from which all paths are relative to.
     csv_file :  str | Path
-        CSV file of data to be summarised.
+        CSV file or Parquet dataset of data to be summarised.
     stat_to_sum :  str
         Variable to summarise.
     molecule_id :  str
@@ -105,7 +104,7 @@ class TopoSum:
         base_dir :  str | Path
             Base directory from which all paths are relative to.
         csv_file :  str | Path
-            CSV file of data to be summarised.
+            CSV file or Parquet dataset of data to be summarised.
         stat_to_sum :  str
             Variable to summarise.
         molecule_id :  str
@@ -137,7 +136,7 @@ class TopoSum:
         hue :  str
             Dataframe column to group plots by.
         """
-        self.df = df if df is not None else pd.read_csv(csv_file)
+        self.df = df if df is not None else read_statistics(csv_file)
         self.base_dir = base_dir
         self.stat_to_sum = stat_to_sum
         self.molecule_id = molecule_id
@@ -210,6 +209,8 @@ class TopoSum:
         # are the same, the standard deviation is 0 which results in a ZeroDivisionError with
         # is caught internally but then raises a numpy linalg error.
         # The try/catch is there to catch this error and skip plotting KDEs if all values are the same.
+        # Seaborn is slow to import so is only imported when plotting summaries.
+        import seaborn as sns  # pylint: disable=import-outside-toplevel
 
         fig, ax = self._setup_figure()
 
@@ -262,6 +263,8 @@ for KDE plot being the same. KDE plots cannot be made as there is no variance, s
         fig, ax
             Matplotlib fig and ax objects.
         """
+        import seaborn as sns  # pylint: disable=import-outside-toplevel
+
         fig, ax = self._setup_figure()
         # Determine whether to draw a legend
         legend = "full" if len(self.melted_data[self.hue].unique()) > 1 else False
@@ -332,6 +335,8 @@ for KDE plot being the same. KDE plots cannot be made as there is no variance, s
 
     def set_palette(self):
         """Set the color palette."""
+        import seaborn as sns  # pylint: disable=import-outside-toplevel
+
         sns.set_palette(self.palette)
         LOGGER.debug(f"[plotting] Seaborn color palette : {self.palette}")
 
@@ -381,7 +386,11 @@ def toposum(config: dict) -> dict:
        'ax' for that plot.
     """
     if "df" not in config.keys():
-        config["df"] = pd.read_csv(config["csv_file"])
+        # Only the columns that are summarised are read, which is much quicker for Parquet datasets
+        columns = [config["image_id"], config["molecule_id"], "grain_number", "basename", *config["stats_to_sum"]]
+        if isinstance(config.get("hue"), str):
+            columns.append(config["hue"])
+        config["df"] = read_statistics(config["csv_file"], columns=columns)
     if config["df"].isna().values.all():
         LOGGER.warning("[plotting] No statistics in DataFrame. Exiting...")
         return None
@@ -437,7 +446,7 @@ def run_toposum(args=None) -> None:
         config["var_to_label"] = yaml.safe_load(plotting_yaml)
         LOGGER.debug("[plotting] Default variable to labels mapping loaded.")
     if args.input_csv is not None:
-        config["input_csv"] = args.input_csv
+        config["csv_file"] = args.input_csv
 
     # Write sample configuration if asked to do so and exit
     if args.create_config_file:
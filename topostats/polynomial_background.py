@@ -0,0 +1,449 @@
+"""Fit and evaluate polynomial backgrounds by linear least squares."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from functools import lru_cache, reduce
+
+import numpy as np
+import numpy.typing as npt
+
+from topostats.logs.logs import LOGGER_NAME
+from topostats.tiling import Tile, run_tiles, tile_image
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+# Terms of the "saddle" a + b * x * y - c * x - d * y as (row, col) exponents, i.e. constant, xy, x and y.
+SADDLE_TERMS = ((0, 0), (1, 1), (0, 1), (1, 0))
+
+# Gram matrices are small (terms x terms) so enough are kept for the few image sizes and term sets of a batch.
+GRAM_MATRIX_CACHE_SIZE = 32
+
+# Batches (e.g. the frames of a video) are fitted and have the fit subtracted in chunks of about this many points, so
+# only the float64 copies of a chunk are held at once.
+BATCH_CHUNK_SIZE = 2**22
+
+
+def polynomial_terms(order: int, ndim: int = 2) -> tuple[tuple[int, ...], ...]:
+    """
+    Exponents of every term of a polynomial up to the given total order.
+
+    Parameters
+    ----------
+    order : int
+        Maximum total order of the polynomial, e.g. ``1`` for a plane, ``2`` for a quadratic surface.
+    ndim : int
+        Number of dimensions (coordinates) the polynomial is a function of.
+
+    Returns
+    -------
+    tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term in increasing order, the first term is always the constant.
+    """
+    if order < 0:
+        raise ValueError(f"Polynomial order must be non-negative, got {order}.")
+    terms = [exponents for exponents in itertools.product(range(order + 1), repeat=ndim) if sum(exponents) <= order]
+    return tuple(sorted(terms, key=lambda exponents: (sum(exponents), exponents[::-1])))
+
+
+def _max_exponents(shape: tuple[int, ...], terms: tuple[tuple[int, ...], ...]) -> tuple[int, ...]:
+    """
+    Get the highest exponent of each coordinate over all terms.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...]
+        Shape of the array the polynomial is evaluated over.
+    terms : tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term, one exponent per axis of ``shape``.
+
+    Returns
+    -------
+    tuple[int, ...]
+        The highest exponent of the coordinate of each axis.
+    """
+    for exponents in terms:
+        if len(exponents) != len(shape):
+            raise ValueError(f"Term {exponents} does not have one exponent per axis of shape {shape}.")
+    return tuple(max(exponents) for exponents in zip(*terms))
+
+
+def _term_index(terms: tuple[tuple[int, ...], ...]) -> tuple[npt.NDArray, ...]:
+    """
+    Index of each term in an array with an axis of exponents for each coordinate.
+
+    Parameters
+    ----------
+    terms : tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term.
+
+    Returns
+    -------
+    tuple[npt.NDArray, ...]
+        Array of the exponent of each term for each coordinate.
+    """
+    return tuple(np.array(exponents) for exponents in zip(*terms))
+
+
+def _coordinate_powers(
+    shape: tuple[int, ...], max_exponents: tuple[int, ...], offset: tuple[int, ...] | None = None
+) -> list[npt.NDArray]:
+    """
+    Powers of the coordinates along each axis of an array.
+
+    Coordinates are pixel indices along each axis. A polynomial term evaluated at each pixel is the outer product of
+    the powers of each axis' coordinates, so these few rows replace the ``pixels x terms`` design matrix.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...]
+        Shape of the array.
+    max_exponents : tuple[int, ...]
+        The highest power of the coordinates of each axis.
+    offset : tuple[int, ...] | None
+        Coordinates of the first pixel of the array if it is a region of a larger array, e.g. a band of an image.
+
+    Returns
+    -------
+    list[npt.NDArray]
+        Array for each axis of shape ``(max_exponent + 1, length)``, row ``e`` is the coordinates raised to ``e``.
+    """
+    offset = (0,) * len(shape) if offset is None else offset
+    return [
+        (np.arange(length, dtype=np.float64) + start)[np.newaxis, :] ** np.arange(max_exponent + 1)[:, np.newaxis]
+        for length, start, max_exponent in zip(shape, offset, max_exponents)
+    ]
+
+
+def _apply_along_axes(array: npt.NDArray, matrices: list[npt.NDArray], first_axis: int) -> npt.NDArray:
+    """
+    Multiply each of a run of axes of an array by a matrix, e.g. to sum the values weighted by each coordinate power.
+
+    Parameters
+    ----------
+    array : npt.NDArray
+        Array to transform.
+    matrices : list[npt.NDArray]
+        Matrix for each axis from ``first_axis``, of shape ``(new length, length)``.
+    first_axis : int
+        First axis to transform, earlier (batch) axes are left as they are.
+
+    Returns
+    -------
+    npt.NDArray
+        Array with the length of each transformed axis replaced by the number of rows of its matrix.
+    """
+    for axis, matrix in enumerate(matrices, start=first_axis):
+        array = np.moveaxis(np.tensordot(array, matrix, axes=([axis], [1])), -1, axis)
+    return array
+
+
+def _gram(
+    shape: tuple[int, ...],
+    terms: tuple[tuple[int, ...], ...],
+    weights: npt.NDArray | None = None,
+    offset: tuple[int, ...] | None = None,
+) -> npt.NDArray:
+    """
+    Construct the (weighted) Gram matrix of the polynomial terms evaluated at each pixel of an array.
+
+    Each element is the sum over pixels of the product of two terms, which is itself a term with the exponents added.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...]
+        Shape of the array the polynomial is evaluated over.
+    terms : tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term, one exponent per axis of ``shape``.
+    weights : npt.NDArray | None
+        Weight of each pixel, leading dimensions beyond ``shape`` are treated as a batch. All pixels have a weight of
+        one if ``None``.
+    offset : tuple[int, ...] | None
+        Coordinates of the first pixel of the array if it is a region of a larger array.
+
+    Returns
+    -------
+    npt.NDArray
+        Array of the batch shape of ``weights`` followed by ``(len(terms), len(terms))``.
+    """
+    powers = _coordinate_powers(shape, tuple(2 * exponent for exponent in _max_exponents(shape, terms)), offset)
+    if weights is None:
+        # Sums over every pixel are the products of the sums along each axis
+        sums = reduce(np.multiply.outer, [axis_powers.sum(axis=1) for axis_powers in powers])
+    else:
+        sums = _apply_along_axes(weights, powers, weights.ndim - len(shape))
+    term_index = _term_index(terms)
+    return sums[(..., *(index[:, np.newaxis] + index[np.newaxis, :] for index in term_index))]
+
+
+@lru_cache(maxsize=GRAM_MATRIX_CACHE_SIZE)
+def gram_matrix(shape: tuple[int, ...], terms: tuple[tuple[int, ...], ...]) -> npt.NDArray:
+    """
+    Construct the Gram matrix (X^T X) of the design matrix X of polynomial terms evaluated at each pixel of an array.
+
+    Coordinates are pixel indices along each axis. Results are cached by shape and terms so the matrix is built once
+    for all unmasked images of the same size; the returned array is read-only as it is shared between callers. The
+    design matrix itself is never constructed.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...]
+        Shape of the array the polynomial is evaluated over.
+    terms : tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term, one exponent per axis of ``shape``.
+
+    Returns
+    -------
+    npt.NDArray
+        Array of shape ``(len(terms), len(terms))``.
+    """
+    gram = _gram(shape, terms)
+    gram.flags.writeable = False
+    return gram
+
+
+def fit_polynomial(
+    data: npt.NDArray,
+    terms: tuple[tuple[int, ...], ...],
+    mask: npt.NDArray | None = None,
+    tile_size: int | None = None,
+    cores: int = 1,
+) -> npt.NDArray:
+    """
+    Fit a polynomial to an array by linear least squares.
+
+    Points that are masked or NaN are excluded from the fit. If no points remain the coefficients are all NaN. If
+    ``data`` has more dimensions than the terms have coordinates the leading dimensions are treated as a batch (e.g. the
+    frames of a video) and a polynomial is fitted to each array in the batch.
+
+    Parameters
+    ----------
+    data : npt.NDArray
+        Array of values to fit, of any dimension.
+    terms : tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term, see ``polynomial_terms()``.
+    mask : npt.NDArray | None
+        Boolean array of points to mask (ignore), should have the same shape as ``data``.
+    tile_size : int | None
+        If given, arrays with more rows than this are fitted in bands of ``tile_size`` rows so that only one band per
+        core is copied at once. Not used for batches.
+    cores : int
+        Number of threads fitting bands.
+
+    Returns
+    -------
+    npt.NDArray
+        Coefficient of each term, with the shape of any batch dimensions followed by the number of terms.
+    """
+    if data.ndim > len(terms[0]):
+        return np.concatenate(
+            [
+                _solve_normal_equations(*_normal_equations(data[chunk], terms, None if mask is None else mask[chunk]))
+                for chunk in _batch_chunks(data.shape)
+            ]
+        )
+    if tile_size is not None and data.shape[0] > tile_size:
+        # The normal equations are sums over points, so those of each band add up to those of the whole array
+        bands = tile_image(data.shape, (tile_size,) + (None,) * (data.ndim - 1))
+        gram, moments, count = (
+            sum(parts)
+            for parts in zip(
+                *run_tiles(
+                    lambda band: _normal_equations(
+                        data[band.inner],
+                        terms,
+                        None if mask is None else mask[band.inner],
+                        offset=tuple(axis.start for axis in band.inner),
+                    ),
+                    bands,
+                    cores,
+                )
+            )
+        )
+    else:
+        gram, moments, count = _normal_equations(data, terms, mask)
+    return _solve_normal_equations(gram, moments, count)
+
+
+def _batch_chunks(shape: tuple[int, ...]) -> list[slice]:
+    """
+    Split the first axis of a batch into chunks of about ``BATCH_CHUNK_SIZE`` points.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...]
+        Shape of the batch.
+
+    Returns
+    -------
+    list[slice]
+        Slices of the first axis of each chunk, each at least one array of the batch.
+    """
+    step = max(1, BATCH_CHUNK_SIZE // int(np.prod(shape[1:])))
+    return [slice(start, start + step) for start in range(0, shape[0], step)]
+
+
+def _solve_normal_equations(gram: npt.NDArray, moments: npt.NDArray, count: npt.NDArray | int) -> npt.NDArray:
+    """
+    Solve the normal equations of a least squares fit.
+
+    The (small) normal equations are solved with the columns scaled to unit norm to improve the conditioning of higher
+    order terms. Leading dimensions are a batch, each is solved.
+
+    Parameters
+    ----------
+    gram : npt.NDArray
+        The Gram matrix of the design matrix, shared by every fit of a batch if it has no batch dimensions.
+    moments : npt.NDArray
+        The moments of the data.
+    count : npt.NDArray | int
+        The number of points fitted, the coefficients of fits to no points are NaN.
+
+    Returns
+    -------
+    npt.NDArray
+        Coefficient of each term, with the shape of any batch dimensions followed by the number of terms.
+    """
+    scale = np.sqrt(np.diagonal(gram, axis1=-2, axis2=-1))
+    scale = np.where(scale == 0, 1.0, scale)
+    scaled_gram = gram / (scale[..., :, np.newaxis] * scale[..., np.newaxis, :])
+    coefficients = (np.linalg.pinv(scaled_gram) @ (moments / scale)[..., np.newaxis])[..., 0] / scale
+    return np.where(np.asarray(count)[..., np.newaxis] == 0, np.nan, coefficients)
+
+
+def _normal_equations(
+    data: npt.NDArray,
+    terms: tuple[tuple[int, ...], ...],
+    mask: npt.NDArray | None = None,
+    offset: tuple[int, ...] | None = None,
+) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray | int]:
+    """
+    Form the normal equations of a least squares polynomial fit to an array.
+
+    Parameters
+    ----------
+    data : npt.NDArray
+        Array of values to fit, leading dimensions beyond those of the terms are treated as a batch.
+    terms : tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term, see ``polynomial_terms()``.
+    mask : npt.NDArray | None
+        Boolean array of points to mask (ignore), should have the same shape as ``data``.
+    offset : tuple[int, ...] | None
+        Coordinates of the first point of ``data`` if it is a region of a larger array, the Gram matrix of a region is
+        not cached.
+
+    Returns
+    -------
+    tuple[npt.NDArray, npt.NDArray, npt.NDArray | int]
+        The Gram matrix of the design matrix, the moments of the data and the number of points fitted, each with the
+        batch dimensions of ``data``.
+    """
+    shape = data.shape[data.ndim - len(terms[0]) :]
+    batch_ndim = data.ndim - len(shape)
+    values = np.asarray(data, dtype=np.float64)
+    valid = ~np.isnan(values)
+    if mask is not None:
+        valid &= ~np.asarray(mask, dtype=bool)
+    if valid.all():
+        gram = gram_matrix(shape, terms) if offset is None else _gram(shape, terms, offset=offset)
+    else:
+        values = np.where(valid, values, 0.0)
+        gram = _gram(shape, terms, weights=valid, offset=offset)
+    powers = _coordinate_powers(shape, _max_exponents(shape, terms), offset)
+    moments = _apply_along_axes(values, powers, batch_ndim)[(..., *_term_index(terms))]
+    count = valid.sum(axis=tuple(range(batch_ndim, data.ndim)))
+    return gram, moments, count
+
+
+def evaluate_polynomial(
+    shape: tuple[int, ...],
+    terms: tuple[tuple[int, ...], ...],
+    coefficients: npt.NDArray,
+    offset: tuple[int, ...] | None = None,
+) -> npt.NDArray:
+    """
+    Evaluate a polynomial at each pixel of an array of the given shape.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...]
+        Shape of the array to evaluate the polynomial over.
+    terms : tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term, see ``polynomial_terms()``.
+    coefficients : npt.NDArray
+        Coefficient of each term, as returned by ``fit_polynomial()``. Leading dimensions are treated as a batch and a
+        polynomial is evaluated for each.
+    offset : tuple[int, ...] | None
+        Coordinates of the first pixel if the array is a region of a larger array, e.g. a band of an image.
+
+    Returns
+    -------
+    npt.NDArray
+        Array of the batch shape followed by the given shape with the polynomial evaluated at each pixel.
+    """
+    shape = tuple(shape)
+    max_exponents = _max_exponents(shape, terms)
+    # Coefficients arranged by the exponent of each coordinate, the polynomial is then a product along each axis
+    tensor = np.zeros((*coefficients.shape[:-1], *(exponent + 1 for exponent in max_exponents)))
+    tensor[(..., *_term_index(terms))] = coefficients
+    powers = _coordinate_powers(shape, max_exponents, offset)
+    return _apply_along_axes(tensor, [axis_powers.T for axis_powers in powers], coefficients.ndim - 1)
+
+
+def remove_polynomial(
+    data: npt.NDArray,
+    terms: tuple[tuple[int, ...], ...],
+    mask: npt.NDArray | None = None,
+    copy: bool = True,
+    tile_size: int | None = None,
+    cores: int = 1,
+) -> tuple[npt.NDArray, npt.NDArray]:
+    """
+    Fit a polynomial to an array and subtract it.
+
+    Parameters
+    ----------
+    data : npt.NDArray
+        Array of values to remove the polynomial background from, leading dimensions beyond those of the terms are
+        treated as a batch and a polynomial is fitted to and removed from each.
+    terms : tuple[tuple[int, ...], ...]
+        Exponents of each coordinate for each term, see ``polynomial_terms()``.
+    mask : npt.NDArray | None
+        Boolean array of points to mask (ignore) when fitting, the fit is subtracted from all points.
+    copy : bool
+        Whether to subtract the fit from a copy of the data, if ``False`` the data is modified in place.
+    tile_size : int | None
+        If given, arrays with more rows than this are fitted and have the fit subtracted in bands of ``tile_size`` rows,
+        see ``fit_polynomial()``.
+    cores : int
+        Number of threads processing bands.
+
+    Returns
+    -------
+    tuple[npt.NDArray, npt.NDArray]
+        Array with the fitted polynomial subtracted and the coefficient of each term.
+    """
+    coefficients = fit_polynomial(data, terms, mask, tile_size=tile_size, cores=cores)
+    shape = data.shape[data.ndim - len(terms[0]) :]
+    if data.ndim > len(shape):
+        result = data.copy() if copy else data
+        for chunk in _batch_chunks(data.shape):
+            result[chunk] -= evaluate_polynomial(shape, terms, coefficients[chunk]).astype(result.dtype, copy=False)
+        return result, coefficients
+    if tile_size is not None and data.shape[0] > tile_size:
+        result = data.copy() if copy else data
+
+        def _subtract_band(band: Tile) -> None:
+            offset = tuple(axis.start for axis in band.inner)
+            background = evaluate_polynomial(result[band.inner].shape, terms, coefficients, offset=offset)
+            result[band.inner] -= background.astype(result.dtype, copy=False)
+
+        run_tiles(_subtract_band, tile_image(data.shape, (tile_size,) + (None,) * (data.ndim - 1)), cores)
+        return result, coefficients
+    # Subtracting the (float64) background should not change the precision of the data
+    background = evaluate_polynomial(shape, terms, coefficients).astype(data.dtype, copy=False)
+    if copy:
+        return data - background, coefficients
+    data -= background
+    return data, coefficients
@@ -0,0 +1,193 @@
+"""Quick-look previews of scans, filtering and finding grains on a downsampled image."""
+
+from __future__ import annotations
+
+import logging
+from copy import deepcopy
+from pathlib import Path
+
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import numpy as np
+import numpy.typing as npt
+from skimage.segmentation import find_boundaries
+
+from topostats.filters import Filters
+from topostats.grains import Grains
+from topostats.io import get_out_path
+from topostats.logs.logs import LOGGER_NAME
+from topostats.plottingfuncs import load_mplstyle
+from topostats.theme import Colormap
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+
+def build_pyramid(image: npt.NDArray, max_size: int) -> list[npt.NDArray]:
+    """
+    Build a pyramid of an image, halving its size at each level until it is no larger than the maximum size.
+
+    Each pixel of a level is the mean of a block of 2x2 pixels of the level below, so heights are preserved and the
+    size of a pixel doubles at each level. An odd row or column at the bottom or right edge is dropped.
+
+    Parameters
+    ----------
+    image : npt.NDArray
+        2-D image to build the pyramid of.
+    max_size : int
+        Largest number of rows or columns of the top level of the pyramid.
+
+    Returns
+    -------
+    list[npt.NDArray]
+        Levels of the pyramid, the first being the image itself, each half the size of the one before.
+    """
+    pyramid = [image]
+    while max(pyramid[-1].shape) > max_size and min(pyramid[-1].shape) >= 2:
+        level = pyramid[-1]
+        rows, cols = level.shape[0] // 2, level.shape[1] // 2
+        pyramid.append(level[: rows * 2, : cols * 2].reshape(rows, 2, cols, 2).mean(axis=(1, 3)))
+    return pyramid
+
+
+def scale_filter_config(filter_config: dict, factor: int) -> dict:
+    """
+    Scale the options of the filter configuration given in pixels to pixels larger by a factor.
+
+    Parameters
+    ----------
+    filter_config : dict
+        Dictionary of configuration for the Filters class.
+    factor : int
+        Factor by which the size of the pixels is increased.
+
+    Returns
+    -------
+    dict
+        A copy of the configuration with the Gaussian blur and scar sizes scaled to the larger pixels.
+    """
+    filter_config = deepcopy(filter_config)
+    filter_config["gaussian_size"] = filter_config["gaussian_size"] / factor
+    for option in ("max_scar_width", "min_scar_length"):
+        filter_config["remove_scars"][option] = max(1, round(filter_config["remove_scars"][option] / factor))
+    return filter_config
+
+
+def save_thumbnail(
+    image: npt.NDArray,
+    outpath: Path,
+    grains: npt.NDArray | None = None,
+    cmap: str | None = None,
+    mask_cmap: str = "blue_purple_green",
+    zrange: list | None = None,
+) -> None:
+    """
+    Save an image as a thumbnail, outlining any grains.
+
+    Parameters
+    ----------
+    image : npt.NDArray
+        2-D image to save.
+    outpath : Path
+        Path of the thumbnail, the format is taken from the suffix.
+    grains : npt.NDArray | None
+        Optional labelled 2-D array of grains, whose boundaries are drawn over the image.
+    cmap : str | None
+        Colormap of the image, if ``None`` the default colormap of the matplotlib style is used.
+    mask_cmap : str
+        Colormap the colour of the grain boundaries is taken from.
+    zrange : list | None
+        Low and high heights of the colormap, ``None`` for either uses the minimum or maximum of the image.
+    """
+    cmap = mpl.rcParams["image.cmap"] if cmap is None else cmap
+    low, high = zrange if zrange is not None else (None, None)
+    normalise = mpl.colors.Normalize(
+        vmin=np.nanmin(image) if low is None else low, vmax=np.nanmax(image) if high is None else high
+    )
+    thumbnail = Colormap(cmap).get_cmap()(normalise(image))
+    if grains is not None:
+        thumbnail[find_boundaries(grains, mode="inner")] = Colormap(mask_cmap).get_cmap()(1.0)
+    outpath.parent.mkdir(parents=True, exist_ok=True)
+    plt.imsave(outpath, thumbnail)
+
+
+def preview_scan(
+    topostats_object: dict,
+    base_dir: str | Path,
+    filter_config: dict,
+    grains_config: dict | None,
+    plotting_config: dict,
+    preview_size: int = 512,
+    output_dir: str | Path = "output",
+) -> tuple[str, dict]:
+    """
+    Filter and find grains on a downsampled image of a scan, giving approximate grain counts and a thumbnail.
+
+    The image is downsampled through a pyramid until it is no larger than ``preview_size``. The pixel to nanometre
+    scaling is increased to match, so area thresholds given in nanometres squared apply to the downsampled image, and
+    the options given in pixels (the Gaussian blur, scar sizes and the smallest grains that are kept) are scaled down.
+    Height thresholds are unchanged as downsampling preserves heights. The thumbnail is saved under ``preview`` in the
+    output directory.
+
+    Parameters
+    ----------
+    topostats_object : dict
+        A dictionary with keys 'image_original', 'img_path', 'filename' and 'pixel_to_nm_scaling' of a scan.
+    base_dir : str | Path
+        Directory files were found in, the output directory mirrors its structure.
+    filter_config : dict
+        Dictionary of configuration for the Filters class.
+    grains_config : dict | None
+        Dictionary of configuration for the Grains class, if ``None`` or not run only filtering is previewed.
+    plotting_config : dict
+        Dictionary of configuration options for plotting, only 'style', 'cmap', 'mask_cmap' and 'zrange' are used.
+    preview_size : int
+        Largest number of rows or columns of the downsampled image.
+    output_dir : str | Path
+        Directory to save the thumbnail under.
+
+    Returns
+    -------
+    tuple[str, dict]
+        The name of the image and a dictionary of the pyramid level, pixel to nanometre scaling and the number of
+        grains found in each direction.
+    """
+    filename = topostats_object["filename"]
+    pyramid = build_pyramid(topostats_object["image_original"], preview_size)
+    factor = 2 ** (len(pyramid) - 1)
+    pixel_to_nm_scaling = float(topostats_object["pixel_to_nm_scaling"]) * factor
+    result = {"pyramid_level": len(pyramid) - 1, "pixel_to_nm_scaling": pixel_to_nm_scaling}
+    LOGGER.info(f"[{filename}] : Previewing at {pyramid[-1].shape} ({pixel_to_nm_scaling:.3f} nm/px).")
+
+    filter_config = scale_filter_config(filter_config, factor)
+    filter_config.pop("run")
+    filter_config["lean_memory"] = True
+    filters = Filters(image=pyramid[-1], filename=filename, pixel_to_nm_scaling=pixel_to_nm_scaling, **filter_config)
+    filters.filter_image()
+    image = filters.images["gaussian_filtered"]
+
+    grain_mask = None
+    if grains_config is not None and grains_config["run"]:
+        grains_config = deepcopy(grains_config)
+        grains_config.pop("run")
+        grains = Grains(image=image, filename=filename, pixel_to_nm_scaling=pixel_to_nm_scaling, **grains_config)
+        # The smallest grains the rest of the pipeline can process shrink with the image
+        grains.minimum_grain_size_px = max(1, round(grains.minimum_grain_size_px / factor**2))
+        grains.minimum_bbox_size_px = max(1, round(grains.minimum_bbox_size_px / factor))
+        grains.find_grains()
+        grain_mask = np.zeros(image.shape, dtype=np.int32)
+        for direction, images in grains.directions.items():
+            labelled = images["labelled_regions_02"][:, :, 1]
+            result[f"grains_{direction}"] = int(labelled.max())
+            grain_mask = np.where(labelled > 0, labelled + grain_mask.max(), grain_mask)
+            LOGGER.info(f"[{filename}] : Approximate number of grains ({direction}) : {result[f'grains_{direction}']}")
+
+    load_mplstyle(plotting_config["style"])
+    save_thumbnail(
+        image,
+        outpath=get_out_path(topostats_object["img_path"], base_dir, output_dir).parent / "preview" / f"{filename}.png",
+        grains=grain_mask,
+        cmap=plotting_config["cmap"],
+        mask_cmap=plotting_config["mask_cmap"],
+        zrange=plotting_config["zrange"],
+    )
+    return filename, result
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import logging
 from collections import defaultdict
+from collections.abc import Callable
+from copy import deepcopy
 from pathlib import Path
 
 import numpy as np
@@ -12,10 +14,12 @@ import pandas as pd
 from art import tprint
 
 from topostats import __version__
+from topostats.cache import CACHED_STAGES, StageCache, hash_input, run_stage
 from topostats.filters import Filters
+from topostats.grain_crops import crop_grain_masks
 from topostats.grains import Grains
 from topostats.grainstats import GrainStats
-from topostats.io import get_out_path, save_topostats_file
+from topostats.io import LoadScans, get_out_path, save_topostats_file
 from topostats.logs.logs import LOGGER_NAME
 from topostats.measure.curvature import calculate_curvature_stats_image
 from topostats.plotting import plot_crossing_linetrace_halfmax
@@ -44,6 +48,9 @@ from topostats.utils import create_empty_dataframe
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 
+# Largest number of pixels of a video filtered as one stack, each step of filtering makes a few copies of the stack
+FRAME_CHUNK_SIZE = 2**23
+
 
 def run_filters(
     unprocessed_image: npt.NDArray,
@@ -53,6 +60,7 @@ def run_filters(
     core_out_path: Path,
     filter_config: dict,
     plotting_config: dict,
+    filtered_images: dict | None = None,
 ) -> npt.NDArray | None:
     """
     Filter and flatten an image. Optionally plots the results, returning the flattened image.
@@ -74,6 +82,9 @@ def run_filters(
         Dictionary of configuration for the Filters class to use when initialised.
     plotting_config : dict
         Dictionary of configuration for plotting output images.
+    filtered_images : dict | None
+        Images of the filtering stage if the image has already been filtered (e.g. with the other frames of a video by
+        ''filter_frames()''), these are plotted and returned rather than filtering the image again.
 
     Returns
     -------
@@ -91,7 +102,12 @@ def run_filters(
             pixel_to_nm_scaling=pixel_to_nm_scaling,
             **filter_config,
         )
-        filters.filter_image()
+        if filtered_images is None:
+            filters.filter_image()
+        else:
+            LOGGER.debug(f"[{filename}] : Image filtered with the other frames of its video.")
+            # Only the images made when filtering the frame are kept (e.g. a warm started frame has no first pass)
+            filters.images = {name: filtered_images[name] for name in filters.images if name in filtered_images}
         # Optionally plot filter stage
         if plotting_config["run"]:
             plotting_config.pop("run")
@@ -99,6 +115,8 @@ def run_filters(
             if plotting_config["image_set"] == "all":
                 filter_out_path.mkdir(parents=True, exist_ok=True)
                 LOGGER.debug(f"[{filename}] : Target filter directory created : {filter_out_path}")
+                if filters.lean_memory:
+                    LOGGER.info(f"[{filename}] : Lean memory mode, intermediate filtering images are not plotted.")
             # Generate plots
             for plot_name, array in filters.images.items():
                 if plot_name not in ["scan_raw"]:
@@ -260,6 +278,7 @@ def run_grainstats(
     grainstats_config: dict,
     plotting_config: dict,
     grain_out_path: Path,
+    grain_crops: dict | None = None,
 ) -> pd.DataFrame:
     """
     Calculate grain statistics for an image and optionally plots the results.
@@ -284,6 +303,9 @@ def run_grainstats(
         Dictionary of configuration for plotting images.
     grain_out_path : Path
         Directory to save optional grain statistics visual information to.
+    grain_crops : dict | None
+        Dictionary of crops of the grains of each direction's mask, see ``crop_grain_masks()``. If ``None`` grains are
+        cropped from the masks.
 
     Returns
     -------
@@ -328,6 +350,7 @@ def run_grainstats(
                         base_output_dir=grain_out_path,
                         image_name=filename,
                         plot_opts=grain_plot_dict,
+                        grain_crops=None if grain_crops is None else grain_crops[direction],
                         **grainstats_config,
                     )
                     grainstats_dict[direction], grains_plot_data, height_profiles_dict[direction] = (
@@ -387,6 +410,7 @@ def run_disordered_tracing(
     disordered_tracing_config: dict,
     plotting_config: dict,
     grainstats_df: pd.DataFrame = None,
+    grain_crops: dict | None = None,
 ) -> dict:
     """
     Skeletonise and prune grains, adding results to statistics data frames and optionally plot results.
@@ -414,6 +438,9 @@ def run_disordered_tracing(
         Dictionary configuration for plotting images.
     grainstats_df : pd.DataFrame | None
         The grain statistics dataframe to be added to. This optional argument defaults to `None` in which case an empty grainstats dataframe is created.
+    grain_crops : dict | None
+        Dictionary of crops of the grains of each direction's mask, see ``crop_grain_masks()``. If ``None`` grains are
+        cropped from the masks.
 
     Returns
     -------
@@ -452,6 +479,7 @@ def run_disordered_tracing(
                     grains_mask=dna_class_mask,
                     filename=filename,
                     pixel_to_nm_scaling=pixel_to_nm_scaling,
+                    grain_crops=None if grain_crops is None else grain_crops[direction],
                     **disordered_tracing_config,
                 )
                 # save per image new grainstats stats
@@ -1002,6 +1030,25 @@ def run_curvature_stats(
     return None
 
 
+def _run_ordered_tracing_with_nodestats(nodestats_data: dict, **kwargs) -> tuple:
+    """
+    Run ordered tracing also returning the NodeStats data, which ordered tracing modifies.
+
+    Parameters
+    ----------
+    nodestats_data : dict
+        Dictionary of images and statistics from the NodeStats analysis. Result from "run_nodestats".
+    **kwargs
+        Keyword arguments passed to ``run_ordered_tracing()``.
+
+    Returns
+    -------
+    tuple
+        The results of ``run_ordered_tracing()`` followed by the NodeStats data.
+    """
+    return (*run_ordered_tracing(nodestats_data=nodestats_data, **kwargs), nodestats_data)
+
+
 def get_out_paths(
     image_path: Path, base_dir: Path, output_dir: Path, filename: str, plotting_config: dict, grain_dirs: bool = True
 ):
@@ -1063,6 +1110,8 @@ def process_scan(
     curvature_config: dict,
     plotting_config: dict,
     output_dir: str | Path = "output",
+    topostats_file_config: dict | None = None,
+    cache_config: dict | None = None,
 ) -> tuple[dict, pd.DataFrame, dict]:
     """
     Process a single image, filtering, finding grains and calculating their statistics.
@@ -1095,6 +1144,12 @@ def process_scan(
     output_dir : str | Path
         Directory to save output to, it will be created if it does not exist. If it already exists then it is possible
         that output will be over-written.
+    topostats_file_config : dict | None
+        Dictionary of configuration options for saving ''.topostats'' files (e.g. compression), if ''None'' the defaults
+        of ''save_topostats_file()'' are used.
+    cache_config : dict | None
+        Dictionary of configuration options for caching the output of each stage, if ''None'' or not enabled every
+        stage is run. Plots are not regenerated for stages whose output is retrieved from the cache.
 
     Returns
     -------
@@ -1111,9 +1166,31 @@ def process_scan(
     )
 
     plotting_config = add_pixel_to_nm_to_plotting_config(plotting_config, topostats_object["pixel_to_nm_scaling"])
+    warm_start = topostats_object.pop("warm_start", None)
+
+    # Cache keys have to be derived before running any stages as they modify their configuration
+    if cache_config is not None and cache_config["run"]:
+        cache = StageCache(cache_dir=cache_config["cache_dir"], max_size_gb=cache_config["max_size_gb"])
+        stage_keys = cache.stage_keys(
+            input_hash=_hash_frame(topostats_object),
+            configs={
+                "filter": _filter_cache_config(filter_config, warm_start),
+                "grains": grains_config,
+                "grainstats": grainstats_config,
+                "disordered_tracing": disordered_tracing_config,
+                "nodestats": nodestats_config,
+                "ordered_tracing": ordered_tracing_config,
+                "splining": splining_config,
+            },
+        )
+    else:
+        cache, stage_keys = None, dict.fromkeys(CACHED_STAGES)
 
     # Flatten Image
-    image = run_filters(
+    image = run_stage(
+        cache,
+        stage_keys["filter"],
+        run_filters,
         unprocessed_image=topostats_object["image_original"],
         pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
         filename=topostats_object["filename"],
@@ -1121,12 +1198,16 @@ def process_scan(
         core_out_path=core_out_path,
         filter_config=filter_config,
         plotting_config=plotting_config,
+        filtered_images=topostats_object.pop("filtered_images", None),
     )
     # Use flattened image if one is returned, else use original image
     topostats_object["image"] = image if image is not None else topostats_object["image_original"]
 
     # Find Grains :
-    grain_masks = run_grains(
+    grain_masks = run_stage(
+        cache,
+        stage_keys["grains"],
+        run_grains,
         image=topostats_object["image"],
         pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
         filename=topostats_object["filename"],
@@ -1141,8 +1222,13 @@ def process_scan(
     topostats_object["grain_masks"] = grain_masks if grain_masks is not None else topostats_object["grain_masks"]
 
     if "above" in topostats_object["grain_masks"].keys() or "below" in topostats_object["grain_masks"].keys():
+        # Grains are cropped once and the crops shared by the stages that process grains individually
+        grain_crops = crop_grain_masks(topostats_object["grain_masks"])
         # Grainstats :
-        grainstats_df, height_profiles = run_grainstats(
+        grainstats_df, height_profiles = run_stage(
+            cache,
+            stage_keys["grainstats"],
+            run_grainstats,
             image=topostats_object["image"],
             pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
             grain_masks=topostats_object["grain_masks"],
@@ -1151,11 +1237,15 @@ def process_scan(
             grainstats_config=grainstats_config,
             plotting_config=plotting_config,
             grain_out_path=grain_out_path,
+            grain_crops=grain_crops,
         )
         topostats_object["height_profiles"] = height_profiles
 
         # Disordered Tracing
-        disordered_traces_data, grainstats_df, disordered_tracing_stats = run_disordered_tracing(
+        disordered_traces_data, grainstats_df, disordered_tracing_stats = run_stage(
+            cache,
+            stage_keys["disordered_tracing"],
+            run_disordered_tracing,
             image=topostats_object["image"],
             grain_masks=topostats_object["grain_masks"],
             pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
@@ -1166,11 +1256,15 @@ def process_scan(
             disordered_tracing_config=disordered_tracing_config,
             grainstats_df=grainstats_df,
             plotting_config=plotting_config,
+            grain_crops=grain_crops,
         )
         topostats_object["disordered_traces"] = disordered_traces_data
 
         # Nodestats
-        nodestats, grainstats_df = run_nodestats(
+        nodestats, grainstats_df = run_stage(
+            cache,
+            stage_keys["nodestats"],
+            run_nodestats,
             image=topostats_object["image"],
             disordered_tracing_data=topostats_object["disordered_traces"],
             pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
@@ -1183,7 +1277,11 @@ def process_scan(
         )
 
         # Ordered Tracing
-        ordered_tracing, grainstats_df, molstats_df = run_ordered_tracing(
+        # Ordered tracing adds to the NodeStats data so the two are cached together
+        ordered_tracing, grainstats_df, molstats_df, nodestats = run_stage(
+            cache,
+            stage_keys["ordered_tracing"],
+            _run_ordered_tracing_with_nodestats,
             image=topostats_object["image"],
             disordered_tracing_data=topostats_object["disordered_traces"],
             nodestats_data=nodestats,
@@ -1199,7 +1297,10 @@ def process_scan(
         topostats_object["nodestats"] = nodestats  # looks weird but ordered adds an extra field
 
         # splining
-        splined_data, grainstats_df, molstats_df = run_splining(
+        splined_data, grainstats_df, molstats_df = run_stage(
+            cache,
+            stage_keys["splining"],
+            run_splining,
             image=topostats_object["image"],
             ordered_tracing_data=topostats_object["ordered_traces"],
             pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
@@ -1250,9 +1351,16 @@ def process_scan(
     )
 
     # Save the topostats dictionary object to .topostats file.
-    save_topostats_file(
-        output_dir=core_out_path, filename=str(topostats_object["filename"]), topostats_object=topostats_object
-    )
+    try:
+        save_topostats_file(
+            output_dir=core_out_path,
+            filename=str(topostats_object["filename"]),
+            topostats_object=topostats_object,
+            **(topostats_file_config if topostats_file_config is not None else {}),
+        )
+    except RuntimeError as e:
+        # Raised when the image could not be added to the batch container, the statistics are still valid
+        LOGGER.error(f"[{topostats_object['filename']}] : Saving the processed image failed.", exc_info=e)
 
     return (
         topostats_object["img_path"],
@@ -1270,6 +1378,7 @@ def process_filters(
     filter_config: dict,
     plotting_config: dict,
     output_dir: str | Path = "output",
+    topostats_file_config: dict | None = None,
 ) -> tuple[str, bool]:
     """
     Filter an image return the flattened images and save to ''.topostats''.
@@ -1291,6 +1400,9 @@ def process_filters(
     output_dir : str | Path
         Directory to save output to, it will be created if it does not exist. If it already exists then it is possible
         that output will be over-written.
+    topostats_file_config : dict | None
+        Dictionary of configuration options for saving ''.topostats'' files (e.g. compression), if ''None'' the defaults
+        of ''save_topostats_file()'' are used.
 
     Returns
     -------
@@ -1318,13 +1430,18 @@ def process_filters(
             core_out_path=core_out_path,
             filter_config=filter_config,
             plotting_config=plotting_config,
+            filtered_images=topostats_object.pop("filtered_images", None),
         )
+        topostats_object.pop("warm_start", None)
         # Use flattened image if one is returned, else use original image
         topostats_object["image"] = image if image is not None else topostats_object["image_original"]
 
         # Save the topostats dictionary object to .topostats file.
         save_topostats_file(
-            output_dir=core_out_path, filename=str(topostats_object["filename"]), topostats_object=topostats_object
+            output_dir=core_out_path,
+            filename=str(topostats_object["filename"]),
+            topostats_object=topostats_object,
+            **(topostats_file_config if topostats_file_config is not None else {}),
         )
         return (topostats_object["filename"], True)
     except:  # noqa: E722  # pylint: disable=bare-except
@@ -1338,6 +1455,7 @@ def process_grains(
     grains_config: dict,
     plotting_config: dict,
     output_dir: str | Path = "output",
+    topostats_file_config: dict | None = None,
 ) -> tuple[str, bool]:
     """
     Detect grains in flattened images and save to ''.topostats''.
@@ -1359,6 +1477,9 @@ def process_grains(
     output_dir : str | Path
         Directory to save output to, it will be created if it does not exist. If it already exists then it is possible
         that output will be over-written.
+    topostats_file_config : dict | None
+        Dictionary of configuration options for saving ''.topostats'' files (e.g. compression), if ''None'' the defaults
+        of ''save_topostats_file()'' are used.
 
     Returns
     -------
@@ -1389,7 +1510,10 @@ def process_grains(
         topostats_object["grain_masks"] = grain_masks if grain_masks is not None else topostats_object["grain_masks"]
         # Save the topostats dictionary object to .topostats file.
         save_topostats_file(
-            output_dir=core_out_path, filename=str(topostats_object["filename"]), topostats_object=topostats_object
+            output_dir=core_out_path,
+            filename=str(topostats_object["filename"]),
+            topostats_object=topostats_object,
+            **(topostats_file_config if topostats_file_config is not None else {}),
         )
         return (topostats_object["filename"], True)
     except:  # noqa: E722  # pylint: disable=bare-except
@@ -1403,6 +1527,7 @@ def process_grainstats(
     grainstats_config: dict,
     plotting_config: dict,
     output_dir: str | Path = "output",
+    topostats_file_config: dict | None = None,
 ) -> tuple[str, bool]:
     """
     Calculate grain statistics in an image where grains have already been detected.
@@ -1424,6 +1549,9 @@ def process_grainstats(
     output_dir : str | Path
         Directory to save output to, it will be created if it does not exist. If it already exists then it is possible
         that output will be over-written.
+    topostats_file_config : dict | None
+        Dictionary of configuration options for saving ''.topostats'' files (e.g. compression), if ''None'' the defaults
+        of ''save_topostats_file()'' are used.
 
     Returns
     -------
@@ -1456,7 +1584,10 @@ def process_grainstats(
         # Save the topostats dictionary object to .topostats file.
         topostats_object["height_profiles"] = height_profiles
         save_topostats_file(
-            output_dir=core_out_path, filename=str(topostats_object["filename"]), topostats_object=topostats_object
+            output_dir=core_out_path,
+            filename=str(topostats_object["filename"]),
+            topostats_object=topostats_object,
+            **(topostats_file_config if topostats_file_config is not None else {}),
         )
         return (topostats_object["filename"], grainstats_df, height_profiles)
     return (
@@ -1469,6 +1600,317 @@ def process_grainstats(
     #     return (create_empty_dataframe(column_set="grainstats", index_col="grain_number"), False)
 
 
+def load_and_process(
+    img_path: Path,
+    processing_function: Callable,
+    loading_config: dict,
+    skip: Callable | None = None,
+    precision: str = "float64",
+    stack_filter: Callable | None = None,
+) -> list[tuple]:
+    """
+    Load a scan from disk and process each image it contains.
+
+    Used when scans are loaded lazily so that the parent process only passes the path to a worker which then decodes
+    the scan itself rather than having the image pickled across. Files such as ``.asd`` contain multiple frames, each of
+    which is processed in turn and so a list of results is returned.
+
+    Parameters
+    ----------
+    img_path : Path
+        Path to a valid AFM scan to load.
+    processing_function : Callable
+        Function to process each image dictionary with, typically a ``functools.partial()`` of ``process_scan()`` or
+        one of the ``process_<stage>()`` functions.
+    loading_config : dict
+        Dictionary of configuration options passed to ``LoadScans``.
+    skip : Callable | None
+        Optional function which takes the ``img_path`` of each image and returns ``True`` if it should not be processed.
+    precision : str
+        Floating point precision (``float32`` or ``float64``) images are loaded in.
+    stack_filter : Callable | None
+        Optional function, typically a ``functools.partial()`` of ``filter_frames()``, which takes a list of image
+        dictionaries within the scan and the name of the scan and filters them together before each is processed. It
+        is called for each run of consecutive images that are not skipped.
+
+    Returns
+    -------
+    list[tuple]
+        List of the results returned by ``processing_function`` for each image within the scan.
+    """
+    scan_data = LoadScans([img_path], precision=precision, **loading_config)
+    topostats_objects = []
+    # Frames either side of a skipped frame are not consecutive, e.g. to warm start one from the other
+    runs = [[]]
+    for topostats_object in scan_data.iter_data():
+        if skip is not None and skip(topostats_object["img_path"]):
+            runs.append([])
+            continue
+        topostats_objects.append(topostats_object)
+        runs[-1].append(topostats_object)
+    if stack_filter is not None:
+        for run in runs:
+            if run:
+                stack_filter(run, filename=img_path.stem)
+    # Processing functions modify their configuration (e.g. popping "run") so each image gets its own copy
+    return [deepcopy(processing_function)(topostats_object) for topostats_object in topostats_objects]
+
+
+def filter_frames(
+    topostats_objects: list[dict], filename: str, filter_config: dict, cache_config: dict | None = None
+) -> None:
+    """
+    Filter the frames of a video (e.g. a ``.asd`` file) together as a stack.
+
+    Each frame is filtered as it would be on its own, but each step is computed for all frames at once. The stack is
+    filtered in chunks of at most ``FRAME_CHUNK_SIZE`` pixels, bounding the memory used whatever the length of the
+    video, and in lean memory mode (see ``Filters``) so only the images needed after filtering (the mask, scar mask and
+    Gaussian filtered image) are added to the dictionary of each frame under ``filtered_images``, these are used by
+    ``run_filters()`` in place of filtering the frame again. Intermediate filtering images of the frames are not
+    plotted. Scans with a single image, or whose frames differ in size, are left to be filtered individually as are
+    videos whose filtered frames are all cached.
+
+    Parameters
+    ----------
+    topostats_objects : list[dict]
+        Image dictionaries of the frames of the video.
+    filename : str
+        Name of the video (used in logging only).
+    filter_config : dict
+        Dictionary of configuration for the Filters class, as passed to ``run_filters()``.
+    cache_config : dict | None
+        Dictionary of configuration for the cache of stage outputs, as passed to ``process_scan()``.
+    """
+    if not filter_config["run"] or len(topostats_objects) < 2:
+        return
+    shapes = {topostats_object["image_original"].shape for topostats_object in topostats_objects}
+    if len(shapes) > 1:
+        LOGGER.warning(f"[{filename}] : Frames differ in size {shapes}, each frame will be filtered individually.")
+        return
+    if _frames_filter_cached(topostats_objects, filter_config, cache_config):
+        LOGGER.info(f"[{filename}] : Filtered frames are cached, the stack is not filtered.")
+        return
+    filter_config = deepcopy(filter_config)
+    filter_config.pop("run")
+    # Images of each frame are views of those of the stack, so any intermediate images kept would be held for every
+    # frame until the last is processed
+    filter_config["lean_memory"] = True
+    frames_per_chunk = max(FRAME_CHUNK_SIZE // topostats_objects[0]["image_original"].size, 1)
+    LOGGER.info(
+        f"[{filename}] : *** Filtering {len(topostats_objects)} frames as stacks of up to {frames_per_chunk} frames ***"
+    )
+    for start in range(0, len(topostats_objects), frames_per_chunk):
+        chunk = topostats_objects[start : start + frames_per_chunk]
+        # Filtering modifies its configuration (e.g. popping remove_scars["run"]) so each chunk gets its own copy
+        filters = Filters(
+            image=np.stack([topostats_object["image_original"] for topostats_object in chunk]),
+            filename=filename,
+            pixel_to_nm_scaling=chunk[0]["pixel_to_nm_scaling"],
+            **deepcopy(filter_config),
+        )
+        filters.filter_image()
+        for index, topostats_object in enumerate(chunk):
+            # The raw pixels of each frame are its original image, the stack of them is not kept
+            topostats_object["filtered_images"] = {
+                "pixels": topostats_object["image_original"],
+                **{
+                    name: image[index]
+                    for name, image in filters.images.items()
+                    if image is not None and name != "pixels"
+                },
+            }
+
+
+def _frames_filter_cached(topostats_objects: list[dict], filter_config: dict, cache_config: dict | None) -> bool:
+    """
+    Check whether the output of the filter stage of every frame of a video is cached.
+
+    Parameters
+    ----------
+    topostats_objects : list[dict]
+        Image dictionaries of the frames of the video.
+    filter_config : dict
+        Dictionary of configuration for the Filters class, as passed to ``run_filters()``.
+    cache_config : dict | None
+        Dictionary of configuration for the cache of stage outputs, as passed to ``process_scan()``.
+
+    Returns
+    -------
+    bool
+        Whether ``process_scan()`` will retrieve the filtered image of every frame from the cache.
+    """
+    if cache_config is None or not cache_config["run"]:
+        return False
+    cache = StageCache(cache_dir=cache_config["cache_dir"], max_size_gb=cache_config["max_size_gb"])
+    return all(
+        _filter_cache_key(topostats_object, filter_config, topostats_object.get("warm_start")) in cache
+        for topostats_object in topostats_objects
+    )
+
+
+def _hash_frame(topostats_object: dict) -> str:
+    """
+    Hash the input of processing a scan, see ``hash_input()``.
+
+    Parameters
+    ----------
+    topostats_object : dict
+        Image dictionary of the scan.
+
+    Returns
+    -------
+    str
+        Hash of the scan's image, pixel to nanometre scaling, filename and path.
+    """
+    return hash_input(
+        image=topostats_object["image_original"],
+        pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
+        filename=topostats_object["filename"],
+        img_path=topostats_object["img_path"],
+    )
+
+
+def _filter_cache_config(filter_config: dict, warm_start: dict | None) -> dict:
+    """
+    Build the configuration the filtered image of a scan depends on, its filter stage cache key is derived from it.
+
+    Parameters
+    ----------
+    filter_config : dict
+        Dictionary of configuration for the Filters class, as passed to ``run_filters()``.
+    warm_start : dict | None
+        Drift limit and the filter stage cache key of the frame before of frames warm started from the frame before (see
+        ``filter_frames_coherent()``), ``None`` for scans filtered on their own.
+
+    Returns
+    -------
+    dict
+        The filter configuration, with the warm start of frames warm started from the frame before.
+    """
+    return filter_config if warm_start is None else {**filter_config, "warm_start": warm_start}
+
+
+def _filter_cache_key(topostats_object: dict, filter_config: dict, warm_start: dict | None) -> str:
+    """
+    Derive the cache key of the filter stage of a scan, as ``process_scan()`` does.
+
+    Parameters
+    ----------
+    topostats_object : dict
+        Image dictionary of the scan.
+    filter_config : dict
+        Dictionary of configuration for the Filters class, as passed to ``run_filters()``.
+    warm_start : dict | None
+        Drift limit and the filter stage cache key of the frame before of frames warm started from the frame before,
+        ``None`` for scans filtered on their own.
+
+    Returns
+    -------
+    str
+        Cache key of the filter stage.
+    """
+    return StageCache.stage_keys(
+        input_hash=_hash_frame(topostats_object), configs={"filter": _filter_cache_config(filter_config, warm_start)}
+    )["filter"]
+
+
+def filter_frames_coherent(
+    topostats_objects: list[dict],
+    filename: str,
+    filter_config: dict,
+    drift_limit: float = 0.05,
+    cache_config: dict | None = None,
+) -> None:
+    """
+    Filter the frames of a video (e.g. a ``.asd`` file) in order, warm starting each frame from the frame before.
+
+    Consecutive frames have nearly the same background and features, so the mask of each frame is used in place of the
+    unmasked first pass of filtering the next (see ``Filters.filter_image()``). If the mask of a frame differs from the
+    mask it was warm started from in more than ``drift_limit`` of its pixels the frame is filtered again from scratch.
+    Frames are filtered in lean memory mode (see ``Filters``) so only the images needed after filtering (the mask each
+    frame was filtered with, scar mask and Gaussian filtered image) are added to the dictionary of each frame under
+    ``filtered_images``, these are used by ``run_filters()`` in place of filtering the frame again.
+
+    The filtered image of a frame depends on the frames before it, so the drift limit and the filter stage cache key of
+    the frame before are added to the dictionary of each frame under ``warm_start`` and are part of the key its filtered
+    image is cached under by ``process_scan()``. Videos whose filtered frames are all cached are not filtered.
+
+    Parameters
+    ----------
+    topostats_objects : list[dict]
+        Image dictionaries of consecutive frames of the video, in order.
+    filename : str
+        Name of the video (used in logging only).
+    filter_config : dict
+        Dictionary of configuration for the Filters class, as passed to ``run_filters()``.
+    drift_limit : float
+        Largest fraction of pixels whose mask may change between frames before a frame is filtered from scratch.
+    cache_config : dict | None
+        Dictionary of configuration for the cache of stage outputs, as passed to ``process_scan()``.
+    """
+    if not filter_config["run"] or len(topostats_objects) < 2:
+        return
+    previous_key = None
+    for topostats_object in topostats_objects:
+        topostats_object["warm_start"] = {"drift_limit": drift_limit, "previous_key": previous_key}
+        previous_key = _filter_cache_key(topostats_object, filter_config, topostats_object["warm_start"])
+    if _frames_filter_cached(topostats_objects, filter_config, cache_config):
+        LOGGER.info(f"[{filename}] : Filtered frames are cached, the frames are not filtered.")
+        return
+    filter_config = deepcopy(filter_config)
+    filter_config.pop("run")
+    filter_config["lean_memory"] = True
+    LOGGER.info(f"[{filename}] : *** Filtering {len(topostats_objects)} frames warm started from the frame before ***")
+    mask = None
+    full_fits = 0
+    for topostats_object in topostats_objects:
+        if mask is not None and mask.shape != topostats_object["image_original"].shape:
+            mask = None
+        filters = _filter_frame(topostats_object, filter_config, initial_mask=mask)
+        if mask is not None and filters.results["mask_drift"] > drift_limit:
+            LOGGER.info(
+                f"[{topostats_object['filename']}] : Mask changed in {filters.results['mask_drift']:.1%} of pixels from "
+                "the frame before, filtering from scratch."
+            )
+            filters = _filter_frame(topostats_object, filter_config, initial_mask=None)
+        full_fits += filters.initial_mask is None
+        mask = filters.images["mask"] if filters.derived_mask is None else filters.derived_mask
+        topostats_object["filtered_images"] = {
+            name: image for name, image in filters.images.items() if image is not None
+        }
+    LOGGER.info(f"[{filename}] : {full_fits} of {len(topostats_objects)} frames filtered from scratch.")
+
+
+def _filter_frame(topostats_object: dict, filter_config: dict, initial_mask: npt.NDArray | None) -> Filters:
+    """
+    Filter a frame of a video.
+
+    Parameters
+    ----------
+    topostats_object : dict
+        Image dictionary of the frame.
+    filter_config : dict
+        Dictionary of configuration for the Filters class, without 'run'.
+    initial_mask : npt.NDArray | None
+        Mask to warm start filtering from, if ``None`` the frame is filtered from scratch.
+
+    Returns
+    -------
+    Filters
+        The Filters object after filtering the frame.
+    """
+    # Filtering modifies its configuration (e.g. popping remove_scars["run"]) so each frame gets its own copy
+    filters = Filters(
+        image=topostats_object["image_original"],
+        filename=topostats_object["filename"],
+        pixel_to_nm_scaling=topostats_object["pixel_to_nm_scaling"],
+        initial_mask=initial_mask,
+        **deepcopy(filter_config),
+    )
+    filters.filter_image()
+    return filters
+
+
 def check_run_steps(  # noqa: C901
     filter_run: bool,
     grains_run: bool,
@@ -1590,6 +2032,7 @@ def completion_message(config: dict, img_files: list, summary_config: dict, imag
         distribution_plots_message = str(summary_config["output_dir"])
     else:
         distribution_plots_message = "Disabled. Enable in config 'summary_stats/run' if needed."
+    statistics_format = config.get("statistics_output", {}).get("format", "csv")
     print(
         "\n\n~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n\n"
     )
@@ -1601,7 +2044,7 @@ def completion_message(config: dict, img_files: list, summary_config: dict, imag
         f"  File Extension              : {config['file_ext']}\n"
         f"  Files Found                 : {len(img_files)}\n"
         f"  Successfully Processed^1    : {images_processed} ({(images_processed * 100) / len(img_files)}%)\n"
-        f"  All statistics              : {str(config['output_dir'])}/all_statistics.csv\n"
+        f"  All statistics              : {str(config['output_dir'])}/all_statistics.{statistics_format}\n"
         f"  Distribution Plots          : {distribution_plots_message}\n\n"
         f"  Configuration               : {config['output_dir']}/config.yaml\n\n"
         f"  Email                       : topostats@sheffield.ac.uk\n"
@@ -11,29 +11,42 @@ import argparse
 import logging
 import sys
 from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import nullcontext
 from functools import partial
 from importlib import resources
+from itertools import chain
 from multiprocessing import Pool
 from pprint import pformat
+from typing import Any
 
 import pandas as pd
 import yaml
 from tqdm import tqdm
 
+from topostats.checkpoint import Checkpoints
 from topostats.io import (
+    BATCH_CONTAINER_FILENAME,
+    BATCH_CONTAINER_SUFFIX,
+    BatchContainerWriter,
+    LazyHDF5Dict,
     LoadScans,
+    StatisticsWriter,
     dict_to_json,
     find_files,
     merge_mappings,
     read_yaml,
-    save_folder_grainstats,
     write_yaml,
 )
 from topostats.logs.logs import LOGGER_NAME
 from topostats.plotting import toposum
+from topostats.preview import preview_scan
 from topostats.processing import (
     check_run_steps,
     completion_message,
+    filter_frames,
+    filter_frames_coherent,
+    load_and_process,
     process_filters,
     process_grains,
     process_grainstats,
@@ -43,6 +56,7 @@ from topostats.processing import (
     run_ordered_tracing,
     run_splining,
 )
+from topostats.shared_arrays import imap_unordered_shared
 from topostats.utils import update_config, update_plotting_config
 from topostats.validation import DEFAULT_CONFIG_SCHEMA, PLOTTING_SCHEMA, SUMMARY_SCHEMA, validate_config
 
@@ -52,6 +66,8 @@ from topostats.validation import DEFAULT_CONFIG_SCHEMA, PLOTTING_SCHEMA, SUMMARY
 # LOGGER = setup_logger(LOGGER_NAME)
 LOGGER = logging.getLogger(LOGGER_NAME)
 
+# Columns statistics are indexed by when written to CSV
+STATISTICS_INDEX = ["image", "threshold", "grain_number"]
 
 # pylint: disable=too-many-branches
 # pylint: disable=too-many-locals
@@ -202,6 +218,265 @@ def _parse_configuration(args: argparse.Namespace | None = None) -> tuple[dict,
     return config, img_files
 
 
+def _process_and_close(topostats_object: dict, processing_function: Callable) -> Any:
+    """
+    Process an image dictionary, closing the file it is lazily read from (if any) once processed.
+
+    Parameters
+    ----------
+    topostats_object : dict
+        Image dictionary to process.
+    processing_function : Callable
+        Function to process the image dictionary with.
+
+    Returns
+    -------
+    Any
+        The results returned by ``processing_function``.
+    """
+    if isinstance(topostats_object, LazyHDF5Dict):
+        with topostats_object:
+            return processing_function(topostats_object)
+    return processing_function(topostats_object)
+
+
+def _imap_images(
+    pool: Pool,
+    processing_function: Callable,
+    img_files: list,
+    loading_config: dict,
+    skip: Callable | None = None,
+    shared_memory: bool = False,
+    precision: str = "float64",
+    stack_filter: Callable | None = None,
+) -> Iterator:
+    """
+    Map a processing function over all images, yielding the results in the order they are completed.
+
+    By default all scans are loaded in the parent process before processing starts and each image is passed to the
+    workers. If ``loading_config["lazy"]`` is ``True`` only the paths to the scans are passed and each worker loads the
+    scan it is processing, so memory usage of the parent does not grow with the number of files. Otherwise, if
+    ``shared_memory`` is ``True`` the arrays of each image are placed in shared memory and only descriptors of them are
+    pickled to the workers. If a ``stack_filter`` is given each worker loads and processes a whole scan, as when loading
+    lazily, so that the frames of a video can be filtered together.
+
+    Parameters
+    ----------
+    pool : Pool
+        Pool of workers to process images with.
+    processing_function : Callable
+        Function to process each image dictionary with.
+    img_files : list
+        List of paths to images that are to be processed.
+    loading_config : dict
+        Dictionary of configuration options for loading scans.
+    skip : Callable | None
+        Optional function which takes the ``img_path`` of each image and returns ``True`` if it should not be processed.
+    shared_memory : bool
+        Whether to pass image arrays to the workers through shared memory rather than pickling them.
+    precision : str
+        Floating point precision (''float32'' or ''float64'') images are loaded in.
+    stack_filter : Callable | None
+        Optional function to filter the images of each scan together before they are processed, see
+        ``load_and_process()``.
+
+    Yields
+    ------
+    Iterator
+        The results returned by ``processing_function`` for each image.
+    """
+    # Files lazily read from by each image (e.g. a batch container) are closed by the worker once it is processed
+    processing_function = partial(_process_and_close, processing_function=processing_function)
+    all_scan_data = LoadScans(img_files, precision=precision, **loading_config)
+    if all_scan_data.lazy or stack_filter is not None:
+        LOGGER.info("Scans will be loaded lazily by each worker.")
+        for scan_results in pool.imap_unordered(
+            partial(
+                load_and_process,
+                processing_function=processing_function,
+                loading_config=loading_config,
+                skip=skip,
+                precision=precision,
+                stack_filter=stack_filter,
+            ),
+            img_files,
+        ):
+            yield from scan_results
+    elif shared_memory:
+        all_scan_data.get_data()
+        LOGGER.info("Images will be passed to workers through shared memory.")
+        # Images are removed as they are shared so the parent does not hold two copies of each
+        yield from imap_unordered_shared(
+            pool,
+            processing_function,
+            (
+                topostats_object
+                for topostats_object in (all_scan_data.img_dict.pop(image) for image in list(all_scan_data.img_dict))
+                if skip is None or not skip(topostats_object["img_path"])
+            ),
+        )
+    else:
+        all_scan_data.get_data()
+        # Values are the individual image data dictionaries, keyed by image name
+        yield from pool.imap_unordered(
+            processing_function,
+            (
+                topostats_object
+                for topostats_object in all_scan_data.img_dict.values()
+                if skip is None or not skip(topostats_object["img_path"])
+            ),
+        )
+
+
+def _index_statistics(df: pd.DataFrame, drop_index: bool) -> pd.DataFrame:
+    """
+    Index statistics from a single image by image, threshold and grain number ready for writing.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Statistics returned by ``process_scan()`` for a single image.
+    drop_index : bool
+        Whether to drop the existing index rather than retaining it as a column.
+
+    Returns
+    -------
+    pd.DataFrame
+        Statistics with columns that are entirely ``NaN`` removed and indexed by ``STATISTICS_INDEX``, empty if there
+        are no statistics.
+    """
+    df = df.dropna(axis=1, how="all")
+    if df.empty:
+        return df
+    return df.reset_index(drop=drop_index).set_index(STATISTICS_INDEX)
+
+
+def _batch_container_writer(config: dict, img_files: list) -> BatchContainerWriter | None:
+    """
+    Create the writer of the batch container for a run if ``topostats_file.batch_container`` is enabled.
+
+    When resuming a run images are added to the existing container, otherwise it is overwritten.
+
+    Parameters
+    ----------
+    config : dict
+        Dictionary of configuration options.
+    img_files : list
+        List of paths to images that are to be processed.
+
+    Returns
+    -------
+    BatchContainerWriter | None
+        Writer of the batch container, which should be entered before processing starts, or ``None`` if images are
+        saved to individual ``.topostats`` files.
+    """
+    if not config["topostats_file"]["batch_container"]:
+        return None
+    path = config["output_dir"] / BATCH_CONTAINER_FILENAME
+    if any(path.resolve() == img_file.resolve() for img_file in img_files):
+        raise ValueError(f"The batch container {path} is also being processed, please specify a different output_dir.")
+    return BatchContainerWriter(
+        path,
+        compression=config["topostats_file"]["compression"],
+        compression_level=config["topostats_file"]["compression_level"],
+        append=config["resume"],
+    )
+
+
+def _stack_filter(config: dict, cache_config: dict | None = None) -> Callable | None:
+    """
+    Create the function that filters the frames of each video together, if enabled.
+
+    Stacking frames takes precedence over warm starting each frame from the one before if both are enabled.
+
+    Parameters
+    ----------
+    config : dict
+        Dictionary of configuration options.
+    cache_config : dict | None
+        Dictionary of configuration for the cache of stage outputs, videos whose filtered frames are all cached are not
+        filtered.
+
+    Returns
+    -------
+    Callable | None
+        A ``functools.partial()`` of ``filter_frames()`` if ``stack_frames`` is enabled, of
+        ``filter_frames_coherent()`` if ``temporal_coherence`` is enabled, otherwise ``None``.
+    """
+    if config["stack_frames"]:
+        return partial(filter_frames, filter_config=config["filter"], cache_config=cache_config)
+    if config["temporal_coherence"]:
+        return partial(
+            filter_frames_coherent,
+            filter_config=config["filter"],
+            drift_limit=config["coherence_drift_limit"],
+            cache_config=cache_config,
+        )
+    return None
+
+
+def _preview(config: dict, img_files: list, find_grains: bool) -> None:
+    """
+    Preview all images, filtering and optionally finding grains on downsampled images.
+
+    The approximate number of grains in each image is written to ``preview.csv`` in the output directory and a
+    thumbnail of each image is saved, see ``preview_scan()``.
+
+    Parameters
+    ----------
+    config : dict
+        Dictionary of configuration options.
+    img_files : list
+        List of paths to images that are to be previewed.
+    find_grains : bool
+        Whether to find grains as well as filtering the images.
+    """
+    processing_function = partial(
+        preview_scan,
+        base_dir=config["base_dir"],
+        filter_config=config["filter"],
+        grains_config=config["grains"] if find_grains else None,
+        plotting_config=config["plotting"],
+        preview_size=config["preview_size"],
+        output_dir=config["output_dir"],
+    )
+    results = {}
+    with Pool(processes=config["cores"]) as pool:
+        with tqdm(total=len(img_files), desc=f"Previewing images from {config['base_dir']}") as pbar:
+            for img, result in _imap_images(
+                pool, processing_function, img_files, config["loading"], precision=config["precision"]
+            ):
+                results[img] = result
+                pbar.update()
+    config["output_dir"].mkdir(parents=True, exist_ok=True)
+    previews = pd.DataFrame.from_dict(results, orient="index").rename_axis("image").sort_index()
+    previews.to_csv(config["output_dir"] / "preview.csv")
+    LOGGER.info(f"Previewed {len(previews)} images, results saved to : {config['output_dir'] / 'preview.csv'}.")
+
+
+def _topostats_file_options(topostats_file_config: dict, batch_writer: BatchContainerWriter | None) -> dict:
+    """
+    Options passed to ``save_topostats_file()`` by the processing functions.
+
+    Parameters
+    ----------
+    topostats_file_config : dict
+        Dictionary of configuration options for saving ''.topostats'' files.
+    batch_writer : BatchContainerWriter | None
+        Writer of the batch container, if ``None`` each image is saved to its own ``.topostats`` file.
+
+    Returns
+    -------
+    dict
+        Keyword arguments for ``save_topostats_file()``.
+    """
+    return {
+        "compression": topostats_file_config["compression"],
+        "compression_level": topostats_file_config["compression_level"],
+        "batch_writer": batch_writer,
+    }
+
+
 def process(args: argparse.Namespace | None = None) -> None:  # noqa: C901
     """
     Find and process all files.
@@ -213,6 +488,7 @@ def process(args: argparse.Namespace | None = None) -> None:  # noqa: C901
     """
     config, img_files = _parse_configuration(args)
 
+    batch_writer = _batch_container_writer(config, img_files)
     processing_function = partial(
         process_scan,
         base_dir=config["base_dir"],
@@ -226,24 +502,75 @@ def process(args: argparse.Namespace | None = None) -> None:  # noqa: C901
         curvature_config=config["curvature"],
         plotting_config=config["plotting"],
         output_dir=config["output_dir"],
+        topostats_file_config=_topostats_file_options(config["topostats_file"], batch_writer),
+        cache_config=config["cache"],
     )
     # Ensure we load the original images as we are running the whole pipeline
-    if config["file_ext"] == ".topostats":
+    if config["file_ext"] in (".topostats", BATCH_CONTAINER_SUFFIX):
         config["loading"]["extract"] = "raw"
-
-    all_scan_data = LoadScans(img_files, **config["loading"])
-    all_scan_data.get_data()
-    # Get a dictionary of all the image data dictionaries.
-    # Keys are the image names
-    # Values are the individual image data dictionaries
-    scan_data_dict = all_scan_data.img_dict
-
-    with Pool(processes=config["cores"]) as pool:
-        results = defaultdict()
-        image_stats_all = defaultdict()
-        mols_results = defaultdict()
-        disordered_trace_results = defaultdict()
+    if config["preview"]:
+        _preview(config, img_files, find_grains=True)
+        return
+
+    # When resuming, images already committed with the same configuration are skipped and the aggregate results are
+    # rebuilt from the committed results of every image.
+    if config["resume"]:
+        checkpoints = Checkpoints(output_dir=config["output_dir"], config=config)
+        # Single image files can be skipped without loading them, frames of .asd files are skipped once loaded
+        files_to_process = [
+            img_file for img_file in img_files if not checkpoints.is_committed(img_file.with_suffix(""))
+        ]
+        LOGGER.info(f"Resuming, {len(img_files) - len(files_to_process)} files have already been processed.")
+    else:
+        checkpoints = None
+        files_to_process = img_files
+
+    # Statistics are appended to the output as each image completes so that memory use does not grow with the number of
+    # grains across the batch
+    statistics_output = {
+        "output_dir": config["output_dir"],
+        "base_dir": config["base_dir"],
+        "output_format": config["statistics_output"]["format"],
+        "partition_by": config["statistics_output"]["partition_by"],
+    }
+    image_stats_writer = StatisticsWriter(name="image_stats", **statistics_output)
+    grainstats_writer = StatisticsWriter(
+        name="all_statistics", folder_stats_filename="grain_stats", **statistics_output
+    )
+    disordered_trace_writer = StatisticsWriter(
+        name="all_disordered_segment_statistics", folder_stats_filename="disordered_trace_stats", **statistics_output
+    )
+    mols_writer = StatisticsWriter(name="all_mol_statistics", folder_stats_filename="mol_stats", **statistics_output)
+    images_with_grains = set()
+    LOGGER.info(f"Saving image stats to : {image_stats_writer.path}.")
+    with batch_writer or nullcontext(), Pool(processes=config["cores"]) as pool:
         height_profile_all = defaultdict()
+        if checkpoints is not None:
+            image_results = chain(
+                checkpoints.load_committed(),
+                checkpoints.commit_each(
+                    _imap_images(
+                        pool,
+                        processing_function,
+                        files_to_process,
+                        config["loading"],
+                        skip=checkpoints.is_committed,
+                        shared_memory=config["shared_memory"],
+                        precision=config["precision"],
+                        stack_filter=_stack_filter(config, cache_config=config["cache"]),
+                    )
+                ),
+            )
+        else:
+            image_results = _imap_images(
+                pool,
+                processing_function,
+                files_to_process,
+                config["loading"],
+                shared_memory=config["shared_memory"],
+                precision=config["precision"],
+                stack_filter=_stack_filter(config, cache_config=config["cache"]),
+            )
         with tqdm(
             total=len(img_files),
             desc=f"Processing images from {config['base_dir']}, results are under {config['output_dir']}",
@@ -255,17 +582,17 @@ def process(args: argparse.Namespace | None = None) -> None:  # noqa: C901
                 individual_image_stats_df,
                 disordered_trace_result,
                 mols_result,
-            ) in pool.imap_unordered(
-                processing_function,
-                scan_data_dict.values(),
-            ):
-                results[str(img)] = result.dropna(axis=1, how="all")
-                disordered_trace_results[str(img)] = disordered_trace_result.dropna(axis=1, how="all")
-                mols_results[str(img)] = mols_result.dropna(axis=1, how="all")
+            ) in image_results:
+                result = _index_statistics(result, drop_index=True)
+                grainstats_writer.write(result, img)
+                if not result.empty:
+                    images_with_grains.update(result.index.unique(level="image"))
+                disordered_trace_writer.write(_index_statistics(disordered_trace_result, drop_index=False), img)
+                mols_writer.write(_index_statistics(mols_result, drop_index=True), img)
                 pbar.update()
 
-                # Add the dataframe to the results dict
-                image_stats_all[str(img)] = individual_image_stats_df.dropna(axis=1, how="all")
+                # Add the dataframe to the image statistics
+                image_stats_writer.write(individual_image_stats_df.dropna(axis=1, how="all"), img)
 
                 # Combine all height profiles
                 height_profile_all[str(img)] = height_profiles
@@ -273,29 +600,15 @@ def process(args: argparse.Namespace | None = None) -> None:  # noqa: C901
                 # Display completion message for the image
                 LOGGER.info(f"[{img.name}] Processing completed.")
 
-    LOGGER.info(f"Saving image stats to : {config['output_dir']}/image_stats.csv.")
-    # Concatenate all the dictionary's values into a dataframe. Ignore the keys since
-    # the dataframes have the file names in them already.
-    image_stats_all_df = pd.concat(image_stats_all.values())
-    image_stats_all_df.to_csv(config["output_dir"] / "image_stats.csv")
-
-    try:
-        results = pd.concat(results.values())
-    except ValueError as error:
+    if grainstats_writer.rows == 0:
         LOGGER.error("No grains found in any images, consider adjusting your thresholds.")
-        LOGGER.error(error)
-
-    try:
-        disordered_trace_results = pd.concat(disordered_trace_results.values())
-    except ValueError as error:
+        LOGGER.warning("There are no grainstats statistics to write to CSV.")
+    if disordered_trace_writer.rows == 0:
         LOGGER.error("No skeletons found in any images, consider adjusting disordered tracing parameters.")
-        LOGGER.error(error)
-
-    try:
-        mols_results = pd.concat(mols_results.values())
-    except ValueError as error:
+        LOGGER.warning("There are no disordered tracing statistics to write to CSV.")
+    if mols_writer.rows == 0:
         LOGGER.error("No mols found in any images, consider adjusting ordered tracing / splining parameters.")
-        LOGGER.error(error)
+        LOGGER.warning("There are no molecule tracing statistics to write to CSV.")
     # If requested save height profiles
     if config["grainstats"]["extract_height_profile"]:
         LOGGER.info(f"Saving all height profiles to {config['output_dir']}/height_profiles.json")
@@ -317,25 +630,23 @@ def process(args: argparse.Namespace | None = None) -> None:  # noqa: C901
         summary_config = update_config(summary_config, config["plotting"])
 
         validate_config(summary_config, SUMMARY_SCHEMA, config_type="YAML summarisation config")
-        # We never want to load data from CSV as we are using the data that has just been processed.
-        summary_config.pop("csv_file")
 
         # Load variable to label mapping
         plotting_yaml = (resources.files(__package__) / "var_to_label.yaml").read_text()
         summary_config["var_to_label"] = yaml.safe_load(plotting_yaml)
         LOGGER.info("[plotting] Default variable to labels mapping loaded.")
 
-        # If we don't have a dataframe or we do and it is all NaN there is nothing to plot
-        if isinstance(results, pd.DataFrame) and not results.isna().values.all():
-            if results.shape[0] > 1:
+        # If we don't have any grain statistics there is nothing to plot
+        if grainstats_writer.rows > 0:
+            if grainstats_writer.rows > 1:
                 # If summary_config["output_dir"] does not match or is not a sub-dir of config["output_dir"] it
                 # needs creating
                 summary_config["output_dir"] = config["output_dir"] / "summary_distributions"
                 summary_config["output_dir"].mkdir(parents=True, exist_ok=True)
                 LOGGER.info(f"Summary plots and statistics will be saved to : {summary_config['output_dir']}")
 
-                # Plot summaries
-                summary_config["df"] = results.reset_index()
+                # Plot summaries from the statistics written whilst processing
+                summary_config["csv_file"] = grainstats_writer.path
                 toposum(summary_config)
             else:
                 LOGGER.warning(
@@ -355,37 +666,7 @@ def process(args: argparse.Namespace | None = None) -> None:  # noqa: C901
     else:
         summary_config = None
 
-    # Write statistics to CSV if there is data.
-    if isinstance(results, pd.DataFrame) and not results.isna().values.all():
-        results.reset_index(drop=True, inplace=True)
-        results.set_index(["image", "threshold", "grain_number"], inplace=True)
-        results.to_csv(config["output_dir"] / "all_statistics.csv", index=True)
-        save_folder_grainstats(config["output_dir"], config["base_dir"], results, "grain_stats")
-        results.reset_index(inplace=True)  # So we can access unique image names
-        images_processed = len(results["image"].unique())
-    else:
-        images_processed = 0
-        LOGGER.warning("There are no grainstats statistics to write to CSV.")
-
-    if isinstance(disordered_trace_results, pd.DataFrame) and not disordered_trace_results.isna().values.all():
-        disordered_trace_results.reset_index(inplace=True)
-        disordered_trace_results.set_index(["image", "threshold", "grain_number"], inplace=True)
-        disordered_trace_results.to_csv(config["output_dir"] / "all_disordered_segment_statistics.csv", index=True)
-        save_folder_grainstats(
-            config["output_dir"], config["base_dir"], disordered_trace_results, "disordered_trace_stats"
-        )
-        disordered_trace_results.reset_index(inplace=True)  # So we can access unique image names
-    else:
-        LOGGER.warning("There are no disordered tracing statistics to write to CSV.")
-
-    if isinstance(mols_results, pd.DataFrame) and not mols_results.isna().values.all():
-        mols_results.reset_index(drop=True, inplace=True)
-        mols_results.set_index(["image", "threshold", "grain_number"], inplace=True)
-        mols_results.to_csv(config["output_dir"] / "all_mol_statistics.csv", index=True)
-        save_folder_grainstats(config["output_dir"], config["base_dir"], mols_results, "mol_stats")
-        mols_results.reset_index(inplace=True)  # So we can access unique image names
-    else:
-        LOGGER.warning("There are no molecule tracing statistics to write to CSV.")
+    images_processed = len(images_with_grains)
     # Write config to file
     config["plotting"].pop("plot_dict")
     write_yaml(config, output_dir=config["output_dir"])
@@ -410,28 +691,36 @@ def filters(args: argparse.Namespace | None = None) -> None:
     """
     config, img_files = _parse_configuration(args)
     # If loading existing .topostats files the images need filtering again so we need to extract the raw image
-    if config["file_ext"] == ".topostats":
+    if config["file_ext"] in (".topostats", BATCH_CONTAINER_SUFFIX):
         config["loading"]["extract"] = "raw"
-    all_scan_data = LoadScans(img_files, **config["loading"])
-    all_scan_data.get_data()
+    if config["preview"]:
+        _preview(config, img_files, find_grains=False)
+        return
 
+    batch_writer = _batch_container_writer(config, img_files)
     processing_function = partial(
         process_filters,
         base_dir=config["base_dir"],
         filter_config=config["filter"],
         plotting_config=config["plotting"],
         output_dir=config["output_dir"],
+        topostats_file_config=_topostats_file_options(config["topostats_file"], batch_writer),
     )
 
-    with Pool(processes=config["cores"]) as pool:
+    with batch_writer or nullcontext(), Pool(processes=config["cores"]) as pool:
         results = defaultdict()
         with tqdm(
             total=len(img_files),
             desc=f"Processing images from {config['base_dir']}, results are under {config['output_dir']}",
         ) as pbar:
-            for img, result in pool.imap_unordered(
+            for img, result in _imap_images(
+                pool,
                 processing_function,
-                all_scan_data.img_dict.values(),
+                img_files,
+                config["loading"],
+                shared_memory=config["shared_memory"],
+                precision=config["precision"],
+                stack_filter=_stack_filter(config),
             ):
                 results[str(img)] = result
                 pbar.update()
@@ -458,27 +747,31 @@ def grains(args: argparse.Namespace | None = None) -> None:
     """
     config, img_files = _parse_configuration(args)
     # Triggers extraction of filtered images from existing .topostats files
-    if config["file_ext"] == ".topostats":
+    if config["file_ext"] in (".topostats", BATCH_CONTAINER_SUFFIX):
         config["loading"]["extract"] = "grains"
-    all_scan_data = LoadScans(img_files, **config["loading"])
-    all_scan_data.get_data()
 
+    batch_writer = _batch_container_writer(config, img_files)
     processing_function = partial(
         process_grains,
         base_dir=config["base_dir"],
         grains_config=config["grains"],
         plotting_config=config["plotting"],
         output_dir=config["output_dir"],
+        topostats_file_config=_topostats_file_options(config["topostats_file"], batch_writer),
     )
-    with Pool(processes=config["cores"]) as pool:
+    with batch_writer or nullcontext(), Pool(processes=config["cores"]) as pool:
         results = defaultdict()
         with tqdm(
             total=len(img_files),
             desc=f"Processing images from {config['base_dir']}, results are under {config['output_dir']}",
         ) as pbar:
-            for img, result in pool.imap_unordered(
+            for img, result in _imap_images(
+                pool,
                 processing_function,
-                all_scan_data.img_dict.values(),
+                img_files,
+                config["loading"],
+                shared_memory=config["shared_memory"],
+                precision=config["precision"],
             ):
                 results[str(img)] = result
                 pbar.update()
@@ -505,45 +798,49 @@ def grainstats(args: argparse.Namespace | None = None) -> None:
     """
     config, img_files = _parse_configuration(args)  # pylint: disable=unused-variable
     # Triggers extraction of filtered images from existing .topostats files
-    if config["file_ext"] == ".topostats":
+    if config["file_ext"] in (".topostats", BATCH_CONTAINER_SUFFIX):
         config["loading"]["extract"] = "grainstats"
-    all_scan_data = LoadScans(img_files, **config["loading"])
-    all_scan_data.get_data()
+    batch_writer = _batch_container_writer(config, img_files)
     processing_function = partial(
         process_grainstats,
         base_dir=config["base_dir"],
         grainstats_config=config["grainstats"],
         plotting_config=config["plotting"],
         output_dir=config["output_dir"],
+        topostats_file_config=_topostats_file_options(config["topostats_file"], batch_writer),
     )
-    with Pool(processes=config["cores"]) as pool:
-        results = defaultdict()
+    # Statistics are appended as each image completes rather than held in memory until the end
+    image_stats_writer = StatisticsWriter(
+        output_dir=config["output_dir"],
+        base_dir=config["base_dir"],
+        name="image_stats",
+        output_format=config["statistics_output"]["format"],
+        partition_by=config["statistics_output"]["partition_by"],
+    )
+    LOGGER.info(f"Saving image stats to : {image_stats_writer.path}.")
+    with batch_writer or nullcontext(), Pool(processes=config["cores"]) as pool:
         height_profile_all = defaultdict()
         with tqdm(
             total=len(img_files),
             desc=f"Processing images from {config['base_dir']}, results are under {config['output_dir']}",
         ) as pbar:
-            for img, result, height_profiles in pool.imap_unordered(
+            for img, result, height_profiles in _imap_images(
+                pool,
                 processing_function,
-                all_scan_data.img_dict.values(),
+                img_files,
+                config["loading"],
+                shared_memory=config["shared_memory"],
+                precision=config["precision"],
             ):
-                results[str(img)] = result
+                image_stats_writer.write(result, img)
                 height_profile_all[str(img)] = height_profiles
                 pbar.update()
 
                 # Display completion message for the image
                 LOGGER.info(f"[{img}] Grainstats completed (NB - Filtering was *not* re-run).")
 
-    LOGGER.info(f"Saving image stats to : {config['output_dir']}/image_stats.csv.")
-    # Concatenate all the dictionary's values into a dataframe. Ignore the keys since
-    # the dataframes have the file names in them already.
-
-    try:
-        image_stats_all_df = pd.concat(results.values())
-        image_stats_all_df.to_csv(config["output_dir"] / "image_stats.csv")
-    except ValueError as error:
+    if image_stats_writer.rows == 0:
         LOGGER.error("No grains found in any images, consider adjusting your thresholds.")
-        LOGGER.error(error)
     # If requested save height profiles
     if config["grainstats"]["extract_height_profile"]:
         LOGGER.info(f"Saving all height profiles to {config['output_dir']}/height_profiles.json")
@@ -552,9 +849,9 @@ def grainstats(args: argparse.Namespace | None = None) -> None:
     # Write config to file
     config["plotting"].pop("plot_dict")
     write_yaml(config, output_dir=config["output_dir"])
-    LOGGER.debug(f"Images processed : {len(results)}")
+    LOGGER.debug(f"Images processed : {len(height_profile_all)}")
     # Update config with plotting defaults for printing
-    completion_message(config, img_files, summary_config=None, images_processed=image_stats_all_df.shape[0])
+    completion_message(config, img_files, summary_config=None, images_processed=image_stats_writer.rows)
 
 
 def disordered_tracing(args: argparse.Namespace | None = None) -> None:
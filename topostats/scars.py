@@ -135,6 +135,98 @@ def _mark_if_negative_scar(
                     k -= 1
 
 
+def _mark_positive_scars(
+    img: npt.NDArray,
+    stddev: float,
+    threshold_low: float,
+    max_scar_width: int,
+) -> npt.NDArray:
+    """
+    Mark positive scars (ridges rather than dips) across the whole image at once.
+
+    Gives the same result as calling ``_mark_if_positive_scar()`` on every pixel in turn (rows in ascending order) with
+    an empty mask, but only iterates over the possible scar widths. Negative scars can be marked by passing the negated
+    image.
+
+    Parameters
+    ----------
+    img : npt.NDArray
+        A 2-D image of the data to mark scars in.
+    stddev : float
+        The standard deviation, or the root-mean-square value for the image.
+    threshold_low : float
+        A value that when multiplied with the standard deviation, acts as a threshold to determine if an increase
+        or decrease in height might constitute the top or bottom of a scar.
+    max_scar_width : int
+        A value that dictates the maximum width that a scar can be. Note that this does not mean horizontal width,
+        rather vertical, this is because we consider scars to be laying flat, horizontally, so their width is
+        vertical and their length is horizontal.
+
+    Returns
+    -------
+    npt.NDArray
+        A 2-D image of the same shape as the data image, where each pixel's value represents how strongly that pixel is
+        considered to be a scar.
+    """
+    height = img.shape[0]
+    threshold = threshold_low * stddev
+    # scars[k - 1] marks the pixels at the top border of a scar of width k (i.e. the scar is rows row + 1 to row + k)
+    scars = []
+    scar_min = None
+    for width in range(1, max_scar_width + 1):
+        # Rows which have a border pixel below a scar of this width
+        rows = height - width - 1
+        if rows <= 0:
+            break
+        scar_bottom = img[width : width + rows]
+        # The comparisons are ordered to match min() and max() so that any NaN values are handled identically
+        if scar_min is None:
+            scar_min = scar_bottom
+        else:
+            scar_min = np.where(scar_bottom < scar_min[:rows], scar_bottom, scar_min[:rows])
+        border_top, border_bottom = img[:rows], img[width + 1 : width + 1 + rows]
+        border_max = np.where(border_bottom > border_top, border_bottom, border_top)
+        scar = np.zeros(img.shape, dtype=bool)
+        scar[:rows] = scar_min - border_max > threshold
+        scars.append(scar)
+
+    # Each pixel takes the value from the lowest scar top above it and, of the scars from that top which cover it, the
+    # widest. Iterating from the widest to the narrowest offset lets nearer tops overwrite those further away.
+    marked = np.zeros(img.shape)
+    widest = np.zeros(img.shape, dtype=np.intp)
+    for width in range(len(scars), 0, -1):
+        widest = np.where((widest == 0) & scars[width - 1], width, widest)
+        rows, cols = np.nonzero(widest)
+        border_top, border_bottom = img[rows, cols], img[rows + widest[rows, cols] + 1, cols]
+        border_max = np.where(border_bottom > border_top, border_bottom, border_top)
+        marked[rows + width, cols] = (img[rows + width, cols] - border_max) / stddev
+    return marked
+
+
+def _spread_right(low: npt.NDArray, high: npt.NDArray) -> npt.NDArray:
+    """
+    Find pixels reached by spreading high-marked pixels rightwards through adjacent low-marked pixels.
+
+    Parameters
+    ----------
+    low : npt.NDArray
+        Boolean 2-D array of pixels marked at or above the low threshold.
+    high : npt.NDArray
+        Boolean 2-D array of pixels marked at or above the high threshold.
+
+    Returns
+    -------
+    npt.NDArray
+        Boolean 2-D array of low-marked pixels with a high-marked pixel to their left that is only separated from them
+        by low-marked pixels.
+    """
+    cols = np.arange(low.shape[1])
+    last_not_low = np.maximum.accumulate(np.where(low, -1, cols), axis=1)
+    last_high = np.maximum.accumulate(np.where(high, cols, -1), axis=1)
+    previous_high = np.pad(last_high[:, :-1], ((0, 0), (1, 0)), constant_values=-1)
+    return low & (previous_high >= 0) & (previous_high >= last_not_low)
+
+
 def _spread_scars(
     marked: npt.NDArray,
     threshold_low: float,
@@ -163,17 +255,11 @@ def _spread_scars(
         A floating point value that is used similarly to threshold_low, however sharp inclines or descents
         that result in values in the mask higher than this threshold are automatically considered scars.
     """
-    # Spread scars that have close to threshold edge-points
-    for row in range(marked.shape[0]):
-        # Spread right
-        for col in range(1, marked.shape[1]):
-            if marked[row, col] >= threshold_low and marked[row, col - 1] >= threshold_high:
-                marked[row, col] = threshold_high
-
-        # Spread left
-        for col in range(marked.shape[1] - 1, 0, -1):
-            if marked[row, col - 1] >= threshold_low and marked[row, col] >= threshold_high:
-                marked[row, col - 1] = threshold_high
+    # Spread right
+    marked[_spread_right(marked >= threshold_low, marked >= threshold_high)] = threshold_high
+    # Spread left, which is spreading right along the reversed rows
+    reversed_marked = marked[:, ::-1]
+    reversed_marked[_spread_right(reversed_marked >= threshold_low, reversed_marked >= threshold_high)] = threshold_high
 
 
 def _remove_short_scars(marked: npt.NDArray, threshold_high: float, min_scar_length: int) -> None:
@@ -197,33 +283,22 @@ def _remove_short_scars(marked: npt.NDArray, threshold_high: float, min_scar_len
         rather vertical, this is because we consider scars to be laying flat, horizontally, so their width is
         vertical and their length is horizontal.
     """
-    # Remove too-short scars
-    for row in range(marked.shape[0]):
-        k = 0
-        for col in range(marked.shape[1]):
-            # If greater than threshold, set value to true
-            if marked[row, col] >= threshold_high:
-                marked[row, col] = 1.0
-                k += 1
-                continue
-            # If not greater than threshold,
-            # either we reached the end of the scar,
-            # or haven't found one.
-            # Check if too short. If so, remove.
-            if k and k < min_scar_length:
-                while k:
-                    marked[row, col - k] = 0.0
-                    k -= 1
-            # Long enough, just not bright anymore.
-            # Reached the end of the scar that is long enough. Stop and reset.
-            marked[row, col] = 0.0
-            k = 0
-        # Reached the end of the line, so check current scar's
-        # length to see if too short and should be deleted.
-        if k and k < min_scar_length:
-            while k:
-                marked[row, col - k] = 0.0
-                k -= 1
+    n_cols = marked.shape[1]
+    # Pad each row so that runs of scar pixels never continue onto the next row
+    scar = np.pad(marked >= threshold_high, ((0, 0), (0, 1))).ravel()
+    edges = np.diff(scar.astype(np.int8), prepend=0)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    long_enough = lengths >= min_scar_length
+    kept = np.zeros(scar.size + 1, dtype=np.intp)
+    np.add.at(kept, starts[long_enough], 1)
+    np.add.at(kept, ends[long_enough], -1)
+    kept = np.cumsum(kept[:-1]) > 0
+    # Short scars which reach the end of a row (but do not span it) have historically kept their last pixel, this is
+    # retained so that masks are unchanged
+    at_row_end = ~long_enough & (ends % (n_cols + 1) == n_cols) & (lengths < n_cols)
+    kept[ends[at_row_end] - 1] = True
+    marked[...] = kept.reshape(marked.shape[0], n_cols + 1)[:, :n_cols]
 
 
 def _mark_scars(
@@ -271,32 +346,18 @@ def _mark_scars(
     image = np.copy(img)
 
     stddev = np.std(image)
-    marked = np.zeros(image.shape)
-
-    for row in range(image.shape[0] - 1):
-        for col in range(image.shape[1]):
-            if direction == "positive":
-                _mark_if_positive_scar(
-                    row_col=(row, col),
-                    stddev=stddev,
-                    img=image,
-                    marked=marked,
-                    threshold_low=threshold_low,
-                    max_scar_width=max_scar_width,
-                )
-
-            elif direction == "negative":
-                _mark_if_negative_scar(
-                    row_col=(row, col),
-                    stddev=stddev,
-                    img=image,
-                    marked=marked,
-                    threshold_low=threshold_low,
-                    max_scar_width=max_scar_width,
-                )
-
-            else:
-                raise ValueError(f"direction {direction} invalid.")
+
+    # Negative scars (dips) in the image are positive scars (ridges) in the negated image
+    if direction == "positive":
+        marked = _mark_positive_scars(
+            img=image, stddev=stddev, threshold_low=threshold_low, max_scar_width=max_scar_width
+        )
+    elif direction == "negative":
+        marked = _mark_positive_scars(
+            img=-image, stddev=stddev, threshold_low=threshold_low, max_scar_width=max_scar_width
+        )
+    else:
+        raise ValueError(f"direction {direction} invalid.")
 
     _spread_scars(marked=marked, threshold_low=threshold_low, threshold_high=threshold_high)
 
@@ -320,24 +381,22 @@ def _remove_marked_scars(img: npt.NDArray, scar_mask: npt.NDArray) -> None:
         A boolean image of pixels that determine which values are flagged as scars and therefore should
         be interpolated over in the original data image.
     """
-    for row, col in np.ndindex(img.shape):
-        if scar_mask[row, col] == 1.0:
-            # Determine how wide the scar is by incrementing scar_width until either the bottom
-            # of the image is reached, or a non-marked pixel is encountered.
-            scar_width = 1
-            while row + scar_width < img.shape[0] and scar_mask[row + scar_width, col] == 1.0:
-                scar_width += 1
-
-            above = img[row - 1, col]
-            below = img[row + scar_width, col]
-            k = scar_width
-            while k:
-                # Linearly interpolate
-                interp_val = (k / (scar_width + 1)) * below + (1 - (k / (scar_width + 1))) * above
-                img[row + k - 1, col] = interp_val
-                scar_mask[row + k - 1, col] = 0.0
-                k -= 1
-                LOGGER.debug("Scar removed")
+    height = img.shape[0]
+    # Find the vertical runs of scar pixels in each column, columns are padded so that runs never continue onto the next
+    scar = np.pad(scar_mask.T == 1.0, ((0, 0), (1, 1))).ravel()
+    edges = np.diff(scar.astype(np.int8))
+    starts = np.flatnonzero(edges == 1) + 1
+    widths = np.flatnonzero(edges == -1) + 1 - starts
+    rows, cols = starts % (height + 2) - 1, starts // (height + 2)
+    above = img[rows - 1, cols]
+    below = img[rows + widths, cols]
+    # Linearly interpolate each pixel of each scar between the pixels above and below the scar
+    run = np.repeat(np.arange(widths.size), widths)
+    k = np.arange(run.size) - np.repeat(np.cumsum(widths) - widths, widths) + 1
+    fraction = k / (widths[run] + 1)
+    img[rows[run] + k - 1, cols[run]] = fraction * below[run] + (1 - fraction) * above[run]
+    scar_mask[rows[run] + k - 1, cols[run]] = 0.0
+    LOGGER.debug(f"{widths.size} scars removed")
 
 
 def remove_scars(
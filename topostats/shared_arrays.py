@@ -0,0 +1,243 @@
+"""Transport image arrays between the parent process and pool workers through shared memory."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from multiprocessing import resource_tracker
+from multiprocessing.pool import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from topostats.logs.logs import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+
+class SharedArray(NamedTuple):
+    """
+    Descriptor of an array held in a shared memory block, this is all that is pickled between processes.
+
+    Parameters
+    ----------
+    name : str
+        Name of the shared memory block.
+    shape : tuple
+        Shape of the array.
+    dtype : str
+        Data type of the array.
+    """
+
+    name: str
+    shape: tuple
+    dtype: str
+
+
+def _is_shareable(value: Any) -> bool:
+    """
+    Check whether a value is an array that can be placed in shared memory.
+
+    Parameters
+    ----------
+    value : Any
+        Value to check.
+
+    Returns
+    -------
+    bool
+        Whether the value is a non-empty array without Python objects.
+    """
+    return isinstance(value, np.ndarray) and value.nbytes > 0 and not value.dtype.hasobject
+
+
+def share_arrays(data: dict, blocks: list[SharedMemory]) -> dict:
+    """
+    Copy the arrays in a dictionary to shared memory, replacing them with descriptors.
+
+    Nested dictionaries (e.g. ``grain_masks``) are searched recursively. The created blocks are appended to ``blocks``.
+    Blocks are removed from the resource tracker of this process as they are unlinked by the worker which processes
+    them, any that are not must be unlinked with ``release()``.
+
+    Parameters
+    ----------
+    data : dict
+        Dictionary of image data (e.g. a ``topostats_object``).
+    blocks : list[SharedMemory]
+        List to append the created shared memory blocks to.
+
+    Returns
+    -------
+    dict
+        Copy of ``data`` with arrays replaced by ``SharedArray`` descriptors.
+    """
+    shared = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            shared[key] = share_arrays(value, blocks)
+        elif _is_shareable(value):
+            block = SharedMemory(create=True, size=value.nbytes)
+            blocks.append(block)
+            # pylint: disable=protected-access
+            resource_tracker.unregister(block._name, "shared_memory")
+            np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+            shared[key] = SharedArray(name=block.name, shape=value.shape, dtype=value.dtype.str)
+        else:
+            shared[key] = value
+    return shared
+
+
+def attach_arrays(data: dict, blocks: list[SharedMemory]) -> dict:
+    """
+    Replace descriptors in a dictionary with arrays backed by the shared memory blocks, without copying.
+
+    The attached blocks are appended to ``blocks`` and should be closed once the arrays are no longer used.
+
+    Parameters
+    ----------
+    data : dict
+        Dictionary returned by ``share_arrays()``.
+    blocks : list[SharedMemory]
+        List to append the attached shared memory blocks to.
+
+    Returns
+    -------
+    dict
+        Copy of ``data`` with descriptors replaced by arrays.
+    """
+    attached = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            attached[key] = attach_arrays(value, blocks)
+        elif isinstance(value, SharedArray):
+            block = SharedMemory(name=value.name)
+            blocks.append(block)
+            attached[key] = np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=block.buf)
+        else:
+            attached[key] = value
+    return attached
+
+
+def release(blocks: list[SharedMemory], unlink: bool = True) -> None:
+    """
+    Close and optionally unlink shared memory blocks.
+
+    Parameters
+    ----------
+    blocks : list[SharedMemory]
+        Shared memory blocks.
+    unlink : bool
+        Whether to unlink (free) the blocks once closed.
+    """
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            # Arrays still reference the block, it is closed when they are garbage collected
+            LOGGER.debug(f"Shared memory block {block.name} is still in use and was not closed.")
+        if unlink:
+            # Blocks may not be registered with the resource tracker of this process (see share_arrays()), registering
+            # is idempotent and keeps the tracker consistent when unlink() unregisters the block.
+            # pylint: disable=protected-access
+            resource_tracker.register(block._name, "shared_memory")
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                resource_tracker.unregister(block._name, "shared_memory")
+
+
+def _run_attached(item: tuple[int, dict], processing_function: Callable) -> tuple[int, Any]:
+    """
+    Attach the shared arrays of an image in a worker and process it, freeing the shared memory once complete.
+
+    Parameters
+    ----------
+    item : tuple[int, dict]
+        Key identifying the image and its dictionary of data with ``SharedArray`` descriptors.
+    processing_function : Callable
+        Function to process the image dictionary with.
+
+    Returns
+    -------
+    tuple[int, Any]
+        Key identifying the image and the result of ``processing_function``.
+    """
+    key, data = item
+    blocks: list[SharedMemory] = []
+    try:
+        result = processing_function(attach_arrays(data, blocks) if isinstance(data, dict) else data)
+    finally:
+        release(blocks)
+    return key, result
+
+
+def imap_unordered_shared(
+    pool: Pool, processing_function: Callable, data: Iterable[dict], max_in_flight: int | None = None
+) -> Iterator[Any]:
+    """
+    Map a function over image dictionaries with a pool, passing arrays through shared memory.
+
+    Arrays are copied to shared memory in the parent and only their descriptors are pickled to the workers, which
+    attach to the blocks without copying and free them once the image is processed. Image data which is not a ``dict``
+    (e.g. ``LazyASDFrameDict``) is read on demand and so is passed to the workers unchanged. At most ``max_in_flight``
+    images are held in shared memory at once, the next is only shared once the result of an earlier one is yielded.
+
+    Parameters
+    ----------
+    pool : Pool
+        Pool of workers to process images with.
+    processing_function : Callable
+        Function to process each image dictionary with.
+    data : Iterable[dict]
+        Image dictionaries (e.g. ``topostats_object``) to process.
+    max_in_flight : int | None
+        Largest number of images shared and not yet yielded, if ``None`` twice the number of workers of the pool.
+
+    Yields
+    ------
+    Any
+        The results of ``processing_function`` in the order they are completed.
+    """
+    image_blocks: dict[int, list[SharedMemory]] = {}
+    # pylint: disable=protected-access
+    max_in_flight = 2 * pool._processes if max_in_flight is None else max_in_flight
+    # The pool's task handler draws all images from _share_each() without waiting for results, so each image waits for
+    # a slot in the window before it is shared
+    window = threading.Semaphore(max_in_flight)
+    stopped = threading.Event()
+
+    def _share_each() -> Iterator[tuple[int, dict]]:
+        """
+        Share the arrays of each image once there is a slot in the window.
+
+        Yields
+        ------
+        tuple[int, dict]
+            Key identifying the image and its dictionary of data with ``SharedArray`` descriptors.
+        """
+        for key, image_data in enumerate(data):
+            window.acquire()  # pylint: disable=consider-using-with
+            if stopped.is_set():
+                return
+            blocks: list[SharedMemory] = []
+            image_blocks[key] = blocks
+            # Lazy mappings (e.g. frames of .asd files) are cheap to pickle and are read by the worker itself
+            yield key, share_arrays(image_data, blocks) if isinstance(image_data, dict) else image_data
+
+    try:
+        for key, result in pool.imap_unordered(
+            partial(_run_attached, processing_function=processing_function), _share_each()
+        ):
+            release(image_blocks.pop(key), unlink=False)
+            window.release()
+            yield result
+    finally:
+        # Stop sharing images, waking the task handler if it is waiting for a slot
+        stopped.set()
+        window.release()
+        # Free the blocks of any images that were not processed
+        for blocks in list(image_blocks.values()):
+            release(blocks)
@@ -190,3 +190,9 @@ class Colormap:
             "blue_purple_green",
             N=3,
         )
+
+
+# Register the custom colormaps with Matplotlib so they can be used by name, done here rather than when the package is
+# imported so Matplotlib is only loaded by modules that plot
+mpl.colormaps.register(cmap=Colormap("nanoscope").get_cmap())
+mpl.colormaps.register(cmap=Colormap("gwyddion").get_cmap())
@@ -1,11 +1,15 @@
 """Functions for calculating thresholds."""
 
 # pylint: disable=no-name-in-module
+from __future__ import annotations
+
 import logging
 from collections.abc import Callable
 
+import numpy as np
 import numpy.typing as npt
-from skimage.filters import threshold_mean, threshold_minimum, threshold_otsu, threshold_triangle, threshold_yen
+from skimage.exposure import histogram
+from skimage.filters import threshold_minimum, threshold_otsu, threshold_yen
 
 from topostats.logs.logs import LOGGER_NAME
 
@@ -15,7 +19,103 @@ LOGGER = logging.getLogger(LOGGER_NAME)
 # pylint: disable=unused-argument
 
 
-def threshold(image: npt.NDArray, method: str = None, otsu_threshold_multiplier: float = None, **kwargs: dict) -> float:
+class ThresholdStatistics:
+    """
+    Histogram and moments of an image shared by every threshold method.
+
+    Each statistic is computed the first time it is needed and then reused, so an image can be thresholded by several
+    methods (or with several multipliers) while its histogram, mean and standard deviation are each computed only once.
+    The image must not be modified once its statistics have been computed.
+
+    Parameters
+    ----------
+    image : npt.NDArray
+        Numpy array of image for thresholding.
+    """
+
+    def __init__(self, image: npt.NDArray) -> None:
+        """
+        Initialise the class.
+
+        Parameters
+        ----------
+        image : npt.NDArray
+            Numpy array of image for thresholding.
+        """
+        self.image = image
+        self._histograms: dict[int, tuple[npt.NDArray, npt.NDArray]] = {}
+        self._mean: float | None = None
+        self._std: float | None = None
+        self._constant: bool | None = None
+
+    def histogram(self, nbins: int = 256) -> tuple[npt.NDArray, npt.NDArray]:
+        """
+        Histogram of the image over the range of its values, as used by the ``skimage.filters`` threshold methods.
+
+        Parameters
+        ----------
+        nbins : int
+            Number of bins (ignored for integer images which have one bin per value).
+
+        Returns
+        -------
+        tuple[npt.NDArray, npt.NDArray]
+            Count of values in each bin and the centre of each bin.
+        """
+        if nbins not in self._histograms:
+            self._histograms[nbins] = histogram(self.image.reshape(-1), nbins, source_range="image")
+        return self._histograms[nbins]
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean of the image.
+
+        Returns
+        -------
+        float
+            Mean of the image.
+        """
+        if self._mean is None:
+            self._mean = np.mean(self.image)
+        return self._mean
+
+    @property
+    def std(self) -> float:
+        """
+        Standard deviation of the image, ignoring NaN.
+
+        Returns
+        -------
+        float
+            Standard deviation of the image.
+        """
+        if self._std is None:
+            self._std = np.nanstd(self.image)
+        return self._std
+
+    @property
+    def constant(self) -> bool:
+        """
+        Whether every value of the image is the same.
+
+        Returns
+        -------
+        bool
+            ``True`` if the image has a single value.
+        """
+        if self._constant is None:
+            self._constant = bool(np.all(self.image == self.image.reshape(-1)[0]))
+        return self._constant
+
+
+def threshold(
+    image: npt.NDArray,
+    method: str = None,
+    otsu_threshold_multiplier: float = None,
+    statistics: ThresholdStatistics | None = None,
+    **kwargs: dict,
+) -> float:
     """
     Thresholding for producing masks.
 
@@ -27,6 +127,8 @@ def threshold(image: npt.NDArray, method: str = None, otsu_threshold_multiplier:
         Method to use for thresholding, currently supported methods are otsu (default), mean and minimum.
     otsu_threshold_multiplier : float
         Factor for scaling the Otsu threshold.
+    statistics : ThresholdStatistics | None
+        Statistics of ``image`` shared with other calls, if ``None`` they are computed for this call only.
     **kwargs : dict
         Additional keyword arguments to pass to skimage methods.
 
@@ -36,7 +138,9 @@ def threshold(image: npt.NDArray, method: str = None, otsu_threshold_multiplier:
         Threshold of image using specified method.
     """
     thresholder = _get_threshold(method)
-    return thresholder(image, otsu_threshold_multiplier=otsu_threshold_multiplier, **kwargs)
+    if statistics is None:
+        statistics = ThresholdStatistics(image)
+    return thresholder(statistics, otsu_threshold_multiplier=otsu_threshold_multiplier, **kwargs)
 
 
 def _get_threshold(method: str = "otsu") -> Callable:
@@ -71,7 +175,9 @@ def _get_threshold(method: str = "otsu") -> Callable:
     raise ValueError(method)
 
 
-def _threshold_otsu(image: npt.NDArray, otsu_threshold_multiplier: float = None, **kwargs) -> float:
+def _threshold_otsu(
+    statistics: ThresholdStatistics, otsu_threshold_multiplier: float = None, nbins: int = 256
+) -> float:
     """
     Calculate the Otsu threshold.
 
@@ -80,22 +186,25 @@ def _threshold_otsu(image: npt.NDArray, otsu_threshold_multiplier: float = None,
 
     Parameters
     ----------
-    image : npt.NDArray
-        2-D Numpy array of image for thresholding.
+    statistics : ThresholdStatistics
+        Statistics of the image for thresholding.
     otsu_threshold_multiplier : float
         Factor for scaling Otsu threshold.
-    **kwargs : dict
-        Dictionary of keyword arguments to pass to 'skimage.filters.threshold_otsu(**kwargs)'.
+    nbins : int
+        Number of histogram bins, see 'skimage.filters.threshold_otsu()'.
 
     Returns
     -------
     float
         Threshold to be used in masking heights.
     """
-    return threshold_otsu(image, **kwargs) * otsu_threshold_multiplier
+    # Images of a single value have no histogram to split, their threshold is that value.
+    if statistics.constant:
+        return statistics.image.reshape(-1)[0] * otsu_threshold_multiplier
+    return threshold_otsu(hist=statistics.histogram(nbins)) * otsu_threshold_multiplier
 
 
-def _threshold_mean(image: npt.NDArray, otsu_threshold_multiplier: float = None, **kwargs) -> float:
+def _threshold_mean(statistics: ThresholdStatistics, otsu_threshold_multiplier: float = None) -> float:
     """
     Calculate the Mean threshold.
 
@@ -104,22 +213,22 @@ def _threshold_mean(image: npt.NDArray, otsu_threshold_multiplier: float = None,
 
     Parameters
     ----------
-    image : npt.NDArray
-        2-D Numpy array of image for thresholding.
+    statistics : ThresholdStatistics
+        Statistics of the image for thresholding.
     otsu_threshold_multiplier : float
         Factor for scaling (not used).
-    **kwargs : dict
-        Dictionary of keyword arguments to pass to 'skimage.filters.threshold_mean(**kwargs)'.
 
     Returns
     -------
     float
         Threshold to be used in masking heights.
     """
-    return threshold_mean(image, **kwargs)
+    return statistics.mean
 
 
-def _threshold_minimum(image: npt.NDArray, otsu_threshold_multiplier: float = None, **kwargs) -> float:
+def _threshold_minimum(
+    statistics: ThresholdStatistics, otsu_threshold_multiplier: float = None, nbins: int = 256, **kwargs
+) -> float:
     """
     Calculate the Minimum threshold.
 
@@ -128,10 +237,12 @@ def _threshold_minimum(image: npt.NDArray, otsu_threshold_multiplier: float = No
 
     Parameters
     ----------
-    image : npt.NDArray
-        2-D Numpy array of image for thresholding.
+    statistics : ThresholdStatistics
+        Statistics of the image for thresholding.
     otsu_threshold_multiplier : float
         Factor for scaling (not used).
+    nbins : int
+        Number of histogram bins, see 'skimage.filters.threshold_minimum()'.
     **kwargs : dict
         Dictionary of keyword arguments to pass to 'skimage.filters.threshold_minimum(**kwargs)'.
 
@@ -140,10 +251,10 @@ def _threshold_minimum(image: npt.NDArray, otsu_threshold_multiplier: float = No
     float
         Threshold to be used in masking heights.
     """
-    return threshold_minimum(image, **kwargs)
+    return threshold_minimum(hist=statistics.histogram(nbins), **kwargs)
 
 
-def _threshold_yen(image: npt.NDArray, otsu_threshold_multiplier: float = None, **kwargs) -> float:
+def _threshold_yen(statistics: ThresholdStatistics, otsu_threshold_multiplier: float = None, nbins: int = 256) -> float:
     """
     Calculate the Yen threshold.
 
@@ -152,22 +263,24 @@ def _threshold_yen(image: npt.NDArray, otsu_threshold_multiplier: float = None,
 
     Parameters
     ----------
-    image : npt.NDArray
-        2-D Numpy array of image for thresholding.
+    statistics : ThresholdStatistics
+        Statistics of the image for thresholding.
     otsu_threshold_multiplier : float
         Factor for scaling (not used).
-    **kwargs : dict
-        Dictionary of keyword arguments to pass to 'skimage.filters.threshold_yen(**kwargs)'.
+    nbins : int
+        Number of histogram bins, see 'skimage.filters.threshold_yen()'.
 
     Returns
     -------
     float
         Threshold to be used in masking heights.
     """
-    return threshold_yen(image, **kwargs)
+    return threshold_yen(hist=statistics.histogram(nbins))
 
 
-def _threshold_triangle(image: npt.NDArray, otsu_threshold_multiplier: float = None, **kwargs) -> float:
+def _threshold_triangle(
+    statistics: ThresholdStatistics, otsu_threshold_multiplier: float = None, nbins: int = 256
+) -> float:
     """
     Calculate the triangle threshold.
 
@@ -176,16 +289,61 @@ def _threshold_triangle(image: npt.NDArray, otsu_threshold_multiplier: float = N
 
     Parameters
     ----------
-    image : npt.NDArray
-        2-D Numpy array of image for thresholding.
+    statistics : ThresholdStatistics
+        Statistics of the image for thresholding.
     otsu_threshold_multiplier : float
         Factor for scaling (not used).
-    **kwargs : dict
-        Dictionary of keyword arguments to pass to 'skimage.filters.threshold_triangle(**kwargs)'.
+    nbins : int
+        Number of histogram bins, see 'skimage.filters.threshold_triangle()'.
+
+    Returns
+    -------
+    float
+        Threshold to be used in masking heights.
+    """
+    counts, bin_centers = statistics.histogram(nbins)
+    return _triangle_from_histogram(counts, bin_centers, statistics.image)
+
+
+def _triangle_from_histogram(counts: npt.NDArray, bin_centers: npt.NDArray, image: npt.NDArray) -> float:
+    """
+    Calculate the triangle threshold from the histogram of an image.
+
+    Follows `skimage.filters.threshold_triangle()` which does not accept a precomputed histogram.
+
+    Parameters
+    ----------
+    counts : npt.NDArray
+        Count of values in each bin of the histogram.
+    bin_centers : npt.NDArray
+        Centre of each bin of the histogram.
+    image : npt.NDArray
+        Image the histogram is of, the threshold of an image of a single value is that value.
 
     Returns
     -------
     float
         Threshold to be used in masking heights.
     """
-    return threshold_triangle(image, **kwargs)
+    nbins = len(counts)
+    arg_peak_height = np.argmax(counts)
+    peak_height = counts[arg_peak_height]
+    arg_low_level, arg_high_level = np.flatnonzero(counts)[[0, -1]]
+    if arg_low_level == arg_high_level:
+        return image.ravel()[0]
+    # Flip the histogram so the longer tail is always on the right
+    flip = arg_peak_height - arg_low_level < arg_high_level - arg_peak_height
+    if flip:
+        counts = counts[::-1]
+        arg_low_level = nbins - arg_high_level - 1
+        arg_peak_height = nbins - arg_peak_height - 1
+    # Find the point furthest from the line between the peak and the lowest level
+    width = arg_peak_height - arg_low_level
+    x1 = np.arange(width)
+    y1 = counts[x1 + arg_low_level]
+    norm = np.sqrt(peak_height**2 + width**2)
+    length = peak_height / norm * x1 - width / norm * y1
+    arg_level = np.argmax(length) + arg_low_level
+    if flip:
+        arg_level = nbins - arg_level - 1
+    return bin_centers[arg_level]
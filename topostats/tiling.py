@@ -0,0 +1,322 @@
+"""Process large images in tiles, bounding the memory used and spreading the work over several cores."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from skimage.measure import label
+
+from topostats.logs.logs import LOGGER_NAME
+
+LOGGER = logging.getLogger(LOGGER_NAME)
+
+
+class Tile(NamedTuple):
+    """
+    Region of an image processed as one tile.
+
+    Parameters
+    ----------
+    outer : tuple[slice, ...]
+        Region of the image read when processing the tile, the tile extended by the overlap on every side that is not
+        an edge of the image.
+    inner : tuple[slice, ...]
+        Region of the image the tile is responsible for, tiles' inner regions do not overlap and cover the image.
+    core : tuple[slice, ...]
+        The inner region relative to the outer region, i.e. the part of a tile's result that is kept.
+    """
+
+    outer: tuple[slice, ...]
+    inner: tuple[slice, ...]
+    core: tuple[slice, ...]
+
+
+def tile_image(shape: tuple[int, ...], tile_size: int | tuple[int | None, ...], overlap: int = 0) -> list[Tile]:
+    """
+    Split an array of the given shape into tiles.
+
+    Parameters
+    ----------
+    shape : tuple[int, ...]
+        Shape of the array to split.
+    tile_size : int | tuple[int | None, ...]
+        Size of the tiles along every axis, or along each axis where ``None`` does not split the axis (e.g.
+        ``(256, None)`` splits an image into bands of 256 rows).
+    overlap : int
+        Number of pixels each tile extends into its neighbours, so operations that depend on nearby pixels (e.g. a
+        Gaussian filter) give the same result in a tile as in the whole image.
+
+    Returns
+    -------
+    list[Tile]
+        Tiles in raster order.
+    """
+    if isinstance(tile_size, int):
+        tile_size = (tile_size,) * len(shape)
+    axes = []
+    for length, size in zip(shape, tile_size):
+        size = length if size is None else size
+        if size < 1:
+            raise ValueError(f"Tile size must be positive, got {size}.")
+        regions = []
+        for start in range(0, length, size):
+            end = min(start + size, length)
+            outer = slice(max(start - overlap, 0), min(end + overlap, length))
+            regions.append((outer, slice(start, end), slice(start - outer.start, end - outer.start)))
+        axes.append(regions)
+    return [Tile(*zip(*regions)) for regions in itertools.product(*axes)]
+
+
+def get_tile_size(image: npt.NDArray, tiling: dict | None) -> int | None:
+    """
+    Size of the tiles to process an image in, if tiling is enabled and the image is large enough to need it.
+
+    Parameters
+    ----------
+    image : npt.NDArray
+        Image to be processed, only 2-D images are tiled.
+    tiling : dict | None
+        Dictionary of 'run', 'tile_size' and 'cores' options, if ``None`` images are not tiled.
+
+    Returns
+    -------
+    int | None
+        Size of the tiles in pixels, or ``None`` if the image is processed whole.
+    """
+    if tiling is not None and tiling["run"] and image.ndim == 2 and max(image.shape) > tiling["tile_size"]:
+        return tiling["tile_size"]
+    return None
+
+
+def run_tiles(function: Callable, tiles: Iterable[Tile], cores: int = 1) -> list[Any]:
+    """
+    Run a function on each tile.
+
+    Tiles are processed by a pool of threads, as workers processing files in parallel are daemonic processes that can
+    not start processes of their own. The NumPy, SciPy and scikit-image routines that do the work release the GIL.
+
+    Parameters
+    ----------
+    function : Callable
+        Function run for each tile, called with the ``Tile``.
+    tiles : Iterable[Tile]
+        Tiles to process.
+    cores : int
+        Number of threads processing tiles.
+
+    Returns
+    -------
+    list[Any]
+        The result of the function for each tile, in the order of the tiles.
+    """
+    if cores <= 1:
+        return [function(tile) for tile in tiles]
+    with ThreadPoolExecutor(max_workers=cores) as executor:
+        return list(executor.map(function, tiles))
+
+
+def map_tiles(
+    function: Callable,
+    image: npt.NDArray,
+    tile_size: int | tuple[int | None, ...],
+    overlap: int = 0,
+    cores: int = 1,
+) -> npt.NDArray:
+    """
+    Apply a function to an image tile by tile and assemble the results.
+
+    Each tile is extended by the overlap before the function is applied and only the result for the tile itself is
+    kept, so functions whose result at a pixel depends only on pixels within ``overlap`` of it give the same result as
+    applying the function to the whole image.
+
+    Parameters
+    ----------
+    function : Callable
+        Function of an array returning an array of the same shape.
+    image : npt.NDArray
+        Image to process.
+    tile_size : int | tuple[int | None, ...]
+        Size of the tiles, see ``tile_image()``.
+    overlap : int
+        Number of pixels each tile extends into its neighbours.
+    cores : int
+        Number of threads processing tiles.
+
+    Returns
+    -------
+    npt.NDArray
+        The assembled result, of the type of the function's result.
+    """
+    tiles = tile_image(image.shape, tile_size, overlap)
+    # The first tile is processed on its own to find the type of the result
+    first = function(image[tiles[0].outer])[tiles[0].core]
+    out = np.empty(image.shape, dtype=first.dtype)
+    out[tiles[0].inner] = first
+
+    def _process(tile: Tile) -> None:
+        out[tile.inner] = function(image[tile.outer])[tile.core]
+
+    run_tiles(_process, tiles[1:], cores)
+    return out
+
+
+def label_tiled(
+    image: npt.NDArray, tile_size: int, cores: int = 1, background: int = 0, connectivity: int | None = None
+) -> npt.NDArray:
+    """
+    Label the connected regions of an image tile by tile, stitching regions that span tiles back together.
+
+    Each tile is labelled independently and the labels of regions that touch across the seams between tiles are
+    merged. Regions are numbered in the order they are first met scanning the image row by row, so the result is the
+    same as labelling the whole image with ``skimage.measure.label()``.
+
+    Parameters
+    ----------
+    image : npt.NDArray
+        2-D image to label, regions are connected pixels of the same value.
+    tile_size : int
+        Size of the tiles in pixels.
+    cores : int
+        Number of threads labelling tiles.
+    background : int
+        Value of background pixels, which are not labelled.
+    connectivity : int | None
+        Maximum number of orthogonal steps between neighbouring pixels, ``None`` for full connectivity (including
+        diagonal neighbours), as ``skimage.measure.label()``.
+
+    Returns
+    -------
+    npt.NDArray
+        Image with each region numbered from 1 and the background 0.
+    """
+    connectivity = image.ndim if connectivity is None else connectivity
+    tiles = tile_image(image.shape, tile_size)
+
+    def _label_tile(tile: Tile) -> tuple[npt.NDArray, int, npt.NDArray]:
+        labels, count = label(image[tile.inner], background=background, return_num=True, connectivity=connectivity)
+        # Position in the whole image of the first pixel of each region. Regions are numbered in the order they are
+        # first met so each region's first pixel is where the running maximum of the labels increases.
+        pixels = np.flatnonzero(labels)
+        values = labels.ravel()[pixels]
+        increases = np.empty(values.shape, dtype=bool)
+        increases[:1] = True
+        np.greater(values[1:], np.maximum.accumulate(values)[:-1], out=increases[1:])
+        rows, cols = np.unravel_index(pixels[increases], labels.shape)
+        return labels, count, (rows + tile.inner[0].start) * image.shape[1] + cols + tile.inner[1].start
+
+    def _label_into(tile: Tile) -> tuple[int, npt.NDArray]:
+        labels, count, first = _label_tile(tile)
+        labelled[tile.inner] = labels
+        return count, first
+
+    # Tiles are labelled into the one array (of the type of the labels of the first tile) and are given distinct
+    # provisional labels by offsetting each tile's labels by the number of regions in earlier tiles
+    first_labels, first_count, first_tile_pixels = _label_tile(tiles[0])
+    labelled = np.empty(image.shape, dtype=first_labels.dtype)
+    labelled[tiles[0].inner] = first_labels
+    del first_labels
+    offsets, first_pixels, total = [], [np.zeros(1, dtype=np.int64)], 0
+    for tile_count, tile_first_pixels in [(first_count, first_tile_pixels)] + run_tiles(_label_into, tiles[1:], cores):
+        offsets.append(total)
+        first_pixels.append(tile_first_pixels)
+        total += tile_count
+    first_pixels = np.concatenate(first_pixels)
+
+    # Pairs of labels of neighbouring pixels of the same value either side of each seam are the same region
+    pairs = [np.empty((2, 0), dtype=np.int64)]
+    shifts = [0] if connectivity == 1 else [-1, 0, 1]
+    for axis in (0, 1):
+        for seam in sorted({tile.inner[axis].start for tile in tiles} - {0}):
+            before = _seam_labels(labelled, tiles, offsets, seam - 1, axis)
+            after = _seam_labels(labelled, tiles, offsets, seam, axis)
+            values_before = np.take(image, seam - 1, axis=axis)
+            values_after = np.take(image, seam, axis=axis)
+            for shift in shifts:
+                labels_pair = _shift_pair(before, after, shift)
+                values_pair = _shift_pair(values_before, values_after, shift)
+                connected = (labels_pair[0] > 0) & (labels_pair[1] > 0) & (values_pair[0] == values_pair[1])
+                pairs.append(np.stack([labels_pair[0][connected], labels_pair[1][connected]]))
+    pairs = np.concatenate(pairs, axis=1)
+    graph = coo_matrix((np.ones(pairs.shape[1], dtype=bool), (pairs[0], pairs[1])), shape=(total + 1, total + 1))
+    _, components = connected_components(graph, directed=False)
+
+    # Number the merged regions in the order of their first pixel, the background (label 0) is always first
+    component_first = np.full(components.max() + 1, np.iinfo(np.int64).max)
+    np.minimum.at(component_first, components, first_pixels)
+    component_first[components[0]] = -1
+    order = np.empty_like(component_first)
+    order[np.argsort(component_first, kind="stable")] = np.arange(len(component_first))
+    lookup = order[components].astype(labelled.dtype)
+
+    def _relabel(tile_offset: tuple[Tile, int]) -> None:
+        tile, offset = tile_offset
+        tile_lookup = lookup[offset : offset + labelled[tile.inner].max(initial=0) + 1].copy()
+        tile_lookup[0] = 0
+        labelled[tile.inner] = tile_lookup[labelled[tile.inner]]
+
+    run_tiles(_relabel, list(zip(tiles, offsets)), cores)
+    LOGGER.debug(f"Labelled {lookup.max()} regions in {len(tiles)} tiles.")
+    return labelled
+
+
+def _seam_labels(labelled: npt.NDArray, tiles: list[Tile], offsets: list[int], index: int, axis: int) -> npt.NDArray:
+    """
+    Provisional labels of a row or column of pixels next to a seam between tiles.
+
+    Parameters
+    ----------
+    labelled : npt.NDArray
+        Labels of each tile, numbered from 1 within the tile.
+    tiles : list[Tile]
+        Tiles the image was labelled in.
+    offsets : list[int]
+        Offset of the labels of each tile.
+    index : int
+        Index of the row (``axis=0``) or column (``axis=1``).
+    axis : int
+        Axis the index is along.
+
+    Returns
+    -------
+    npt.NDArray
+        Labels of the pixels offset by the tile each pixel is in, background pixels are 0.
+    """
+    line = np.take(labelled, index, axis=axis).astype(np.int64)
+    line_offsets = np.zeros_like(line)
+    for tile, offset in zip(tiles, offsets):
+        if tile.inner[axis].start <= index < tile.inner[axis].stop:
+            line_offsets[tile.inner[1 - axis]] = offset
+    return np.where(line > 0, line + line_offsets, 0)
+
+
+def _shift_pair(before: npt.NDArray, after: npt.NDArray, shift: int) -> tuple[npt.NDArray, npt.NDArray]:
+    """
+    Align the pixels either side of a seam with their diagonal neighbours.
+
+    Parameters
+    ----------
+    before : npt.NDArray
+        Pixels on the first side of the seam.
+    after : npt.NDArray
+        Pixels on the second side of the seam.
+    shift : int
+        Offset along the seam of the neighbour of each pixel of ``before`` in ``after``.
+
+    Returns
+    -------
+    tuple[npt.NDArray, npt.NDArray]
+        The pixels of each side that are diagonal neighbours, paired by position.
+    """
+    if shift > 0:
+        return before[:-shift], after[shift:]
+    if shift < 0:
+        return before[-shift:], after[:shift]
+    return before, after
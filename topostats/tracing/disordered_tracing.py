@@ -4,16 +4,20 @@ from __future__ import annotations
 
 import logging
 import warnings
+from typing import TYPE_CHECKING
 
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
-import skan
-import skimage.measure as skimage_measure
 from scipy import ndimage
 from skimage import filters
 from skimage.morphology import label
 
+# skan compiles its graph routines with Numba when imported so is only imported when tracing
+if TYPE_CHECKING:
+    import skan
+
+from topostats.grain_crops import GrainCrop, crop_labelled_grains, pad_grain_crop
 from topostats.logs.logs import LOGGER_NAME
 from topostats.tracing.pruning import prune_skeleton
 from topostats.tracing.skeletonize import getSkeleton
@@ -309,6 +313,7 @@ def trace_image_disordered(  # pylint: disable=too-many-arguments,too-many-local
     skeletonisation_params: dict,
     pruning_params: dict,
     pad_width: int = 1,
+    grain_crops: list[GrainCrop] | None = None,
 ) -> tuple[dict, pd.DataFrame, dict, pd.DataFrame]:
     """
     Processor function for tracing image.
@@ -335,17 +340,22 @@ def trace_image_disordered(  # pylint: disable=too-many-arguments,too-many-local
         Dictionary of options for pruning.
     pad_width : int
         Padding to the cropped image mask.
+    grain_crops : list[GrainCrop] | None
+        Unpadded crops of each grain of the mask, in the order of their labels. If ``None`` the grains are cropped from
+        the mask.
 
     Returns
     -------
     tuple[dict, pd.DataFrame, dict, pd.DataFrame]
         Binary and integer labeled cropped and full-image masks from skeletonising and pruning the grains in the image.
     """
+    import skan  # pylint: disable=import-outside-toplevel
+
     # Check both arrays are the same shape - should this be a test instead, why should this ever occur?
     if image.shape != grains_mask.shape:
         raise ValueError(f"Image shape ({image.shape}) and Mask shape ({grains_mask.shape}) should match.")
 
-    cropped_images, cropped_masks, bboxs = prep_arrays(image, grains_mask, pad_width)
+    cropped_images, cropped_masks, bboxs = prep_arrays(image, grains_mask, pad_width, grain_crops)
     n_grains = len(cropped_images)
     img_base = np.zeros_like(image)
     disordered_trace_crop_data = {}
@@ -562,7 +572,7 @@ def find_connections(row: pd.Series, skan_df: pd.DataFrame) -> str:
 
 
 def prep_arrays(
-    image: npt.NDArray, labelled_grains_mask: npt.NDArray, pad_width: int
+    image: npt.NDArray, labelled_grains_mask: npt.NDArray, pad_width: int, grain_crops: list[GrainCrop] | None = None
 ) -> tuple[dict[int, npt.NDArray], dict[int, npt.NDArray]]:
     """
     Take an image and labelled mask and crops individual grains and original heights to a list.
@@ -579,30 +589,30 @@ def prep_arrays(
         zero). Typically this will be output from 'grains.directions[<direction>["labelled_region_02]'.
     pad_width : int
         Cells by which to pad cropped regions by.
+    grain_crops : list[GrainCrop] | None
+        Unpadded crops of each grain of the mask, in the order of their labels. If ``None`` the grains are cropped from
+        the mask.
 
     Returns
     -------
     Tuple
         Returns a tuple of three dictionaries, the cropped images, cropped masks and bounding boxes.
     """
-    # Get bounding boxes for each grain
-    region_properties = skimage_measure.regionprops(labelled_grains_mask)
-    # Subset image and grains then zip them up
-    cropped_images = {}
-    cropped_masks = {}
-
-    # for index, grain in enumerate(region_properties):
-    #    cropped_image, cropped_bbox = crop_array(image, grain.bbox, pad_width)
-
-    cropped_images = {index: crop_array(image, grain.bbox, pad_width) for index, grain in enumerate(region_properties)}
-    cropped_images = {index: np.pad(grain, pad_width=pad_width) for index, grain in cropped_images.items()}
+    # Crop each grain, padded within the image, other grains in the padded region are removed
+    if grain_crops is None:
+        grain_crops = crop_labelled_grains(labelled_grains_mask, padding=pad_width)
+    else:
+        grain_crops = [pad_grain_crop(grain_crop, pad_width, image.shape) for grain_crop in grain_crops]
+    # Subset image and grains
+    cropped_images = {
+        index: np.pad(crop_array(image, grain_crop.bounding_box), pad_width=pad_width)
+        for index, grain_crop in enumerate(grain_crops)
+    }
     cropped_masks = {
-        index: crop_array(labelled_grains_mask, grain.bbox, pad_width) for index, grain in enumerate(region_properties)
+        index: np.pad(grain_crop.mask, pad_width=pad_width).astype(int) for index, grain_crop in enumerate(grain_crops)
     }
-    cropped_masks = {index: np.pad(grain, pad_width=pad_width) for index, grain in cropped_masks.items()}
-    cropped_masks = {index: np.where(grain == (index + 1), 1, 0) for index, grain in cropped_masks.items()}
     # Get BBOX coords to remap crops to images
-    bboxs = [pad_bounding_box(image.shape, list(grain.bbox), pad_width=pad_width) for grain in region_properties]
+    bboxs = [list(grain_crop.bounding_box) for grain_crop in grain_crops]
 
     return (cropped_images, cropped_masks, bboxs)
 
@@ -731,6 +741,8 @@ def get_skan_image(original_image: npt.NDArray, pruned_skeleton: npt.NDArray, sk
     npt.NDArray
         2D array where the background is 0, and skeleton branches label as their Skan branch type.
     """
+    import skan  # pylint: disable=import-outside-toplevel
+
     branch_field_image = np.zeros_like(original_image)
     skeleton_image = np.where(pruned_skeleton == 1, original_image, 0)
     try:
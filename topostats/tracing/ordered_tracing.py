@@ -9,7 +9,6 @@ import numpy as np
 import numpy.typing as npt
 import pandas as pd
 from skimage.morphology import binary_dilation, label
-from topoly import jones, translate_code
 
 from topostats.logs.logs import LOGGER_NAME
 from topostats.tracing.tracingfuncs import coord_dist, genTracingFuncs, order_branch, reorderTrace
@@ -282,6 +281,9 @@ class OrderedTraceNodestats:  # pylint: disable=too-many-instance-attributes
             del nxyz_cp[i]
         # classify topology for non-reidmeister moves
         if len(nxyz_cp) != 0:
+            # Topoly is slow to import and only needed here
+            from topoly import jones, translate_code  # pylint: disable=import-outside-toplevel
+
             try:
                 pd_code = translate_code(
                     nxyz_cp, output_type="pdcode"
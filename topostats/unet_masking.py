@@ -3,20 +3,30 @@
 from __future__ import annotations
 
 import logging
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import keras
 import numpy as np
 import numpy.typing as npt
-import tensorflow as tf
 from PIL import Image
 
 from topostats.logs.logs import LOGGER_NAME
 
+# TensorFlow and Keras take seconds to import so are only imported when a model is used
+if TYPE_CHECKING:
+    import keras
+    import tensorflow as tf
+
 LOGGER = logging.getLogger(LOGGER_NAME)
 
 # pylint: disable=too-many-positional-arguments
 # pylint: disable=too-many-locals
 
+# Number of U-Net models each process keeps loaded, the least recently used is evicted when another is loaded
+UNET_MODEL_CACHE_SIZE = 4
+
 
 def dice_loss(y_true: npt.NDArray[np.float32], y_pred: npt.NDArray[np.float32], smooth: float = 1e-5) -> tf.Tensor:
     """
@@ -38,6 +48,8 @@ def dice_loss(y_true: npt.NDArray[np.float32], y_pred: npt.NDArray[np.float32],
     tf.Tensor
         The DICE loss.
     """
+    import tensorflow as tf  # pylint: disable=import-outside-toplevel
+
     # Ensure the tensors are of the same shape
     y_true = tf.squeeze(y_true, axis=-1) if y_true.shape[-1] == 1 else y_true
     y_pred = tf.squeeze(y_pred, axis=-1) if y_pred.shape[-1] == 1 else y_pred
@@ -72,6 +84,8 @@ def iou_loss(y_true: npt.NDArray[np.float32], y_pred: npt.NDArray[np.float32], s
     tf.Tensor
         The IoU loss.
     """
+    import tensorflow as tf  # pylint: disable=import-outside-toplevel
+
     # Ensure the tensors are of the same shape
     y_true = tf.squeeze(y_true, axis=-1) if y_true.shape[-1] == 1 else y_true
     y_pred = tf.squeeze(y_pred, axis=-1) if y_pred.shape[-1] == 1 else y_pred
@@ -101,6 +115,8 @@ def mean_iou(y_true: npt.NDArray[np.float32], y_pred: npt.NDArray[np.float32]):
     tf.Tensor
         The mean IoU.
     """
+    import tensorflow as tf  # pylint: disable=import-outside-toplevel
+
     # Ensure the tensors are of the same shape, and ignore the background class
     # The [-1] here is to flatten the tensor into a 1D array, allowing for the calculation of the IoU
     # The 1: is to use all channels except channel 0. Since this would be the background class and if
@@ -115,6 +131,88 @@ def mean_iou(y_true: npt.NDArray[np.float32], y_pred: npt.NDArray[np.float32]):
     return tf.reduce_mean((intersect + smooth) / (union - intersect + smooth))
 
 
+def load_unet_model(model_path: str | Path) -> keras.Model:
+    """
+    Load a U-Net model, re-using the model already loaded by this process if the file is unchanged.
+
+    Models are cached by their path and modification time, so a model is loaded once by each worker for a whole batch
+    and is reloaded if the file is replaced. Paths that can not be found are passed to Keras without caching.
+
+    Parameters
+    ----------
+    model_path : str | Path
+        Path to the U-Net model.
+
+    Returns
+    -------
+    keras.Model
+        The U-Net model.
+    """
+    try:
+        path = Path(model_path).resolve()
+        modified = path.stat().st_mtime_ns
+    except (OSError, TypeError):
+        return _load_unet_model(model_path)
+    return _cached_unet_model(str(path), modified)
+
+
+@lru_cache(maxsize=UNET_MODEL_CACHE_SIZE)
+def _cached_unet_model(model_path: str, modified: int) -> keras.Model:  # pylint: disable=unused-argument
+    """
+    Load a U-Net model, cached by path and modification time.
+
+    Parameters
+    ----------
+    model_path : str
+        Resolved path to the U-Net model.
+    modified : int
+        Modification time of the model file in nanoseconds, part of the cache key only.
+
+    Returns
+    -------
+    keras.Model
+        The U-Net model.
+    """
+    return _load_unet_model(model_path)
+
+
+def _load_unet_model(model_path: str | Path) -> keras.Model:
+    """
+    Load a U-Net model from disk.
+
+    Parameters
+    ----------
+    model_path : str | Path
+        Path to the U-Net model.
+
+    Returns
+    -------
+    keras.Model
+        The U-Net model.
+    """
+    LOGGER.debug(f"Loading UNet model : {model_path}")
+    # When debugging, you might find that the custom_objects are incorrect. This is entirely based on what the model used
+    # for its loss during training and so this will need to be changed a lot.
+    # Once the group has gotten used to training models, this can be made configurable, but currently it's too changeable.
+    # unet_model = keras.models.load_model(
+    #     self.unet_config["model_path"], custom_objects={"dice_loss": dice_loss, "iou_loss": iou_loss}
+    # )
+    # You may also get an error referencing a "group_1" parameter, this is discussed in this issue:
+    # https://github.com/keras-team/keras/issues/19441 which also has an experimental fix that we can try but
+    # I haven't tested it yet.
+    import keras  # pylint: disable=import-outside-toplevel
+
+    try:
+        return keras.models.load_model(
+            model_path, custom_objects={"mean_iou": mean_iou, "iou_loss": iou_loss}, compile=False
+        )
+    except Exception as e:
+        LOGGER.debug(f"Python executable: {sys.executable}")
+        LOGGER.debug(f"Keras version: {keras.__version__}")
+        LOGGER.debug(f"Model path: {model_path}")
+        raise e
+
+
 def predict_unet(
     image: npt.NDArray[np.float32],
     model: keras.Model,
@@ -146,15 +244,202 @@ def predict_unet(
     npt.NDArray[np.bool_]
         The predicted mask.
     """
-    # Strip the batch dimension from the model input shape
-    image_shape: tuple[int, int] = model_input_shape[1:3]
+    return predict_unet_batch(
+        images=[image],
+        model=model,
+        confidence=confidence,
+        model_input_shape=model_input_shape,
+        upper_norm_bound=upper_norm_bound,
+        lower_norm_bound=lower_norm_bound,
+        batch_size=1,
+    )[0]
+
+
+def predict_unet_batch(
+    images: list[npt.NDArray[np.float32]],
+    model: keras.Model,
+    confidence: float,
+    model_input_shape: tuple[int | None, int, int, int],
+    upper_norm_bound: float,
+    lower_norm_bound: float,
+    batch_size: int = 32,
+) -> list[npt.NDArray[np.bool_]]:
+    """
+    Predict the segmentation of several images (e.g. crops of each grain), running the model on batches of images.
+
+    Each image is normalised and resized to the model input shape, the model is run once for each batch of up to
+    ``batch_size`` images and each predicted mask is resized back to the size of its image.
+
+    Parameters
+    ----------
+    images : list[npt.NDArray[np.float32]]
+        The images to predict the masks for, which may differ in size.
+    model : keras.Model
+        The U-Net model.
+    confidence : float
+        The confidence threshold for the mask.
+    model_input_shape : tuple[int | None, int, int, int]
+        The shape of the model input, including the batch and channel dimensions.
+    upper_norm_bound : float
+        The upper bound for normalising the image.
+    lower_norm_bound : float
+        The lower bound for normalising the image.
+    batch_size : int
+        Largest number of images passed to the model at once.
+
+    Returns
+    -------
+    list[npt.NDArray[np.bool_]]
+        The predicted mask of each image, the size of the image with a channel for each class.
+    """
     LOGGER.info(f"Model input shape: {model_input_shape}")
+    if not images:
+        return []
+    LOGGER.info(f"Preprocessing {len(images)} images for Unet prediction...")
+    inputs = np.stack(
+        [_preprocess_unet(image, model_input_shape, upper_norm_bound, lower_norm_bound) for image in images]
+    )
+
+    # Predict the masks
+    LOGGER.info(f"Running Unet & predicting masks in batches of {batch_size}")
+    prediction: npt.NDArray[np.float32] = np.concatenate(
+        [model.predict(inputs[start : start + batch_size]) for start in range(0, len(inputs), batch_size)]
+    )
+    LOGGER.info(f"Unet finished predicted masks. Prediction shape: {prediction.shape}")
+
+    # Threshold the predicted masks
+    predicted_masks: npt.NDArray[np.bool_] = prediction > confidence
+
+    # Note that these predicted masks can have any number of channels, depending on the number of classes for the model
+
+    # Check if the output is a single channel mask and convert it to a two-channel mask since the output is
+    # designed to be categorical, where even the background has a channel
+    if predicted_masks.shape[3] == 1:
+        predicted_masks = np.concatenate((1 - predicted_masks, predicted_masks), axis=3)
+
+    assert len(predicted_masks.shape) == 4, f"Predicted masks shape is not 4D: {predicted_masks.shape}"
+    assert (
+        predicted_masks.shape[3] >= 2
+    ), f"Predicted mask has less than 2 channels: {predicted_masks.shape[3]}, needs separate background channel"
+    return [_resize_unet_mask(mask, image.shape) for mask, image in zip(predicted_masks, images)]
+
+
+def predict_unet_tiled(
+    image: npt.NDArray[np.float32],
+    model: keras.Model,
+    confidence: float,
+    model_input_shape: tuple[int | None, int, int, int],
+    upper_norm_bound: float,
+    lower_norm_bound: float,
+    overlap: int = 32,
+    batch_size: int = 32,
+) -> npt.NDArray[np.bool_]:
+    """
+    Predict the segmentation of a whole image, running the model over overlapping tiles of the model input size.
+
+    Tiles are taken from the normalised image at its own resolution, so the model is run on each pixel once (or a few
+    times where tiles overlap) rather than on every crop containing it. Where tiles overlap the predicted probabilities
+    are blended, each tile's weight falling linearly to its edges over ``overlap`` pixels, so there are no seams. The
+    image is padded with the lower normalisation bound if it is smaller than a tile.
+
+    Parameters
+    ----------
+    image : npt.NDArray[np.float32]
+        2-D image to predict the mask of.
+    model : keras.Model
+        The U-Net model.
+    confidence : float
+        The confidence threshold for the mask.
+    model_input_shape : tuple[int | None, int, int, int]
+        The shape of the model input, including the batch and channel dimensions.
+    upper_norm_bound : float
+        The upper bound for normalising the image.
+    lower_norm_bound : float
+        The lower bound for normalising the image.
+    overlap : int
+        Number of pixels neighbouring tiles overlap by, must be less than the size of the tiles.
+    batch_size : int
+        Largest number of tiles passed to the model at once.
+
+    Returns
+    -------
+    npt.NDArray[np.bool_]
+        The predicted mask, the size of the image with a channel for each class.
+    """
+    tile_shape: tuple[int, int] = tuple(model_input_shape[1:3])
+    if overlap >= min(tile_shape):
+        raise ValueError(f"Tile overlap ({overlap}) must be less than the size of the tiles {tile_shape}.")
+    shape = image.shape
+    normalised = (np.clip(image, lower_norm_bound, upper_norm_bound) - lower_norm_bound) / (
+        upper_norm_bound - lower_norm_bound
+    )
+    normalised = np.pad(
+        normalised.astype(np.float32),
+        [(0, max(tile - length, 0)) for tile, length in zip(tile_shape, shape)],
+        constant_values=0.0,
+    )
+    # Tiles start a tile less the overlap apart, the last tile along each axis ends at the edge of the image
+    starts = [
+        sorted({*range(0, length - tile, tile - overlap), length - tile})
+        for tile, length in zip(tile_shape, normalised.shape)
+    ]
+    corners = [(row, col) for row in starts[0] for col in starts[1]]
+    LOGGER.info(f"Running Unet on {len(corners)} tiles of {tile_shape} in batches of {batch_size}")
+
+    # Weights fall linearly to the edges of each tile so predictions are blended smoothly across the overlaps
+    ramps = [
+        np.minimum(np.minimum(np.arange(tile) + 1, tile - np.arange(tile)), max(overlap, 1)) for tile in tile_shape
+    ]
+    weight = np.outer(*ramps).astype(np.float32)[..., np.newaxis]
+    probabilities, weights = None, np.zeros((*normalised.shape, 1), dtype=np.float32)
+    for start in range(0, len(corners), batch_size):
+        batch = corners[start : start + batch_size]
+        tiles = np.stack([normalised[row : row + tile_shape[0], col : col + tile_shape[1]] for row, col in batch])[
+            ..., np.newaxis
+        ]
+        prediction: npt.NDArray[np.float32] = model.predict(tiles)
+        if probabilities is None:
+            probabilities = np.zeros((*normalised.shape, prediction.shape[3]), dtype=np.float32)
+        for (row, col), tile_prediction in zip(batch, prediction):
+            probabilities[row : row + tile_shape[0], col : col + tile_shape[1]] += tile_prediction * weight
+            weights[row : row + tile_shape[0], col : col + tile_shape[1]] += weight
+    probabilities = probabilities[: shape[0], : shape[1]] / weights[: shape[0], : shape[1]]
+    LOGGER.info(f"Unet finished predicted mask. Prediction shape: {probabilities.shape}")
+
+    # Threshold the blended probabilities, a single channel mask gets a background channel as the output is categorical
+    predicted_mask: npt.NDArray[np.bool_] = probabilities > confidence
+    if predicted_mask.shape[2] == 1:
+        predicted_mask = np.concatenate((~predicted_mask, predicted_mask), axis=2)
+    return predicted_mask
 
-    # Make a copy of the original image
-    original_image = image.copy()
 
-    # Run the model on a single image
-    LOGGER.info("Preprocessing image for Unet prediction...")
+def _preprocess_unet(
+    image: npt.NDArray[np.float32],
+    model_input_shape: tuple[int | None, int, int, int],
+    upper_norm_bound: float,
+    lower_norm_bound: float,
+) -> npt.NDArray[np.float32]:
+    """
+    Normalise an image and resize it to the model input shape.
+
+    Parameters
+    ----------
+    image : npt.NDArray[np.float32]
+        The image to prepare.
+    model_input_shape : tuple[int | None, int, int, int]
+        The shape of the model input, including the batch and channel dimensions.
+    upper_norm_bound : float
+        The upper bound for normalising the image.
+    lower_norm_bound : float
+        The lower bound for normalising the image.
+
+    Returns
+    -------
+    npt.NDArray[np.float32]
+        The normalised image of the model input shape, with a channel dimension.
+    """
+    # Strip the batch dimension from the model input shape
+    image_shape: tuple[int, int] = model_input_shape[1:3]
 
     # Normalise the image
     image = np.clip(image, lower_norm_bound, upper_norm_bound)
@@ -165,35 +450,26 @@ def predict_unet(
     image_resized = Image.fromarray(image)
     image_resized = image_resized.resize(image_shape)
     image_resized_np: npt.NDArray[np.float32] = np.array(image_resized)
+    return np.expand_dims(image_resized_np, axis=2)
 
-    # Predict the mask
-    LOGGER.info("Running Unet & predicting mask")
-    prediction: npt.NDArray[np.float32] = model.predict(np.expand_dims(image_resized_np, axis=(0, 3)))
-    LOGGER.info(f"Unet finished predicted mask. Prediction shape: {prediction.shape}")
-
-    # Threshold the predicted mask
-    predicted_mask: npt.NDArray[np.bool_] = prediction > confidence
-
-    # Remove the batch dimension since we are predicting single images at a time
-    predicted_mask = predicted_mask[0]
 
-    # Note that this predicted mask can have any number of channels, depending on the number of classes for the model
+def _resize_unet_mask(predicted_mask: npt.NDArray[np.bool_], shape: tuple[int, ...]) -> npt.NDArray[np.bool_]:
+    """
+    Resize each channel of a predicted mask to the size of the image it was predicted from.
 
-    # Check if the output is a single channel mask and convert it to a two-channel mask since the output is
-    # designed to be categorical, where even the background has a channel
-    if predicted_mask.shape[2] == 1:
-        predicted_mask = np.concatenate((1 - predicted_mask, predicted_mask), axis=2)
+    Parameters
+    ----------
+    predicted_mask : npt.NDArray[np.bool_]
+        Predicted mask of the model output shape, without the batch dimension.
+    shape : tuple[int, ...]
+        Shape of the image the mask was predicted from.
 
-    assert len(predicted_mask.shape) == 3, f"Predicted mask shape is not 3D: {predicted_mask.shape}"
-    assert (
-        predicted_mask.shape[2] >= 2
-    ), f"Predicted mask has less than 2 channels: {predicted_mask.shape[2]}, needs separate background channel"
-
-    # Resize each channel of the predicted mask to the original image size, also remove the batch
-    # dimension but keep channel
-    resized_predicted_mask: npt.NDArray[np.bool_] = np.zeros(
-        (original_image.shape[0], original_image.shape[1], predicted_mask.shape[2])
-    ).astype(bool)
+    Returns
+    -------
+    npt.NDArray[np.bool_]
+        The mask resized to the image with a channel for each class.
+    """
+    resized_predicted_mask: npt.NDArray[np.bool_] = np.zeros((shape[0], shape[1], predicted_mask.shape[2])).astype(bool)
     for channel_index in range(predicted_mask.shape[2]):
         # Note that uint8 is required to allow PIL to load the array into an image
         channel_mask = predicted_mask[:, :, channel_index].astype(np.uint8)
@@ -201,9 +477,7 @@ def predict_unet(
         # Resize the channel mask to the original image size, but we want boolean so use nearest neighbour
         # Sylvia: Pylint incorrectly thinks that Image.NEAREST is not a member of Image. IDK why.
         # pylint: disable=no-member
-        channel_mask_PIL = channel_mask_PIL.resize(
-            (original_image.shape[1], original_image.shape[0]), Image.Resampling.NEAREST
-        )
+        channel_mask_PIL = channel_mask_PIL.resize((shape[1], shape[0]), Image.Resampling.NEAREST)
         resized_predicted_mask[:, :, channel_index] = np.array(channel_mask_PIL).astype(bool)
 
     return resized_predicted_mask
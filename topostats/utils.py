@@ -14,7 +14,7 @@ import pandas as pd
 from scipy.ndimage import convolve
 
 from topostats.logs.logs import LOGGER_NAME
-from topostats.thresholds import threshold
+from topostats.thresholds import ThresholdStatistics, threshold
 
 LOGGER = logging.getLogger(LOGGER_NAME)
 
@@ -243,6 +243,7 @@ def get_thresholds(  # noqa: C901
     otsu_threshold_multiplier: float = None,
     threshold_std_dev: dict = None,
     absolute: dict = None,
+    statistics: ThresholdStatistics | None = None,
     **kwargs,
 ) -> dict:
     """
@@ -260,6 +261,8 @@ def get_thresholds(  # noqa: C901
         Dict of above and below thresholds for the standard deviation method.
     absolute : tuple
         Dict of below and above thresholds.
+    statistics : ThresholdStatistics | None
+        Histogram and moments of ``image`` shared between thresholds, if ``None`` they are computed for this call.
     **kwargs :
         Dictionary passed to 'topostats.threshold(**kwargs)'.
 
@@ -269,14 +272,22 @@ def get_thresholds(  # noqa: C901
         Dictionary of thresholds, contains keys 'below' and optionally 'above'.
     """
     thresholds = defaultdict()
+    if statistics is None:
+        statistics = ThresholdStatistics(image)
     if threshold_method == "otsu":
-        thresholds["above"] = threshold(image, method="otsu", otsu_threshold_multiplier=otsu_threshold_multiplier)
+        thresholds["above"] = threshold(
+            image, method="otsu", otsu_threshold_multiplier=otsu_threshold_multiplier, statistics=statistics
+        )
     elif threshold_method == "std_dev":
         try:
             if threshold_std_dev["below"] is not None:
-                thresholds["below"] = threshold(image, method="mean") - threshold_std_dev["below"] * np.nanstd(image)
+                thresholds["below"] = (
+                    threshold(image, method="mean", statistics=statistics) - threshold_std_dev["below"] * statistics.std
+                )
             if threshold_std_dev["above"] is not None:
-                thresholds["above"] = threshold(image, method="mean") + threshold_std_dev["above"] * np.nanstd(image)
+                thresholds["above"] = (
+                    threshold(image, method="mean", statistics=statistics) + threshold_std_dev["above"] * statistics.std
+                )
         except TypeError as typeerror:
             raise typeerror
     elif threshold_method == "absolute":
@@ -49,6 +49,38 @@ DEFAULT_CONFIG_SCHEMA = Schema(
             error="Invalid value in config for 'log_level', valid values are 'info' (default), 'debug', 'error' or 'warning",
         ),
         "cores": lambda n: 1 <= n <= os.cpu_count(),
+        "shared_memory": Or(
+            True,
+            False,
+            error="Invalid value in config for 'shared_memory', valid values are 'True' or 'False'",
+        ),
+        "precision": Or(
+            "float32",
+            "float64",
+            error="Invalid value in config for 'precision', valid values are 'float32' or 'float64'",
+        ),
+        "stack_frames": Or(
+            True,
+            False,
+            error="Invalid value in config for 'stack_frames', valid values are 'True' or 'False'",
+        ),
+        "temporal_coherence": Or(
+            True,
+            False,
+            error="Invalid value in config for 'temporal_coherence', valid values are 'True' or 'False'",
+        ),
+        "coherence_drift_limit": lambda n: 0.0 <= n <= 1.0,
+        "preview": Or(
+            True,
+            False,
+            error="Invalid value in config for 'preview', valid values are 'True' or 'False'",
+        ),
+        "preview_size": lambda n: n > 0,
+        "resume": Or(
+            True,
+            False,
+            error="Invalid value in config for 'resume', valid values are 'True' or 'False'",
+        ),
         "file_ext": Or(
             ".spm",
             ".asd",
@@ -56,7 +88,9 @@ DEFAULT_CONFIG_SCHEMA = Schema(
             ".ibw",
             ".gwy",
             ".topostats",
-            error="Invalid value in config for 'file_ext', valid values are '.spm', '.jpk', '.ibw', '.gwy', '.topostats', or '.asd'.",
+            ".topostats_batch",
+            error="Invalid value in config for 'file_ext', valid values are '.spm', '.jpk', '.ibw', '.gwy', '.topostats', "
+            "'.topostats_batch' or '.asd'.",
         ),
         "loading": {
             "channel": str,
@@ -66,6 +100,11 @@ DEFAULT_CONFIG_SCHEMA = Schema(
                 "filters",
                 error="Invalid value in config for 'extract', valid values are 'all', 'raw' or 'filters'",
             ),
+            "lazy": Or(
+                True,
+                False,
+                error="Invalid value in config for 'loading.lazy', valid values are 'True' or 'False'",
+            ),
         },
         "filter": {
             "run": Or(
@@ -109,6 +148,20 @@ DEFAULT_CONFIG_SCHEMA = Schema(
                 "nearest",
                 error="Invalid value in config for 'filter.gaussian_mode', valid values are 'nearest'",
             ),
+            "lean_memory": Or(
+                True,
+                False,
+                error="Invalid value in config for 'filter.lean_memory', valid values are 'True' or 'False'",
+            ),
+            "tiling": {
+                "run": Or(
+                    True,
+                    False,
+                    error="Invalid value in config for 'filter.tiling.run', valid values are 'True' or 'False'",
+                ),
+                "tile_size": lambda n: n > 0,
+                "cores": lambda n: n >= 1,
+            },
             "remove_scars": {
                 "run": bool,
                 "removal_iterations": lambda n: 0 <= n < 10,
@@ -188,11 +241,27 @@ DEFAULT_CONFIG_SCHEMA = Schema(
                 False,
                 error="Invalid value in config for 'grains.remove_edge_intersecting_grains', valid values are 'True' or 'False'",
             ),
+            "tiling": {
+                "run": Or(
+                    True,
+                    False,
+                    error="Invalid value in config for 'grains.tiling.run', valid values are 'True' or 'False'",
+                ),
+                "tile_size": lambda n: n > 0,
+                "cores": lambda n: n >= 1,
+            },
             "unet_config": {
                 "model_path": Or(None, str),
                 "grain_crop_padding": int,
                 "upper_norm_bound": float,
                 "lower_norm_bound": float,
+                "batch_size": lambda n: n >= 1,
+                "mode": Or(
+                    "crops",
+                    "tiled",
+                    error="Invalid value in config for 'grains.unet_config.mode', valid values are 'crops' or 'tiled'",
+                ),
+                "tile_overlap": lambda n: n >= 0,
             },
             "vetting": {
                 "class_conversion_size_thresholds": Or(
@@ -373,6 +442,44 @@ DEFAULT_CONFIG_SCHEMA = Schema(
                 )
             ],
         },
+        "topostats_file": {
+            "compression": Or(
+                None,
+                "gzip",
+                "lzf",
+                error="Invalid value in config for 'topostats_file.compression', valid values are 'gzip', 'lzf' or null",
+            ),
+            "compression_level": lambda n: 0 <= n <= 9,
+            "batch_container": Or(
+                True,
+                False,
+                error="Invalid value in config for 'topostats_file.batch_container', valid values are 'True' or 'False'",
+            ),
+        },
+        "statistics_output": {
+            "format": Or(
+                "csv",
+                "parquet",
+                error="Invalid value in config for 'statistics_output.format', valid values are 'csv' or 'parquet'",
+            ),
+            "partition_by": Or(
+                "folder",
+                "image",
+                error=(
+                    "Invalid value in config for 'statistics_output.partition_by', valid values are 'folder' or "
+                    "'image'"
+                ),
+            ),
+        },
+        "cache": {
+            "run": Or(
+                True,
+                False,
+                error="Invalid value in config for 'cache.run', valid values are 'True' or 'False'",
+            ),
+            "cache_dir": Or(str, Path, error="Invalid value in config for 'cache.cache_dir', should be a path"),
+            "max_size_gb": lambda n: n > 0,
+        },
         "plotting": {
             "run": Or(
                 True,